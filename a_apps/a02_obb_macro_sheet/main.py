@@ -1,13 +1,23 @@
 from __future__ import annotations
 import os, json, sys, math
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from pathlib import Path
+from typing import List, Dict, Any, Optional
 
-from openbb import obb  # OpenBB builds interface on first import
+# Shared helpers live in lib/py (repo root locally, /app/lib in the job image)
+for _p in Path(__file__).resolve().parents:
+    if (_p / "lib" / "py").is_dir():
+        if str(_p) not in sys.path: sys.path.insert(0, str(_p))
+        break
+from lib.py import startup
+startup.install_from_argv("a02_obb_macro_sheet")  # --startup-profile: per-module import times at exit
 
-from google.auth import default as google_auth_default
-from google.auth.transport.requests import Request as GARequest
-from googleapiclient.discovery import build
+from lib.py import align, encoding, fred, sheets, telemetry
+
+def _obb():
+    # OpenBB builds its whole interface on first import; only the no-FRED_API_KEY path pays for it
+    from openbb import obb
+    return obb
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00","Z")
@@ -30,81 +40,63 @@ FRED_SERIES = {
     "M2SL": "M2 Money Stock (Billions USD)",
 }
 
-def sheets_service():
-    creds,_ = google_auth_default(scopes=["https://www.googleapis.com/auth/spreadsheets"])
-    if not creds.valid: creds.refresh(GARequest())
-    return build("sheets","v4",credentials=creds, cache_discovery=False)
-
-def ensure_header(svc, sheet_id: str, tab: str):
-    header = ["date","id","value","source","desc","yc_2s10s","cpi_yoy","m2_yoy"]
-    meta = svc.spreadsheets().get(spreadsheetId=sheet_id).execute()
-    by_title = {s["properties"]["title"]: s for s in meta.get("sheets", [])}
-    if tab not in by_title:
-        svc.spreadsheets().batchUpdate(spreadsheetId=sheet_id, body={"requests":[{"addSheet":{"properties":{"title": tab}}}]}).execute()
-    svc.spreadsheets().values().update(
-        spreadsheetId=sheet_id,
-        range=f"{tab}!A1:H1",
-        valueInputOption="RAW",
-        body={"values":[header]},
-    ).execute()
-
-def clear_data_rows(svc, sheet_id: str, tab: str):
-    svc.spreadsheets().values().clear(
-        spreadsheetId=sheet_id,
-        range=f"{tab}!A2:H",
-        body={}
-    ).execute()
-
-def append_rows(svc, sheet_id: str, tab: str, matrix: List[List[Any]]):
-    if not matrix: return
-    svc.spreadsheets().values().append(
-        spreadsheetId=sheet_id,
-        range=f"{tab}!A2",
-        valueInputOption="RAW",
-        insertDataOption="INSERT_ROWS",
-        body={"values": matrix},
-    ).execute()
+HEADER = ["date","id","value","source","desc","yc_2s10s","cpi_yoy","m2_yoy"]
+WIDE_HEADER = ["date", *FRED_SERIES, "yc_2s10s", "cpi_yoy", "m2_yoy"]
+
+def frame_rows(df, sym: str) -> List[Dict[str, Any]]:
+    """OpenBB result DataFrame -> [{"date","value"}], column-wise (dates from a date column or the index)."""
+    import pandas as pd
+    col = next((c for c in ("value", "Value", sym) if c in df.columns), None)
+    if col is None:
+        numeric = df.select_dtypes("number").columns
+        if len(numeric) != 1: return []
+        col = numeric[0]
+    dcol = next((c for c in ("date", "Date") if c in df.columns), None)
+    dates = pd.to_datetime(df[dcol] if dcol else df.index.to_series(), errors="coerce").to_numpy()
+    values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64")
+    ok = ~pd.isna(dates) & ~pd.isna(values)
+    days = pd.DatetimeIndex(dates[ok]).strftime("%Y-%m-%d").tolist()
+    return [{"date": d, "value": v} for d, v in zip(days, values[ok].tolist())]
 
 def fred_fetch(symbols: List[str], start_date: str):
-    out: Dict[str, List[Dict[str, Any]]] = {}
-    for sym in symbols:
-        try:
-            res = obb.economy.fred_series(symbol=sym, start_date=start_date)
-            df = res.to_dataframe()
-            rows = []
-            for _, r in df.iterrows():
-                d = r.get("date") or r.get("Date") or r.name
-                v = r.get("value") or r.get("Value")
-                if d is None or v is None: continue
-                d_str = d.date().isoformat() if hasattr(d, "date") else str(d)[:10]
-                try: val = float(v)
-                except Exception: continue
-                rows.append({"date": d_str, "value": val})
-            out[sym] = rows
-        except Exception as e:
-            print(json.dumps({"ts":utc_now_iso(),"lvl":"WARN","sym":sym,"msg":"fred_fetch failed","err":str(e)[:200]}))
-            out[sym] = []
-    return out
-
-def compute_derivatives(timeline: Dict[str, Dict[str,float]]):
-    out = {}
-    dates = sorted(timeline.keys())
-    for i, d in enumerate(dates):
-        row = timeline[d].copy()
-        if "DGS10" in row and "DGS2" in row and isinstance(row["DGS10"], (int,float)) and isinstance(row["DGS2"], (int,float)):
-            row["yc_2s10s"] = row["DGS10"] - row["DGS2"]
-        row["cpi_yoy"] = ""
-        row["m2_yoy"] = ""
-        if i >= 12:
-            prev = timeline.get(dates[i-12], {})
-            if "CPIAUCSL" in row and "CPIAUCSL" in prev and prev["CPIAUCSL"]:
-                try: row["cpi_yoy"] = (row["CPIAUCSL"]/prev["CPIAUCSL"] - 1.0)
-                except Exception: pass
-            if "M2SL" in row and "M2SL" in prev and prev["M2SL"]:
-                try: row["m2_yoy"] = (row["M2SL"]/prev["M2SL"] - 1.0)
-                except Exception: pass
-        out[d] = row
-    return out
+    # Series in parallel (FRED_WORKERS, default all at once); with FRED_CACHE_DIR only observations
+    # after each series' cached tail (plus a re-verified overlap) are requested.
+    fred_key = env("FRED_API_KEY","")
+    def fetch(sym: str, start: str) -> List[Dict[str, Any]]:
+        if fred_key:
+            # direct REST over the shared pooled transport
+            return fred.series_observations(sym, start, fred_key)
+        res = _obb().economy.fred_series(symbol=sym, start_date=start)
+        return frame_rows(res.to_dataframe(), sym)
+    def warn(sym: str, e: Exception) -> None:
+        print(json.dumps({"ts":utc_now_iso(),"lvl":"WARN","sym":sym,"msg":"fred_fetch failed","err":str(e)[:200]}))
+    return fred.observations_batch(symbols, start_date, fetch, workers=int(env("FRED_WORKERS", str(len(symbols))) or 1),
+                                   cache=fred.default_cache(), on_error=warn)
+
+def derivatives(block: Dict[str, align.Series], at, max_age: Optional[int]) -> Dict[str, Any]:
+    # max_age=0: only same-day prints (long layout); None: as-of forward fill (wide layout)
+    _, vals = align.align({k: block[k] for k in ("DGS10", "DGS2")}, at, max_age=max_age)
+    return {
+        "yc_2s10s": vals["DGS10"] - vals["DGS2"],
+        # 12 calendar months back on each series' own dates, then as-of onto the timeline
+        "cpi_yoy": align.asof(align.yoy(block["CPIAUCSL"]), at, max_age=max_age),
+        "m2_yoy": align.asof(align.yoy(block["M2SL"]), at, max_age=max_age),
+    }
+
+def build_matrix(block: Dict[str, align.Series], layout: str):
+    at = align.calendar(block)
+    dates = align.iso_days(at)
+    syms = list(FRED_SERIES)
+    if layout == "wide":
+        # one row per date: every series as-of (last print on or before the date) + derivatives
+        _, vals = align.align(block, at)
+        cols = [encoding.cells(vals[s]) for s in syms] + [encoding.cells(c) for c in derivatives(block, at, None).values()]
+        return WIDE_HEADER, [[d, *row] for d, row in zip(dates, zip(*cols))]
+    _, vals = align.align(block, at, max_age=0)
+    cells = {s: encoding.cells(vals[s]) for s in syms}
+    yc, cpi, m2 = (encoding.cells(c) for c in derivatives(block, at, 0).values())
+    return HEADER, [[d, s, cells[s][i], "fred", FRED_SERIES[s], yc[i], cpi[i], m2[i]]
+                    for i, d in enumerate(dates) for s in syms]
 
 def main():
     sheet_id = env("SHEET_ID")
@@ -115,35 +107,34 @@ def main():
     write_mode = env("WRITE_MODE","replace").lower()  # replace|append
     fred_key = env("FRED_API_KEY","")
     if fred_key: os.environ["FRED_API_KEY"] = fred_key
+    telemetry.install("a02_obb_macro_sheet")  # k=v timing report at exit; PROFILE=cprofile|sample for one run
+    startup.ready()
 
     symbols = list(FRED_SERIES.keys())
-    fred = fred_fetch(symbols, start_date=since)
-    timeline: Dict[str, Dict[str, Any]] = {}
-    for sym, rows in fred.items():
-        for r in rows:
-            d = r["date"]
-            timeline.setdefault(d, {})
-            timeline[d][sym] = r["value"]
-    enriched = compute_derivatives(timeline)
-
-    matrix = []
-    for d in sorted(enriched.keys()):
-        row = enriched[d]
-        for sym, desc in FRED_SERIES.items():
-            val = row.get(sym, "")
-            matrix.append([d, sym, val, "fred", desc, row.get("yc_2s10s",""), row.get("cpi_yoy",""), row.get("m2_yoy","")])
-
-    svc = sheets_service()
-    ensure_header(svc, sheet_id, tab)
-    if write_mode == "replace":
-        clear_data_rows(svc, sheet_id, tab)
-    append_rows(svc, sheet_id, tab, matrix)
+    layout = env("MACRO_LAYOUT","long").lower()  # long (date x series rows) | wide (one row per date)
+    with telemetry.span("fetch", mod="a02", fred_path="direct" if fred_key else "openbb"):
+        fetched = fred_fetch(symbols, start_date=since)
+    with telemetry.span("build", mod="a02", layout=layout):
+        block = {sym: align.series(fetched.get(sym, [])) for sym in symbols}
+        header, matrix = build_matrix(block, layout)
+
+    with telemetry.span("publish", mod="a02", write_mode=write_mode, rows=len(matrix)):
+        client = sheets.client()  # shared Sheets client (lib/py/sheets.py)
+        if write_mode == "replace":
+            # long: 11 rows per date since 2015; header/grid/stale-tail clear in one batchUpdate, rows chunked and concurrent
+            client.replace_rows(sheet_id, tab, matrix, header=header,
+                                workers=int(env("WRITE_WORKERS","4") or 1), progress_path=env("WRITE_PROGRESS") or None)
+        else:
+            client.ensure_header(sheet_id, tab, header)
+            client.append_rows(sheet_id, tab, matrix)
     print(json.dumps({
         "ts": utc_now_iso(),
         "lvl":"INFO",
         "job":"a02_obb_macro_sheet",
         "rows": len(matrix),
         "tab": tab,
+        "layout": layout,
+        "fred_path": "direct" if fred_key else "openbb",
         "write_mode": write_mode
     },separators=(",",":")))
 
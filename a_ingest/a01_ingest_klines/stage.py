@@ -0,0 +1,43 @@
+"""Ingest stage: closed daily klines for one symbol, as one artifact (DAG mode) or page by page (stream mode)."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator
+
+from a_apps.a01_bsp_pullDaily_sheet_full import main as a01
+from lib.py import binance, binance_archive, kline_cache, pipeline
+from lib.py.klineframe import KlineFrame
+
+PAGE = 1000  # bars per Binance response (the API maximum)
+
+
+def ingest_klines(provider: str, symbol: str, since: str, as_of: int) -> Dict[str, Any]:
+    """Every closed bar since `since`; `as_of` (last closed open-close bound) only keys the cache, so a new day refetches."""
+    return {"klines": a01.get_kline_frame(provider, symbol, since)}
+
+
+def pages(provider: str, symbol: str, since: str, *, page: int = PAGE) -> Iterator[KlineFrame]:
+    """Closed klines in time order, at most `page` bars at a time.
+
+    Plain Binance REST is walked one response at a time, so only the page in
+    flight is held; archive, cache and OpenBB sources are loaded first and
+    sliced.
+    """
+    if provider.lower() == "binance" and not a01.env("ARCHIVE_SOURCE") and not a01.env("KLINE_CACHE_DIR"):
+        yield from binance.klines_pages(symbol, binance.date_to_ms(date.fromisoformat(since)), limit=page)
+        return
+    frame = a01.get_kline_frame(provider, symbol, since)
+    for lo in range(0, len(frame), page):
+        yield frame.take(slice(lo, lo + page))
+
+
+STAGE = pipeline.Stage(
+    "ingest_klines",
+    ingest_klines,
+    inputs=("provider", "symbol", "since", "as_of"),
+    outputs=("klines",),
+    code=(a01.get_kline_frame, a01.get_raw_klines, binance, binance_archive, kline_cache),
+)
+
+__all__: Iterable[str] = ("PAGE", "ingest_klines", "pages", "STAGE")
@@ -0,0 +1,27 @@
+"""Ingest stage: FRED macro series (independent of the kline pull, so the two run concurrently)."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Tuple
+
+from a_apps.a02_obb_macro_sheet import main as a02
+from lib.py import align, fred, pipeline
+
+SERIES: Tuple[str, ...] = tuple(a02.FRED_SERIES)
+
+
+def ingest_fred(fred_series: Tuple[str, ...], fred_since: str, fred_as_of: str) -> Dict[str, Any]:
+    """Observations per series since `fred_since` as align.Series; `fred_as_of` (UTC date) only keys the cache."""
+    rows = a02.fred_fetch(list(fred_series), fred_since)
+    return {"fred": {sid: align.series(rows.get(sid, [])) for sid in fred_series}}
+
+
+STAGE = pipeline.Stage(
+    "ingest_fred",
+    ingest_fred,
+    inputs=("fred_series", "fred_since", "fred_as_of"),
+    outputs=("fred",),
+    code=(a02.fred_fetch, a02.frame_rows, fred),
+)
+
+__all__: Iterable[str] = ("SERIES", "ingest_fred", "STAGE")
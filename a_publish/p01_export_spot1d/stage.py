@@ -0,0 +1,51 @@
+"""Publish stage: write the spot1d rows to Google Sheets (whole matrix in DAG mode, chunk by chunk in stream mode)."""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Iterable, List, Sequence
+
+from a_apps.a01_bsp_pullDaily_sheet_full import main as a01
+from lib.py import pipeline, sheets
+
+
+def _workers() -> int:
+    return int(os.getenv("WRITE_WORKERS", "4").strip() or 1)
+
+
+def publish_spot1d(header: List[str], matrix: List[List[Any]], sheet_id: str, sheet_tab: str) -> Dict[str, Any]:
+    """Replace the tab's rows in place; with WRITE_PROGRESS a retry skips chunks an earlier attempt committed."""
+    client = sheets.client()
+    client.replace_rows(sheet_id, sheet_tab, matrix, header=header, workers=_workers(), progress_path=os.getenv("WRITE_PROGRESS") or None)
+    return {"published": {"sheet_tab": sheet_tab, "rows": len(matrix)}}
+
+
+def stream(client: sheets.SheetsClient, sheet_id: str, sheet_tab: str, header: Sequence[str], chunks: Iterable[Any]) -> int:
+    """Write each transform chunk at its row offset as it arrives, patch revised cells, then clear the stale tail.
+
+    Rows are overwritten in place, so the tab never reads empty; returns the
+    number of data rows written.
+    """
+    client.ensure_header(sheet_id, sheet_tab, header)
+    total = 0
+    for chunk in chunks:
+        if chunk.rows:
+            client.properties(sheet_id, sheet_tab, rows=chunk.offset + len(chunk.rows) + 1)
+            client.write_rows(sheet_id, sheet_tab, chunk.rows, first_row=chunk.offset + 2, width=len(header), workers=_workers())
+        if chunk.revisions:
+            a01.write_revisions(client, sheet_id, sheet_tab, chunk.revisions, chunk.spec)
+        total = chunk.offset + len(chunk.rows)
+    if client.tabs(sheet_id).get(sheet_tab, {}).get("gridProperties", {}).get("rowCount", 0) > total + 1:
+        client.clear_rows(sheet_id, sheet_tab, total)
+    return total
+
+
+STAGE = pipeline.Stage(
+    "publish_spot1d",
+    publish_spot1d,
+    inputs=("header", "matrix", "sheet_id", "sheet_tab"),
+    outputs=("published",),
+    code=(sheets,),
+)
+
+__all__: Iterable[str] = ("publish_spot1d", "stream", "STAGE")
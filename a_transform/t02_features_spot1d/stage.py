@@ -0,0 +1,62 @@
+"""Transform stage: spot1d header + rows from the ingested klines.
+
+DAG mode computes the whole history at once. Stream mode pushes each ingest
+page through one `FeatureStream`, whose carried state (rolling windows up
+to sma200's 200 bars, EMA/RMA seeds, cumulative sums, open pivots) stands in
+for a warm-up tail. Every chunk is bit-identical to the batch rows, and
+`revisions` patches structure cells of rows emitted earlier, exactly as a
+batch recompute would change them.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from a_apps.a01_bsp_pullDaily_sheet_full import main as a01
+from lib.py import encoding, features, indicators, pipeline, telemetry
+from lib.py.features import FeatureStream, Revision
+from lib.py.klineframe import KlineFrame
+
+
+class Chunk(NamedTuple):
+    """Finished spot1d rows starting at 0-based data row `offset`, plus revisions of earlier rows."""
+
+    offset: int
+    rows: List[List[Any]]
+    revisions: List[Revision]
+    spec: Optional[Dict[str, int]]
+
+
+def transform_features(klines: KlineFrame, encoding_mode: str) -> Dict[str, Any]:
+    """Header and row matrix (compact or full encoding); depends on the klines only, so a FRED outage never blocks the publish."""
+    spec = encoding.encoding_spec(klines) if encoding_mode == "compact" else None
+    header, matrix = a01.compute_all(klines, spec)
+    return {"header": header, "matrix": matrix}
+
+
+def stream(pages: Iterable[KlineFrame], encoding_mode: str) -> Iterator[Chunk]:
+    """Feature rows page by page; memory is one page plus the indicator state, not the history."""
+    state = FeatureStream()
+    spec: Optional[Dict[str, int]] = None
+    offset = 0
+    for page in pages:
+        if not len(page):
+            continue
+        if encoding_mode == "compact":
+            spec = encoding.widen_spec(spec, encoding.encoding_spec(page))
+        with telemetry.span("chunk", mod="transform", rows=len(page)):
+            rows, revisions = a01.compute_incremental(state, page, spec)
+        if rows or revisions:
+            yield Chunk(offset, rows, revisions, spec)
+            offset += len(rows)
+
+
+STAGE = pipeline.Stage(
+    "transform_features",
+    transform_features,
+    inputs=("klines", "encoding_mode"),
+    outputs=("header", "matrix"),
+    code=(a01.build_header, a01.compute_all, a01._matrix, encoding, features, indicators),
+)
+
+__all__: Iterable[str] = ("Chunk", "transform_features", "stream", "STAGE")
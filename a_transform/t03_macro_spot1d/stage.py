@@ -0,0 +1,30 @@
+"""Transform stage: FRED macro columns as-of joined onto the spot1d bars (kept off the publish path)."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Mapping
+
+from lib.py import align, pipeline
+from lib.py.klineframe import KlineFrame
+
+# Days between an observation's date and its release: daily series print the
+# next morning, monthly CPI/M2 (dated the 1st) land about six weeks later.
+MACRO_LAGS: Dict[str, int] = {"CPIAUCSL": 45, "M2SL": 45}
+DEFAULT_LAG = 1
+
+
+def join_macro(klines: KlineFrame, fred: Mapping[str, align.Series]) -> Dict[str, Any]:
+    """Macro block aligned to the bars, each series shifted by its publication lag."""
+    lags = {sid: MACRO_LAGS.get(sid, DEFAULT_LAG) for sid in fred}
+    return {"macro": align.join_frame(klines, fred, lags=lags)}
+
+
+STAGE = pipeline.Stage(
+    "join_macro",
+    join_macro,
+    inputs=("klines", "fred"),
+    outputs=("macro",),
+    code=(align, repr(MACRO_LAGS), str(DEFAULT_LAG)),
+)
+
+__all__: Iterable[str] = ("MACRO_LAGS", "DEFAULT_LAG", "join_macro", "STAGE")
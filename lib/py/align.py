@@ -0,0 +1,140 @@
+"""As-of alignment of mixed-frequency series on sorted day arrays.
+
+A series is two parallel arrays: strictly increasing days since the epoch
+(int64) and float64 values. Every join is a binary search: `asof` returns,
+for each target day, the last observation on or before it (optionally no
+older than `max_age` days), so daily, weekly and monthly series land on one
+calendar without per-date dicts. Lookbacks are calendar-correct: `yoy` compares
+each observation with the one 12 months earlier (month-end clamped, within
+`tolerance` days), not with whatever sits 12 rows back on a merged timeline.
+
+`join_frame` as-of joins a block of series onto a KlineFrame's bars (by UTC
+open day) so macro columns sit next to the spot1d features; `lags` shifts a
+series by its publication delay to keep the join free of lookahead.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from .klineframe import KlineFrame
+
+DAY_MS = 86_400_000
+YOY_TOLERANCE = 6  # days; wide enough for weekend/holiday gaps, far below a month
+
+
+class Series(NamedTuple):
+    """Sorted observation days (int64 days since epoch) and their float64 values."""
+
+    days: np.ndarray
+    values: np.ndarray
+
+
+def to_days(dates: Iterable[object]) -> np.ndarray:
+    """ISO date strings, `date`s or datetime64 -> int64 days since 1970-01-01."""
+    return np.asarray(dates if isinstance(dates, np.ndarray) else list(dates), dtype="datetime64[D]").astype(np.int64)
+
+
+def iso_days(days: np.ndarray) -> list:
+    """int64 days -> ISO date strings."""
+    return np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype(str).tolist()
+
+
+def series(rows: Iterable[Mapping[str, object]]) -> Series:
+    """Build a Series from `[{"date", "value"}]` rows (any order; the last row per date wins)."""
+    rows = list(rows)
+    days = to_days([str(r["date"])[:10] for r in rows])
+    values = np.array([r["value"] for r in rows], dtype=np.float64)
+    order = np.argsort(days, kind="stable")
+    days, values = days[order], values[order]
+    last = np.r_[days[1:] != days[:-1], True] if days.size else np.zeros(0, dtype=bool)
+    return Series(days[last], values[last])
+
+
+def asof(s: Series, at: np.ndarray, *, max_age: Optional[int] = None) -> np.ndarray:
+    """Value of the last observation on or before each day in `at`; NaN before the first or when older than `max_age`."""
+    at = np.asarray(at, dtype=np.int64)
+    if not s.days.size:
+        return np.full(at.shape, np.nan)
+    idx = np.searchsorted(s.days, at, side="right") - 1
+    ok = idx >= 0
+    safe = np.where(ok, idx, 0)
+    if max_age is not None:
+        ok &= at - s.days[safe] <= max_age
+    return np.where(ok, s.values[safe], np.nan)
+
+
+def shift_months(days: np.ndarray, months: int) -> np.ndarray:
+    """Move each day `months` calendar months back (positive) or forward, clamping to the month's last day."""
+    d = np.asarray(days, dtype=np.int64).astype("datetime64[D]")
+    month = d.astype("datetime64[M]")
+    dom = (d - month.astype("datetime64[D]")).astype(np.int64)
+    target = month - months
+    length = ((target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")).astype(np.int64)
+    return target.astype("datetime64[D]").astype(np.int64) + np.minimum(dom, length - 1)
+
+
+def lookback(s: Series, months: int, *, at: Optional[np.ndarray] = None, tolerance: int = YOY_TOLERANCE) -> np.ndarray:
+    """Value `months` calendar months before each day (default: the series' own days), NaN if none within `tolerance`."""
+    at = s.days if at is None else np.asarray(at, dtype=np.int64)
+    return asof(s, shift_months(at, months), max_age=tolerance)
+
+
+def yoy(s: Series, *, months: int = 12, tolerance: int = YOY_TOLERANCE) -> Series:
+    """Calendar-correct change over `months` on the series' own observation days (x / x[-12 months] - 1)."""
+    prev = lookback(s, months, tolerance=tolerance)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = np.where(prev != 0, s.values / prev - 1.0, np.nan)
+    return Series(s.days, change)
+
+
+def calendar(block: Mapping[str, Series]) -> np.ndarray:
+    """Union of every series' observation days, sorted."""
+    parts = [s.days for s in block.values()]
+    return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+
+def align(
+    block: Mapping[str, Series],
+    at: Optional[np.ndarray] = None,
+    *,
+    max_age: Union[None, int, Mapping[str, Optional[int]]] = None,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """As-of join every series onto `at` (default: the union calendar); returns (days, {name: column}).
+
+    `max_age=0` keeps only same-day observations (no forward fill); a
+    mapping sets it per series.
+    """
+    at = calendar(block) if at is None else np.asarray(at, dtype=np.int64)
+    ages = max_age if isinstance(max_age, Mapping) else {name: max_age for name in block}
+    return at, {name: asof(s, at, max_age=ages.get(name)) for name, s in block.items()}
+
+
+def join_frame(
+    frame: KlineFrame,
+    block: Mapping[str, Series],
+    *,
+    lags: Optional[Mapping[str, int]] = None,
+    max_age: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """As-of join series onto the frame's bars by UTC open day, each shifted `lags[name]` days for publication delay."""
+    bar_days = np.asarray(frame.open_time, dtype=np.int64) // DAY_MS
+    lags = lags or {}
+    return {name: asof(s, bar_days - int(lags.get(name, 0)), max_age=max_age) for name, s in block.items()}
+
+
+__all__: Iterable[str] = (
+    "Series",
+    "to_days",
+    "iso_days",
+    "series",
+    "asof",
+    "shift_months",
+    "lookback",
+    "yoy",
+    "calendar",
+    "align",
+    "join_frame",
+)
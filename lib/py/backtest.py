@@ -0,0 +1,221 @@
+"""Vectorized rule screening over spot1d features: many entry/exit variants as one array program.
+
+Signals are evaluated on closed bars: a rule row fires at the close of bar
+t and the position changes at the open of bar t+1. A (variants x bars)
+boolean matrix of entries and one of exits become positions through a
+forward fill (an exit wins over an entry on the same bar). Equity
+compounds the overnight gap (open t / close t-1) on the position already
+held and the intrabar move (close t / open t) on the position held from
+the open, minus `fee + slippage` per unit of position changed. Bars with a
+missing price carry the position without P&L.
+
+Columns must not know the future either. `point_in_time(frame)` replays
+the history through `features.FeatureStream` and keeps every row as it was
+first emitted: swing/divergence flags fire on the bar their pivot confirms
+(3 bars after it), swing fibs use only confirmed pivots and the fibA
+anchor is the latest sma50/sma200 cross so far. The batch `compute_all`
+columns put those flags on the pivot bar and anchor fibA on the last cross
+of the whole history, which is fine for the sheet but leaks into a
+backtest.
+
+`evaluate` screens thousands of variants per second in row batches and
+returns metrics only; `simulate` keeps the curves for the few worth
+inspecting. Shortlisted rules still go through Freqtrade before paper
+trading.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, NamedTuple, Tuple
+
+import numpy as np
+
+from .features import FEATURES, FLAGS, FeatureStream
+from .indicators import SeriesLike, _arr
+from .klineframe import FIELDS, KlineFrame
+
+Array = np.ndarray
+
+FEE = 0.001  # Binance spot taker
+SLIPPAGE = 0.0005
+PERIODS_PER_YEAR = 365
+METRICS = ("total_return", "cagr", "sharpe", "max_drawdown", "trades", "win_rate", "exposure")
+
+
+class Backtest(NamedTuple):
+    """Per-variant curves, all shaped (variants, bars).
+
+    `position` is the position held over each bar (entered at its open),
+    `returns` the bar's net return, `equity` the compounded curve starting
+    at 1 and `drawdown` the fall from its running peak (<= 0).
+    """
+
+    position: Array
+    returns: Array
+    equity: Array
+    drawdown: Array
+
+
+def point_in_time(frame: KlineFrame) -> Dict[str, Array]:
+    """Raw fields plus every spot1d feature as known at each bar's close (no revisions)."""
+    n = len(frame)
+    out = {k: np.empty(n) for k in FEATURES}
+    stream = FeatureStream()
+    cols = [getattr(frame, name).tolist() for name in FIELDS]
+    for t, bar in enumerate(zip(*cols)):
+        row, revisions = stream.push(bar)
+        for k, v in row.items():
+            out[k][t] = v
+        for col, _start, _values in revisions:
+            if col in FLAGS:
+                out[col][t] = 1  # the pivot (and its flag) became known at this close
+    return {**{name: np.asarray(getattr(frame, name), dtype=np.float64) for name in FIELDS}, **out}
+
+
+def _rows(x: SeriesLike) -> Array:
+    a = np.asarray(x)
+    return a[None, :] if a.ndim == 1 else a
+
+
+def cross_above(a: SeriesLike, b: SeriesLike) -> Array:
+    """True where `a` closes above `b` after closing at or below it the bar before (broadcasts)."""
+    a, b = np.broadcast_arrays(_arr(a), _arr(b))
+    out = np.zeros(a.shape, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        out[..., 1:] = (a[..., 1:] > b[..., 1:]) & (a[..., :-1] <= b[..., :-1])
+    return out
+
+
+def cross_below(a: SeriesLike, b: SeriesLike) -> Array:
+    """True where `a` closes below `b` after closing at or above it the bar before (broadcasts)."""
+    return cross_above(b, a)
+
+
+def positions(entries: SeriesLike, exits: SeriesLike, *, short: bool = False) -> Array:
+    """Position held over each bar (0 or +1, -1 with `short`) from close-of-bar entry/exit signals."""
+    entries, exits = np.broadcast_arrays(_rows(entries).astype(bool), _rows(exits).astype(bool))
+    t = entries.shape[1]
+    last = np.where(entries | exits, np.arange(t, dtype=np.int32), np.int32(-1))
+    np.maximum.accumulate(last, axis=1, out=last)
+    # the latest signal decides: long after an entry, flat after an exit (or before any signal)
+    target = np.take_along_axis(entries & ~exits, np.maximum(last, 0), 1) & (last >= 0)
+    held = np.zeros(entries.shape, dtype=np.float64)
+    held[:, 1:] = target[:, :-1]  # decided at close t, held from the open of t+1
+    return -held if short else held
+
+
+def _legs(open_: SeriesLike, close: SeriesLike) -> Tuple[Array, Array]:
+    o, c = _arr(open_), _arr(close)
+    gap = np.zeros_like(c)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gap[1:] = o[1:] / c[:-1] - 1
+        intra = c / o - 1
+    return np.nan_to_num(gap, nan=0.0, posinf=0.0, neginf=0.0), np.nan_to_num(intra, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def _returns(held: Array, gap: Array, intra: Array, cost: float) -> Array:
+    prev = np.zeros_like(held)
+    prev[:, 1:] = held[:, :-1]
+    return (1 + prev * gap) * (1 + held * intra) * (1 - np.abs(held - prev) * cost) - 1
+
+
+def simulate(
+    open_: SeriesLike,
+    close: SeriesLike,
+    entries: SeriesLike,
+    exits: SeriesLike,
+    *,
+    fee: float = FEE,
+    slippage: float = SLIPPAGE,
+    short: bool = False,
+) -> Backtest:
+    """Full curves for each row of `entries` / `exits` (1-D signals are one variant)."""
+    gap, intra = _legs(open_, close)
+    held = positions(entries, exits, short=short)
+    ret = _returns(held, gap, intra, fee + slippage)
+    equity = np.cumprod(1 + ret, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)  # the starting capital is the first peak
+    return Backtest(held, ret, equity, equity / peak - 1)
+
+
+def _metrics(held: Array, ret: Array, periods_per_year: int) -> Dict[str, Array]:
+    v, t = ret.shape
+    log_ret = np.log1p(ret)
+    total = np.expm1(log_ret.sum(axis=1))
+    log_eq = np.cumsum(log_ret, axis=1)
+    mdd = np.expm1((log_eq - np.maximum(np.maximum.accumulate(log_eq, axis=1), 0.0)).min(axis=1))
+    mean, sd = ret.mean(axis=1), ret.std(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(sd > 0, mean / sd * np.sqrt(periods_per_year), np.nan)
+    on = held != 0
+    prev_on = np.zeros_like(on)
+    prev_on[:, 1:] = on[:, :-1]
+    # A trade runs from the bar it is entered on to the bar it is closed on (gap leg and exit
+    # cost) or the last bar; starts and ends pair up in row-major order.
+    start = np.flatnonzero(on & ~prev_on)
+    closed = prev_on & ~on
+    closed[:, -1] |= on[:, -1]
+    end = np.flatnonzero(closed)
+    flat_eq = log_eq.ravel()
+    before = np.where(start % t > 0, flat_eq[start - 1], 0.0)
+    trades = np.bincount(start // t, minlength=v)
+    wins = np.bincount(start // t, flat_eq[end] > before, minlength=v)
+    return {
+        "total_return": total,
+        "cagr": np.power(1 + total, periods_per_year / t) - 1,
+        "sharpe": sharpe,
+        "max_drawdown": mdd,
+        "trades": trades,
+        "win_rate": np.where(trades > 0, wins / np.maximum(trades, 1), np.nan),
+        "exposure": on.mean(axis=1),
+    }
+
+
+def evaluate(
+    open_: SeriesLike,
+    close: SeriesLike,
+    entries: SeriesLike,
+    exits: SeriesLike,
+    *,
+    fee: float = FEE,
+    slippage: float = SLIPPAGE,
+    short: bool = False,
+    periods_per_year: int = PERIODS_PER_YEAR,
+    batch: int = 256,
+) -> Dict[str, Array]:
+    """Metrics (METRICS, one value per variant) for every row of `entries` / `exits`, `batch` rows at a time.
+
+    Curves are never kept for more than `batch` variants, so memory stays
+    flat however many variants are screened.
+    """
+    gap, intra = _legs(open_, close)
+    entries, exits = np.broadcast_arrays(_rows(entries), _rows(exits))
+    out: Dict[str, list] = {k: [] for k in METRICS}
+    for lo in range(0, entries.shape[0], batch):
+        held = positions(entries[lo:lo + batch], exits[lo:lo + batch], short=short)
+        for k, val in _metrics(held, _returns(held, gap, intra, fee + slippage), periods_per_year).items():
+            out[k].append(val)
+    return {k: np.concatenate(v) if v else np.empty(0) for k, v in out.items()}
+
+
+def best(metrics: Dict[str, Array], by: str = "sharpe", top: int = 10, min_trades: int = 1) -> Array:
+    """Indices of the `top` variants by `by` (descending) among those with at least `min_trades` trades."""
+    score = np.where(metrics["trades"] >= min_trades, metrics[by], np.nan)
+    order = np.argsort(-np.nan_to_num(score, nan=-np.inf), kind="stable")
+    return order[: min(top, int(np.isfinite(score).sum()))]
+
+
+__all__: Iterable[str] = (
+    "Backtest",
+    "FEE",
+    "SLIPPAGE",
+    "PERIODS_PER_YEAR",
+    "METRICS",
+    "point_in_time",
+    "cross_above",
+    "cross_below",
+    "positions",
+    "simulate",
+    "evaluate",
+    "best",
+)
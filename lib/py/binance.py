@@ -1,14 +1,301 @@
-"""Binance data access stubs for ingest pipelines."""
+"""Binance data access helpers for ingest pipelines."""
 
 from __future__ import annotations
 
-from datetime import date
-from typing import Iterable, List, Mapping
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import requests
+
+from . import transport
+from .kline_cache import KlineCache, cached_klines, default_cache
+from .klineframe import KlineFrame
+
+BASES: List[str] = [
+    "https://data-api.binance.vision",
+    "https://api.binance.com",
+    "https://api-gcp.binance.com",
+    "https://api1.binance.com",
+    "https://api2.binance.com",
+    "https://api3.binance.com",
+    "https://api4.binance.com",
+]
+DAY_MS = 86_400_000
+INTERVAL_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": DAY_MS,
+}
+
+
+# /api/v3/klines request weight (any limit up to 1000)
+KLINES_WEIGHT = 2
+
+
+class WeightLimiter:
+    """Token bucket over Binance's per-minute request weight.
+
+    Tokens refill continuously at `limit * headroom` per minute. Every
+    response re-syncs the bucket from the `X-MBX-USED-WEIGHT-1M` header, so
+    weight spent by other clients on the same IP is accounted for, and a
+    429/418 blocks all callers until its `Retry-After` has elapsed.
+    """
+
+    def __init__(self, limit: int = 6000, *, headroom: float = 0.8, window_s: float = 60.0) -> None:
+        self.capacity = limit * headroom
+        self.rate = self.capacity / window_s
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, weight: int) -> None:
+        """Block until `weight` tokens are available and spend them."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= weight:
+                        self.tokens -= weight
+                        return
+                    wait = (weight - self.tokens) / self.rate
+                self._cond.wait(wait)
+
+    def observe(self, response: requests.Response) -> None:
+        """Sync the bucket from the used-weight headers and honour 429/418 bans."""
+        used = None
+        for key, value in response.headers.items():
+            k = key.lower()
+            if k.startswith("x-mbx-used-weight") and k.endswith("1m"):
+                try:
+                    used = max(used or 0, int(value))
+                except ValueError:
+                    continue
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if used is not None:
+                self.tokens = min(self.tokens, self.capacity - used)
+            if response.status_code in (418, 429):
+                try:
+                    retry_after = float(response.headers.get("Retry-After", "60"))
+                except ValueError:
+                    retry_after = 60.0
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                self.tokens = 0.0
+            self._cond.notify_all()
+
+
+LIMITER = WeightLimiter()
+
+
+def fetch_bytes(path: str, *, weight: int = KLINES_WEIGHT, retries: int = 3) -> bytes:
+    """GET `path` from the best-scoring healthy mirror in BASES, paced by LIMITER; return the raw body."""
+    api = transport.shared(BASES, on_response=LIMITER.observe, stop_status=(418, 429))
+    attempt = 0
+    while True:
+        try:
+            # every attempt (hedges and failovers included) spends weight
+            return api.get(path, before_send=lambda: LIMITER.acquire(weight)).content
+        except transport.TransportError as e:
+            # a ban already blocked LIMITER until Retry-After; anything else is final
+            status = e.response.status_code if e.response is not None else None
+            if status not in (418, 429) or attempt >= retries:
+                raise
+            attempt += 1
+
+
+def fetch_json(path: str, *, weight: int = KLINES_WEIGHT, retries: int = 3) -> List[List[object]]:
+    """Like `fetch_bytes`, decoding the JSON body."""
+    return json.loads(fetch_bytes(path, weight=weight, retries=retries))
+
+
+def last_closed_ms(interval: str = "1d", now_ms: Optional[int] = None) -> int:
+    """Return the latest close time a fully closed bar of `interval` can have."""
+    step = INTERVAL_MS[interval]
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    return (now_ms // step) * step - 1
+
+
+# A page parser turns one response body into (kept, raw_count, last_open_ms),
+# keeping closed bars opened in [lo, hi]; the walkers below are shared by the
+# row (cache-faithful strings) and columnar (KlineFrame) entry points.
+PageParser = Callable[[bytes, int, int, int], Tuple[object, int, Optional[int]]]
+
+
+def _parse_rows(body: bytes, lo: int, hi: int, closed_ms: int) -> Tuple[List[List[object]], int, Optional[int]]:
+    page = json.loads(body)
+    kept = [row for row in page if lo <= int(row[0]) <= hi and int(row[6]) <= closed_ms]
+    return kept, len(page), (int(page[-1][0]) if page else None)
+
+
+def _parse_frame(body: bytes, lo: int, hi: int, closed_ms: int) -> Tuple[KlineFrame, int, Optional[int]]:
+    frame = KlineFrame.from_bytes(body)
+    n = len(frame)
+    return frame.select(lo, hi, closed_ms), n, (int(frame.open_time[-1]) if n else None)
+
+
+def _pages(symbol: str, start_ms: int, interval: str, limit: int, parse: PageParser) -> Iterator[object]:
+    # Serial walk, one page in flight: each request starts after the last bar of the previous page
+    base = f"/api/v3/klines?symbol={symbol}&interval={interval}&limit={limit}"
+    closed_ms = last_closed_ms(interval)
+    cur = start_ms
+    while True:
+        kept, n, last_open = parse(fetch_bytes(f"{base}&startTime={cur}"), cur, closed_ms, closed_ms)
+        if not n:
+            return
+        yield kept
+        if n < limit:
+            return
+        cur = last_open + 1
+
+
+def _walk(symbol: str, start_ms: int, interval: str, limit: int, workers: int, parse: PageParser) -> List[object]:
+    if workers <= 1:
+        return list(_pages(symbol, start_ms, interval, limit, parse))
+    base = f"/api/v3/klines?symbol={symbol}&interval={interval}&limit={limit}"
+    closed_ms = last_closed_ms(interval)
+    # Fixed-interval bars make every page boundary known up front: window k
+    # covers [start + k*limit bars, start + (k+1)*limit bars), so pages never
+    # overlap even when `start_ms` predates the listing and stitching is a concat.
+    span = limit * INTERVAL_MS[interval]
+    windows = [(s, s + span - 1) for s in range(start_ms, closed_ms + 1, span)]
+
+    def fetch(window: Tuple[int, int]) -> object:
+        s, e = window
+        return parse(fetch_bytes(f"{base}&startTime={s}&endTime={e}"), s, e, closed_ms)[0]
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(windows) or 1)) as pool:
+        return list(pool.map(fetch, windows))
+
+
+def klines(symbol: str, start_ms: int, *, interval: str = "1d", limit: int = 1000, workers: int = 1) -> List[List[object]]:
+    """Return closed raw klines from `start_ms`; `workers > 1` fetches page windows concurrently."""
+    return [row for page in _walk(symbol, start_ms, interval, limit, workers, _parse_rows) for row in page]
+
+
+def klines_frame(symbol: str, start_ms: int, *, interval: str = "1d", limit: int = 1000, workers: int = 1) -> KlineFrame:
+    """Like `klines`, but parse each response body straight into a columnar KlineFrame."""
+    return KlineFrame.concat(_walk(symbol, start_ms, interval, limit, workers, _parse_frame))
+
+
+def klines_pages(symbol: str, start_ms: int, *, interval: str = "1d", limit: int = 1000) -> Iterator[KlineFrame]:
+    """Yield closed klines from `start_ms` one response page (a KlineFrame of at most `limit` bars) at a time."""
+    return _pages(symbol, start_ms, interval, limit, _parse_frame)
+
+
+def klines_cached(
+    symbol: str,
+    start_ms: int,
+    *,
+    interval: str = "1d",
+    workers: int = 1,
+    cache: Optional[KlineCache] = None,
+    verify_bars: int = 3,
+) -> List[List[object]]:
+    """Return closed raw klines from `start_ms`, requesting only bars missing from the local cache."""
+    return cached_klines(
+        cache if cache is not None else default_cache(),
+        "binance",
+        symbol,
+        interval,
+        start_ms,
+        lambda from_ms: klines(symbol, from_ms, interval=interval, workers=workers),
+        verify_bars=verify_bars,
+        step_ms=INTERVAL_MS[interval],
+    )
+
+
+def klines_batch(
+    symbols: Sequence[str],
+    start_ms: int,
+    *,
+    interval: str = "1d",
+    workers: int = 8,
+    cache: Optional[KlineCache] = None,
+    on_error: Optional[Callable[[str, Exception], None]] = None,
+) -> Dict[str, List[List[object]]]:
+    """Return closed raw klines per symbol, fanning symbols out over a bounded pool.
+
+    All requests share LIMITER, so concurrency is capped by the exchange's
+    weight budget rather than by fixed sleeps. With `on_error`, a failing
+    symbol (delisted, unknown, exhausted retries) is reported there and maps
+    to `[]` while the others are kept; otherwise the first error raises.
+    """
+    def one(symbol: str) -> List[List[object]]:
+        try:
+            return klines_cached(symbol, start_ms, interval=interval, cache=cache)
+        except Exception as exc:
+            if on_error is None:
+                raise
+            on_error(symbol, exc)
+            return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(symbols)))) as pool:
+        return dict(zip(symbols, pool.map(one, symbols)))
+
+
+def date_to_ms(d: date) -> int:
+    """Return 00:00:00Z of `d` as epoch milliseconds."""
+    return int(datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def to_record(symbol: str, row: List[object]) -> Mapping[str, object]:
+    """Map a raw 12-field kline to the `raw_klines_daily` column names."""
+    open_ms = int(row[0])
+    return {
+        "date": datetime.fromtimestamp(open_ms / 1000, tz=timezone.utc).date().isoformat(),
+        "symbol": symbol,
+        "provider": "binance",
+        "open": float(row[1]),
+        "high": float(row[2]),
+        "low": float(row[3]),
+        "close": float(row[4]),
+        "volume": float(row[5]),
+        "close_time": datetime.fromtimestamp(int(row[6]) / 1000, tz=timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "quote_volume": float(row[7]),
+        "trades": int(row[8]),
+        "taker_base": float(row[9]),
+        "taker_quote": float(row[10]),
+        "vendor_ignore": str(row[11]),
+    }
 
 
 def get_klines_daily_binance(symbol: str, since_date: date) -> List[Mapping[str, object]]:
     """Fetch daily kline data for a symbol from Binance starting at the given date."""
-    raise NotImplementedError("Implement Binance kline retrieval.")
+    workers = int(os.getenv("FETCH_WORKERS", "1").strip() or 1)
+    rows = klines_cached(symbol, date_to_ms(since_date), workers=workers)
+    return [to_record(symbol, row) for row in rows]
 
 
-__all__: Iterable[str] = ("get_klines_daily_binance",)
+__all__: Iterable[str] = (
+    "BASES",
+    "WeightLimiter",
+    "LIMITER",
+    "fetch_bytes",
+    "fetch_json",
+    "last_closed_ms",
+    "klines",
+    "klines_frame",
+    "klines_pages",
+    "klines_cached",
+    "klines_batch",
+    "date_to_ms",
+    "to_record",
+    "get_klines_daily_binance",
+)
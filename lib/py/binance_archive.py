@@ -0,0 +1,208 @@
+"""Bulk kline backfill from Binance-style zipped CSV archives (data.binance.vision layout)."""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
+
+from . import binance, transport
+from .kline_cache import KlineCache, default_cache
+
+MIRROR = "https://data.binance.vision/data/spot"
+LOOKAHEAD = 4  # archives downloaded ahead of the one being yielded
+
+
+class ArchiveError(Exception):
+    """Raised when an archive fails checksum verification or cannot be parsed."""
+
+
+class ArchiveSource:
+    """Read archive files from a local directory or an HTTP mirror with the same layout."""
+
+    def __init__(self, root: str = MIRROR) -> None:
+        self.root = root.rstrip("/")
+        self.remote = self.root.startswith(("http://", "https://"))
+
+    def read(self, relpath: str) -> Optional[bytes]:
+        """Return the file bytes, or None when the archive does not exist."""
+        if not self.remote:
+            path = Path(self.root) / relpath
+            return path.read_bytes() if path.exists() else None
+        try:
+            return transport.shared([self.root]).get("/" + relpath).content
+        except transport.TransportError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+
+
+def archive_relpath(symbol: str, interval: str, period: str, stamp: str) -> str:
+    """Return e.g. `monthly/klines/BTCUSDT/1d/BTCUSDT-1d-2017-08.zip`."""
+    return f"{period}/klines/{symbol}/{interval}/{symbol}-{interval}-{stamp}.zip"
+
+
+def verify_checksum(data: bytes, checksum_text: str) -> None:
+    """Compare the zip's sha256 against a `.CHECKSUM` file (`<hex>  <name>`)."""
+    expected = checksum_text.split()[0].lower() if checksum_text.strip() else ""
+    actual = hashlib.sha256(data).hexdigest()
+    if expected != actual:
+        raise ArchiveError(f"checksum mismatch expected={expected[:16]} actual={actual[:16]}")
+
+
+def iter_archive_rows(data: bytes) -> Iterator[List[object]]:
+    """Stream kline rows out of an in-memory zip in the REST 12-field shape (no extraction to disk)."""
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        for name in zf.namelist():
+            if not name.endswith(".csv"):
+                continue
+            with zf.open(name) as fh:
+                for rec in csv.reader(io.TextIOWrapper(fh, encoding="utf-8", newline="")):
+                    if len(rec) < 12 or not rec[0].isdigit():
+                        continue  # header row in some archive vintages
+                    open_t, close_t = int(rec[0]), int(rec[6])
+                    if open_t >= 10**14:  # spot archives switched to microseconds in 2025
+                        open_t, close_t = open_t // 1000, close_t // 1000
+                    yield [open_t, rec[1], rec[2], rec[3], rec[4], rec[5], close_t, rec[7], int(rec[8]), rec[9], rec[10], rec[11]]
+
+
+def _periods(from_ms: int, closed_ms: int) -> List[Tuple[str, str]]:
+    # Whole months before the current one come from monthly files, the rest of
+    # the current month from daily files up to the last closed day.
+    start = datetime.fromtimestamp(from_ms / 1000, tz=timezone.utc)
+    end = datetime.fromtimestamp(closed_ms / 1000, tz=timezone.utc)
+    out: List[Tuple[str, str]] = []
+    y, m = start.year, start.month
+    while (y, m) < (end.year, end.month):
+        out.append(("monthly", f"{y:04d}-{m:02d}"))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    day = max(start, end.replace(day=1, hour=0, minute=0, second=0, microsecond=0)).date()
+    while day <= end.date():
+        out.append(("daily", day.isoformat()))
+        day += timedelta(days=1)
+    return out
+
+
+def _month_days(stamp: str, from_ms: int, closed_ms: int) -> List[Tuple[str, str]]:
+    # Daily files covering one month (clipped to [from_ms, closed_ms]), used while its zip is unpublished.
+    y, m = (int(x) for x in stamp.split("-"))
+    day = max(date(y, m, 1), datetime.fromtimestamp(from_ms / 1000, tz=timezone.utc).date())
+    last = min((date(y + 1, 1, 1) if m == 12 else date(y, m + 1, 1)) - timedelta(days=1),
+               datetime.fromtimestamp(closed_ms / 1000, tz=timezone.utc).date())
+    out: List[Tuple[str, str]] = []
+    while day <= last:
+        out.append(("daily", day.isoformat()))
+        day += timedelta(days=1)
+    return out
+
+
+def archive_rows(
+    symbol: str,
+    from_ms: int,
+    *,
+    interval: str = "1d",
+    source: Optional[ArchiveSource] = None,
+    verify: bool = True,
+    until_ms: Optional[int] = None,
+) -> Iterator[List[List[object]]]:
+    """Yield one list of closed rows per archive, in time order, never skipping a published period.
+
+    Missing monthly files are skipped only before the first row (the months
+    before listing). A later missing month (Binance publishes it a few days
+    into the next one) is read from its daily files instead; the first
+    missing daily file ends the walk and REST fills from the last row. At
+    most LOOKAHEAD archives are fetched ahead. `until_ms` caps close times
+    (default: the last closed bar).
+    """
+    src = source or ArchiveSource()
+    closed_ms = binance.last_closed_ms(interval) if until_ms is None else until_ms
+
+    def load(period: Tuple[str, str]) -> Optional[List[List[object]]]:
+        rel = archive_relpath(symbol, interval, *period)
+        data = src.read(rel)
+        if data is None:
+            return None
+        if verify:
+            checksum = src.read(rel + ".CHECKSUM")
+            if checksum is None:
+                raise ArchiveError(f"missing checksum for {rel}")
+            verify_checksum(data, checksum.decode("utf-8"))
+        return [r for r in iter_archive_rows(data) if from_ms <= r[0] and r[6] <= closed_ms]
+
+    todo: Deque[Tuple[str, str]] = deque(_periods(from_ms, closed_ms))
+    ahead: Deque[Tuple[Tuple[str, str], Future]] = deque()
+    started = False
+    with ThreadPoolExecutor(max_workers=LOOKAHEAD) as pool:
+        try:
+            while todo or ahead:
+                while todo and len(ahead) < LOOKAHEAD:
+                    period = todo.popleft()
+                    ahead.append((period, pool.submit(load, period)))
+                (kind, stamp), fut = ahead.popleft()
+                rows = fut.result()
+                if rows is None:
+                    if kind == "daily":
+                        return  # not published yet; REST fills from the last row
+                    if started:
+                        # Unpublished month inside the history: its daily files, then the rest again.
+                        for _, f in ahead:
+                            f.cancel()
+                        todo = deque(_month_days(stamp, from_ms, closed_ms) + [p for p, _ in ahead] + list(todo))
+                        ahead.clear()
+                    continue  # month before listing
+                started = started or bool(rows)
+                yield rows
+        finally:
+            for _, f in ahead:
+                f.cancel()
+
+
+def backfill(
+    symbol: str,
+    start_ms: int,
+    *,
+    interval: str = "1d",
+    source: Optional[ArchiveSource] = None,
+    cache: Optional[KlineCache] = None,
+    verify: bool = True,
+) -> List[List[object]]:
+    """Return closed raw klines from `start_ms`, seeded from archives and topped up over REST.
+
+    With a cache each verified archive is appended as soon as it is parsed,
+    so an interrupted backfill resumes after the last cached bar.
+    """
+    cache = cache if cache is not None else default_cache()
+    step = binance.INTERVAL_MS[interval]
+    rows: List[List[object]] = []
+    if cache is not None:
+        cached_start, rows = cache.load("binance", symbol, interval)
+        if cached_start is None or start_ms < cached_start:
+            rows = []
+            cache.rewrite("binance", symbol, interval, start_ms, rows)
+    from_ms = int(rows[-1][0]) + step if rows else start_ms
+    for chunk in archive_rows(symbol, from_ms, interval=interval, source=source, verify=verify):
+        if cache is not None:
+            cache.append("binance", symbol, interval, chunk)
+        rows.extend(chunk)
+    if cache is not None:
+        return binance.klines_cached(symbol, start_ms, interval=interval, cache=cache)
+    tail_from = int(rows[-1][0]) + step if rows else start_ms
+    return [r for r in rows if int(r[0]) >= start_ms] + binance.klines(symbol, tail_from, interval=interval)
+
+
+__all__: Iterable[str] = (
+    "ArchiveSource",
+    "ArchiveError",
+    "LOOKAHEAD",
+    "archive_relpath",
+    "verify_checksum",
+    "iter_archive_rows",
+    "archive_rows",
+    "backfill",
+)
@@ -1,23 +1,690 @@
-"""BigQuery helper stubs for the staged data platform."""
+"""BigQuery helpers for the staged data platform: columnar loads, MERGE upserts and cached Arrow reads.
+
+Batches for the `(date, symbol)`-keyed tables in `tools/bq/bootstrap.sql`
+are coerced to the table schema as an Arrow table, written as Parquet, loaded
+with one load job into a throwaway staging table and folded into the target
+by a single `MERGE`. The MERGE's ON clause pins the target to the batch's
+dates, so only those partitions are scanned, and matched rows are updated
+only when a value actually differs: reloading the same batch changes
+nothing, and late revisions touch just the partitions they land in.
+
+The warehouse is pluggable. `get_client()` returns a `BigQueryWarehouse`
+(google-cloud-bigquery, Application Default Credentials) or, with
+`BQ_BACKEND=duckdb`, a `DuckDBWarehouse` that runs the same SQL against an
+embedded DuckDB file (`BQ_DUCKDB_PATH`, in-memory by default) for tests and
+offline runs. pyarrow, google-cloud-bigquery and duckdb are imported lazily.
+
+Reads come back as Arrow tables: the Storage Read API (parallel Arrow
+streams, no query job) on BigQuery, DuckDB's native Arrow export locally.
+With a `PartitionCache` attached (`BQ_CACHE_DIR`), `read` first asks for the
+per-date partition snapshots and fetches only partitions whose snapshot
+is not already cached, in one filtered read.
+"""
 
 from __future__ import annotations
 
-from typing import Iterable, Mapping, Sequence
+import io
+import json
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import telemetry
+from .features import FEATURES_1D
+from .klineframe import FIELDS, KlineFrame
+
+KEYS: Tuple[str, ...] = ("date", "symbol")
+STAGING_TTL_S = 3600  # staging tables left behind by a crashed run expire on their own
+READ_STREAMS = 4  # Storage Read API streams per read session
+
+# Column types per table, in bootstrap.sql order (tools/verify/test_bq_merge.py checks they match).
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    "trading.ohlcv_1d": {
+        "date": "DATE", "symbol": "STRING",
+        "open": "NUMERIC", "high": "NUMERIC", "low": "NUMERIC", "close": "NUMERIC", "volume": "NUMERIC",
+        "qav": "NUMERIC", "ntr": "INT64", "tbb": "NUMERIC", "tbq": "NUMERIC",
+    },
+    "trading.features_1d": {
+        "date": "DATE", "symbol": "STRING",
+        **{name: "NUMERIC" for name in FEATURES_1D},
+    },
+}
+
+_SYMBOL = re.compile(r"[A-Za-z0-9_.:-]+")  # quoted literally into SQL, so nothing that needs escaping
+_DUCKDB_TYPES = {"DATE": "DATE", "STRING": "VARCHAR", "NUMERIC": "DECIMAL(38, 9)", "INT64": "BIGINT", "FLOAT64": "DOUBLE"}
+
+
+class MergeResult(NamedTuple):
+    """Outcome of one `merge_upsert`: rows staged, rows inserted or changed, and the partitions in scope."""
+
+    staged: int
+    affected: int
+    partitions: Tuple[str, ...]
+
+
+def _arrow_type(pa: Any, sql_type: str) -> Any:
+    return {
+        "DATE": pa.date32(),
+        "STRING": pa.string(),
+        "NUMERIC": pa.decimal128(38, 9),  # BigQuery NUMERIC precision/scale
+        "INT64": pa.int64(),
+        "FLOAT64": pa.float64(),
+    }[sql_type]
+
+
+def _arrow_column(pa: Any, values: Any, sql_type: str) -> Any:
+    target = _arrow_type(pa, sql_type)
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        arr = values
+    else:
+        host = np.asarray(values)
+        if host.dtype.kind in "fiub":
+            arr = pa.array(host.astype(np.float64, copy=False), from_pandas=True)  # NaN -> NULL
+        elif host.dtype.kind == "M":
+            arr = pa.array(host.astype("datetime64[D]"))
+        else:
+            arr = pa.array(list(values), from_pandas=True)
+    if arr.type == target:
+        return arr
+    # Float -> NUMERIC keeps the nearest 9-decimal value; exact-decimal safety would reject most floats.
+    return arr.cast(target, safe=not (sql_type == "NUMERIC" and pa.types.is_floating(arr.type)))
+
+
+def to_arrow(table_id: str, data: Any) -> Any:
+    """Coerce a batch to the table's Arrow schema.
+
+    `data` may be a pyarrow Table, a mapping of column -> values, a sequence
+    of row mappings, or a pandas DataFrame. Columns the table lacks are
+    dropped, missing ones become NULL, floats are NaN-to-NULL, and NUMERIC
+    columns are rounded to 9 decimals so reloads compare exactly.
+    """
+    import pyarrow as pa
+
+    schema = SCHEMAS.get(table_id)
+    if isinstance(data, pa.Table):
+        table = data
+    elif hasattr(data, "dtypes") and hasattr(data, "columns"):
+        table = pa.Table.from_pandas(data, preserve_index=False)
+    elif isinstance(data, Mapping):
+        table = None
+        cols = dict(data)
+    else:
+        table = pa.Table.from_pylist([dict(row) for row in data])
+    if table is not None:
+        cols = {name: table.column(name) for name in table.column_names}
+    if schema is None:
+        return table if table is not None else pa.table({k: pa.array(v, from_pandas=True) for k, v in cols.items()})
+    n = len(next(iter(cols.values()))) if cols else 0
+    arrays = [
+        _arrow_column(pa, cols[name], kind) if name in cols else pa.nulls(n, _arrow_type(pa, kind))
+        for name, kind in schema.items()
+    ]
+    return pa.Table.from_arrays(arrays, names=list(schema))
+
+
+def _dedupe_last(pa: Any, table: Any, keys: Sequence[str]) -> Any:
+    # MERGE fails when two source rows match one target row; keep each key's last occurrence.
+    idx = "__row"
+    numbered = table.append_column(idx, pa.array(np.arange(table.num_rows, dtype=np.int64)))
+    last = numbered.group_by(list(keys)).aggregate([(idx, "max")]).column(f"{idx}_max").to_numpy()
+    return table.take(pa.array(np.sort(last)))
+
+
+def parquet_bytes(table: Any) -> bytes:
+    """Serialize an Arrow table to Parquet (the load-job payload)."""
+    import pyarrow.parquet as pq
+
+    buf = io.BytesIO()
+    pq.write_table(table, buf, compression="zstd")
+    return buf.getvalue()
+
+
+def merge_sql(
+    target: str,
+    staging: str,
+    columns: Sequence[str],
+    partitions: Sequence[str],
+    *,
+    keys: Sequence[str] = KEYS,
+    partition_column: str = "date",
+) -> str:
+    """Build the upsert MERGE; valid in both BigQuery and DuckDB SQL.
+
+    The constant `IN (...)` filter on the target's partition column limits
+    the scan to the batch's partitions, and `IS DISTINCT FROM` keeps
+    unchanged rows (NULLs included) out of the UPDATE.
+    """
+    values = [c for c in columns if c not in keys]
+    on = " AND ".join([f"T.{k} = S.{k}" for k in keys])
+    dates = ", ".join(f"DATE '{d}'" for d in partitions)
+    differs = " OR ".join(f"T.{c} IS DISTINCT FROM S.{c}" for c in values)
+    lines = [
+        f"MERGE INTO {target} AS T",
+        f"USING {staging} AS S",
+        f"ON {on} AND T.{partition_column} IN ({dates})",
+    ]
+    if values:
+        lines.append(f"WHEN MATCHED AND ({differs}) THEN UPDATE SET " + ", ".join(f"{c} = S.{c}" for c in values))
+    lines.append(f"WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) VALUES ({', '.join(f'S.{c}' for c in columns)})")
+    return "\n".join(lines)
+
+
+def _iso(day: Any) -> str:
+    return day if isinstance(day, str) else str(np.datetime64(day, "D"))  # date, datetime or datetime64
+
+
+def where_sql(
+    *,
+    dates: Optional[Sequence[Any]] = None,
+    start: Any = None,
+    end: Any = None,
+    symbols: Optional[Sequence[str]] = None,
+) -> str:
+    """Row filter on `date` (list or inclusive range) and `symbol`; valid as SQL WHERE and Storage API row_restriction."""
+    terms = []
+    if dates is not None:
+        terms.append("date IN (" + ", ".join(f"DATE '{_iso(d)}'" for d in dates) + ")" if dates else "FALSE")
+    if start is not None:
+        terms.append(f"date >= DATE '{_iso(start)}'")
+    if end is not None:
+        terms.append(f"date <= DATE '{_iso(end)}'")
+    if symbols is not None:
+        bad = [sym for sym in symbols if not _SYMBOL.fullmatch(sym)]
+        if bad:
+            raise ValueError(f"unsupported symbol(s) {bad}")
+        quoted = ", ".join(f"'{sym}'" for sym in symbols)
+        terms.append(f"symbol IN ({quoted})" if symbols else "FALSE")
+    return " AND ".join(terms)
+
+
+class PartitionCache:
+    """Local Parquet copy of warehouse partitions keyed by (table, date partition, snapshot).
+
+    Each cached partition is one file `<root>/<table>/<date>.parquet` holding
+    every column and symbol of that day; `index.json` next to it records the
+    snapshot (last-modified stamp or content hash) the file was taken at. A
+    partition whose warehouse snapshot moved is refetched; one that did not
+    is never fetched again.
+    """
+
+    def __init__(self, root: os.PathLike | str) -> None:
+        self.root = Path(root)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _dir(self, table_id: str) -> Path:
+        return self.root / table_id
+
+    def _index(self, table_id: str) -> Dict[str, str]:
+        path = self._dir(table_id) / "index.json"
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, table_id: str, snapshots: Mapping[str, str]) -> Tuple[Dict[str, Any], List[str]]:
+        """Return ({date: cached Arrow table}, [dates to fetch]) for the wanted `{date: snapshot}`."""
+        import pyarrow.parquet as pq
+
+        index = self._index(table_id)
+        found: Dict[str, Any] = {}
+        missing: List[str] = []
+        for day, snap in snapshots.items():
+            path = self._dir(table_id) / f"{day}.parquet"
+            if index.get(day) == snap and path.exists():
+                try:
+                    found[day] = pq.read_table(path)
+                    continue
+                except (OSError, ValueError):
+                    pass
+            missing.append(day)
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put(self, table_id: str, parts: Mapping[str, Any], snapshots: Mapping[str, str]) -> None:
+        """Store freshly fetched partitions and record their snapshots."""
+        import pyarrow.parquet as pq
+
+        folder = self._dir(table_id)
+        folder.mkdir(parents=True, exist_ok=True)
+        for day, part in parts.items():
+            tmp = folder / f"{day}.parquet.tmp"
+            pq.write_table(part, tmp, compression="zstd")
+            os.replace(tmp, folder / f"{day}.parquet")
+        with self._lock:
+            index = self._index(table_id)
+            index.update({day: snapshots[day] for day in parts})
+            tmp = folder / "index.json.tmp"
+            tmp.write_text(json.dumps(index, sort_keys=True, separators=(",", ":")) + "\n", encoding="utf-8")
+            os.replace(tmp, folder / "index.json")
+
+
+def _split_by_date(table: Any) -> Dict[str, Any]:
+    import pyarrow.compute as pc
+
+    table = table.sort_by([("date", "ascending")])
+    days = table.column("date").cast("int32").to_numpy()
+    cuts = np.flatnonzero(np.diff(days)) + 1
+    starts = np.concatenate(([0], cuts)).tolist() if days.size else []
+    ends = np.concatenate((cuts, [days.size])).tolist() if days.size else []
+    labels = pc.take(table.column("date"), starts).to_pylist() if starts else []
+    return {day.isoformat(): table.slice(a, b - a) for day, a, b in zip(labels, starts, ends)}
+
+
+class Warehouse:
+    """Backend-neutral loader and reader; subclasses provide the SQL/IO primitives below."""
+
+    cache: Optional[PartitionCache] = None
+
+    def table_ref(self, table_id: str) -> str:
+        """Return `table_id` quoted for this dialect."""
+        raise NotImplementedError
+
+    def load_parquet(self, table_id: str, data: bytes, *, write_disposition: str = "WRITE_APPEND") -> None:
+        """Run one load job of Parquet bytes into `table_id` (WRITE_APPEND or WRITE_TRUNCATE)."""
+        raise NotImplementedError
+
+    def execute(self, sql: str) -> int:
+        """Run one statement; return the DML affected-row count (0 for DDL)."""
+        raise NotImplementedError
+
+    def drop(self, table_id: str) -> None:
+        """Drop a table if it exists."""
+        raise NotImplementedError
+
+    def insert_json(self, table_id: str, rows: Sequence[Mapping[str, object]], *, retry: int = 3) -> None:
+        """Append rows via the backend's row-wise insert path."""
+        raise NotImplementedError
+
+    def read_arrow(self, table_id: str, where: str = "", columns: Optional[Sequence[str]] = None) -> Any:
+        """Return the rows matching `where` (see `where_sql`) as one Arrow table, ordered by (date, symbol)."""
+        raise NotImplementedError
+
+    def partition_snapshots(self, table_id: str, start: Any = None, end: Any = None) -> Dict[str, str]:
+        """Return {date: snapshot} for the table's non-empty date partitions in the inclusive range."""
+        raise NotImplementedError
+
+    def read(
+        self,
+        table_id: str,
+        *,
+        start: Any = None,
+        end: Any = None,
+        symbols: Optional[Sequence[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Any:
+        """Read a date range as Arrow, serving unchanged partitions from `cache` when one is attached."""
+        with telemetry.span("read", mod="bq", table=table_id, cached=self.cache is not None) as sp:
+            table = self._read(table_id, start, end, symbols, columns)
+            sp.fields.update(rows=table.num_rows, bytes=table.nbytes)
+        return table
 
+    def _read(self, table_id: str, start: Any, end: Any, symbols: Optional[Sequence[str]], columns: Optional[Sequence[str]]) -> Any:
+        import pyarrow as pa
+        import pyarrow.compute as pc
 
-def get_client() -> "bigquery.Client":
-    """Return a BigQuery client authenticated via Application Default Credentials."""
-    raise NotImplementedError("Implement BigQuery client acquisition.")
+        if self.cache is None:
+            return self.read_arrow(table_id, where_sql(start=start, end=end, symbols=symbols), columns)
+        snapshots = self.partition_snapshots(table_id, start, end)
+        parts, missing = self.cache.get(table_id, snapshots)
+        if missing:
+            fresh = _split_by_date(self.read_arrow(table_id, where_sql(dates=missing)))
+            self.cache.put(table_id, fresh, snapshots)
+            parts.update(fresh)
+        ordered = [parts[day] for day in sorted(parts)]
+        if not ordered:
+            return self.read_arrow(table_id, "FALSE", columns)
+        table = pa.concat_tables(ordered, promote_options="permissive")
+        if symbols is not None:
+            table = table.filter(pc.is_in(table.column("symbol"), value_set=pa.array(list(symbols), pa.string())))
+        return table.select(list(columns)) if columns else table
+
+    def staging_id(self, table_id: str) -> str:
+        """Return a unique staging table next to `table_id`."""
+        dataset, _, table = table_id.rpartition(".")
+        name = f"_stage_{table}_{uuid.uuid4().hex[:12]}"
+        return f"{dataset}.{name}" if dataset else name
+
+    def load_dataframe(self, table_id: str, df: Any, *, write_disposition: str = "WRITE_APPEND") -> None:
+        """Load a DataFrame/Arrow batch into `table_id` with one Parquet load job."""
+        table = to_arrow(table_id, df)
+        payload = parquet_bytes(table)
+        with telemetry.span("load", mod="bq", table=table_id, rows=table.num_rows, bytes=len(payload)):
+            self.load_parquet(table_id, payload, write_disposition=write_disposition)
+
+    def merge_upsert(self, table_id: str, data: Any, *, keys: Sequence[str] = KEYS) -> MergeResult:
+        """Stage `data` with one load job and MERGE it into `table_id` on `keys`, scoped to its partitions."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        table = to_arrow(table_id, data)
+        if table.num_rows == 0:
+            return MergeResult(0, 0, ())
+        for key in keys:
+            if table.column(key).null_count:
+                raise ValueError(f"{table_id}: NULL in key column {key!r}")
+        table = _dedupe_last(pa, table, keys)
+        partitions = tuple(d.isoformat() for d in sorted(pc.unique(table.column(keys[0])).to_pylist()))
+        staging = self.staging_id(table_id)
+        payload = parquet_bytes(table)
+        with telemetry.span("merge", mod="bq", table=table_id, rows=table.num_rows, bytes=len(payload)):
+            self.load_parquet(staging, payload, write_disposition="WRITE_TRUNCATE")
+            try:
+                affected = self.execute(
+                    merge_sql(self.table_ref(table_id), self.table_ref(staging), table.column_names, partitions, keys=keys)
+                )
+            finally:
+                self.drop(staging)
+        return MergeResult(table.num_rows, affected, partitions)
+
+
+class BigQueryWarehouse(Warehouse):
+    """google-cloud-bigquery backend (Parquet load jobs, DML through query jobs)."""
+
+    def __init__(self, client: Any = None, *, project: Optional[str] = None, location: Optional[str] = None) -> None:
+        self._client = client
+        self.project = project or os.getenv("GCP_PROJECT") or None
+        self.location = location or os.getenv("BQ_LOCATION", "europe-central2")
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        """The underlying `bigquery.Client`, created on first use (ADC)."""
+        with self._lock:
+            if self._client is None:
+                from google.cloud import bigquery
+
+                self._client = bigquery.Client(project=self.project, location=self.location)
+            return self._client
+
+    def table_ref(self, table_id: str) -> str:
+        """Backtick-quote the table id."""
+        return f"`{table_id}`"
+
+    def load_parquet(self, table_id: str, data: bytes, *, write_disposition: str = "WRITE_APPEND") -> None:
+        """Load Parquet bytes with one load job; decimals land as NUMERIC."""
+        from google.cloud import bigquery
+
+        config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition=write_disposition,
+            decimal_target_types=["NUMERIC", "BIGNUMERIC"],
+        )
+        self.client.load_table_from_file(io.BytesIO(data), table_id, job_config=config).result()
+        if table_id.rpartition(".")[2].startswith("_stage_"):
+            table = self.client.get_table(table_id)
+            table.expires = datetime.now(timezone.utc) + timedelta(seconds=STAGING_TTL_S)
+            self.client.update_table(table, ["expires"])
+
+    def execute(self, sql: str) -> int:
+        """Run a query job to completion; return `num_dml_affected_rows`."""
+        job = self.client.query(sql)
+        job.result()
+        return int(job.num_dml_affected_rows or 0)
+
+    def _path(self, table_id: str) -> Tuple[str, str, str]:
+        parts = table_id.split(".")
+        return tuple(parts) if len(parts) == 3 else (self.project or self.client.project, *parts)
+
+    def read_arrow(self, table_id: str, where: str = "", columns: Optional[Sequence[str]] = None) -> Any:
+        """Read through the Storage Read API (Arrow streams, no query job), streams fetched concurrently."""
+        import pyarrow as pa
+        from google.cloud import bigquery_storage_v1
+        from google.cloud.bigquery_storage_v1 import types
+
+        project, dataset, table = self._path(table_id)
+        reader = bigquery_storage_v1.BigQueryReadClient()
+        request = types.ReadSession(
+            table=f"projects/{project}/datasets/{dataset}/tables/{table}",
+            data_format=types.DataFormat.ARROW,
+            read_options=types.ReadSession.TableReadOptions(selected_fields=list(columns or []), row_restriction=where),
+        )
+        session = reader.create_read_session(parent=f"projects/{project}", read_session=request, max_stream_count=READ_STREAMS)
+        if not session.streams:
+            schema = pa.schema([(name, _arrow_type(pa, kind)) for name, kind in SCHEMAS.get(table_id, {}).items()])
+            return schema.empty_table().select(list(columns)) if columns else schema.empty_table()
+        with ThreadPoolExecutor(max_workers=len(session.streams)) as pool:
+            parts = list(pool.map(lambda s: reader.read_rows(s.name).to_arrow(session), session.streams))
+        out = pa.concat_tables(parts)
+        return out.sort_by([(k, "ascending") for k in KEYS if k in out.column_names])
+
+    def partition_snapshots(self, table_id: str, start: Any = None, end: Any = None) -> Dict[str, str]:
+        """Partition last-modified times from INFORMATION_SCHEMA.PARTITIONS (metadata only, no table scan)."""
+        project, dataset, table = self._path(table_id)
+        lo = _iso(start).replace("-", "") if start is not None else "0"
+        hi = _iso(end).replace("-", "") if end is not None else "99999999"
+        job = self.client.query(
+            f"SELECT partition_id, UNIX_MICROS(last_modified_time) AS ts, total_rows "
+            f"FROM `{project}.{dataset}.INFORMATION_SCHEMA.PARTITIONS` "
+            f"WHERE table_name = '{table}' AND partition_id BETWEEN '{lo}' AND '{hi}' AND total_rows > 0"
+        )
+        return {
+            f"{p[:4]}-{p[4:6]}-{p[6:]}": f"{ts}:{rows}"
+            for p, ts, rows in ((r["partition_id"], r["ts"], r["total_rows"]) for r in job.result())
+            if p.isdigit()
+        }
+
+    def drop(self, table_id: str) -> None:
+        """Delete the table (missing is fine)."""
+        self.client.delete_table(table_id, not_found_ok=True)
+
+    def insert_json(self, table_id: str, rows: Sequence[Mapping[str, object]], *, retry: int = 3) -> None:
+        """Streaming insert; retries the rows BigQuery rejects up to `retry` times."""
+        pending = list(rows)
+        for _ in range(max(1, retry)):
+            errors = self.client.insert_rows_json(table_id, pending) if pending else []
+            if not errors:
+                return
+            pending = [pending[e["index"]] for e in errors]
+        raise RuntimeError(f"{table_id}: {len(pending)} rows rejected: {errors[:3]}")
+
+
+class DuckDBWarehouse(Warehouse):
+    """Embedded DuckDB stand-in that accepts the same table ids, Parquet payloads and MERGE SQL."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        import duckdb
+
+        self.path = path
+        self.con = duckdb.connect(path)
+        self._lock = threading.Lock()
+
+    def bootstrap(self, schemas: Mapping[str, Mapping[str, str]] = SCHEMAS) -> None:
+        """Create the datasets and tables of `schemas` if missing (the bootstrap.sql equivalent)."""
+        for table_id, columns in schemas.items():
+            dataset = table_id.rpartition(".")[0]
+            if dataset:
+                self.execute(f"CREATE SCHEMA IF NOT EXISTS {dataset}")
+            cols = ", ".join(
+                f"{name} {_DUCKDB_TYPES[kind]}" + (" NOT NULL" if name in KEYS else "") for name, kind in columns.items()
+            )
+            self.execute(f"CREATE TABLE IF NOT EXISTS {table_id} ({cols})")
+
+    def table_ref(self, table_id: str) -> str:
+        """DuckDB takes `dataset.table` as `schema.table` unquoted."""
+        return table_id
+
+    def load_parquet(self, table_id: str, data: bytes, *, write_disposition: str = "WRITE_APPEND") -> None:
+        """Read the Parquet payload and create/replace or append to `table_id`."""
+        import pyarrow.parquet as pq
+
+        batch = pq.read_table(io.BytesIO(data))
+        with self._lock:
+            self.con.register("_load_batch", batch)
+            try:
+                exists = self.con.execute(
+                    "SELECT count(*) FROM information_schema.tables WHERE table_schema = ? AND table_name = ?",
+                    list(_split(table_id)),
+                ).fetchone()[0]
+                if write_disposition == "WRITE_TRUNCATE" or not exists:
+                    self.con.execute(f"CREATE OR REPLACE TABLE {table_id} AS SELECT * FROM _load_batch")
+                else:
+                    self.con.execute(f"INSERT INTO {table_id} BY NAME SELECT * FROM _load_batch")
+            finally:
+                self.con.unregister("_load_batch")
+
+    def execute(self, sql: str) -> int:
+        """Run one statement; MERGE/INSERT/UPDATE report their affected-row count."""
+        with self._lock:
+            cur = self.con.execute(sql)
+            row = cur.fetchone() if cur.description else None
+        return int(row[0]) if row and cur.description[0][0] == "Count" else 0
+
+    def read_arrow(self, table_id: str, where: str = "", columns: Optional[Sequence[str]] = None) -> Any:
+        """Run the filtered SELECT and return DuckDB's Arrow result."""
+        cols = ", ".join(columns) if columns else "*"
+        sql = f"SELECT {cols} FROM {table_id}" + (f" WHERE {where}" if where else "") + " ORDER BY date, symbol"
+        with self._lock:
+            return self.con.execute(sql).arrow().read_all()
+
+    def partition_snapshots(self, table_id: str, start: Any = None, end: Any = None) -> Dict[str, str]:
+        """Per-date row count and order-independent content hash (DuckDB tables have no partition metadata)."""
+        cols = ", ".join(self.con.execute(f"SELECT * FROM {table_id} LIMIT 0").arrow().schema.names)
+        where = where_sql(start=start, end=end)
+        sql = f"SELECT date, count(*), bit_xor(hash({cols})) FROM {table_id}" + (f" WHERE {where}" if where else "") + " GROUP BY date"
+        with self._lock:
+            rows = self.con.execute(sql).fetchall()
+        return {day.isoformat(): f"{n}:{h}" for day, n, h in rows}
+
+    def drop(self, table_id: str) -> None:
+        """Drop the table if it exists."""
+        self.execute(f"DROP TABLE IF EXISTS {table_id}")
+
+    def insert_json(self, table_id: str, rows: Sequence[Mapping[str, object]], *, retry: int = 3) -> None:
+        """Append rows (schema-coerced) in one statement."""
+        if rows:
+            self.load_parquet(table_id, parquet_bytes(to_arrow(table_id, rows)))
+
+
+def _split(table_id: str) -> Tuple[str, str]:
+    dataset, _, table = table_id.rpartition(".")
+    return dataset or "main", table
+
+
+_CLIENT: Optional[Warehouse] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client() -> Warehouse:
+    """Return the process-wide warehouse: BigQuery (ADC) by default, DuckDB when `BQ_BACKEND=duckdb`.
+
+    With `BQ_CACHE_DIR` set, its `read` serves unchanged date partitions
+    from a local Parquet `PartitionCache`.
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            if os.getenv("BQ_BACKEND", "bigquery").strip().lower() == "duckdb":
+                local = DuckDBWarehouse(os.getenv("BQ_DUCKDB_PATH", ":memory:"))
+                local.bootstrap()
+                _CLIENT = local
+            else:
+                _CLIENT = BigQueryWarehouse()
+            cache_dir = os.getenv("BQ_CACHE_DIR", "").strip()
+            if cache_dir:
+                _CLIENT.cache = PartitionCache(cache_dir)
+        return _CLIENT
+
+
+def set_client(client: Optional[Warehouse]) -> None:
+    """Install `client` as the process-wide warehouse (None resets to the env-selected default)."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        _CLIENT = client
 
 
 def load_dataframe(table_id: str, df: "DataFrame", *, write_disposition: str = "WRITE_APPEND") -> None:
-    """Load a pandas DataFrame into the specified BigQuery table."""
-    raise NotImplementedError("Implement DataFrame load to BigQuery.")
+    """Load a pandas DataFrame (or Arrow table / column mapping) into the table with one Parquet load job."""
+    get_client().load_dataframe(table_id, df, write_disposition=write_disposition)
 
 
 def insert_json(table_id: str, rows: Sequence[Mapping[str, object]], *, retry: int = 3) -> None:
-    """Insert JSON payload rows into a BigQuery table using streaming inserts."""
-    raise NotImplementedError("Implement JSON row insertion to BigQuery.")
+    """Insert JSON payload rows using streaming inserts (small ad-hoc writes; prefer `merge_upsert`)."""
+    with telemetry.span("insert_json", mod="bq", table=table_id, rows=len(rows)):
+        get_client().insert_json(table_id, rows, retry=retry)
+
+
+def merge_upsert(table_id: str, data: Any, *, keys: Sequence[str] = KEYS, client: Optional[Warehouse] = None) -> MergeResult:
+    """Idempotently upsert a batch into a `(date, symbol)` table via staging load + one partition-scoped MERGE."""
+    return (client or get_client()).merge_upsert(table_id, data, keys=keys)
+
+
+def read(
+    table_id: str,
+    *,
+    start: Any = None,
+    end: Any = None,
+    symbols: Optional[Sequence[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+    client: Optional[Warehouse] = None,
+) -> Any:
+    """Read a `(date, symbol)` table range as one Arrow table through the (cached) warehouse."""
+    return (client or get_client()).read(table_id, start=start, end=end, symbols=symbols, columns=columns)
+
+
+def read_klines(symbol: str, *, start: Any = None, end: Any = None, client: Optional[Warehouse] = None) -> KlineFrame:
+    """Load a symbol's `trading.ohlcv_1d` history as a KlineFrame (for recomputing features offline)."""
+    import pyarrow.compute as pc
+
+    table = read("trading.ohlcv_1d", start=start, end=end, symbols=[symbol], client=client)
+    open_time = table.column("date").cast("int32").to_numpy().astype(np.int64) * 86_400_000
+    cols = {
+        "open_time": open_time,
+        "close_time": open_time + 86_399_999,
+        "ignore": np.zeros(open_time.shape[0]),
+        **{name: pc.cast(table.column(name), "float64").to_numpy(zero_copy_only=False) for name in FIELDS if name in table.column_names},
+    }
+    return KlineFrame.from_block(np.column_stack([np.asarray(cols[name], dtype=np.float64) for name in FIELDS]))
+
+
+def _dates(frame: KlineFrame) -> np.ndarray:
+    return (frame.open_time.astype(np.int64) // 86_400_000).astype("datetime64[D]")
+
+
+def ohlcv_columns(frame: KlineFrame, symbol: str) -> Dict[str, Any]:
+    """`trading.ohlcv_1d` columns for a symbol's daily frame (UTC open date as `date`)."""
+    n = len(frame)
+    out: Dict[str, Any] = {"date": _dates(frame), "symbol": [symbol] * n}
+    out.update({name: getattr(frame, name) for name in SCHEMAS["trading.ohlcv_1d"] if name not in out})
+    return out
+
+
+def features_columns(frame: KlineFrame, feats: Mapping[str, np.ndarray], symbol: str) -> Dict[str, Any]:
+    """`trading.features_1d` columns from spot1d feature arrays (see `features.FEATURES_1D`)."""
+    out: Dict[str, Any] = {"date": _dates(frame), "symbol": [symbol] * len(frame)}
+    out.update({col: feats[name] for col, name in FEATURES_1D.items()})
+    return out
 
 
-__all__: Iterable[str] = ("get_client", "load_dataframe", "insert_json")
+__all__: Iterable[str] = (
+    "KEYS",
+    "SCHEMAS",
+    "MergeResult",
+    "Warehouse",
+    "BigQueryWarehouse",
+    "DuckDBWarehouse",
+    "to_arrow",
+    "parquet_bytes",
+    "merge_sql",
+    "get_client",
+    "set_client",
+    "load_dataframe",
+    "insert_json",
+    "merge_upsert",
+    "where_sql",
+    "PartitionCache",
+    "read",
+    "read_klines",
+    "ohlcv_columns",
+    "features_columns",
+)
@@ -0,0 +1,130 @@
+"""Compact per-column value encoding for published feature matrices.
+
+Every spot1d column gets a kind: prices and price-derived levels are
+rounded to the instrument's tick, base/quote quantities to their step,
+ratios and 0-100 oscillators to fixed decimals, flags and trade counts
+become ints. Tick and step decimals are read off the raw exchange values
+(the fewest decimals that reproduce every price exactly), so no symbol
+metadata is needed. Rounding is one vectorized pass over the stacked
+float columns; a column whose magnitude leaves fewer than the requested
+decimals inside float64's 2**53 integer range is rounded to what fits.
+
+`check_error_bounds` proves the quantization: every encoded cell is within
+half a unit of its last kept decimal (plus float rounding) of the raw
+value, and missing cells stay missing.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .features import FEATURES, FLAGS
+from .klineframe import KlineFrame
+
+MAX_DECIMALS = 8
+MIN_DECIMALS = 2  # floor for tick/step decimals read off a short sample
+RATIO_DECIMALS = 6
+OSC_DECIMALS = 4
+_EXACT = float(2 ** 53)
+
+# Column kinds for the 12 raw kline fields and the 58 features (FEATURES order).
+KINDS: Dict[str, str] = {
+    "open": "price", "high": "price", "low": "price", "close": "price",
+    "volume": "qty", "tbb": "qty", "qav": "quote", "tbq": "quote", "ntr": "count",
+    **{name: "flag" for name in FLAGS},
+    **{name: "qty" for name in ("delta", "cvd", "avg_trade", "obv", "ad")},
+    **{name: "ratio" for name in ("tbr", "rvol20", "roc10", "cmf20", "bb_w")},
+    **{name: "osc" for name in ("rsi14", "mfi14", "di_plus", "di_minus", "adx14")},
+}
+for _name in FEATURES:
+    KINDS.setdefault(_name, "price")  # averages, bands, channels, MACD legs, fib levels
+
+
+def tick_decimals(values: np.ndarray, *, floor: int = MIN_DECIMALS, cap: int = MAX_DECIMALS) -> int:
+    """Return the fewest decimals (>= floor, <= cap) that reproduce every finite value exactly."""
+    x = values[np.isfinite(values)]
+    for d in range(floor, cap + 1):
+        scale = 10.0 ** d
+        if np.all(np.abs(np.rint(x * scale) / scale - x) <= 4 * np.spacing(np.abs(x))):
+            return d
+    return cap
+
+
+def encoding_spec(frame: KlineFrame, columns: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Decimals per float column (flags and counts are ints and carry no entry)."""
+    decimals = {
+        "price": tick_decimals(np.concatenate([frame.open, frame.high, frame.low, frame.close])),
+        "qty": tick_decimals(np.concatenate([frame.volume, frame.tbb])),
+        "quote": tick_decimals(np.concatenate([frame.qav, frame.tbq])),
+        "ratio": RATIO_DECIMALS,
+        "osc": OSC_DECIMALS,
+    }
+    names = list(KINDS) if columns is None else list(columns)
+    return {name: decimals[KINDS[name]] for name in names if KINDS.get(name) in decimals}
+
+
+def widen_spec(spec: Optional[Mapping[str, int]], page: Mapping[str, int]) -> Dict[str, int]:
+    """Merge a new page's spec into the running one; decimals only grow, so later rows never lose precision."""
+    return {k: max(v, (spec or {}).get(k, v)) for k, v in page.items()}
+
+
+def _effective(block: np.ndarray, decimals: np.ndarray) -> np.ndarray:
+    # Keep |x| * 10**d below 2**53 so the scaled value is still an exact integer grid
+    peak = np.max(np.where(np.isfinite(block), np.abs(block), 0.0), axis=0, initial=0.0)
+    fits = np.floor(np.log10(_EXACT / np.where(peak > 0, peak, 1.0)))
+    return np.minimum(decimals, fits).astype(np.int64)
+
+
+def encode_block(columns: Mapping[str, np.ndarray], spec: Mapping[str, int]) -> Tuple[Dict[str, np.ndarray], Dict[str, int]]:
+    """Round every spec'd column in one vectorized pass; return (encoded columns, effective decimals)."""
+    names = [name for name in spec if name in columns]
+    if not names:
+        return {}, {}
+    block = np.column_stack([np.asarray(columns[name], dtype=np.float64) for name in names])
+    dec = _effective(block, np.array([spec[name] for name in names], dtype=np.int64))
+    scale = 10.0 ** dec
+    with np.errstate(invalid="ignore"):
+        out = np.rint(block * scale) / scale
+    return {name: out[:, j] for j, name in enumerate(names)}, dict(zip(names, dec.tolist()))
+
+
+def cells(col: np.ndarray) -> List[object]:
+    """Column to Sheets cells: non-finite -> '' (empty cell); int dtypes stay ints."""
+    out = col.tolist()
+    if col.dtype.kind == "f":
+        for i in np.flatnonzero(~np.isfinite(col)).tolist():
+            out[i] = ""
+    return out
+
+
+def check_error_bounds(
+    raw: Mapping[str, np.ndarray], encoded: Mapping[str, np.ndarray], decimals: Mapping[str, int]
+) -> Dict[str, float]:
+    """Return {column: worst error / allowed error} for columns that break the bound (empty = all within)."""
+    bad = {}
+    for name, d in decimals.items():
+        x = np.asarray(raw[name], dtype=np.float64)
+        y = np.asarray(encoded[name], dtype=np.float64)
+        ok = np.isfinite(x)
+        if not np.array_equal(ok, np.isfinite(y)):
+            bad[name] = float("inf")
+            continue
+        allowed = 0.5 * 10.0 ** -d + 4 * np.spacing(np.abs(x[ok]))
+        err = np.abs(y[ok] - x[ok])
+        worst = float(np.max(err / allowed)) if err.size else 0.0
+        if worst > 1.0:
+            bad[name] = worst
+    return bad
+
+
+__all__: Iterable[str] = (
+    "KINDS",
+    "tick_decimals",
+    "encoding_spec",
+    "widen_spec",
+    "encode_block",
+    "cells",
+    "check_error_bounds",
+)
@@ -0,0 +1,477 @@
+"""spot1d feature set: batch columns and the equivalent checkpointed stream."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import indicators as ind
+from . import telemetry
+from .indicator_stream import (
+    EMA,
+    RMA,
+    RSI,
+    SMA,
+    Cumulative,
+    Lag,
+    PivotStream,
+    RollingExtreme,
+    StdDev,
+    WindowSums,
+    fib_levels,
+    finite,
+    nan_max,
+    ratio,
+)
+from .klineframe import FIELDS, KlineFrame
+
+# Column order of the a01 `spot1d` tab after the 12 raw kline fields.
+FEATURES: Tuple[str, ...] = (
+    "delta", "cvd", "tbr", "rvol20", "avg_trade",
+    "vwap_bar", "vwap_sess", "vwma20",
+    "sma20", "sma50", "sma200", "ema12", "ema26", "ema50", "macd", "macd_sig", "macd_hist", "rsi14", "roc10", "obv",
+    "ad", "cmf20", "mfi14",
+    "atr14", "bb_mid", "bb_up", "bb_dn", "bb_w", "kc_mid", "kc_up", "kc_dn",
+    "di_plus", "di_minus", "adx14", "don20_hi", "don20_lo", "don55_hi", "don55_lo",
+    "swing_hh", "swing_hl", "swing_lh", "swing_ll", "bull_div_rsi", "bear_div_rsi", "bull_div_cvd", "bear_div_cvd",
+    "fib20_382", "fib20_500", "fib20_618", "fib55_382", "fib55_500", "fib55_618",
+    "fib_sw_382", "fib_sw_500", "fib_sw_618", "fibA_382", "fibA_500", "fibA_618",
+)
+FLAGS = frozenset(FEATURES[38:46])
+
+# (column, first row index, values): earlier rows whose value changed after a push.
+Revision = Tuple[str, int, List[float]]
+
+_NAN = float("nan")
+
+
+class Node(NamedTuple):
+    """One computation in the feature DAG; equal nodes (same op, inputs and params) run once.
+
+    Inputs are raw kline field names, other feature names or nested Nodes.
+    `out` selects one element of a multi-output op.
+    """
+
+    op: str
+    inputs: Tuple[Any, ...]
+    params: Tuple[Tuple[str, Any], ...] = ()
+    out: Optional[int] = None
+
+
+def node(op: str, *inputs: Any, out: Optional[int] = None, **params: Any) -> Node:
+    """Declare a DAG node; keyword arguments become the op's parameters."""
+    return Node(op, inputs, tuple(sorted(params.items())), out)
+
+
+def _band(mid: np.ndarray, dev: np.ndarray, k: float) -> np.ndarray:
+    return mid + k * dev
+
+
+OPS: Dict[str, Callable[..., Any]] = {
+    "sub": np.subtract,
+    "ratio": ind._ratio,
+    "band": _band,
+    "delta": ind.delta,
+    "cumulative_delta": ind.cumulative_delta,
+    "taker_buy_ratio": ind.taker_buy_ratio,
+    "relative_volume": ind.relative_volume,
+    "average_trade_size": ind.average_trade_size,
+    "vwap": ind.vwap,
+    "session_vwap": ind.session_vwap,
+    "vwma": ind.vwma,
+    "sma": ind.sma,
+    "ema": ind.ema,
+    "rma": ind.rma,
+    "stddev": ind.stddev,
+    "rsi": ind.rsi,
+    "roc": ind.roc,
+    "macd_signal": ind.macd_signal,
+    "macd_histogram": ind.macd_histogram,
+    "on_balance_volume": ind.on_balance_volume,
+    "accumulation_distribution": ind.accumulation_distribution,
+    "chaikin_money_flow": ind.chaikin_money_flow,
+    "money_flow_index": ind.money_flow_index,
+    "atr": ind.atr,
+    "directional_index": ind.directional_index,
+    "rolling_max": ind.rolling_max,
+    "rolling_min": ind.rolling_min,
+    "fibonacci_from_range": ind.fibonacci_from_range,
+    "price_pivots": ind.price_pivots,
+    "swing_points": lambda h, l, piv: ind.swing_points(h, l, pivots=piv),
+    "divergence_flags": lambda h, l, x, piv: ind.divergence_flags(h, l, x, pivots=piv),
+    "swing_fibonacci_levels": lambda h, l, piv: ind.swing_fibonacci_levels(h, l, pivots=piv),
+    "anchored_fibonacci_levels": ind.anchored_fibonacci_levels,
+}
+
+_PIV = node("price_pivots", "high", "low", lookback=3, min_sep=5)
+_CVD_SMOOTH = node("rma", "cvd", window=5)
+
+
+def _fib(lo: Any, hi: Any) -> Tuple[Node, Node, Node]:
+    return tuple(node("fibonacci_from_range", lo, hi, out=k) for k in range(3))
+
+
+def _outs(op: str, *inputs: Any, count: int, **params: Any) -> Tuple[Node, ...]:
+    return tuple(node(op, *inputs, out=k, **params) for k in range(count))
+
+
+# Every spot1d column as a DAG node. Columns that are the same computation
+# (sma20/bb_mid, don20_*/the fib20 range, atr14/the Keltner width) resolve to
+# the same node and are computed once.
+SPECS: Dict[str, Node] = {
+    # Volume & Flow
+    "delta": node("delta", "tbb", "volume"),
+    "cvd": node("cumulative_delta", "delta"),
+    "tbr": node("taker_buy_ratio", "tbb", "volume"),
+    "rvol20": node("relative_volume", "volume", node("sma", "volume", window=20)),
+    "avg_trade": node("average_trade_size", "volume", "ntr"),
+    "vwap_bar": node("vwap", "qav", "volume"),
+    "vwap_sess": node("session_vwap", "qav", "volume"),
+    "vwma20": node("vwma", "close", "volume", window=20),
+    # Momentum / Trend
+    "sma20": node("sma", "close", window=20),
+    "sma50": node("sma", "close", window=50),
+    "sma200": node("sma", "close", window=200),
+    "ema12": node("ema", "close", window=12),
+    "ema26": node("ema", "close", window=26),
+    "ema50": node("ema", "close", window=50),
+    "macd": node("sub", "ema12", "ema26"),
+    "macd_sig": node("macd_signal", "macd", signal=9),
+    "macd_hist": node("macd_histogram", "macd", "macd_sig"),
+    "rsi14": node("rsi", "close", window=14),
+    "roc10": node("roc", "close", period=10),
+    "obv": node("on_balance_volume", "close", "volume"),
+    # Money Flow
+    "ad": node("accumulation_distribution", "high", "low", "close", "volume"),
+    "cmf20": node("chaikin_money_flow", "high", "low", "close", "volume", window=20),
+    "mfi14": node("money_flow_index", "high", "low", "close", "volume", window=14),
+    # Bands/Channels
+    "atr14": node("atr", "high", "low", "close", window=14),
+    "bb_mid": node("sma", "close", window=20),
+    "bb_up": node("band", "bb_mid", node("stddev", "close", window=20), k=2.0),
+    "bb_dn": node("band", "bb_mid", node("stddev", "close", window=20), k=-2.0),
+    "bb_w": node("ratio", node("sub", "bb_up", "bb_dn"), "bb_mid"),
+    "kc_mid": node("ema", "close", window=20),
+    "kc_up": node("band", "kc_mid", "atr14", k=2.0),
+    "kc_dn": node("band", "kc_mid", "atr14", k=-2.0),
+    # DI/ADX/Donchian
+    **dict(zip(("di_plus", "di_minus", "adx14"), _outs("directional_index", "high", "low", "close", count=3, window=14))),
+    "don20_hi": node("rolling_max", "high", window=20),
+    "don20_lo": node("rolling_min", "low", window=20),
+    "don55_hi": node("rolling_max", "high", window=55),
+    "don55_lo": node("rolling_min", "low", window=55),
+    # Pivots & Divergences (k=3 fractals, 5 bar spacing; CVD smoothed via RMA(5))
+    **dict(zip(("swing_hh", "swing_hl", "swing_lh", "swing_ll"), _outs("swing_points", "high", "low", _PIV, count=4))),
+    **dict(zip(("bull_div_rsi", "bear_div_rsi"), _outs("divergence_flags", "high", "low", "rsi14", _PIV, count=2))),
+    **dict(zip(("bull_div_cvd", "bear_div_cvd"), _outs("divergence_flags", "high", "low", _CVD_SMOOTH, _PIV, count=2))),
+    # Fibonacci sets
+    **dict(zip(("fib20_382", "fib20_500", "fib20_618"), _fib("don20_lo", "don20_hi"))),
+    **dict(zip(("fib55_382", "fib55_500", "fib55_618"), _fib("don55_lo", "don55_hi"))),
+    **dict(zip(("fib_sw_382", "fib_sw_500", "fib_sw_618"), _outs("swing_fibonacci_levels", "high", "low", _PIV, count=3))),
+    **dict(zip(("fibA_382", "fibA_500", "fibA_618"), _outs("anchored_fibonacci_levels", "high", "low", "sma50", "sma200", count=3))),
+}
+
+# `trading.features_1d` column -> spot1d feature (see tools/bq/bootstrap.sql).
+FEATURES_1D: Dict[str, str] = {
+    "rsi_14": "rsi14",
+    "atr_14": "atr14",
+    "macd_12_26_9": "macd",
+    "macd_signal_12_26_9": "macd_sig",
+    "donchian_upper_20": "don20_hi",
+    "donchian_lower_20": "don20_lo",
+}
+
+
+def resolve(ref: Any) -> Any:
+    """Expand feature-name references so equal computations compare equal; raw fields stay strings."""
+    if isinstance(ref, Node):
+        return ref._replace(inputs=tuple(resolve(x) for x in ref.inputs))
+    if ref in FIELDS:
+        return ref
+    if ref in SPECS:
+        return resolve(SPECS[ref])
+    raise KeyError(f"unknown feature or field {ref!r}")
+
+
+def plan(columns: Iterable[str]) -> List[Node]:
+    """Return the distinct nodes needed for `columns`, dependencies first (multi-output ops appear once)."""
+    order: List[Node] = []
+    seen = set()
+
+    def visit(n: Node) -> None:
+        key = n._replace(out=None)
+        for x in n.inputs:
+            if isinstance(x, Node):
+                visit(x)
+        if key not in seen:
+            seen.add(key)
+            order.append(key)
+
+    for name in columns:
+        visit(resolve(name))
+    return order
+
+
+def compute(frame: KlineFrame, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """Compute only the requested feature columns (default: all of FEATURES) over the planned DAG."""
+    names = list(FEATURES if columns is None else columns)
+    values: Dict[Node, Any] = {}
+
+    def value(ref: Any) -> Any:
+        if not isinstance(ref, Node):
+            return getattr(frame, ref)
+        res = values[ref._replace(out=None)]
+        return res if ref.out is None else res[ref.out]
+
+    for n in plan(names):
+        t0 = time.perf_counter()
+        values[n] = OPS[n.op](*(value(x) for x in n.inputs), **dict(n.params))
+        telemetry.record("compute", time.perf_counter() - t0, mod="features", family=n.op)
+    return {name: value(resolve(name)) for name in names}
+
+
+def feature_columns(frame: KlineFrame, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """Indicator columns keyed by feature name (NaN = missing, structure flags int8)."""
+    return compute(frame, columns)
+
+
+def _parts() -> Dict[str, Any]:
+    return {
+        "cvd": Cumulative(), "sum_q": Cumulative(), "sum_v": Cumulative(), "obv": Cumulative(), "ad": Cumulative(),
+        "sma_v20": SMA(20), "vwma20": WindowSums(20, 2),
+        "sma20": SMA(20), "sma50": SMA(50), "sma200": SMA(200),
+        "ema12": EMA(12), "ema26": EMA(26), "ema50": EMA(50), "macd_sig": EMA(9),
+        "rsi14": RSI(14), "roc10": Lag(10),
+        "cmf20": WindowSums(20, 2), "mfi14": WindowSums(14, 2),
+        "atr14": RMA(14), "std20": StdDev(20), "kc_mid": EMA(20),
+        "rma_plus": RMA(14), "rma_minus": RMA(14), "adx14": RMA(14),
+        "don20_hi": RollingExtreme(20, "max"), "don20_lo": RollingExtreme(20, "min"),
+        "don55_hi": RollingExtreme(55, "max"), "don55_lo": RollingExtreme(55, "min"),
+        "piv_hi": PivotStream(3, 5, "high"), "piv_lo": PivotStream(3, 5, "low"),
+        "rsi_hi": PivotStream(3, 5, "high"), "rsi_lo": PivotStream(3, 5, "low"),
+        "cvd_smooth": RMA(5), "cvd_hi": PivotStream(3, 5, "high"), "cvd_lo": PivotStream(3, 5, "low"),
+    }
+
+
+class FeatureStream:
+    """Incremental `feature_columns`: push one closed bar, get its feature row in O(1) amortized work.
+
+    Rows equal the batch columns bit for bit. Structure columns are only
+    known after the fact (pivots and their swing/divergence flags confirm 3
+    bars late, the fibA anchor moves on each sma50/sma200 cross), so `push`
+    also returns revisions of earlier rows, exactly as a batch recompute
+    would change them. `spec` rides along in the checkpoint: the encoding
+    decimals of the rows already published from this stream.
+    """
+
+    VERSION = 2
+    _scalars = ("n", "last_open_ms", "prev_c", "prev_h", "prev_l", "prev_tp", "prev_d", "anchor", "lo_a", "hi_a")
+
+    def __init__(self) -> None:
+        self.parts = _parts()
+        self.n = 0
+        self.last_open_ms: Optional[int] = None
+        self.prev_c = self.prev_h = self.prev_l = self.prev_tp = self.prev_d = _NAN
+        self.anchor = 0
+        self.lo_a = self.hi_a = _NAN
+        self.spec: Optional[Dict[str, int]] = None
+
+    # ---- checkpointing ----
+    def to_state(self) -> Dict[str, Any]:
+        """Return a JSON-able checkpoint."""
+        state = {k: getattr(self, k) for k in self._scalars}
+        state["version"] = self.VERSION
+        state["parts"] = {k: p.state() for k, p in self.parts.items()}
+        state["spec"] = self.spec
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "FeatureStream":
+        """Rebuild a stream from `to_state()` output."""
+        if state.get("version") != cls.VERSION:
+            raise ValueError(f"unsupported feature checkpoint version {state.get('version')}")
+        stream = cls()
+        for k in cls._scalars:
+            setattr(stream, k, state[k])
+        for k, p in stream.parts.items():
+            p.load(state["parts"][k])
+        stream.spec = state.get("spec")  # absent in checkpoints written before it was kept
+        return stream
+
+    # ---- updates ----
+    def push(self, bar: Sequence[float]) -> Tuple[Dict[str, float], List[Revision]]:
+        """Consume one raw 12-field bar (FIELDS order); return its feature row and revisions of earlier rows."""
+        ot, _o, h, l, c, v, _ct, qav, ntr, tbb, tbq, _ig = (float(x) for x in bar)
+        p = self.parts
+        i = self.n
+        pc, ph, pl = self.prev_c, self.prev_h, self.prev_l
+        rev: List[Revision] = []
+        f: Dict[str, float] = {}
+        # Volume & Flow
+        f["delta"] = d = 2 * tbb - v
+        f["cvd"] = p["cvd"].update(d, finite(d))
+        f["tbr"] = ratio(tbb, v)
+        f["rvol20"] = ratio(v, p["sma_v20"].update(v))
+        f["avg_trade"] = ratio(v, ntr)
+        f["vwap_bar"] = ratio(qav, v)
+        ok = finite(qav) and finite(v) and v != 0
+        f["vwap_sess"] = ratio(p["sum_q"].update(qav if ok else 0.0, True), p["sum_v"].update(v if ok else 0.0, True))
+        full, s = p["vwma20"].update(finite(c) and finite(v), c * v, v)
+        f["vwma20"] = ratio(s[0], s[1]) if full else _NAN
+        # Momentum / Trend
+        for k in ("sma20", "sma50", "sma200", "ema12", "ema26", "ema50", "rsi14"):
+            f[k] = p[k].update(c)
+        f["macd"] = f["ema12"] - f["ema26"]
+        f["macd_sig"] = p["macd_sig"].update(f["macd"])
+        f["macd_hist"] = f["macd"] - f["macd_sig"]
+        f["roc10"] = ratio(c, p["roc10"].update(c)) - 1
+        sign = 1.0 if c > pc else -1.0 if c < pc else 0.0
+        f["obv"] = p["obv"].update(sign * v, finite(c) and finite(pc) and finite(v))
+        # Money Flow
+        clv = ((c - l) - (h - c)) / (h - l) if finite(h) and finite(l) and finite(c) and h - l > 0 else 0.0
+        mfv = clv * v
+        f["ad"] = p["ad"].update(mfv, finite(mfv))
+        full, s = p["cmf20"].update(finite(mfv) and finite(v), mfv, v)
+        f["cmf20"] = ratio(s[0], s[1]) if full else _NAN
+        tp = (h + l + c) / 3
+        rmf = tp * v
+        valid = finite(tp) and finite(self.prev_tp) and finite(rmf)
+        full, s = p["mfi14"].update(valid, rmf if tp > self.prev_tp else 0.0, rmf if tp < self.prev_tp else 0.0)
+        f["mfi14"] = 100.0 if valid and s[1] == 0 else (100 - 100 / (1 + s[0] / s[1])) if full else _NAN
+        # Bands/Channels
+        f["atr14"] = atr = p["atr14"].update(nan_max(h - l, abs(h - pc), abs(l - pc)))
+        sd = p["std20"].update(c)
+        f["bb_mid"] = mid = f["sma20"]
+        f["bb_up"], f["bb_dn"] = mid + 2.0 * sd, mid - 2.0 * sd
+        f["bb_w"] = ratio(f["bb_up"] - f["bb_dn"], mid)
+        f["kc_mid"] = kc = p["kc_mid"].update(c)
+        f["kc_up"], f["kc_dn"] = kc + 2.0 * atr, kc - 2.0 * atr
+        # DI/ADX/Donchian
+        up, down = h - ph, pl - l
+        plus_dm = _NAN if i == 0 else max(up, 0.0) if up > down else 0.0
+        minus_dm = _NAN if i == 0 else max(down, 0.0) if down > up else 0.0
+        f["di_plus"] = dp = ratio(100 * p["rma_plus"].update(plus_dm), atr)
+        f["di_minus"] = dm = ratio(100 * p["rma_minus"].update(minus_dm), atr)
+        f["adx14"] = p["adx14"].update(ratio(100 * abs(dp - dm), dp + dm))
+        f["don20_hi"], f["don20_lo"] = p["don20_hi"].update(h), p["don20_lo"].update(l)
+        f["don55_hi"], f["don55_lo"] = p["don55_hi"].update(h), p["don55_lo"].update(l)
+        # Pivots & Divergences
+        for k in FLAGS:
+            f[k] = 0
+        new_hi, new_lo = p["piv_hi"].update(h), p["piv_lo"].update(l)
+        for new, piv, gt, lt in ((new_hi, p["piv_hi"], "swing_hh", "swing_lh"), (new_lo, p["piv_lo"], "swing_hl", "swing_ll")):
+            if new and len(piv.recent) == 2:
+                prev_v, cur_v = piv.recent[0][1], piv.recent[1][1]
+                if cur_v > prev_v:
+                    rev.append((gt, new[0], [1]))
+                if cur_v < prev_v:
+                    rev.append((lt, new[0], [1]))
+        p["rsi_hi"].update(f["rsi14"])
+        p["rsi_lo"].update(f["rsi14"])
+        cvd_s = p["cvd_smooth"].update(f["cvd"])
+        p["cvd_hi"].update(cvd_s)
+        p["cvd_lo"].update(cvd_s)
+        for osc in ("rsi", "cvd"):
+            if new_lo and self._diverges(p["piv_lo"], p[f"{osc}_lo"], -1):
+                rev.append((f"bull_div_{osc}", new_lo[0], [1]))
+            if new_hi and self._diverges(p["piv_hi"], p[f"{osc}_hi"], 1):
+                rev.append((f"bear_div_{osc}", new_hi[0], [1]))
+        # Fibonacci sets
+        f["fib20_382"], f["fib20_500"], f["fib20_618"] = fib_levels(f["don20_lo"], f["don20_hi"])
+        f["fib55_382"], f["fib55_500"], f["fib55_618"] = fib_levels(f["don55_lo"], f["don55_hi"])
+        hs, ls = p["piv_hi"].recent, p["piv_lo"].recent
+        sw = fib_levels(ls[-1][1], hs[-1][1]) if hs and ls else (_NAN, _NAN, _NAN)
+        f["fib_sw_382"], f["fib_sw_500"], f["fib_sw_618"] = sw
+        first = min(x[0] for x in (new_hi, new_lo) if x) if new_hi or new_lo else i
+        for k, val in zip(("fib_sw_382", "fib_sw_500", "fib_sw_618"), sw):
+            if first < i:
+                rev.append((k, first, [val] * (i - first)))
+        d_ma = f["sma50"] - f["sma200"]
+        cross = finite(self.prev_d) and finite(d_ma) and (
+            (self.prev_d <= 0 and d_ma > 0) or (self.prev_d >= 0 and d_ma < 0)
+        )
+        if cross:
+            for k in ("fibA_382", "fibA_500", "fibA_618"):
+                rev.append((k, self.anchor, [_NAN] * (i - self.anchor)))
+            self.anchor = i
+        if cross or i == 0:
+            self.lo_a, self.hi_a = l, h
+        else:
+            self.lo_a = float(np.fmin(self.lo_a, l))
+            self.hi_a = float(np.fmax(self.hi_a, h))
+        f["fibA_382"], f["fibA_500"], f["fibA_618"] = fib_levels(self.lo_a, self.hi_a)
+
+        self.n = i + 1
+        self.last_open_ms = int(ot)
+        self.prev_c, self.prev_h, self.prev_l, self.prev_tp, self.prev_d = c, h, l, tp, d_ma
+        return f, rev
+
+    @staticmethod
+    def _diverges(price: PivotStream, osc: PivotStream, sign: int) -> bool:
+        # The oscillator pivots confirmed so far all sit at or before the new price pivot.
+        pr, orc = price.recent, osc.recent
+        if len(pr) < 2 or len(orc) < 2:
+            return False
+        return pr[1][1] * sign > pr[0][1] * sign and orc[1][1] * sign < orc[0][1] * sign
+
+    def extend(self, frame: KlineFrame) -> Tuple[List[Dict[str, float]], List[Revision]]:
+        """Push every bar of `frame`; revisions landing on the new rows are folded into them.
+
+        Returns the new rows and the revisions that still refer to rows
+        emitted before this call.
+        """
+        base = self.n
+        rows: List[Dict[str, float]] = []
+        older: List[Revision] = []
+        cols = [getattr(frame, name).tolist() for name in FIELDS]
+        for bar in zip(*cols):
+            row, rev = self.push(bar)
+            rows.append(row)
+            for col, start, values in rev:
+                for j, val in enumerate(values):
+                    if start + j >= base:
+                        rows[start + j - base][col] = val
+                if start < base:
+                    older.append((col, start, values[: base - start]))
+        return rows, older
+
+
+def load_checkpoint(path: str) -> Optional[FeatureStream]:
+    """Return the stream saved at `path`, or None when there is no checkpoint."""
+    p = Path(path)
+    if not p.exists():
+        return None
+    return FeatureStream.from_state(json.loads(p.read_text(encoding="utf-8")))
+
+
+def save_checkpoint(path: str, stream: FeatureStream) -> None:
+    """Atomically write the stream checkpoint to `path`."""
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    tmp.write_text(json.dumps(stream.to_state(), separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, p)
+
+
+__all__: Iterable[str] = (
+    "FEATURES",
+    "FLAGS",
+    "Revision",
+    "Node",
+    "node",
+    "OPS",
+    "SPECS",
+    "FEATURES_1D",
+    "resolve",
+    "plan",
+    "compute",
+    "feature_columns",
+    "FeatureStream",
+    "load_checkpoint",
+    "save_checkpoint",
+)
@@ -0,0 +1,100 @@
+"""Direct FRED REST access over the shared transport, with incremental cached and concurrent pulls."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from . import transport
+from .kline_cache import KlineCache, cached_klines
+
+BASES: List[str] = ["https://api.stlouisfed.org"]
+VERIFY_OBS = 3  # trailing cached observations re-requested to pick up FRED revisions
+
+Observation = Dict[str, object]
+FetchFn = Callable[[str, str], List[Observation]]
+
+
+def series_observations(series_id: str, start_date: str, api_key: str) -> List[Dict[str, object]]:
+    """Return `[{"date", "value"}]` observations from `start_date`; FRED's "." gaps are dropped."""
+    payload = transport.shared(BASES).get_json(
+        "/fred/series/observations",
+        {"series_id": series_id, "api_key": api_key, "file_type": "json", "observation_start": start_date},
+    )
+    rows: List[Dict[str, object]] = []
+    for obs in payload.get("observations", []):
+        try:
+            val = float(obs["value"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        rows.append({"date": str(obs["date"])[:10], "value": val})
+    return rows
+
+
+def _day_ms(day: str) -> int:
+    d = date.fromisoformat(day[:10])
+    return int(datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _ms_day(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).date().isoformat()
+
+
+def cached_series(
+    cache: Optional[KlineCache],
+    series_id: str,
+    start_date: str,
+    fetch: FetchFn,
+    *,
+    verify_obs: int = VERIFY_OBS,
+) -> List[Observation]:
+    """Return observations from `start_date`, requesting only those after the cached tail.
+
+    Series share the kline store (provider `fred`, interval `obs`) with rows
+    `[date_ms, date, value]`; the last `verify_obs` cached observations are
+    re-requested with the new ones, so a revised print rewrites the segment,
+    while observations the re-request no longer returns stay cached.
+    """
+    def fetch_rows(from_ms: int) -> List[List[object]]:
+        return [[_day_ms(str(r["date"])), str(r["date"])[:10], r["value"]] for r in fetch(series_id, _ms_day(from_ms))]
+
+    rows = cached_klines(cache, "fred", series_id, "obs", _day_ms(start_date), fetch_rows, verify_bars=verify_obs)
+    return [{"date": row[1], "value": row[2]} for row in rows]
+
+
+def observations_batch(
+    series_ids: Sequence[str],
+    start_date: str,
+    fetch: FetchFn,
+    *,
+    workers: int = 8,
+    cache: Optional[KlineCache] = None,
+    on_error: Optional[Callable[[str, Exception], None]] = None,
+) -> Dict[str, List[Observation]]:
+    """Pull every series over a bounded pool (wall time ~ the slowest series, not the sum).
+
+    With `on_error`, a failing series is reported there and maps to `[]`
+    (its cache segment is left untouched); otherwise the first error raises.
+    """
+    def one(series_id: str) -> List[Observation]:
+        try:
+            return cached_series(cache, series_id, start_date, fetch)
+        except Exception as exc:
+            if on_error is None:
+                raise
+            on_error(series_id, exc)
+            return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(series_ids)))) as pool:
+        return dict(zip(series_ids, pool.map(one, series_ids)))
+
+
+def default_cache() -> Optional[KlineCache]:
+    """Return the observation cache rooted at `FRED_CACHE_DIR`, or None when caching is disabled."""
+    root = os.getenv("FRED_CACHE_DIR", "").strip()
+    return KlineCache(root) if root else None
+
+
+__all__: Iterable[str] = ("series_observations", "cached_series", "observations_batch", "default_cache")
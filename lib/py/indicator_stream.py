@@ -0,0 +1,315 @@
+"""Streaming counterparts of lib/py/indicators.py: one bar per `update`, serializable state.
+
+Each class reproduces the batch function's arithmetic operation for
+operation (same running-sum order, same NaN rules), so pushing bars one at a
+time yields bit-identical values to recomputing the whole history. `state()`
+returns a JSON-able dict and `load(state)` restores it onto a freshly
+constructed instance with the same parameters.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_NAN = float("nan")
+
+
+def finite(x: float) -> bool:
+    """Return True for a finite float (the batch engine's notion of a valid sample)."""
+    return math.isfinite(x)
+
+
+def ratio(num: float, den: float) -> float:
+    """Scalar form of the batch `_ratio`: NaN unless both are finite and `den != 0`."""
+    return num / den if math.isfinite(num) and math.isfinite(den) and den != 0 else _NAN
+
+
+def nan_max(*xs: float) -> float:
+    """`np.maximum` semantics: NaN if any argument is NaN."""
+    return _NAN if any(x != x for x in xs) else max(xs)
+
+
+class _Stateful:
+    """Dump/restore the attributes listed in `_fields` (deques round-trip as lists)."""
+
+    _fields: Tuple[str, ...] = ()
+
+    def state(self) -> Dict[str, Any]:
+        """Return the JSON-able state."""
+        out: Dict[str, Any] = {}
+        for f in self._fields:
+            v = getattr(self, f)
+            out[f] = v.state() if isinstance(v, _Stateful) else list(v) if isinstance(v, deque) else v
+        return out
+
+    def load(self, state: Dict[str, Any]) -> "_Stateful":
+        """Restore state produced by `state()` onto this instance."""
+        for f in self._fields:
+            cur = getattr(self, f)
+            val = state[f]
+            if isinstance(cur, _Stateful):
+                cur.load(val)
+            else:
+                setattr(self, f, deque(val, maxlen=cur.maxlen) if isinstance(cur, deque) else val)
+        return self
+
+
+class WindowSums(_Stateful):
+    """Rolling sums of `width` columns over the last `window` jointly valid samples.
+
+    Keeps the running cumulative sums and the ones from `window` valid
+    samples ago, so each sum is `cs[j] - cs[j - window]` exactly as the
+    batch cumsum difference.
+    """
+
+    _fields = ("count", "cs", "hist")
+
+    def __init__(self, window: int, width: int = 1) -> None:
+        self.window = window
+        self.count = 0
+        self.cs = [0.0] * width
+        self.hist: deque = deque(maxlen=window + 1)
+
+    def update(self, valid: bool, *vals: float) -> Tuple[bool, Optional[List[float]]]:
+        """Return `(full, sums)`; sums is None for an invalid sample and a warm-up prefix sum before `full`."""
+        if not valid:
+            return False, None
+        self.cs = [a + b for a, b in zip(self.cs, vals)]
+        self.hist.append(self.cs)
+        self.count += 1
+        if len(self.hist) <= self.window:
+            return self.count >= self.window, self.cs
+        return True, [a - b for a, b in zip(self.cs, self.hist[0])]
+
+
+class SMA(_Stateful):
+    """Streaming `indicators.sma`."""
+
+    _fields = ("sums",)
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.sums = WindowSums(window)
+
+    def update(self, x: float) -> float:
+        """Push one sample and return the average (NaN until the window is complete)."""
+        full, s = self.sums.update(finite(x), x)
+        return s[0] / self.window if full else _NAN
+
+
+class EMA(_Stateful):
+    """Streaming `indicators.ema` (SMA seed, reset on a missing sample)."""
+
+    _fields = ("seed", "cnt", "s")
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.k = 2.0 / (window + 1)
+        self.seed: Optional[float] = None
+        self.cnt = 0
+        self.s = 0.0
+
+    def _step(self, seed: float, v: float) -> float:
+        return (v - seed) * self.k + seed
+
+    def update(self, v: float) -> float:
+        """Push one sample and return the smoothed value (NaN during warm-up)."""
+        if not finite(v):
+            self.seed, self.cnt, self.s = None, 0, 0.0
+            return _NAN
+        if self.seed is None:
+            self.s += v
+            self.cnt += 1
+            if self.cnt == self.window:
+                self.seed = self.s / self.window
+            return _NAN if self.seed is None else self.seed
+        self.seed = self._step(self.seed, v)
+        return self.seed
+
+
+class RMA(EMA):
+    """Streaming `indicators.rma` (Wilder smoothing)."""
+
+    def _step(self, seed: float, v: float) -> float:
+        return (seed * (self.window - 1) + v) / self.window
+
+
+class RSI(_Stateful):
+    """Streaming `indicators.rsi`; a gap inside the first window disables it, as in batch."""
+
+    _fields = ("i", "prev", "gain", "loss", "ag", "al", "dead")
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.i = -1
+        self.prev = _NAN
+        self.gain = 0.0
+        self.loss = 0.0
+        self.ag: Optional[float] = None
+        self.al: Optional[float] = None
+        self.dead = False
+
+    def _value(self) -> float:
+        return 100.0 if self.al == 0 else (100 - 100 / (1 + self.ag / self.al))
+
+    def update(self, c: float) -> float:
+        """Push one close and return the RSI (NaN during warm-up or on a gap)."""
+        self.i += 1
+        prev, self.prev = self.prev, c
+        if self.i == 0 or self.dead:
+            return _NAN
+        ok = finite(c) and finite(prev)
+        d = c - prev
+        w = self.window
+        if self.i <= w:
+            if not ok:
+                self.dead = True
+                return _NAN
+            self.gain += max(d, 0)
+            self.loss += max(-d, 0)
+            if self.i < w:
+                return _NAN
+            self.ag = self.gain / w
+            self.al = self.loss / w
+            return self._value()
+        if not ok:
+            return _NAN
+        self.ag = (self.ag * (w - 1) + max(d, 0)) / w
+        self.al = (self.al * (w - 1) + max(-d, 0)) / w
+        return self._value()
+
+
+class RollingExtreme(_Stateful):
+    """Streaming `indicators.rolling_max`/`rolling_min` via a monotonic deque of `[index, value]`."""
+
+    _fields = ("i", "dq")
+
+    def __init__(self, window: int, kind: str = "max") -> None:
+        self.window = window
+        self.is_max = kind == "max"
+        self.i = -1
+        self.dq: deque = deque()
+
+    def update(self, x: float) -> float:
+        """Push one sample and return the trailing-window extreme."""
+        self.i += 1
+        dq = self.dq
+        if dq and dq[0][0] <= self.i - self.window:
+            dq.popleft()
+        if not finite(x):
+            return _NAN
+        while dq and (dq[-1][1] <= x if self.is_max else dq[-1][1] >= x):
+            dq.pop()
+        dq.append([self.i, x])
+        return dq[0][1] if self.i >= self.window - 1 else _NAN
+
+
+class StdDev(_Stateful):
+    """Streaming `indicators.stddev` over the last `window` valid samples."""
+
+    _fields = ("buf",)
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.buf: deque = deque(maxlen=window)
+
+    def update(self, x: float) -> float:
+        """Push one sample and return the population standard deviation."""
+        if not finite(x):
+            return _NAN
+        self.buf.append(x)
+        return float(np.std(np.array(self.buf))) if len(self.buf) == self.window else _NAN
+
+
+class Lag(_Stateful):
+    """Return the sample pushed `period` bars ago (NaN before that)."""
+
+    _fields = ("buf",)
+
+    def __init__(self, period: int) -> None:
+        self.buf: deque = deque(maxlen=period)
+
+    def update(self, x: float) -> float:
+        """Push one sample and return the lagged one."""
+        out = self.buf[0] if len(self.buf) == self.buf.maxlen else _NAN
+        self.buf.append(x)
+        return out
+
+
+class Cumulative(_Stateful):
+    """Streaming masked cumulative sum (`cumulative_delta`, OBV, A/D)."""
+
+    _fields = ("s",)
+
+    def __init__(self) -> None:
+        self.s = 0.0
+
+    def update(self, x: float, valid: bool) -> float:
+        """Add `x` when valid; return the running total (NaN at invalid samples)."""
+        if not valid:
+            return _NAN
+        self.s += x
+        return self.s
+
+
+class PivotStream(_Stateful):
+    """Streaming `indicators.pivot_indices`: a pivot at bar p is confirmed when bar p+lookback arrives."""
+
+    _fields = ("i", "buf", "last", "recent")
+
+    def __init__(self, lookback: int = 3, min_sep: int = 5, kind: str = "high") -> None:
+        self.lookback = lookback
+        self.min_sep = min_sep
+        self.is_high = kind == "high"
+        self.i = -1
+        self.buf: deque = deque(maxlen=2 * lookback + 1)
+        self.last = -(10**9)
+        self.recent: deque = deque(maxlen=2)
+
+    def update(self, x: float) -> Optional[List[float]]:
+        """Push one sample; return `[index, value]` of a newly confirmed pivot, else None."""
+        self.i += 1
+        self.buf.append(x)
+        if len(self.buf) < self.buf.maxlen:
+            return None
+        k = self.lookback
+        core = self.buf[k]
+        for j in range(1, k + 1):
+            left, right = self.buf[k - j], self.buf[k + j]
+            if not ((core > left and core > right) if self.is_high else (core < left and core < right)):
+                return None
+        p = self.i - k
+        if p - self.last < self.min_sep:
+            return None
+        self.last = p
+        self.recent.append([p, core])
+        return [p, core]
+
+
+def fib_levels(lo: float, hi: float, ratios: Sequence[float] = (0.382, 0.5, 0.618)) -> Tuple[float, ...]:
+    """Scalar `indicators.fibonacci_from_range`."""
+    if not (finite(lo) and finite(hi)):
+        return tuple(_NAN for _ in ratios)
+    return tuple(lo + r * (hi - lo) for r in ratios)
+
+
+__all__: Iterable[str] = (
+    "WindowSums",
+    "SMA",
+    "EMA",
+    "RMA",
+    "RSI",
+    "RollingExtreme",
+    "StdDev",
+    "Lag",
+    "Cumulative",
+    "PivotStream",
+    "finite",
+    "ratio",
+    "nan_max",
+    "fib_levels",
+)
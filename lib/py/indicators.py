@@ -1,151 +1,613 @@
-"""Technical indicator stubs for feature engineering pipelines."""
+"""Vectorized technical indicator engine for feature engineering pipelines.
 
-from __future__ import annotations
-
-from typing import Iterable, Sequence, Tuple
-
-SeriesLike = Sequence[float]
+Every function takes array-likes, works on float64 NumPy arrays and returns
+arrays of the same length with NaN as the missing value (structure flags are
+int8 0/1). Conversion to the Sheets `''` sentinel belongs to the publisher.
+Recursive filters (EMA/RMA/RSI and the pivot spacing pass) run as scalar
+kernels, Numba-compiled when available (`INDICATOR_BACKEND=auto|numba|python`);
+everything else is expressed as whole-array operations.
+"""
 
+from __future__ import annotations
 
-def sma(values: SeriesLike, window: int) -> SeriesLike:
-    """Compute a simple moving average over the window length."""
-    raise NotImplementedError("Implement simple moving average.")
+import importlib.util
+import math
+import os
+from typing import Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
 
-def ema(values: SeriesLike, window: int) -> SeriesLike:
+SeriesLike = Sequence[float]
+Array = np.ndarray
+
+_NAN = float("nan")
+
+
+def _arr(values: SeriesLike) -> Array:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _valid_window_sums(valid: Array, window: int, *cols: Array) -> Tuple[Array, List[Array]]:
+    """Rolling sums over the last `window` *valid* samples (gaps are skipped, not reset).
+
+    Returns `(full, sums)`: `full` marks valid positions with a complete
+    window; each sum is NaN at invalid positions and a warm-up prefix sum
+    before the window fills.
+    """
+    n = valid.shape[0]
+    idx = np.flatnonzero(valid)
+    full = np.zeros(n, dtype=bool)
+    full[idx[window - 1:]] = True
+    sums = []
+    for col in cols:
+        cs = np.cumsum(col[idx])
+        s = cs.copy()
+        s[window:] = cs[window:] - cs[:-window]
+        out = np.full(n, _NAN)
+        out[idx] = s
+        sums.append(out)
+    return full, sums
+
+
+def _rolling_extreme(values: SeriesLike, window: int, fn: np.ufunc) -> Array:
+    """Rolling max/min over the trailing index window in O(n) (van Herk/Gil-Werman blocks)."""
+    x = _arr(values)
+    n = x.shape[0]
+    out = np.full(n, _NAN)
+    if n < window:
+        return out
+    fill = -np.inf if fn is np.maximum else np.inf
+    xf = np.where(np.isfinite(x), x, fill)
+    blocks = np.concatenate([xf, np.full((-n) % window, fill)]).reshape(-1, window)
+    prefix = fn.accumulate(blocks, axis=1).ravel()
+    suffix = fn.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    i = np.arange(window - 1, n)
+    out[window - 1:] = fn(suffix[i - window + 1], prefix[i])
+    out[~np.isfinite(x)] = _NAN
+    return out
+
+
+def rolling_max(values: SeriesLike, window: int) -> Array:
+    """Compute the highest value of the trailing window (NaN until the window is complete)."""
+    return _rolling_extreme(values, window, np.maximum)
+
+
+def rolling_min(values: SeriesLike, window: int) -> Array:
+    """Compute the lowest value of the trailing window (NaN until the window is complete)."""
+    return _rolling_extreme(values, window, np.minimum)
+
+
+def stddev(values: SeriesLike, window: int) -> Array:
+    """Compute the rolling population standard deviation over the last `window` valid samples."""
+    x = _arr(values)
+    valid = np.isfinite(x)
+    idx = np.flatnonzero(valid)
+    out = np.full(x.shape[0], _NAN)
+    if idx.size >= window:
+        w = np.lib.stride_tricks.sliding_window_view(x[idx], window)
+        out[idx[window - 1:]] = w.std(axis=1)
+    return out
+
+
+# ---- recursive kernels ----
+# Written once against plain indexing so the same source runs as CPython over
+# lists (fallback) or compiled by Numba over arrays; both backends therefore
+# perform the identical float operations in the identical order.
+
+
+def _smooth_kernel(xs, period, wilder, out):
+    k = 2.0 / (period + 1)
+    have = False
+    seed = 0.0
+    cnt = 0
+    s = 0.0
+    for i in range(len(xs)):
+        v = xs[i]
+        if not math.isfinite(v):
+            have = False
+            cnt = 0
+            s = 0.0
+            continue
+        if not have:
+            s += v
+            cnt += 1
+            if cnt == period:
+                seed = s / period
+                have = True
+                out[i] = seed
+        elif wilder:
+            seed = (seed * (period - 1) + v) / period
+            out[i] = seed
+        else:
+            seed = (v - seed) * k + seed
+            out[i] = seed
+    return out
+
+
+def _rsi_kernel(c, window, out):
+    n = len(c)
+    if n < window + 1:
+        return out
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, window + 1):
+        if not (math.isfinite(c[i]) and math.isfinite(c[i - 1])):
+            return out
+        d = c[i] - c[i - 1]
+        gain += max(d, 0.0)
+        loss += max(-d, 0.0)
+    ag = gain / window
+    al = loss / window
+    out[window] = 100.0 if al == 0 else (100 - 100 / (1 + ag / al))
+    for i in range(window + 1, n):
+        if not (math.isfinite(c[i]) and math.isfinite(c[i - 1])):
+            continue
+        d = c[i] - c[i - 1]
+        ag = (ag * (window - 1) + max(d, 0.0)) / window
+        al = (al * (window - 1) + max(-d, 0.0)) / window
+        out[i] = 100.0 if al == 0 else (100 - 100 / (1 + ag / al))
+    return out
+
+
+def _spacing_kernel(idx, min_sep, keep):
+    last = -(10**9)
+    for j in range(len(idx)):
+        if idx[j] - last >= min_sep:
+            keep[j] = True
+            last = idx[j]
+    return keep
+
+
+_KERNELS = {"smooth": _smooth_kernel, "rsi": _rsi_kernel, "spacing": _spacing_kernel}
+_JIT: dict = {}
+_BACKEND: Optional[str] = None  # resolved on first use from INDICATOR_BACKEND
+
+
+def available_backends() -> Tuple[str, ...]:
+    """Return the kernel backends usable in this environment (without importing Numba)."""
+    return ("python", "numba") if importlib.util.find_spec("numba") is not None else ("python",)
+
+
+def set_backend(name: str = "auto") -> str:
+    """Select the recursive-kernel backend (`auto`, `numba` or `python`) and return the active one.
+
+    `auto` prefers Numba when it is installed. Compiled kernels are cached
+    on disk (`NUMBA_CACHE_DIR`, default `__pycache__`), so later processes
+    load machine code instead of recompiling.
+    """
+    global _BACKEND
+    name = (name or "auto").lower()
+    if name == "auto":
+        name = available_backends()[-1]
+    if name == "numba":
+        if "numba" not in available_backends():
+            raise ValueError("numba backend requested but numba is not installed")
+        if not _JIT:
+            import numba
+
+            for key, fn in _KERNELS.items():
+                _JIT[key] = numba.njit(cache=True, nogil=True)(fn)
+    elif name != "python":
+        raise ValueError(f"unknown indicator backend {name!r}")
+    _BACKEND = name
+    return name
+
+
+def backend() -> str:
+    """Return the active recursive-kernel backend name, resolving `INDICATOR_BACKEND` on first call."""
+    return _BACKEND or set_backend(os.getenv("INDICATOR_BACKEND", "auto"))
+
+
+def _run(kernel: str, x: Array, *args: object, out: Optional[Array] = None) -> Array:
+    n = x.shape[0]
+    if backend() == "numba":
+        return _JIT[kernel](x, *args, np.full(n, _NAN) if out is None else out)
+    return np.array(_KERNELS[kernel](x.tolist(), *args, [_NAN] * n), dtype=np.float64)
+
+
+def warmup() -> str:
+    """Compile (or load from the disk cache) every kernel for the active backend; return its name."""
+    x = np.linspace(1.0, 2.0, 32)
+    ema(x, 3)
+    rma(x, 3)
+    rsi(x, 3)
+    pivot_indices(x)
+    return backend()
+
+
+def sma(values: SeriesLike, window: int) -> Array:
+    """Compute a simple moving average over the last `window` valid samples."""
+    x = _arr(values)
+    full, (s,) = _valid_window_sums(np.isfinite(x), window, x)
+    return np.where(full, s / window, _NAN)
+
+
+def ema(values: SeriesLike, window: int) -> Array:
     """Compute an exponential moving average with a smoothing factor based on the window."""
-    raise NotImplementedError("Implement exponential moving average.")
+    return _run("smooth", _arr(values), window, False)
 
 
-def rma(values: SeriesLike, window: int) -> SeriesLike:
+def rma(values: SeriesLike, window: int) -> Array:
     """Compute a Wilder-style running moving average."""
-    raise NotImplementedError("Implement running moving average.")
+    return _run("smooth", _arr(values), window, True)
+
+
+def true_range(high: SeriesLike, low: SeriesLike, close: SeriesLike) -> Array:
+    """Compute the true range against the previous close (NaN on the first bar)."""
+    h, l, c = _arr(high), _arr(low), _arr(close)
+    pc = np.concatenate([[_NAN], c[:-1]])
+    with np.errstate(invalid="ignore"):
+        return np.maximum(np.maximum(h - l, np.abs(h - pc)), np.abs(l - pc))
 
 
-def atr(high: SeriesLike, low: SeriesLike, close: SeriesLike, window: int) -> SeriesLike:
+def atr(high: SeriesLike, low: SeriesLike, close: SeriesLike, window: int) -> Array:
     """Calculate the Average True Range using the previous close for true range expansion."""
-    raise NotImplementedError("Implement ATR calculation.")
+    return rma(true_range(high, low, close), window)
 
 
-def rsi(values: SeriesLike, window: int) -> SeriesLike:
+def rsi(values: SeriesLike, window: int) -> Array:
     """Compute the Relative Strength Index with Wilder smoothing."""
-    raise NotImplementedError("Implement RSI calculation.")
+    return _run("rsi", _arr(values), window)
 
 
-def macd(values: SeriesLike, fast: int = 12, slow: int = 26) -> SeriesLike:
+def macd(values: SeriesLike, fast: int = 12, slow: int = 26) -> Array:
     """Compute the Moving Average Convergence Divergence (MACD) line."""
-    raise NotImplementedError("Implement MACD line calculation.")
+    return ema(values, fast) - ema(values, slow)
 
 
-def macd_signal(macd_values: SeriesLike, signal: int = 9) -> SeriesLike:
+def macd_signal(macd_values: SeriesLike, signal: int = 9) -> Array:
     """Compute the MACD signal line from MACD values."""
-    raise NotImplementedError("Implement MACD signal calculation.")
+    return ema(macd_values, signal)
 
 
-def macd_histogram(macd_values: SeriesLike, signal_values: SeriesLike) -> SeriesLike:
+def macd_histogram(macd_values: SeriesLike, signal_values: SeriesLike) -> Array:
     """Compute the MACD histogram by subtracting the signal line from the MACD line."""
-    raise NotImplementedError("Implement MACD histogram calculation.")
+    return _arr(macd_values) - _arr(signal_values)
 
 
-def roc(values: SeriesLike, period: int) -> SeriesLike:
+def _ratio(num: Array, den: Array) -> Array:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(np.isfinite(num) & np.isfinite(den) & (den != 0), num / den, _NAN)
+
+
+def roc(values: SeriesLike, period: int) -> Array:
     """Compute the rate-of-change over the specified period."""
-    raise NotImplementedError("Implement ROC calculation.")
+    x = _arr(values)
+    prev = np.concatenate([np.full(min(period, x.shape[0]), _NAN), x[:-period] if period else x])
+    return _ratio(x, prev) - 1
+
+
+def vwap(quote_volume: SeriesLike, volume: SeriesLike) -> Array:
+    """Compute the per-bar volume-weighted average price as quote turnover over base volume."""
+    return _ratio(_arr(quote_volume), _arr(volume))
 
 
-def vwap(price: SeriesLike, volume: SeriesLike) -> SeriesLike:
-    """Compute the per-bar volume-weighted average price."""
-    raise NotImplementedError("Implement VWAP calculation.")
+def session_vwap(quote_volume: SeriesLike, volume: SeriesLike) -> Array:
+    """Compute the cumulative VWAP from the first bar (bars with zero/invalid volume carry forward)."""
+    q, v = _arr(quote_volume), _arr(volume)
+    ok = np.isfinite(q) & np.isfinite(v) & (v != 0)
+    sum_q = np.cumsum(np.where(ok, q, 0.0))
+    sum_v = np.cumsum(np.where(ok, v, 0.0))
+    return _ratio(sum_q, sum_v)
 
 
-def vwma(price: SeriesLike, volume: SeriesLike, window: int) -> SeriesLike:
+def vwma(price: SeriesLike, volume: SeriesLike, window: int) -> Array:
     """Compute the rolling volume-weighted moving average."""
-    raise NotImplementedError("Implement VWMA calculation.")
+    p, v = _arr(price), _arr(volume)
+    full, (pv, vv) = _valid_window_sums(np.isfinite(p) & np.isfinite(v), window, p * v, v)
+    return np.where(full, _ratio(pv, vv), _NAN)
 
 
-def delta(taker_base: SeriesLike, volume: SeriesLike) -> SeriesLike:
+def delta(taker_base: SeriesLike, volume: SeriesLike) -> Array:
     """Compute order-flow delta defined as `2 * taker_base - volume`."""
-    raise NotImplementedError("Implement delta calculation.")
+    return 2 * _arr(taker_base) - _arr(volume)
 
 
-def cumulative_delta(delta_values: SeriesLike) -> SeriesLike:
+def _masked_cumsum(x: Array, valid: Array) -> Array:
+    return np.where(valid, np.cumsum(np.where(valid, x, 0.0)), _NAN)
+
+
+def cumulative_delta(delta_values: SeriesLike) -> Array:
     """Compute the cumulative sum of order-flow deltas."""
-    raise NotImplementedError("Implement cumulative delta calculation.")
+    d = _arr(delta_values)
+    return _masked_cumsum(d, np.isfinite(d))
 
 
-def taker_buy_ratio(taker_base: SeriesLike, volume: SeriesLike) -> SeriesLike:
+def taker_buy_ratio(taker_base: SeriesLike, volume: SeriesLike) -> Array:
     """Compute taker buy ratio defined as `taker_base / volume`."""
-    raise NotImplementedError("Implement taker buy ratio calculation.")
+    return _ratio(_arr(taker_base), _arr(volume))
 
 
-def relative_volume(volume: SeriesLike, baseline: SeriesLike) -> SeriesLike:
+def relative_volume(volume: SeriesLike, baseline: SeriesLike) -> Array:
     """Compute relative volume as the ratio of volume to a baseline series (e.g., SMA)."""
-    raise NotImplementedError("Implement relative volume calculation.")
+    return _ratio(_arr(volume), _arr(baseline))
 
 
-def average_trade_size(volume: SeriesLike, trades: Sequence[int]) -> SeriesLike:
+def average_trade_size(volume: SeriesLike, trades: Sequence[int]) -> Array:
     """Compute average trade size as `volume / trades`."""
-    raise NotImplementedError("Implement average trade size calculation.")
+    return _ratio(_arr(volume), _arr(trades))
 
 
-def on_balance_volume(close: SeriesLike, volume: SeriesLike) -> SeriesLike:
+def on_balance_volume(close: SeriesLike, volume: SeriesLike) -> Array:
     """Compute On-Balance Volume cumulative flow."""
-    raise NotImplementedError("Implement OBV calculation.")
-
-
-def accumulation_distribution(high: SeriesLike, low: SeriesLike, close: SeriesLike, volume: SeriesLike) -> SeriesLike:
-    """Compute the accumulation/distribution line."""
-    raise NotImplementedError("Implement A/D calculation.")
+    c, v = _arr(close), _arr(volume)
+    pc = np.concatenate([[_NAN], c[:-1]])
+    valid = np.isfinite(c) & np.isfinite(pc) & np.isfinite(v)
+    return _masked_cumsum(np.sign(c - pc) * v, valid)
 
 
-def chaikin_money_flow(high: SeriesLike, low: SeriesLike, close: SeriesLike, volume: SeriesLike, window: int) -> SeriesLike:
-    """Compute the Chaikin Money Flow over the window."""
-    raise NotImplementedError("Implement CMF calculation.")
+def close_location_value(high: SeriesLike, low: SeriesLike, close: SeriesLike) -> Array:
+    """Compute CLV `((c-l) - (h-c)) / (h-l)`, 0 where the range is empty or invalid."""
+    h, l, c = _arr(high), _arr(low), _arr(close)
+    rng = h - l
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(np.isfinite(h) & np.isfinite(l) & np.isfinite(c) & (rng > 0), ((c - l) - (h - c)) / rng, 0.0)
 
 
-def money_flow_index(high: SeriesLike, low: SeriesLike, close: SeriesLike, volume: SeriesLike, window: int) -> SeriesLike:
-    """Compute the Money Flow Index using raw money flows."""
-    raise NotImplementedError("Implement MFI calculation.")
+def accumulation_distribution(high: SeriesLike, low: SeriesLike, close: SeriesLike, volume: SeriesLike) -> Array:
+    """Compute the accumulation/distribution line."""
+    mfv = close_location_value(high, low, close) * _arr(volume)
+    return _masked_cumsum(mfv, np.isfinite(mfv))
 
 
-def bollinger_bands(values: SeriesLike, window: int, num_std: float = 2.0) -> Tuple[SeriesLike, SeriesLike, SeriesLike, SeriesLike]:
+def chaikin_money_flow(high: SeriesLike, low: SeriesLike, close: SeriesLike, volume: SeriesLike, window: int) -> Array:
+    """Compute the Chaikin Money Flow over the window."""
+    v = _arr(volume)
+    mfv = close_location_value(high, low, close) * v
+    full, (num, den) = _valid_window_sums(np.isfinite(mfv) & np.isfinite(v), window, mfv, v)
+    return np.where(full, _ratio(num, den), _NAN)
+
+
+def money_flow_index(high: SeriesLike, low: SeriesLike, close: SeriesLike, volume: SeriesLike, window: int) -> Array:
+    """Compute the Money Flow Index using raw money flows.
+
+    Matches the Apps Script port: a window with no negative flow reads 100
+    even before it is complete.
+    """
+    h, l, c, v = _arr(high), _arr(low), _arr(close), _arr(volume)
+    tp = (h + l + c) / 3
+    rmf = tp * v
+    tp_prev = np.concatenate([[_NAN], tp[:-1]])
+    valid = np.isfinite(tp) & np.isfinite(tp_prev) & np.isfinite(rmf)
+    with np.errstate(invalid="ignore"):
+        pos = np.where(tp > tp_prev, rmf, 0.0)
+        neg = np.where(tp < tp_prev, rmf, 0.0)
+    full, (pos_s, neg_s) = _valid_window_sums(valid, window, pos, neg)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mfi = 100 - 100 / (1 + pos_s / neg_s)
+    out = np.where(full, mfi, _NAN)
+    out[valid & (neg_s == 0)] = 100.0
+    return out
+
+
+def bollinger_bands(values: SeriesLike, window: int, num_std: float = 2.0) -> Tuple[Array, Array, Array, Array]:
     """Compute Bollinger Bands returning middle, upper, lower, and width series."""
-    raise NotImplementedError("Implement Bollinger Bands calculation.")
-
-
-def keltner_channels(high: SeriesLike, low: SeriesLike, close: SeriesLike, window: int, multiplier: float = 2.0) -> Tuple[SeriesLike, SeriesLike, SeriesLike]:
+    mid = sma(values, window)
+    sd = stddev(values, window)
+    up = mid + num_std * sd
+    dn = mid - num_std * sd
+    return mid, up, dn, _ratio(up - dn, mid)
+
+
+def keltner_channels(
+    high: SeriesLike,
+    low: SeriesLike,
+    close: SeriesLike,
+    window: int,
+    multiplier: float = 2.0,
+    *,
+    atr_window: int = 14,
+) -> Tuple[Array, Array, Array]:
     """Compute Keltner Channels returning middle, upper, and lower bands."""
-    raise NotImplementedError("Implement Keltner Channels calculation.")
+    mid = ema(close, window)
+    rng = atr(high, low, close, atr_window)
+    return mid, mid + multiplier * rng, mid - multiplier * rng
 
 
-def directional_index(high: SeriesLike, low: SeriesLike, close: SeriesLike, window: int) -> Tuple[SeriesLike, SeriesLike, SeriesLike]:
+def directional_index(high: SeriesLike, low: SeriesLike, close: SeriesLike, window: int) -> Tuple[Array, Array, Array]:
     """Compute the +DI, -DI, and ADX directional movement indicators."""
-    raise NotImplementedError("Implement directional index calculation.")
-
-
-def donchian_channels(high: SeriesLike, low: SeriesLike, window: int) -> Tuple[SeriesLike, SeriesLike]:
+    h, l = _arr(high), _arr(low)
+    up = np.concatenate([[_NAN], h[1:] - h[:-1]])
+    down = np.concatenate([[_NAN], l[:-1] - l[1:]])
+    with np.errstate(invalid="ignore"):
+        plus_dm = np.where(up > down, np.maximum(up, 0.0), 0.0)
+        minus_dm = np.where(down > up, np.maximum(down, 0.0), 0.0)
+    plus_dm[:1] = _NAN
+    minus_dm[:1] = _NAN
+    tr = atr(high, low, close, window)
+    di_plus = _ratio(100 * rma(plus_dm, window), tr)
+    di_minus = _ratio(100 * rma(minus_dm, window), tr)
+    dx = _ratio(100 * np.abs(di_plus - di_minus), di_plus + di_minus)
+    return di_plus, di_minus, rma(dx, window)
+
+
+def donchian_channels(high: SeriesLike, low: SeriesLike, window: int) -> Tuple[Array, Array]:
     """Compute Donchian channel high/low series."""
-    raise NotImplementedError("Implement Donchian channel calculation.")
-
-
-def swing_points(high: SeriesLike, low: SeriesLike, *, lookback: int = 3) -> Tuple[SeriesLike, SeriesLike, SeriesLike, SeriesLike]:
-    """Detect swing high/low structures with the specified fractal lookback."""
-    raise NotImplementedError("Implement swing point detection.")
-
-
-def divergence_flags(primary: SeriesLike, secondary: SeriesLike) -> Tuple[SeriesLike, SeriesLike]:
-    """Identify bullish and bearish divergence events between two oscillators."""
-    raise NotImplementedError("Implement divergence detection.")
-
-
-def fibonacci_levels(high: SeriesLike, low: SeriesLike, *, lookback: int) -> Tuple[SeriesLike, SeriesLike, SeriesLike]:
+    return rolling_max(high, window), rolling_min(low, window)
+
+
+def pivot_indices(values: SeriesLike, *, lookback: int = 3, min_sep: int = 5, kind: str = "high") -> Array:
+    """Return indices of strict fractal pivots, keeping pivots at least `min_sep` bars apart.
+
+    A high pivot at i exceeds every value within `lookback` bars on both
+    sides (a low pivot undercuts them), so it is only known `lookback` bars
+    after the fact.
+    """
+    x = _arr(values)
+    n = x.shape[0]
+    if n < 2 * lookback + 1:
+        return np.empty(0, dtype=np.int64)
+    core = x[lookback:n - lookback]
+    cand = np.ones(core.shape[0], dtype=bool)
+    with np.errstate(invalid="ignore"):
+        for j in range(1, lookback + 1):
+            left = x[lookback - j:n - lookback - j]
+            right = x[lookback + j:n - lookback + j]
+            cand &= (core > left) & (core > right) if kind == "high" else (core < left) & (core < right)
+    idx = np.flatnonzero(cand) + lookback
+    if backend() == "numba":
+        return idx[_JIT["spacing"](idx, min_sep, np.zeros(idx.shape[0], dtype=np.bool_))]
+    keep = _spacing_kernel(idx.tolist(), min_sep, [False] * idx.shape[0])
+    return idx[np.array(keep, dtype=bool)]
+
+
+def price_pivots(high: SeriesLike, low: SeriesLike, *, lookback: int = 3, min_sep: int = 5) -> Tuple[Array, Array]:
+    """Return `(high_pivot_idx, low_pivot_idx)` once so swings, divergences and swing fibs can share them."""
+    return (
+        pivot_indices(high, lookback=lookback, min_sep=min_sep, kind="high"),
+        pivot_indices(low, lookback=lookback, min_sep=min_sep, kind="low"),
+    )
+
+
+def _sequence_flags(n: int, idx: Array, vals: Array) -> Tuple[Array, Array]:
+    higher = np.zeros(n, dtype=np.int8)
+    lower = np.zeros(n, dtype=np.int8)
+    if idx.size >= 2:
+        higher[idx[1:]] = vals[1:] > vals[:-1]
+        lower[idx[1:]] = vals[1:] < vals[:-1]
+    return higher, lower
+
+
+def swing_points(
+    high: SeriesLike,
+    low: SeriesLike,
+    *,
+    lookback: int = 3,
+    min_sep: int = 5,
+    pivots: Optional[Tuple[Array, Array]] = None,
+) -> Tuple[Array, Array, Array, Array]:
+    """Detect swing structure flags (HH, HL, LH, LL) with the specified fractal lookback."""
+    h, l = _arr(high), _arr(low)
+    hi, lo = pivots if pivots is not None else price_pivots(h, l, lookback=lookback, min_sep=min_sep)
+    hh, lh = _sequence_flags(h.shape[0], hi, h[hi])
+    hl, ll = _sequence_flags(l.shape[0], lo, l[lo])
+    return hh, hl, lh, ll
+
+
+def _diverging(n: int, p_idx: Array, p_vals: Array, o_idx: Array, o_vals: Array, sign: int) -> Array:
+    # For each price pivot after the first, compare it with the previous one and the
+    # oscillator's last two pivots at or before it: price extends (sign) while the
+    # oscillator does not.
+    out = np.zeros(n, dtype=np.int8)
+    if p_idx.size < 2 or o_idx.size < 2:
+        return out
+    m = np.searchsorted(o_idx, p_idx[1:], side="right")
+    ok = m >= 2
+    mm = np.where(ok, m, 2)
+    o_last, o_prev = o_vals[mm - 1], o_vals[mm - 2]
+    price = p_vals[1:] * sign > p_vals[:-1] * sign
+    osc = o_last * sign < o_prev * sign
+    out[p_idx[1:][ok & price & osc]] = 1
+    return out
+
+
+def divergence_flags(
+    high: SeriesLike,
+    low: SeriesLike,
+    oscillator: SeriesLike,
+    *,
+    lookback: int = 3,
+    min_sep: int = 5,
+    pivots: Optional[Tuple[Array, Array]] = None,
+    last_only: bool = False,
+) -> Tuple[Array, Array]:
+    """Identify bullish and bearish divergence between price pivots and oscillator pivots.
+
+    Every price low below the previous one, while the oscillator's last two
+    lows at or before it rise, flags bullish at that low (mirror image for
+    bearish at highs). Flags are final once the pivot confirms. `last_only`
+    keeps the Apps Script rule: only the last two price pivots against the
+    last two oscillator pivots in the whole series.
+    """
+    h, l, x = _arr(high), _arr(low), _arr(oscillator)
+    n = h.shape[0]
+    p_hi, p_lo = pivots if pivots is not None else price_pivots(h, l, lookback=lookback, min_sep=min_sep)
+    o_lo = pivot_indices(x, lookback=lookback, min_sep=min_sep, kind="low")
+    o_hi = pivot_indices(x, lookback=lookback, min_sep=min_sep, kind="high")
+    if not last_only:
+        return _diverging(n, p_lo, l[p_lo], o_lo, x[o_lo], -1), _diverging(n, p_hi, h[p_hi], o_hi, x[o_hi], 1)
+    bull = np.zeros(n, dtype=np.int8)
+    bear = np.zeros(n, dtype=np.int8)
+    if p_lo.size >= 2 and o_lo.size >= 2 and l[p_lo[-1]] < l[p_lo[-2]] and x[o_lo[-1]] > x[o_lo[-2]]:
+        bull[p_lo[-1]] = 1
+    if p_hi.size >= 2 and o_hi.size >= 2 and h[p_hi[-1]] > h[p_hi[-2]] and x[o_hi[-1]] < x[o_hi[-2]]:
+        bear[p_hi[-1]] = 1
+    return bull, bear
+
+
+def fibonacci_from_range(lo: SeriesLike, hi: SeriesLike, ratios: Sequence[float] = (0.382, 0.5, 0.618)) -> Tuple[Array, ...]:
+    """Return `lo + r * (hi - lo)` for each ratio (NaN where either bound is missing)."""
+    a, b = _arr(lo), _arr(hi)
+    ok = np.isfinite(a) & np.isfinite(b)
+    return tuple(np.where(ok, a + r * (b - a), _NAN) for r in ratios)
+
+
+def fibonacci_levels(high: SeriesLike, low: SeriesLike, *, lookback: int) -> Tuple[Array, Array, Array]:
     """Return Fibonacci retracement levels (38.2%, 50.0%, 61.8%) over the window."""
-    raise NotImplementedError("Implement Fibonacci level calculation.")
+    return fibonacci_from_range(rolling_min(low, lookback), rolling_max(high, lookback))
+
+
+def _ffill_at(n: int, idx: Array, vals: Array) -> Array:
+    pos = np.full(n, -1, dtype=np.int64)
+    pos[idx] = np.arange(idx.size)
+    pos = np.maximum.accumulate(pos)
+    out = np.full(n, _NAN)
+    have = pos >= 0
+    out[have] = vals[pos[have]]
+    return out
+
+
+def swing_fibonacci_levels(
+    high: SeriesLike,
+    low: SeriesLike,
+    *,
+    lookback: int = 3,
+    min_sep: int = 5,
+    pivots: Optional[Tuple[Array, Array]] = None,
+) -> Tuple[Array, Array, Array]:
+    """Return Fibonacci levels between the most recent swing low and swing high pivots."""
+    h, l = _arr(high), _arr(low)
+    n = h.shape[0]
+    hi, lo = pivots if pivots is not None else price_pivots(h, l, lookback=lookback, min_sep=min_sep)
+    last_l = _ffill_at(n, lo, l[lo])
+    last_h = _ffill_at(n, hi, h[hi])
+    both = np.isfinite(last_l) & np.isfinite(last_h)
+    return fibonacci_from_range(np.where(both, last_l, _NAN), np.where(both, last_h, _NAN))
+
+
+def last_cross_index(fast: SeriesLike, slow: SeriesLike) -> int:
+    """Return the index of the latest sign change of `fast - slow` (0 when it never crossed)."""
+    d = _arr(fast) - _arr(slow)
+    prev, cur = d[:-1], d[1:]
+    ok = np.isfinite(prev) & np.isfinite(cur)
+    cross = ok & (((prev <= 0) & (cur > 0)) | ((prev >= 0) & (cur < 0)))
+    hits = np.flatnonzero(cross)
+    return int(hits[-1]) + 1 if hits.size else 0
+
+
+def anchored_fibonacci_levels(high: SeriesLike, low: SeriesLike, fast: SeriesLike, slow: SeriesLike) -> Tuple[Array, Array, Array]:
+    """Return Fibonacci levels over the range since the latest `fast`/`slow` cross."""
+    h, l = _arr(high), _arr(low)
+    anchor = last_cross_index(fast, slow)
+    lo = np.full(h.shape[0], _NAN)
+    hi = np.full(h.shape[0], _NAN)
+    lo[anchor:] = np.fmin.accumulate(l[anchor:])
+    hi[anchor:] = np.fmax.accumulate(h[anchor:])
+    return fibonacci_from_range(lo, hi)
 
 
 __all__: Iterable[str] = (
+    "available_backends",
+    "set_backend",
+    "backend",
+    "warmup",
     "sma",
     "ema",
     "rma",
+    "stddev",
+    "rolling_max",
+    "rolling_min",
+    "true_range",
     "atr",
     "rsi",
     "macd",
@@ -153,6 +615,7 @@ __all__: Iterable[str] = (
     "macd_histogram",
     "roc",
     "vwap",
+    "session_vwap",
     "vwma",
     "delta",
     "cumulative_delta",
@@ -160,6 +623,7 @@ __all__: Iterable[str] = (
     "relative_volume",
     "average_trade_size",
     "on_balance_volume",
+    "close_location_value",
     "accumulation_distribution",
     "chaikin_money_flow",
     "money_flow_index",
@@ -167,7 +631,13 @@ __all__: Iterable[str] = (
     "keltner_channels",
     "directional_index",
     "donchian_channels",
+    "pivot_indices",
+    "price_pivots",
     "swing_points",
     "divergence_flags",
+    "fibonacci_from_range",
     "fibonacci_levels",
+    "swing_fibonacci_levels",
+    "last_cross_index",
+    "anchored_fibonacci_levels",
 )
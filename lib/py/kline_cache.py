@@ -0,0 +1,144 @@
+"""Persistent local store of raw 12-field kline arrays keyed by (provider, symbol, interval)."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+Kline = List[object]
+FetchFn = Callable[[int], List[Kline]]
+
+_FORMAT_VERSION = 1
+
+
+class KlineCache:
+    """Append-only NDJSON segments, one file per (provider, symbol, interval).
+
+    Line 1 is a header object recording the `start_ms` the history was pulled
+    from; every following line is one raw kline exactly as the provider
+    returned it, so cached rows round-trip byte for byte.
+    """
+
+    def __init__(self, root: os.PathLike | str) -> None:
+        self.root = Path(root)
+
+    def path(self, provider: str, symbol: str, interval: str) -> Path:
+        """Return the segment file for the cache key."""
+        return self.root / provider.lower() / f"{symbol.upper()}_{interval}.ndjson"
+
+    def load(self, provider: str, symbol: str, interval: str) -> Tuple[Optional[int], List[Kline]]:
+        """Return `(start_ms, rows)`; `(None, [])` when the key has never been stored or is unreadable.
+
+        A torn last line (a run killed mid-append) is dropped and the segment
+        rewritten without it; a corrupt line anywhere else discards the segment.
+        """
+        path = self.path(provider, symbol, interval)
+        if not path.exists():
+            return None, []
+        data = path.read_bytes()
+        head, _, body = data.partition(b"\n")
+        try:
+            meta = json.loads(head)
+        except ValueError:
+            return None, []
+        if not isinstance(meta, dict) or meta.get("v") != _FORMAT_VERSION:
+            return None, []
+        lines = [line for line in body.split(b"\n") if line.strip()]
+        rows: List[Kline] = []
+        torn = bool(body) and not body.endswith(b"\n")
+        for k, line in enumerate(lines):
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                if k < len(lines) - 1:
+                    return None, []
+                torn = True
+        if torn:
+            self.rewrite(provider, symbol, interval, int(meta["start_ms"]), rows)
+        return int(meta["start_ms"]), rows
+
+    def append(self, provider: str, symbol: str, interval: str, rows: Iterable[Kline]) -> None:
+        """Append new closed bars to an existing segment."""
+        with self.path(provider, symbol, interval).open("a", encoding="utf-8", newline="\n") as fh:
+            fh.write("".join(_dumps(row) + "\n" for row in rows))
+
+    def rewrite(self, provider: str, symbol: str, interval: str, start_ms: int, rows: Iterable[Kline]) -> None:
+        """Atomically replace the segment (first run, earlier `since`, or a revised tail)."""
+        path = self.path(provider, symbol, interval)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8", newline="\n") as fh:
+            fh.write(_dumps({"v": _FORMAT_VERSION, "start_ms": int(start_ms)}) + "\n")
+            fh.writelines(_dumps(row) + "\n" for row in rows)
+        os.replace(tmp, path)
+
+
+def _dumps(obj: object) -> str:
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _first_gap(rows: List[Kline], step_ms: int) -> Optional[int]:
+    # Index of the first row that does not follow its predecessor by exactly one interval.
+    for i in range(1, len(rows)):
+        if int(rows[i][0]) != int(rows[i - 1][0]) + step_ms:
+            return i
+    return None
+
+
+def cached_klines(
+    cache: Optional[KlineCache],
+    provider: str,
+    symbol: str,
+    interval: str,
+    start_ms: int,
+    fetch: FetchFn,
+    *,
+    verify_bars: int = 3,
+    step_ms: Optional[int] = None,
+) -> List[Kline]:
+    """Return closed klines from `start_ms`, fetching only the tail missing from the cache.
+
+    `fetch(from_ms)` must return closed bars with open time >= `from_ms` in
+    ascending order. The last `verify_bars` cached bars are re-requested with
+    the new ones and merged by open time: if the provider revised one of
+    them, or filled a hole, the segment is rewritten; otherwise new bars are
+    simply appended. Cached bars the re-request did not return (a short or
+    empty page) are kept. With `step_ms` (regular intervals) a cached gap
+    moves the re-request back to the bar before it.
+    """
+    if cache is None:
+        return fetch(start_ms)
+    cached_start, rows = cache.load(provider, symbol, interval)
+    if cached_start is None or start_ms < cached_start or not rows:
+        rows = fetch(start_ms)
+        cache.rewrite(provider, symbol, interval, start_ms, rows)
+        return rows
+
+    keep = max(len(rows) - max(verify_bars, 1), 0)
+    gap = _first_gap(rows, step_ms) if step_ms else None
+    if gap is not None:
+        keep = min(keep, gap - 1)
+    fresh = fetch(int(rows[keep][0]))
+    tail = rows[keep:]
+    by_time = {int(row[0]): row for row in tail}
+    by_time.update((int(row[0]), row) for row in fresh)
+    merged = [by_time[t] for t in sorted(by_time)]
+    if merged[: len(tail)] == tail:
+        new = merged[len(tail):]
+        cache.append(provider, symbol, interval, new)
+        rows.extend(new)
+    else:
+        rows = rows[:keep] + merged
+        cache.rewrite(provider, symbol, interval, cached_start, rows)
+    return [row for row in rows if int(row[0]) >= start_ms]
+
+
+def default_cache() -> Optional[KlineCache]:
+    """Return the cache rooted at `KLINE_CACHE_DIR`, or None when caching is disabled."""
+    root = os.getenv("KLINE_CACHE_DIR", "").strip()
+    return KlineCache(root) if root else None
+
+
+__all__: Iterable[str] = ("KlineCache", "cached_klines", "default_cache")
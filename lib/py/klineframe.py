@@ -0,0 +1,95 @@
+"""Columnar kline container parsed straight from provider response bytes."""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+import numpy as np
+
+FIELDS = (
+    "open_time",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "close_time",
+    "qav",
+    "ntr",
+    "tbb",
+    "tbq",
+    "ignore",
+)
+_INT_FIELDS = frozenset({"open_time", "close_time", "ntr"})
+
+
+class KlineFrame:
+    """One contiguous array per raw kline field (int64 times/trade counts, float64 otherwise).
+
+    Built from the `/api/v3/klines` body without materialising per-row Python
+    lists: the JSON punctuation is stripped and the remaining comma-separated
+    numbers are parsed in one C pass into an (n, 12) float64 block. Epoch-ms
+    timestamps are below 2**53 and so survive the float64 round trip exactly.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, **columns: np.ndarray) -> None:
+        for name in FIELDS:
+            setattr(self, name, columns[name])
+
+    @classmethod
+    def from_block(cls, block: np.ndarray) -> "KlineFrame":
+        """Wrap an (n, 12) float64 block, copying each field into its own contiguous column."""
+        block = block.reshape(-1, len(FIELDS))
+        cols = {}
+        for j, name in enumerate(FIELDS):
+            col = block[:, j]
+            cols[name] = col.astype(np.int64) if name in _INT_FIELDS else np.ascontiguousarray(col)
+        return cls(**cols)
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "KlineFrame":
+        """Parse a klines JSON array (or newline-separated kline arrays) from raw bytes."""
+        text = raw.translate(None, b'[]"').replace(b"\n", b",").strip(b", \r\t")
+        if not text:
+            return cls.empty()
+        flat = np.fromstring(text.decode("ascii"), dtype=np.float64, sep=",")
+        if flat.size % len(FIELDS):
+            raise ValueError(f"kline payload has {flat.size} fields, not a multiple of {len(FIELDS)}")
+        return cls.from_block(flat)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[object]]) -> "KlineFrame":
+        """Build from already-decoded 12-field rows (cache and archive paths)."""
+        if not rows:
+            return cls.empty()
+        return cls.from_block(np.array(rows, dtype=np.float64))
+
+    @classmethod
+    def empty(cls) -> "KlineFrame":
+        """Return a zero-length frame."""
+        return cls.from_block(np.empty((0, len(FIELDS)), dtype=np.float64))
+
+    @classmethod
+    def concat(cls, frames: Iterable["KlineFrame"]) -> "KlineFrame":
+        """Stack frames end to end (pages stitched in time order)."""
+        frames = list(frames)
+        if not frames:
+            return cls.empty()
+        return cls(**{name: np.concatenate([getattr(f, name) for f in frames]) for name in FIELDS})
+
+    def __len__(self) -> int:
+        return int(self.open_time.shape[0])
+
+    def take(self, mask: np.ndarray) -> "KlineFrame":
+        """Return the rows selected by a boolean mask or index array."""
+        return KlineFrame(**{name: getattr(self, name)[mask] for name in FIELDS})
+
+    def select(self, lo_ms: int, hi_ms: int, closed_ms: int) -> "KlineFrame":
+        """Keep bars opened in [lo_ms, hi_ms] that closed at or before `closed_ms`."""
+        ot = self.open_time
+        return self.take((ot >= lo_ms) & (ot <= hi_ms) & (self.close_time <= closed_ms))
+
+
+__all__: Iterable[str] = ("KlineFrame", "FIELDS")
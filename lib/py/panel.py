@@ -0,0 +1,97 @@
+"""Multi-symbol (time x symbol) kline panels and sharded feature computation."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .features import FEATURES, compute
+from .klineframe import FIELDS, KlineFrame
+
+
+class Panel:
+    """Klines for many symbols aligned on the union of their open times.
+
+    Each field is a (time, symbol) float64 block; `present` marks the cells
+    where the symbol actually has a bar (before listing, after delisting
+    and inside exchange outages it does not).
+    """
+
+    def __init__(self, times: np.ndarray, symbols: Sequence[str], blocks: Dict[str, np.ndarray], present: np.ndarray) -> None:
+        self.times = times
+        self.symbols = list(symbols)
+        self.blocks = blocks
+        self.present = present
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, KlineFrame]) -> "Panel":
+        """Align per-symbol frames (e.g. from `binance.klines_batch`) on one time grid."""
+        symbols = list(frames)
+        times = np.unique(np.concatenate([frames[s].open_time for s in symbols])) if symbols else np.empty(0, np.int64)
+        shape = (times.shape[0], len(symbols))
+        blocks = {name: np.full(shape, np.nan) for name in FIELDS}
+        present = np.zeros(shape, dtype=bool)
+        for j, sym in enumerate(symbols):
+            fr = frames[sym]
+            rows = np.searchsorted(times, fr.open_time)
+            present[rows, j] = True
+            for name in FIELDS:
+                blocks[name][rows, j] = getattr(fr, name)
+        return cls(times, symbols, blocks, present)
+
+    def frame(self, symbol: str) -> KlineFrame:
+        """Return the symbol's own bars (absent cells dropped) as a KlineFrame."""
+        j = self.symbols.index(symbol)
+        rows = self.present[:, j]
+        return KlineFrame.from_block(np.column_stack([self.blocks[name][rows, j] for name in FIELDS]))
+
+    def to_grid(self, per_symbol: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Scatter per-symbol columns (own bars) back onto the (time, symbol) grid, NaN where absent."""
+        out = np.full(self.present.shape, np.nan)
+        for j, sym in enumerate(self.symbols):
+            out[self.present[:, j], j] = per_symbol[sym]
+        return out
+
+
+def _compute_shard(shard: List[Tuple[str, KlineFrame]], columns: Tuple[str, ...]) -> Dict[str, Dict[str, np.ndarray]]:
+    return {sym: compute(frame, columns) for sym, frame in shard}
+
+
+def panel_features(
+    panel: Panel,
+    columns: Optional[Iterable[str]] = None,
+    *,
+    workers: Optional[int] = None,
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """Compute feature columns for every symbol on its own bars, sharding symbols across processes.
+
+    Each symbol gets exactly what `features.compute` returns for its frame,
+    so per-symbol matrices keep the spot1d column order. `workers` defaults
+    to the CPU count; 1, a single symbol, or a platform without process
+    pools runs in-process, and so does a pool that breaks mid-run (a worker
+    killed by the OOM killer or a signal). An exception raised by `compute`
+    itself propagates.
+    """
+    cols = tuple(FEATURES if columns is None else columns)
+    items = [(sym, panel.frame(sym)) for sym in panel.symbols]
+    workers = min(workers or os.cpu_count() or 1, len(items))
+    if workers <= 1:
+        return _compute_shard(items, cols)
+    # Round-robin shards balance symbols with long and short listing histories.
+    shards = [items[k::workers] for k in range(workers)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_compute_shard, shards, [cols] * workers))
+    except (OSError, NotImplementedError, PermissionError, BrokenProcessPool):
+        return _compute_shard(items, cols)
+    out: Dict[str, Dict[str, np.ndarray]] = {}
+    for part in parts:
+        out.update(part)
+    return {sym: out[sym] for sym in panel.symbols}
+
+
+__all__: Iterable[str] = ("Panel", "panel_features")
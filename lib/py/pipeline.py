@@ -0,0 +1,303 @@
+"""Stage DAG runner with a content-addressed artifact store, plus a streaming helper.
+
+A `Stage` names its inputs (run parameters or other stages' outputs) and its
+outputs. `Pipeline.run(params)` starts each stage as soon as its inputs
+exist, so independent stages (the Binance and FRED pulls) run concurrently.
+A stage's key is a SHA-256 over its name, the source of its code and the
+digests of its inputs. When that key matches the stage's last successful run
+and the recorded outputs are still stored, the stage is skipped; its outputs
+are read back only if a stage that does run needs them. Outputs are pickled
+under `<root>/objects/` by digest and the last success per stage is kept in
+`<root>/runs/<stage>.json`, so a failed publish is retried without
+refetching or recomputing.
+
+`background(items, depth)` drains an iterator on a thread behind a bounded
+queue. Chaining ingest pages -> transform chunks -> publisher through it
+overlaps fetching, computing and writing while at most `depth` items wait
+between two steps.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+from . import telemetry
+
+T = TypeVar("T")
+
+
+class Stage(NamedTuple):
+    """One step: `fn(**inputs)` returns a mapping holding every name in `outputs`.
+
+    `code` lists extra functions, classes or modules whose source feeds the
+    cache key next to `fn` itself (the helpers the stage delegates to).
+    """
+
+    name: str
+    fn: Callable[..., Mapping[str, Any]]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    code: Tuple[Any, ...] = ()
+
+
+class StageRun(NamedTuple):
+    """Outcome of one stage in a run: status is ran, cached, failed or blocked."""
+
+    name: str
+    status: str
+    key: str
+    seconds: float
+    error: str = ""
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def digest(value: Any) -> str:
+    """SHA-256 of the pickled value (the artifact address)."""
+    return _sha(pickle.dumps(value, protocol=5))
+
+
+def code_digest(objs: Iterable[Any]) -> str:
+    """SHA-256 over the source of functions, classes and modules (strings are hashed as given)."""
+    h = hashlib.sha256()
+    for obj in objs:
+        h.update((obj if isinstance(obj, str) else inspect.getsource(obj)).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def stage_key(stage: Stage, input_digests: Mapping[str, str]) -> str:
+    """Cache key of `stage` for the given input digests."""
+    doc = {"stage": stage.name, "code": code_digest((stage.fn, *stage.code)), "inputs": {k: input_digests[k] for k in stage.inputs}}
+    return _sha(json.dumps(doc, sort_keys=True).encode("utf-8"))
+
+
+class ArtifactStore:
+    """Pickled artifacts addressed by digest, plus the last successful run per stage."""
+
+    def __init__(self, root: os.PathLike | str) -> None:
+        self.root = Path(root)
+
+    def _object(self, key: str) -> Path:
+        return self.root / "objects" / key[:2] / key
+
+    def _record(self, stage: str) -> Path:
+        return self.root / "runs" / f"{stage}.json"
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def put(self, value: Any) -> str:
+        """Store `value` (once per content) and return its digest."""
+        data = pickle.dumps(value, protocol=5)
+        key = _sha(data)
+        if not self._object(key).exists():
+            self._write(self._object(key), data)
+        return key
+
+    def get(self, key: str) -> Any:
+        """Load the artifact stored under `key`."""
+        return pickle.loads(self._object(key).read_bytes())
+
+    def has(self, key: str) -> bool:
+        """True when the artifact is present."""
+        return self._object(key).exists()
+
+    def record(self, stage: str) -> Optional[Dict[str, Any]]:
+        """Last successful run of `stage` ({key, outputs, finished, seconds}) or None."""
+        path = self._record(stage)
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+    def save_record(self, stage: str, key: str, outputs: Mapping[str, str], seconds: float) -> None:
+        """Record a successful run of `stage`."""
+        doc = {
+            "key": key,
+            "outputs": dict(outputs),
+            "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "seconds": round(seconds, 3),
+        }
+        self._write(self._record(stage), json.dumps(doc, indent=1, sort_keys=True).encode("utf-8"))
+
+
+class Pipeline:
+    """Validated stage graph over an artifact store."""
+
+    def __init__(self, stages: Sequence[Stage], store: ArtifactStore) -> None:
+        self.store = store
+        self.producers: Dict[str, str] = {}
+        by_name: Dict[str, Stage] = {}
+        for st in stages:
+            if st.name in by_name:
+                raise ValueError(f"duplicate stage {st.name!r}")
+            by_name[st.name] = st
+            for out in st.outputs:
+                if out in self.producers:
+                    raise ValueError(f"output {out!r} produced by both {self.producers[out]!r} and {st.name!r}")
+                self.producers[out] = st.name
+        self.stages = self._order(by_name)
+
+    def _order(self, by_name: Mapping[str, Stage]) -> List[Stage]:
+        deps = {name: {self.producers[i] for i in st.inputs if i in self.producers} for name, st in by_name.items()}
+        order: List[Stage] = []
+        done: set = set()
+        while len(order) < len(by_name):
+            ready = [name for name in by_name if name not in done and deps[name] <= done]
+            if not ready:
+                raise ValueError(f"stage cycle among {sorted(set(by_name) - done)}")
+            for name in ready:
+                order.append(by_name[name])
+                done.add(name)
+        return order
+
+    def params(self) -> List[str]:
+        """Inputs no stage produces (they must be passed to `run`)."""
+        return sorted({i for st in self.stages for i in st.inputs if i not in self.producers})
+
+    def _execute(
+        self, st: Stage, values: Mapping[str, Any], digests: Mapping[str, str], force: bool
+    ) -> Tuple[StageRun, Dict[str, Any], Dict[str, str]]:
+        key = stage_key(st, digests)
+        rec = self.store.record(st.name)
+        if not force and rec and rec["key"] == key and all(self.store.has(d) for d in rec["outputs"].values()):
+            return StageRun(st.name, "cached", key, 0.0), {}, dict(rec["outputs"])
+        t0 = time.perf_counter()
+        try:
+            args = {i: values[i] if i in values else self.store.get(digests[i]) for i in st.inputs}
+            out = st.fn(**args)
+            missing = [o for o in st.outputs if o not in out]
+            if missing:
+                raise ValueError(f"stage {st.name!r} did not return {missing}")
+            stored = {o: self.store.put(out[o]) for o in st.outputs}
+        except Exception as exc:
+            return StageRun(st.name, "failed", key, time.perf_counter() - t0, f"{type(exc).__name__}: {exc}"[:500]), {}, {}
+        seconds = time.perf_counter() - t0
+        self.store.save_record(st.name, key, stored, seconds)
+        telemetry.record("stage", seconds, mod="pipeline", stage=st.name)
+        return StageRun(st.name, "ran", key, seconds), {o: out[o] for o in st.outputs}, stored
+
+    def run(
+        self,
+        params: Mapping[str, Any],
+        *,
+        workers: Optional[int] = None,
+        force: Iterable[str] = (),
+        on_done: Optional[Callable[[StageRun], None]] = None,
+    ) -> Dict[str, StageRun]:
+        """Run every stage whose key changed (or is in `force`); return the outcome per stage in graph order.
+
+        A failed stage blocks only its dependents; independent branches still
+        finish and their artifacts are recorded.
+        """
+        missing = [p for p in self.params() if p not in params]
+        if missing:
+            raise ValueError(f"missing pipeline parameters {missing}")
+        force = set(force)
+        values: Dict[str, Any] = dict(params)
+        digests: Dict[str, str] = {k: digest(v) for k, v in params.items()}
+        report: Dict[str, StageRun] = {}
+        pending = list(self.stages)
+        running: Dict[Any, Stage] = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers or len(self.stages))) as pool:
+            while pending or running:
+                for st in list(pending):
+                    deps = {self.producers[i] for i in st.inputs if i in self.producers}
+                    bad = sorted(d for d in deps if d in report and report[d].status in ("failed", "blocked"))
+                    if bad:
+                        pending.remove(st)
+                        report[st.name] = StageRun(st.name, "blocked", "", 0.0, f"upstream {bad}")
+                        if on_done:
+                            on_done(report[st.name])
+                    elif all(d in report for d in deps):
+                        pending.remove(st)
+                        running[pool.submit(self._execute, st, values, dict(digests), st.name in force)] = st
+                if not running:
+                    continue
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    st = running.pop(fut)
+                    outcome, out, stored = fut.result()
+                    values.update(out)
+                    digests.update(stored)
+                    report[st.name] = outcome
+                    if on_done:
+                        on_done(outcome)
+        return {st.name: report[st.name] for st in self.stages}
+
+
+def default_store() -> ArtifactStore:
+    """Store rooted at `PIPELINE_DIR`; a fresh temporary directory (no reuse across runs) when unset."""
+    root = os.getenv("PIPELINE_DIR", "").strip()
+    return ArtifactStore(root or tempfile.mkdtemp(prefix="pipeline-"))
+
+
+def background(items: Iterable[T], depth: int = 2) -> Iterator[T]:
+    """Yield `items` while a thread produces the next ones, at most `depth` ahead.
+
+    Errors raised by the producer surface at the consumer; closing the
+    consumer early stops the producer at its next item.
+    """
+    q: "queue.Queue[Tuple[int, Any]]" = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+
+    def put(msg: Tuple[int, Any]) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(msg, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((0, item)):
+                    return
+        except BaseException as exc:
+            put((2, exc))
+            return
+        put((1, None))
+
+    worker = threading.Thread(target=produce, name="pipeline-background", daemon=True)
+    worker.start()
+    try:
+        while True:
+            kind, payload = q.get()
+            if kind == 1:
+                return
+            if kind == 2:
+                raise payload
+            yield payload
+    finally:
+        stop.set()
+
+
+__all__: Iterable[str] = (
+    "Stage",
+    "StageRun",
+    "ArtifactStore",
+    "Pipeline",
+    "digest",
+    "code_digest",
+    "stage_key",
+    "default_store",
+    "background",
+)
@@ -1,18 +1,630 @@
-"""Google Sheets helper stubs for deterministic exports."""
+"""Google Sheets client for deterministic exports: chunked writes, diff-publish planning.
+
+Large matrices are split into chunks under the request payload and cell
+limits; each chunk is one `values.batchUpdate` over disjoint ranges, so
+chunks can be written concurrently. All writers share a token bucket sized
+to the per-minute write quota, retry 429/5xx with jittered exponential
+backoff, and can record committed chunks in a progress file so a retried
+job resumes where the previous attempt stopped.
+
+Diff publishing keeps one content hash per data row of the last published
+matrix; the next run rewrites only rows whose hash changed or that are new,
+and falls back to a full rewrite when the header (schema), target sheet or
+tab differs from the saved state.
+"""
 
 from __future__ import annotations
 
-from typing import Iterable, Sequence
+import copy
+import hashlib
+import importlib.util
+import json
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from . import telemetry
+
+PUBLISH_STATE_VERSION = 1
+# Sheets API: ~2 MB recommended max payload, 60 write requests per minute per user.
+CHUNK_CELLS = 50_000
+CHUNK_BYTES = 1_000_000
+WRITE_QUOTA_PER_MIN = 60
+# Rows small enough to ride along in the structural batchUpdate as updateCells (CellData is ~2x the values JSON).
+FOLD_CELLS = 10_000
+SCOPES = ("https://www.googleapis.com/auth/spreadsheets",)
+PROPERTY_FIELDS = "sheets.properties(sheetId,title,gridProperties(rowCount,columnCount))"
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+# Refused before running (quota), so safe to retry even for writes that are not idempotent.
+REFUSED_STATUS = frozenset({429})
+# Trimmed Sheets v4 discovery document (regenerate with tools/sheets/trim_discovery.py).
+DISCOVERY_PATH = Path(__file__).resolve().parent / "discovery" / "sheets.v4.json"
+Run = Tuple[int, int]
+
+if importlib.util.find_spec("orjson") is not None:
+    import orjson
+
+    def dumps(value: Any) -> str:
+        """Compact JSON (orjson when installed, else the stdlib)."""
+        return orjson.dumps(value).decode("utf-8")
+
+else:
+
+    def dumps(value: Any) -> str:
+        """Compact JSON (orjson when installed, else the stdlib)."""
+        return json.dumps(value, separators=(",", ":"))
+
+
+class RateLimiter:
+    """Token bucket over a per-minute request quota, shared by every writer thread."""
+
+    def __init__(self, per_minute: int = WRITE_QUOTA_PER_MIN, *, headroom: float = 0.9, window_s: float = 60.0) -> None:
+        self.capacity = max(1.0, per_minute * headroom)
+        self.rate = self.capacity / window_s
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """Block until one request may be sent."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                self._cond.wait((1 - self.tokens) / self.rate)
+
+
+WRITE_LIMITER = RateLimiter()
+
+
+def _status(exc: BaseException) -> Optional[int]:
+    # googleapiclient HttpError carries `resp.status`; requests-style errors `status_code`
+    resp = getattr(exc, "resp", None)
+    status = getattr(resp, "status", None) or getattr(exc, "status_code", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _observe(req: Any, t0: float, status: object, rows: int) -> None:
+    # One telemetry event per HTTP attempt: API method, status, request body size, data rows carried
+    method = (getattr(req, "methodId", None) or "unknown").replace("sheets.", "", 1)
+    body = getattr(req, "body", None)
+    telemetry.record("request", time.perf_counter() - t0, mod="sheets", method=method, status=status,
+                     bytes=len(body) if isinstance(body, (str, bytes)) else 0, rows=rows)
+
+
+def call_with_retry(
+    request: Callable[[], Any],
+    *,
+    retries: int = 5,
+    base_s: float = 1.0,
+    cap_s: float = 32.0,
+    limiter: Optional[RateLimiter] = WRITE_LIMITER,
+    rows: int = 0,
+    idempotent: bool = True,
+) -> Any:
+    """Build and execute `request()` under the quota, retrying 429/5xx and connection errors with full-jitter backoff.
+
+    With `idempotent=False` (appends) only a 429 is retried: after a 5xx,
+    timeout or dropped connection the write may already have been applied.
+    `rows` (data rows in the body) is only reported to telemetry with the
+    call's latency, status and payload size.
+    """
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        req, t0 = None, time.perf_counter()
+        try:
+            req = request()
+            out = req.execute()
+            _observe(req, t0, 200, rows)
+            return out
+        except Exception as exc:
+            status = _status(exc)
+            _observe(req, t0, status or type(exc).__name__, rows)
+            transient = status in RETRY_STATUS or (status is None and isinstance(exc, (ConnectionError, TimeoutError)))
+            if not idempotent:
+                transient = status in REFUSED_STATUS
+            if not transient or attempt >= retries:
+                raise
+            time.sleep(random.uniform(0, min(cap_s, base_s * 2 ** attempt)))
+            attempt += 1
+
+
+def plan_chunks(
+    matrix: Sequence[Sequence[object]],
+    runs: Optional[Sequence[Run]] = None,
+    *,
+    max_cells: int = CHUNK_CELLS,
+    max_bytes: int = CHUNK_BYTES,
+) -> List[List[Run]]:
+    """Pack [start, stop) row runs (default: every row) into chunks under the cell and payload limits."""
+    runs = [(0, len(matrix))] if runs is None else runs
+    chunks: List[List[Run]] = []
+    cur: List[Run] = []
+    cells = size = 0
+    for a, b in runs:
+        for i in range(a, b):
+            row_cells = max(1, len(matrix[i]))
+            row_bytes = len(dumps(matrix[i]))
+            if cur and (cells + row_cells > max_cells or size + row_bytes > max_bytes):
+                chunks.append(cur)
+                cur, cells, size = [], 0, 0
+            if cur and cur[-1][1] == i:
+                cur[-1] = (cur[-1][0], i + 1)
+            else:
+                cur.append((i, i + 1))
+            cells += row_cells
+            size += row_bytes
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+def col_letters(n: int) -> str:
+    """1 -> A, 26 -> Z, 27 -> AA ..."""
+    s = ""
+    while n > 0:
+        n, r = divmod(n - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+
+class _Progress:
+    """Committed chunk indices for one (target, content) write, persisted after every commit."""
+
+    def __init__(self, path: Optional[str], key: str) -> None:
+        self.path = Path(path) if path else None
+        self.key = key
+        self.done: Set[int] = set()
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+            if state.get("key") == key:
+                self.done = set(state.get("done", []))
+
+    def commit(self, index: int) -> None:
+        with self._lock:
+            self.done.add(index)
+            if self.path is None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps({"key": self.key, "done": sorted(self.done)}), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def finish(self) -> None:
+        if self.path is not None and self.path.exists():
+            self.path.unlink()
+
+
+def write_rows(
+    service_factory: Callable[[], Any],
+    sheet_id: str,
+    tab: str,
+    matrix: Sequence[Sequence[object]],
+    runs: Optional[Sequence[Run]] = None,
+    *,
+    width: Optional[int] = None,
+    first_row: int = 2,
+    workers: int = 4,
+    max_cells: int = CHUNK_CELLS,
+    max_bytes: int = CHUNK_BYTES,
+    progress_path: Optional[str] = None,
+    limiter: Optional[RateLimiter] = WRITE_LIMITER,
+    retries: int = 5,
+) -> int:
+    """Write matrix rows (all, or the given runs) to sheet rows `first_row + i`, chunked and concurrent.
+
+    `service_factory` is called once per worker thread (Google API clients
+    are not thread-safe). The grid must already hold the target rows.
+    With `progress_path`, chunks committed by an interrupted attempt over
+    the same content are skipped. Returns the number of chunks sent.
+    """
+    chunks = plan_chunks(matrix, runs, max_cells=max_cells, max_bytes=max_bytes)
+    if not chunks:
+        return 0
+    end_col = col_letters(width or max(len(r) for r in matrix))
+    rows = [matrix[i] for chunk in chunks for a, b in chunk for i in range(a, b)]
+    key = _digest([sheet_id, tab, first_row, end_col, chunks, row_hashes(rows)])
+    progress = _Progress(progress_path, key)
+    local = threading.local()
+
+    def send(index: int) -> None:
+        if index in progress.done:
+            return
+        if not hasattr(local, "svc"):
+            local.svc = service_factory()
+        data = [
+            {"range": f"{tab}!A{first_row + a}:{end_col}{first_row + b - 1}", "values": [list(r) for r in matrix[a:b]]}
+            for a, b in chunks[index]
+        ]
+        call_with_retry(
+            lambda: local.svc.spreadsheets().values().batchUpdate(
+                spreadsheetId=sheet_id, body={"valueInputOption": "RAW", "data": data}
+            ),
+            retries=retries,
+            limiter=limiter,
+            rows=sum(b - a for a, b in chunks[index]),
+        )
+        progress.commit(index)
+
+    pending = [k for k in range(len(chunks)) if k not in progress.done]
+    if workers > 1 and len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            list(pool.map(send, pending))
+    else:
+        for k in pending:
+            send(k)
+    progress.finish()
+    return len(pending)
+
+
+def append_rows(
+    svc: Any,
+    sheet_id: str,
+    tab: str,
+    matrix: Sequence[Sequence[object]],
+    *,
+    max_cells: int = CHUNK_CELLS,
+    max_bytes: int = CHUNK_BYTES,
+    limiter: Optional[RateLimiter] = WRITE_LIMITER,
+    retries: int = 5,
+) -> int:
+    """Append rows below the table in order, one `values.append` per chunk; returns chunks sent.
+
+    Appends land wherever the table currently ends, so they run serially,
+    are not resumable, and are only retried when refused (429): a chunk
+    whose outcome is unknown raises rather than risk landing twice. Prefer
+    `write_rows` at a known offset whenever the caller knows it.
+    """
+    chunks = plan_chunks(matrix, max_cells=max_cells, max_bytes=max_bytes)
+    for chunk in chunks:
+        (a, b), = chunk
+        call_with_retry(
+            lambda: svc.spreadsheets().values().append(
+                spreadsheetId=sheet_id,
+                range=f"{tab}!A2",
+                valueInputOption="RAW",
+                insertDataOption="INSERT_ROWS",
+                body={"values": [list(r) for r in matrix[a:b]]},
+            ),
+            retries=retries,
+            limiter=limiter,
+            rows=b - a,
+            idempotent=False,
+        )
+    return len(chunks)
+
+
+def _cell(value: object) -> Dict[str, Any]:
+    # RAW semantics: strings stay strings; '' / None / non-finite numbers are empty cells
+    if value is None or value == "":
+        return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}} if math.isfinite(value) else {}
+    return {"userEnteredValue": {"stringValue": str(value)}}
+
+
+def _update_cells(sheet: int, row: int, rows: Sequence[Sequence[object]]) -> Dict[str, Any]:
+    return {
+        "updateCells": {
+            "start": {"sheetId": sheet, "rowIndex": row, "columnIndex": 0},
+            "rows": [{"values": [_cell(v) for v in r]} for r in rows],
+            "fields": "userEnteredValue",
+        }
+    }
+
+
+_DISCOVERY: Optional[Dict[str, Any]] = None
 
 
-def ensure_header(sheet_id: str, tab: str, header: Sequence[str]) -> None:
+def discovery_document() -> Optional[Dict[str, Any]]:
+    """Return the bundled, method-trimmed Sheets v4 discovery document (parsed once), or None if absent."""
+    global _DISCOVERY
+    if _DISCOVERY is None and DISCOVERY_PATH.exists():
+        _DISCOVERY = json.loads(DISCOVERY_PATH.read_text(encoding="utf-8"))
+    return _DISCOVERY
+
+
+class SheetsClient:
+    """Shared Sheets v4 client: one credential, one API client per thread, cached tab metadata.
+
+    Tab properties come from a `fields`-masked `spreadsheets.get`, cached per
+    spreadsheet and kept current as this client adds tabs or grows grids.
+    Structural work (add tab, grow grid, header, clearing a stale tail, and
+    small data sets) is folded into a single `spreadsheets.batchUpdate`;
+    larger data goes through the chunked `write_rows` path.
+    """
+
+    def __init__(self, credentials: Any = None, *, scopes: Sequence[str] = SCOPES, limiter: Optional[RateLimiter] = WRITE_LIMITER) -> None:
+        self._credentials = credentials
+        self.scopes = tuple(scopes)
+        self.limiter = limiter
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def credentials(self) -> Any:
+        """Return Application Default Credentials (WIF on Cloud Run), refreshed when stale."""
+        with self._lock:
+            if self._credentials is None:
+                from google.auth import default as google_auth_default
+
+                self._credentials, _ = google_auth_default(scopes=list(self.scopes))
+            if not self._credentials.valid:
+                from google.auth.transport.requests import Request
+
+                self._credentials.refresh(Request())
+            return self._credentials
+
+    def service(self) -> Any:
+        """Return this thread's Sheets API client (googleapiclient objects are not thread-safe)."""
+        svc = getattr(self._local, "svc", None)
+        if svc is None:
+            from googleapiclient.discovery import build, build_from_document
+            from googleapiclient.model import JsonModel
+
+            class _CompactJsonModel(JsonModel):
+                # request bodies through `dumps` (no whitespace; orjson when installed)
+                def serialize(self, body_value: Any) -> str:
+                    if isinstance(body_value, dict) and "data" not in body_value and self._data_wrapper:
+                        body_value = {"data": body_value}
+                    return dumps(body_value)
+
+            doc = discovery_document()
+            if doc is not None:
+                svc = build_from_document(doc, credentials=self.credentials(), model=_CompactJsonModel())
+            else:
+                svc = build("sheets", "v4", credentials=self.credentials(), cache_discovery=False, model=_CompactJsonModel())
+            self._local.svc = svc
+        return svc
+
+    def call(self, request: Callable[[Any], Any], *, write: bool = True, retries: int = 5, rows: int = 0) -> Any:
+        """Execute `request(service)` with retry/backoff; writes are paced by the shared quota."""
+        return call_with_retry(lambda: request(self.service()), retries=retries, limiter=self.limiter if write else None, rows=rows)
+
+    def tabs(self, sheet_id: str, *, refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Return {title: properties} for the spreadsheet (masked to id, title and grid size; cached)."""
+        if refresh or sheet_id not in self._meta:
+            meta = self.call(lambda s: s.spreadsheets().get(spreadsheetId=sheet_id, fields=PROPERTY_FIELDS), write=False)
+            self._meta[sheet_id] = {t["properties"]["title"]: t["properties"] for t in meta.get("sheets", [])}
+        return self._meta[sheet_id]
+
+    def batch_update(self, sheet_id: str, requests: List[Dict[str, Any]], *, rows: int = 0) -> Dict[str, Any]:
+        """Send structural requests in one `spreadsheets.batchUpdate` (no-op when empty); `rows` = data rows folded in."""
+        if not requests:
+            return {}
+        try:
+            return self.call(lambda s: s.spreadsheets().batchUpdate(spreadsheetId=sheet_id, body={"requests": requests}), rows=rows)
+        except Exception:
+            self._meta.pop(sheet_id, None)  # the cached grid may no longer match
+            raise
+
+    def _layout(self, sheet_id: str, tab: str, rows: Optional[int], cols: Optional[int]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        # Properties the tab will have after the returned requests run (new tabs get a client-chosen id)
+        tabs = self.tabs(sheet_id)
+        if tab in tabs:
+            props, reqs = copy.deepcopy(tabs[tab]), []
+        else:
+            sheet = max((t["sheetId"] for t in tabs.values()), default=0) + 1
+            grid = {"rowCount": max(1000, rows or 0), "columnCount": max(26, cols or 0)}
+            props = {"sheetId": sheet, "title": tab, "gridProperties": grid}
+            reqs = [{"addSheet": {"properties": copy.deepcopy(props)}}]
+        grid = props.setdefault("gridProperties", {})
+        for dim, key, want in (("ROWS", "rowCount", rows), ("COLUMNS", "columnCount", cols)):
+            have = grid.get(key, 0)
+            if want is not None and want > have:
+                reqs.append({"appendDimension": {"sheetId": props["sheetId"], "dimension": dim, "length": want - have}})
+                grid[key] = want
+        return props, reqs
+
+    def _apply(self, sheet_id: str, tab: str, props: Dict[str, Any], reqs: List[Dict[str, Any]], rows: int = 0) -> Dict[str, Any]:
+        self.batch_update(sheet_id, reqs, rows=rows)
+        self._meta.setdefault(sheet_id, {})[tab] = props
+        return props
+
+    def properties(self, sheet_id: str, tab: str, *, rows: Optional[int] = None, cols: Optional[int] = None) -> Dict[str, Any]:
+        """Return the tab's properties, adding the tab / growing its grid in one call if needed."""
+        props, reqs = self._layout(sheet_id, tab, rows, cols)
+        return self._apply(sheet_id, tab, props, reqs) if reqs else props
+
+    def ensure_header(self, sheet_id: str, tab: str, header: Sequence[str], *, rows: Optional[int] = None) -> Dict[str, Any]:
+        """Write the header row (adding the tab / growing the grid in the same batchUpdate); return tab properties."""
+        props, reqs = self._layout(sheet_id, tab, rows, len(header))
+        reqs.append(_update_cells(props["sheetId"], 0, [list(header)]))
+        return self._apply(sheet_id, tab, props, reqs)
+
+    def clear_rows(self, sheet_id: str, tab: str, first: int = 0) -> None:
+        """Clear values from 0-based data row `first` down (sheet row first+2)."""
+        self.call(lambda s: s.spreadsheets().values().clear(spreadsheetId=sheet_id, range=f"{tab}!A{first + 2}:ZZZ", body={}))
+
+    def replace_rows(
+        self,
+        sheet_id: str,
+        tab: str,
+        matrix: Sequence[Sequence[object]],
+        *,
+        header: Optional[Sequence[str]] = None,
+        workers: int = 4,
+        progress_path: Optional[str] = None,
+    ) -> int:
+        """Replace all data rows; returns the number of API write calls.
+
+        Rows are overwritten in place and only the stale tail is cleared, so
+        the tab never reads empty. Up to FOLD_CELLS cells, tab creation, grid
+        growth, header, data and tail clear are a single batchUpdate.
+        """
+        width = max([len(header or ())] + [len(r) for r in matrix])
+        have = self.tabs(sheet_id).get(tab, {}).get("gridProperties", {}).get("rowCount", 0)
+        props, reqs = self._layout(sheet_id, tab, len(matrix) + 1, width)
+        sheet = props["sheetId"]
+        if header is not None:
+            reqs.append(_update_cells(sheet, 0, [list(header)]))
+        fold = sum(len(r) for r in matrix) <= FOLD_CELLS
+        if fold and matrix:
+            reqs.append(_update_cells(sheet, 1, matrix))
+        if have > len(matrix) + 1:
+            # updateCells with no rows clears the masked fields over the range
+            reqs.append({"updateCells": {"range": {"sheetId": sheet, "startRowIndex": len(matrix) + 1, "endRowIndex": have}, "fields": "userEnteredValue"}})
+        self._apply(sheet_id, tab, props, reqs, rows=len(matrix) if fold else 0)
+        calls = 1 if reqs else 0
+        if not fold:
+            calls += write_rows(
+                self.service, sheet_id, tab, matrix, width=width, workers=workers, progress_path=progress_path, limiter=self.limiter
+            )
+        return calls
+
+    def write_rows(self, sheet_id: str, tab: str, matrix: Sequence[Sequence[object]], runs: Optional[Sequence[Run]] = None, **kwargs: Any) -> int:
+        """`write_rows` with this client's per-thread services and quota."""
+        kwargs.setdefault("limiter", self.limiter)
+        return write_rows(self.service, sheet_id, tab, matrix, runs, **kwargs)
+
+    def append_rows(self, sheet_id: str, tab: str, matrix: Sequence[Sequence[object]], **kwargs: Any) -> int:
+        """`append_rows` with this client's service and quota."""
+        kwargs.setdefault("limiter", self.limiter)
+        return append_rows(self.service(), sheet_id, tab, matrix, **kwargs)
+
+    def update_values(self, sheet_id: str, data: List[Dict[str, Any]]) -> None:
+        """Write several A1 ranges in one `values.batchUpdate` (RAW)."""
+        if data:
+            self.call(
+                lambda s: s.spreadsheets().values().batchUpdate(spreadsheetId=sheet_id, body={"valueInputOption": "RAW", "data": data}),
+                rows=sum(len(d["values"]) for d in data),
+            )
+
+
+_CLIENT: Optional[SheetsClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def client() -> SheetsClient:
+    """Return the process-wide client (credentials and metadata shared by every caller)."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = SheetsClient()
+        return _CLIENT
+
+
+def ensure_header(sheet_id: str, tab: str, header: Sequence[str]) -> Dict[str, Any]:
     """Ensure the target sheet tab has the expected header row."""
-    raise NotImplementedError("Implement Sheets header synchronization.")
+    return client().ensure_header(sheet_id, tab, header)
 
 
-def replace_rows(sheet_id: str, tab: str, matrix: Sequence[Sequence[object]]) -> None:
+def replace_rows(sheet_id: str, tab: str, matrix: Sequence[Sequence[object]], *, header: Optional[Sequence[str]] = None) -> int:
     """Replace all data rows in the target sheet tab with the provided matrix."""
-    raise NotImplementedError("Implement Sheets row replacement.")
+    return client().replace_rows(sheet_id, tab, matrix, header=header)
+
+
+def _digest(value: Any) -> str:
+    # json.dumps renders floats via repr, so equal cells always hash equally
+    return hashlib.blake2b(json.dumps(value, separators=(",", ":")).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def row_hashes(matrix: Sequence[Sequence[object]]) -> List[str]:
+    """Return a 64-bit content hash (hex) per data row."""
+    return [_digest(row) for row in matrix]
+
+
+class PublishPlan(NamedTuple):
+    """Rows to write as half-open [start, stop) data-row runs; `clear_from` starts the stale tail to clear."""
+
+    full: bool
+    runs: List[Tuple[int, int]]
+    clear_from: Optional[int]
+
+
+def row_runs(indices: Iterable[int]) -> List[Tuple[int, int]]:
+    """Collapse sorted data-row indices into contiguous [start, stop) runs."""
+    runs: List[Tuple[int, int]] = []
+    for i in indices:
+        if runs and runs[-1][1] == i:
+            runs[-1] = (runs[-1][0], i + 1)
+        else:
+            runs.append((i, i + 1))
+    return runs
+
+
+def plan_publish(
+    state: Optional[Dict[str, Any]],
+    sheet_id: str,
+    tab: str,
+    header: Sequence[str],
+    hashes: Sequence[str],
+) -> PublishPlan:
+    """Compare `hashes` with the last published state and return the minimal write plan."""
+    n = len(hashes)
+    if (
+        not state
+        or state.get("version") != PUBLISH_STATE_VERSION
+        or state.get("sheet_id") != sheet_id
+        or state.get("tab") != tab
+        or state.get("header") != _digest(list(header))
+    ):
+        # Unknown previous content: write everything, then clear whatever lies below it
+        return PublishPlan(True, [(0, n)] if n else [], n)
+    old = state.get("rows", [])
+    changed = (i for i in range(n) if i >= len(old) or old[i] != hashes[i])
+    return PublishPlan(False, row_runs(changed), n if len(old) > n else None)
+
+
+def load_publish_state(path: str) -> Optional[Dict[str, Any]]:
+    """Return the publish state saved at `path`, or None when there is none."""
+    p = Path(path)
+    if not p.exists():
+        return None
+    return json.loads(p.read_text(encoding="utf-8"))
+
+
+def save_publish_state(path: str, sheet_id: str, tab: str, header: Sequence[str], hashes: Sequence[str]) -> None:
+    """Atomically record the published header and row hashes at `path`."""
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    state = {
+        "version": PUBLISH_STATE_VERSION,
+        "sheet_id": sheet_id,
+        "tab": tab,
+        "header": _digest(list(header)),
+        "rows": list(hashes),
+    }
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    tmp.write_text(json.dumps(state, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, p)
 
 
-__all__: Iterable[str] = ("ensure_header", "replace_rows")
+__all__: Iterable[str] = (
+    "SheetsClient",
+    "discovery_document",
+    "client",
+    "dumps",
+    "ensure_header",
+    "replace_rows",
+    "RateLimiter",
+    "WRITE_LIMITER",
+    "call_with_retry",
+    "plan_chunks",
+    "col_letters",
+    "write_rows",
+    "append_rows",
+    "row_hashes",
+    "PublishPlan",
+    "row_runs",
+    "plan_publish",
+    "load_publish_state",
+    "save_publish_state",
+)
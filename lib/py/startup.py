@@ -0,0 +1,129 @@
+"""Cold-start profiling for the job entry points.
+
+`install_from_argv()` runs first in each job (before any heavy import).
+With `--startup-profile` on the command line or `STARTUP_PROFILE=1` it
+wraps `builtins.__import__` to time every first import of a module,
+cumulative and self time, per thread, so the deferred imports a job pays
+inside worker threads (googleapiclient, openbb) are attributed too. At
+exit one JSON line lists the slowest modules and the time from install to
+`ready()` (the first useful work). Off, nothing is wrapped and the only
+cost is the argv check.
+"""
+
+from __future__ import annotations
+
+import atexit
+import builtins
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+FLAG = "--startup-profile"
+TOP = 15
+
+_orig_import = builtins.__import__
+_local = threading.local()
+_lock = threading.Lock()
+_times: Dict[str, List[float]] = {}  # module -> [cumulative s, self s, depth of first import]
+_t0: Optional[float] = None
+_ready: Optional[float] = None
+_job = ""
+
+
+def _timed_import(name: str, globals: Any = None, locals: Any = None, fromlist: Any = (), level: int = 0) -> Any:
+    target = name
+    if level:
+        try:
+            target = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__") or "")
+        except (ImportError, ValueError):
+            return _orig_import(name, globals, locals, fromlist, level)
+    if target in sys.modules:
+        return _orig_import(name, globals, locals, fromlist, level)
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    depth = len(stack)
+    stack.append(0.0)
+    t0 = time.perf_counter()
+    try:
+        return _orig_import(name, globals, locals, fromlist, level)
+    finally:
+        dt = time.perf_counter() - t0
+        child = stack.pop()
+        if stack:
+            stack[-1] += dt
+        with _lock:
+            entry = _times.setdefault(target, [0.0, 0.0, float(depth)])
+            entry[0] += dt
+            entry[1] += dt - child
+
+
+def enabled() -> bool:
+    """True when the import profiler is installed."""
+    return builtins.__import__ is _timed_import
+
+
+def install(job: str = "") -> None:
+    """Start timing imports and register the exit report."""
+    global _t0, _job
+    if enabled():
+        return
+    _t0 = time.perf_counter()
+    _job = job
+    builtins.__import__ = _timed_import
+    atexit.register(report)
+
+
+def install_from_argv(job: str = "", argv: Optional[List[str]] = None) -> bool:
+    """Install when `--startup-profile` is in argv (it is removed) or STARTUP_PROFILE=1; return whether installed."""
+    argv = sys.argv if argv is None else argv
+    on = FLAG in argv or os.getenv("STARTUP_PROFILE", "").strip().lower() in ("1", "true")
+    while FLAG in argv:
+        argv.remove(FLAG)
+    if on:
+        install(job)
+    return on
+
+
+def ready() -> None:
+    """Mark the end of startup (call right before the job's first real work)."""
+    global _ready
+    if enabled() and _ready is None:
+        _ready = time.perf_counter()
+
+
+def summary(top: int = TOP) -> Dict[str, Any]:
+    """Profile so far: slowest first imports (cumulative and self ms), top-level import total, startup ms."""
+    with _lock:
+        items = [(name, cum, own, int(depth)) for name, (cum, own, depth) in _times.items()]
+    by_cum = sorted(items, key=lambda it: -it[1])[:top]
+    by_self = sorted(items, key=lambda it: -it[2])[:top]
+    return {
+        "startup_ms": round(((_ready or time.perf_counter()) - (_t0 or time.perf_counter())) * 1000, 1),
+        "import_ms": round(sum(cum for _, cum, _, depth in items if depth == 0) * 1000, 1),
+        "modules": len(items),
+        "slowest": [{"module": n, "ms": round(c * 1000, 1)} for n, c, _, _ in by_cum],
+        "slowest_self": [{"module": n, "ms": round(s * 1000, 1)} for n, _, s, _ in by_self],
+    }
+
+
+def report() -> None:
+    """Print the profile as one JSON log line."""
+    if not enabled():
+        return
+    payload = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "lvl": "INFO",
+        "msg": "startup_profile",
+        "job": _job,
+        **summary(),
+    }
+    print(json.dumps(payload, separators=(",", ":")))
+
+
+__all__: Iterable[str] = ("install", "install_from_argv", "enabled", "ready", "summary", "report")
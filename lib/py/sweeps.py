@@ -0,0 +1,207 @@
+"""Multi-window indicator sweeps: one pass over the series, a (window x time) matrix out.
+
+Row k of every result equals the single-window function from
+lib/py/indicators.py called with `windows[k]`, bit for bit. SMA windows
+share one cumulative sum; rolling extremes share one sparse table;
+EMA/RMA/RSI advance every window's recursion together in a single time
+loop (their warm-up sums are common prefixes) on the Python kernel backend;
+with Numba the compiled single-window kernels are several times faster than
+that loop, so those sweeps call them once per window instead.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, Sequence
+
+import numpy as np
+
+from .indicators import SeriesLike, _arr, _run, backend
+
+Array = np.ndarray
+_NAN = float("nan")
+
+
+def _windows(windows: Iterable[int]) -> Array:
+    w = np.asarray(list(windows), dtype=np.int64)
+    if w.ndim != 1 or (w < 1).any():
+        raise ValueError("windows must be a flat sequence of positive integers")
+    return w
+
+
+def sma_sweep(values: SeriesLike, windows: Iterable[int]) -> Array:
+    """Simple moving averages for every window from one cumulative sum over the valid samples."""
+    x = _arr(values)
+    w = _windows(windows)
+    out = np.full((w.shape[0], x.shape[0]), _NAN)
+    idx = np.flatnonzero(np.isfinite(x))
+    cs = np.cumsum(x[idx])
+    for k, win in enumerate(w.tolist()):
+        if idx.size < win:
+            continue
+        s = cs[win - 1:].copy()
+        s[1:] -= cs[:-win]
+        out[k, idx[win - 1:]] = s / win
+    return out
+
+
+def _extreme_sweep(values: SeriesLike, windows: Iterable[int], fn: np.ufunc) -> Array:
+    x = _arr(values)
+    w = _windows(windows)
+    n = x.shape[0]
+    out = np.full((w.shape[0], n), _NAN)
+    if n == 0:
+        return out
+    fill = -np.inf if fn is np.maximum else np.inf
+    # Sparse table: level j holds the extreme of x[i : i + 2**j].
+    levels = [np.where(np.isfinite(x), x, fill)]
+    while 2 ** len(levels) <= min(int(w.max()), n):
+        prev = levels[-1]
+        half = 2 ** (len(levels) - 1)
+        levels.append(fn(prev[:-half], prev[half:]))
+    bad = ~np.isfinite(x)
+    for k, win in enumerate(w.tolist()):
+        if n < win:
+            continue
+        j = win.bit_length() - 1
+        t = levels[j]
+        i = np.arange(win - 1, n)
+        row = fn(t[i - win + 1], t[i - 2 ** j + 1])
+        out[k, win - 1:] = row
+        out[k, bad] = _NAN
+    return out
+
+
+def rolling_max_sweep(values: SeriesLike, windows: Iterable[int]) -> Array:
+    """Trailing-window maxima for every window from one sparse table."""
+    return _extreme_sweep(values, windows, np.maximum)
+
+
+def rolling_min_sweep(values: SeriesLike, windows: Iterable[int]) -> Array:
+    """Trailing-window minima for every window from one sparse table."""
+    return _extreme_sweep(values, windows, np.minimum)
+
+
+def _per_window(kernel: str, values: SeriesLike, windows: Iterable[int], *args: object) -> Array:
+    # Numba only: each window's compiled kernel fills its row of the matrix in place.
+    x = _arr(values)
+    w = _windows(windows)
+    out = np.full((w.shape[0], x.shape[0]), _NAN)
+    for k, win in enumerate(w.tolist()):
+        _run(kernel, x, win, *args, out=out[k])
+    return out
+
+
+def _smoother_sweep(values: SeriesLike, windows: Iterable[int], wilder: bool) -> Array:
+    if backend() == "numba":
+        return _per_window("smooth", values, windows, wilder)
+    x = _arr(values).tolist()
+    w = _windows(windows)
+    wf = w.astype(np.float64)
+    k = 2.0 / (wf + 1)
+    out = np.full((w.shape[0], len(x)), _NAN)
+    seed = np.full(w.shape[0], _NAN)
+    seeded = np.zeros(w.shape[0], dtype=bool)
+    s = 0.0
+    cnt = 0
+    for i, v in enumerate(x):
+        if v != v or v in (np.inf, -np.inf):
+            seed[:] = _NAN
+            seeded[:] = False
+            s = 0.0
+            cnt = 0
+            continue
+        if seeded.any():
+            if wilder:
+                seed[seeded] = (seed[seeded] * (wf[seeded] - 1) + v) / wf[seeded]
+            else:
+                seed[seeded] = (v - seed[seeded]) * k[seeded] + seed[seeded]
+        # Unseeded windows share the running warm-up sum.
+        s += v
+        cnt += 1
+        fresh = (~seeded) & (w == cnt)
+        if fresh.any():
+            seed[fresh] = s / wf[fresh]
+            seeded |= fresh
+        out[:, i] = np.where(seeded, seed, _NAN)
+    return out
+
+
+def ema_sweep(values: SeriesLike, windows: Iterable[int]) -> Array:
+    """Exponential moving averages for every window in one time pass (compiled kernel per window under Numba)."""
+    return _smoother_sweep(values, windows, wilder=False)
+
+
+def rma_sweep(values: SeriesLike, windows: Iterable[int]) -> Array:
+    """Wilder running averages for every window in one time pass (compiled kernel per window under Numba)."""
+    return _smoother_sweep(values, windows, wilder=True)
+
+
+def rsi_sweep(values: SeriesLike, windows: Iterable[int]) -> Array:
+    """Relative Strength Index for every window in one time pass (Wilder smoothing; compiled kernel per window under Numba)."""
+    if backend() == "numba":
+        return _per_window("rsi", values, windows)
+    c = _arr(values).tolist()
+    w = _windows(windows)
+    wf = w.astype(np.float64)
+    n = len(c)
+    out = np.full((w.shape[0], n), _NAN)
+    ag = np.full(w.shape[0], _NAN)
+    al = np.full(w.shape[0], _NAN)
+    live = np.zeros(w.shape[0], dtype=bool)
+    gain = 0.0
+    loss = 0.0
+    first_gap = n  # first i whose (c[i-1], c[i]) pair is invalid
+    wmax = int(w.max()) if w.size else 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i in range(1, n):
+            a, b = c[i - 1], c[i]
+            ok = a == a and b == b and abs(a) != np.inf and abs(b) != np.inf
+            d = b - a
+            if not ok and first_gap == n:
+                first_gap = i
+            if ok and live.any():
+                g, ls = max(d, 0), max(-d, 0)
+                ag[live] = (ag[live] * (wf[live] - 1) + g) / wf[live]
+                al[live] = (al[live] * (wf[live] - 1) + ls) / wf[live]
+            if i <= wmax and first_gap > i:
+                gain += max(d, 0)
+                loss += max(-d, 0)
+                fresh = w == i
+                if fresh.any():
+                    ag[fresh] = gain / wf[fresh]
+                    al[fresh] = loss / wf[fresh]
+                    live |= fresh
+            if ok:
+                out[live, i] = np.where(al[live] == 0, 100.0, 100 - 100 / (1 + ag[live] / al[live]))
+    return out
+
+
+SWEEPS: Dict[str, Callable[[SeriesLike, Iterable[int]], Array]] = {
+    "sma": sma_sweep,
+    "ema": ema_sweep,
+    "rma": rma_sweep,
+    "rsi": rsi_sweep,
+    "rolling_max": rolling_max_sweep,
+    "rolling_min": rolling_min_sweep,
+}
+
+
+def sweep(indicator: str, values: SeriesLike, windows: Sequence[int]) -> Array:
+    """Dispatch to the `<indicator>_sweep` function by name."""
+    try:
+        fn = SWEEPS[indicator]
+    except KeyError:
+        raise ValueError(f"no sweep for {indicator!r}; choose from {sorted(SWEEPS)}") from None
+    return fn(values, windows)
+
+
+__all__: Iterable[str] = (
+    "sma_sweep",
+    "ema_sweep",
+    "rma_sweep",
+    "rsi_sweep",
+    "rolling_max_sweep",
+    "rolling_min_sweep",
+    "SWEEPS",
+    "sweep",
+)
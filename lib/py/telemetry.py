@@ -0,0 +1,276 @@
+"""Run telemetry: aggregated spans/timers, k=v log lines, peak RSS and on-demand profiling.
+
+Hot paths call `record(name, seconds, mod=..., **fields)` or wrap a block in
+`span(...)`. String/int fields become tags (`host`, `status`, `family`,
+`method`), while `bytes` and `rows` are summed. Each (name, tags) pair
+keeps count, total and max time under one lock, about a microsecond per
+call. `install(job)` registers the exit report: one line per aggregate,
+then a `run` line with wall time and peak RSS, all in the structured
+format `YYYY-MM-DDTHH:mm:ss.sssZ [LEVEL] [mod] msg | k=v ...`.
+
+TELEMETRY=summary (default) reports at exit, `events` also logs every
+record as it happens, and `off` turns `record` into a flag check.
+PROFILE=cprofile (main thread, pstats dump) or PROFILE=sample (every
+thread, collapsed stacks for flame graphs every PROFILE_INTERVAL_MS,
+default 5) profiles one run into PROFILE_OUT and logs the top functions.
+Without PROFILE nothing is hooked.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SUMMED = ("bytes", "rows")
+TOP = 15
+
+_lock = threading.Lock()
+_aggs: Dict[Tuple[str, str, Tuple[Tuple[str, Any], ...]], List[float]] = {}  # (mod, name, tags) -> [n, total s, max s, bytes, rows]
+_mode = os.getenv("TELEMETRY", "summary").strip().lower() or "summary"
+_on = _mode != "off"
+_events = _mode == "events"
+_job = ""
+_t0: Optional[float] = None
+_profiler: Any = None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _value(v: Any) -> str:
+    s = f"{v:.3f}".rstrip("0").rstrip(".") if isinstance(v, float) else str(v)
+    return f'"{s}"' if (" " in s or not s) else s
+
+
+def format_line(level: str, mod: str, msg: str, **fields: Any) -> str:
+    """`YYYY-MM-DDTHH:mm:ss.sssZ [LEVEL] [mod] msg | k=v ...` (no `|` part without fields)."""
+    line = f"{_now()} [{level.upper()}] [{mod}] {msg}"
+    if fields:
+        line += " | " + " ".join(f"{k}={_value(v)}" for k, v in fields.items() if v is not None)
+    return line
+
+
+def log(level: str, mod: str, msg: str, **fields: Any) -> None:
+    """Print one structured k=v line to stdout."""
+    print(format_line(level, mod, msg, **fields), flush=True)
+
+
+def enabled() -> bool:
+    """True unless TELEMETRY=off."""
+    return _on
+
+
+def configure(mode: str) -> None:
+    """Switch between `summary`, `events` and `off` at runtime (tests, notebooks)."""
+    global _mode, _on, _events
+    _mode = mode.strip().lower()
+    _on, _events = _mode != "off", _mode == "events"
+
+
+def record(name: str, seconds: float, *, mod: str = "app", **fields: Any) -> None:
+    """Add one timed event; `bytes`/`rows` fields are summed, other fields tag the aggregate."""
+    if not _on:
+        return
+    tags = tuple(sorted((k, v) for k, v in fields.items() if k not in SUMMED))
+    key = (mod, name, tags)
+    with _lock:
+        agg = _aggs.get(key)
+        if agg is None:
+            agg = _aggs[key] = [0, 0.0, 0.0, 0, 0]
+        agg[0] += 1
+        agg[1] += seconds
+        if seconds > agg[2]:
+            agg[2] = seconds
+        agg[3] += fields.get("bytes", 0) or 0
+        agg[4] += fields.get("rows", 0) or 0
+    if _events:
+        log("DEBUG", mod, name, ms=round(seconds * 1000, 3), **fields)
+
+
+class span:
+    """Time a block: `with span("publish", mod="sheets", tab=tab) as sp: ...; sp.fields["rows"] = n`.
+
+    Raised exceptions are recorded with `error=<type>` and re-raised.
+    """
+
+    __slots__ = ("name", "mod", "fields", "_t0")
+
+    def __init__(self, name: str, *, mod: str = "app", **fields: Any) -> None:
+        self.name, self.mod, self.fields = name, mod, fields
+
+    def __enter__(self) -> "span":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        record(self.name, time.perf_counter() - self._t0, mod=self.mod, **self.fields)
+
+
+def snapshot() -> List[Dict[str, Any]]:
+    """Aggregates so far, grouped by name, slowest total first: {mod, name, tags..., n, total_ms, max_ms, bytes, rows}."""
+    with _lock:
+        items = [(key, list(agg)) for key, agg in _aggs.items()]
+    out = []
+    for (mod, name, tags), (n, total, peak, nbytes, rows) in sorted(items, key=lambda it: (it[0][1], -it[1][1])):
+        item: Dict[str, Any] = {"mod": mod, "name": name, **dict(tags), "n": int(n), "total_ms": round(total * 1000, 3), "max_ms": round(peak * 1000, 3)}
+        if nbytes:
+            item["bytes"] = int(nbytes)
+        if rows:
+            item["rows"] = int(rows)
+        out.append(item)
+    return out
+
+
+def reset() -> None:
+    """Drop every aggregate."""
+    with _lock:
+        _aggs.clear()
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where `resource` is unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KiB on Linux
+
+
+class Sampler:
+    """Wall-clock sampling profiler: every `interval_s` it folds each thread's Python stack into a counter."""
+
+    def __init__(self, interval_s: float = 0.005) -> None:
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="telemetry-sampler", daemon=True)
+
+    def start(self) -> "Sampler":
+        """Begin sampling in a daemon thread."""
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the thread."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def top(self, limit: int = TOP) -> List[Tuple[str, int, int]]:
+        """(function, inclusive samples, self samples), most inclusive first."""
+        incl: Counter = Counter()
+        own: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            for fn in set(frames):
+                incl[fn] += count
+            own[frames[-1]] += count
+        return [(fn, n, own[fn]) for fn, n in incl.most_common(limit)]
+
+    def write(self, path: str) -> None:
+        """Write collapsed stacks (`a;b;c count` per line; flamegraph.pl / speedscope input)."""
+        with open(path, "w", encoding="utf-8") as fh:
+            for stack, count in self.stacks.most_common():
+                fh.write(f"{stack} {count}\n")
+
+
+def _start_profiler(kind: str) -> None:
+    global _profiler
+    if kind == "cprofile":
+        import cProfile
+
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    elif kind == "sample":
+        interval = float(os.getenv("PROFILE_INTERVAL_MS", "5") or 5) / 1000
+        _profiler = Sampler(interval).start()
+    elif kind:
+        log("WARN", "telemetry", "unknown PROFILE ignored", profile=kind)
+
+
+def _stop_profiler() -> None:
+    global _profiler
+    prof, _profiler = _profiler, None
+    if prof is None:
+        return
+    if isinstance(prof, Sampler):
+        prof.stop()
+        out = os.getenv("PROFILE_OUT", "").strip() or f"{_job or 'run'}.folded"
+        prof.write(out)
+        log("INFO", "profile", "sampled", out=out, samples=prof.samples, interval_ms=round(prof.interval_s * 1000, 3))
+        for rank, (fn, incl, own) in enumerate(prof.top(), 1):
+            log("INFO", "profile", "top", rank=rank, func=fn, incl_pct=round(100 * incl / max(1, prof.samples), 1),
+                self_pct=round(100 * own / max(1, prof.samples), 1))
+        return
+    import pstats
+
+    prof.disable()
+    out = os.getenv("PROFILE_OUT", "").strip() or f"{_job or 'run'}.prof"
+    prof.dump_stats(out)
+    stats = pstats.Stats(prof)
+    log("INFO", "profile", "cprofile", out=out, calls=stats.total_calls, total_ms=round(stats.total_tt * 1000, 1))
+    rows = sorted(stats.stats.items(), key=lambda kv: -kv[1][3])[:TOP]
+    for rank, ((path, line, fn), (_, ncalls, tottime, cumtime, _)) in enumerate(rows, 1):
+        log("INFO", "profile", "top", rank=rank, func=f"{fn} ({os.path.basename(path)}:{line})", calls=ncalls,
+            cum_ms=round(cumtime * 1000, 1), self_ms=round(tottime * 1000, 1))
+
+
+def report() -> None:
+    """Stop any profiler, then log every aggregate and the run line (wall time, peak RSS)."""
+    _stop_profiler()
+    if _on:
+        for item in snapshot():
+            log("INFO", item.pop("mod"), item.pop("name"), **item)
+    wall = None if _t0 is None else round((time.perf_counter() - _t0) * 1000, 1)
+    log("INFO", "telemetry", "run", job=_job, wall_ms=wall, peak_rss_mb=peak_rss_mb())
+
+
+def install(job: str = "") -> None:
+    """Register the exit report and start the PROFILE profiler, once per process."""
+    global _job, _t0
+    if _t0 is not None:
+        return
+    _job, _t0 = job, time.perf_counter()
+    _start_profiler(os.getenv("PROFILE", "").strip().lower())
+    atexit.register(report)
+
+
+__all__: Iterable[str] = (
+    "format_line",
+    "log",
+    "enabled",
+    "configure",
+    "record",
+    "span",
+    "snapshot",
+    "reset",
+    "peak_rss_mb",
+    "Sampler",
+    "report",
+    "install",
+)
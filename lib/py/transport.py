@@ -0,0 +1,253 @@
+"""Shared pooled HTTP transport with mirror scoring, hedged requests, and circuit breakers."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import telemetry
+
+_RETRYABLE_STATUS = frozenset({408, 418, 429, 500, 502, 503, 504})
+
+
+class TransportError(Exception):
+    """Raised when every mirror failed or was skipped for a request."""
+
+    def __init__(self, msg: str, response: Optional[requests.Response] = None) -> None:
+        super().__init__(msg)
+        self.response = response
+
+
+class MirrorStats:
+    """Rolling latency window, error EWMA, and breaker state for one base URL."""
+
+    def __init__(self, window: int = 64) -> None:
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record(self, latency_s: float, ok: bool, *, alpha: float, threshold: int, cooldown_s: float) -> None:
+        """Fold one attempt into the rolling window and trip the breaker on repeated failures."""
+        self.error_rate = (1 - alpha) * self.error_rate + alpha * (0.0 if ok else 1.0)
+        if ok:
+            self.latencies.append(latency_s)
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+            return
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= threshold:
+            self.open_until = time.monotonic() + cooldown_s
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the q-quantile of recent successful latencies, or None without samples."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def score(self) -> float:
+        """Lower is better: median latency inflated by the recent error rate."""
+        p50 = self.quantile(0.5)
+        return float("inf") if p50 is None else p50 * (1.0 + 4.0 * self.error_rate)
+
+
+class Transport:
+    """Keep-alive sessions per host over a ranked list of equivalent mirrors.
+
+    Each request goes to the best-scoring healthy mirror first. Once it has
+    been in flight longer than that mirror's recent p95 latency a duplicate
+    is sent to the next mirror and the first 2xx answer wins. Mirrors that
+    fail `breaker_threshold` times in a row are skipped for `cooldown_s`.
+    `on_response` sees every response (hedges included); statuses in
+    `stop_status` abort the request instead of falling through to the next
+    mirror, for limits that are shared across hosts. A request's
+    `before_send` runs before every attempt it makes (primary, hedge and
+    failover alike), so a shared rate limiter paces each one. The hedge
+    clock starts when the primary actually goes out, not while it waits in
+    `before_send`, and an attempt still waiting there when the request is
+    settled is dropped without sending.
+    """
+
+    def __init__(
+        self,
+        bases: Sequence[str],
+        *,
+        timeout: float = 30.0,
+        pool_size: int = 8,
+        hedge: bool = True,
+        hedge_min_samples: int = 20,
+        breaker_threshold: int = 3,
+        cooldown_s: float = 60.0,
+        error_alpha: float = 0.2,
+        on_response: Optional[Callable[[requests.Response], None]] = None,
+        stop_status: Iterable[int] = (),
+    ) -> None:
+        self.bases = list(bases)
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker_threshold = breaker_threshold
+        self.cooldown_s = cooldown_s
+        self.error_alpha = error_alpha
+        self.on_response = on_response
+        self.stop_status = frozenset(stop_status)
+        self._stats: Dict[str, MirrorStats] = {b: MirrorStats() for b in self.bases}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(2, pool_size), thread_name_prefix="transport")
+
+    def session(self, base: str) -> requests.Session:
+        """Return the pooled keep-alive session for `base`'s host."""
+        host = urlsplit(base).netloc
+        with self._lock:
+            sess = self._sessions.get(host)
+            if sess is None:
+                sess = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size)
+                sess.mount("https://", adapter)
+                sess.mount("http://", adapter)
+                self._sessions[host] = sess
+            return sess
+
+    def ranked(self) -> List[str]:
+        """Return bases ordered fastest-healthy first; open breakers go last."""
+        now = time.monotonic()
+        with self._lock:
+            keyed = [
+                (st.open_until > now, st.score(), st.error_rate, i, b)
+                for i, (b, st) in enumerate((b, self._stats[b]) for b in self.bases)
+            ]
+        return [b for *_, b in sorted(keyed)]
+
+    def stats(self, base: str) -> MirrorStats:
+        """Return the live stats object for a base URL."""
+        return self._stats[base]
+
+    def _hedge_delay(self, base: str) -> Optional[float]:
+        st = self._stats[base]
+        if not self.hedge or len(st.latencies) < self.hedge_min_samples:
+            return None
+        return st.quantile(0.95)
+
+    def _attempt(
+        self,
+        base: str,
+        path: str,
+        params: Optional[Mapping[str, object]],
+        before_send: Optional[Callable[[], None]],
+        sent: Future,
+        settled: threading.Event,
+    ) -> Optional[requests.Response]:
+        if before_send is not None:
+            before_send()  # may block (rate limiter); counts as neither mirror latency nor hedge time
+        if settled.is_set():
+            return None  # the request was answered (or aborted) while this attempt was queued
+        t0 = time.monotonic()
+        sent.set_result(t0)
+        try:
+            r = self.session(base).get(base + path, params=params, timeout=self.timeout)
+        except Exception as exc:
+            dt = time.monotonic() - t0
+            self._record(base, dt, False)
+            telemetry.record("http", dt, mod="transport", host=urlsplit(base).netloc, status=type(exc).__name__)
+            raise
+        dt = time.monotonic() - t0
+        self._record(base, dt, r.status_code not in _RETRYABLE_STATUS and r.status_code < 500)
+        telemetry.record("http", dt, mod="transport", host=urlsplit(base).netloc, status=r.status_code, bytes=len(r.content))
+        if self.on_response is not None:
+            self.on_response(r)
+        return r
+
+    def _record(self, base: str, latency_s: float, ok: bool) -> None:
+        with self._lock:
+            self._stats[base].record(
+                latency_s, ok, alpha=self.error_alpha, threshold=self.breaker_threshold, cooldown_s=self.cooldown_s
+            )
+
+    def get(
+        self,
+        path: str,
+        params: Optional[Mapping[str, object]] = None,
+        *,
+        before_send: Optional[Callable[[], None]] = None,
+    ) -> requests.Response:
+        """GET `path` from the mirrors and return the first 2xx response; `before_send` runs before each attempt."""
+        now = time.monotonic()
+        order = [b for b in self.ranked() if self._stats[b].open_until <= now] or self.ranked()
+        last_err: Optional[BaseException] = None
+        pending: Dict[Future, Tuple[str, Future]] = {}
+        settled = threading.Event()
+        nxt = 0
+
+        def launch() -> None:
+            nonlocal nxt
+            sent: Future = Future()  # resolves to the send time once before_send has returned
+            pending[self._executor.submit(self._attempt, order[nxt], path, params, before_send, sent, settled)] = (order[nxt], sent)
+            nxt += 1
+
+        try:
+            while nxt < len(order) or pending:
+                if not pending:
+                    launch()
+                delay = None
+                watch: List[Future] = list(pending)
+                if len(pending) == 1 and nxt < len(order):
+                    base, sent = next(iter(pending.values()))
+                    p95 = self._hedge_delay(base)
+                    if p95 is not None and sent.done():
+                        delay = max(0.0, p95 - (time.monotonic() - sent.result()))
+                    elif p95 is not None:
+                        watch.append(sent)  # still queued in before_send: wake when it sends
+                done, _ = wait(watch, timeout=delay, return_when=FIRST_COMPLETED)
+                if not done:
+                    launch()  # primary is past its p95: race a duplicate on the next mirror
+                    continue
+                for fut in done & pending.keys():
+                    base, _ = pending.pop(fut)
+                    try:
+                        r = fut.result()
+                    except Exception as e:
+                        last_err = e
+                        continue
+                    if r is None:
+                        continue
+                    if 200 <= r.status_code < 300:
+                        return r
+                    if r.status_code in self.stop_status:
+                        raise TransportError(f"HTTP {r.status_code} {base} {r.text[:160]}", r)
+                    last_err = TransportError(f"HTTP {r.status_code} {base} {r.text[:160]}", r)
+            raise last_err or TransportError("All bases failed")
+        finally:
+            settled.set()
+
+    def get_json(
+        self, path: str, params: Optional[Mapping[str, object]] = None, *, before_send: Optional[Callable[[], None]] = None
+    ) -> object:
+        """GET `path` and decode the JSON body."""
+        return self.get(path, params, before_send=before_send).json()
+
+
+_shared: Dict[tuple, Transport] = {}
+_shared_lock = threading.Lock()
+
+
+def shared(bases: Sequence[str], **kwargs: object) -> Transport:
+    """Return the process-wide Transport for this mirror list, creating it on first use."""
+    key = tuple(bases)
+    with _shared_lock:
+        t = _shared.get(key)
+        if t is None:
+            t = _shared[key] = Transport(bases, **kwargs)
+        return t
+
+
+__all__: Iterable[str] = ("Transport", "TransportError", "MirrorStats", "shared")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Run the staged spot1d pipeline: ingest (klines, FRED) -> transform -> publish, plus the macro join.
+
+PIPELINE_MODE=dag (default) runs the stages through `lib.py.pipeline`:
+the Binance and FRED pulls run concurrently, a stage whose code and inputs
+hash to its last successful run is skipped, and every artifact is kept under
+PIPELINE_DIR, so a failed publish is retried without refetching or
+recomputing. FRED only feeds the `join_macro` stage, whose `macro` artifact
+is kept in the store; a FRED outage fails that branch, not the publish.
+PIPELINE_FORCE=stage[,stage] reruns named stages regardless.
+
+PIPELINE_MODE=stream pipes ingest pages -> transform chunks -> Sheets
+writes through bounded queues: fetching, computing and writing overlap and
+peak memory follows the page size (STREAM_DEPTH pages in flight), not the
+history length. Stream mode keeps no artifacts and skips the FRED branch.
+
+Configuration otherwise matches a01 (PROVIDER, SYMBOL, SINCE, SHEET_ID,
+SHEET_TAB, PUBLISH_ENCODING, WRITE_WORKERS, WRITE_PROGRESS, FETCH_WORKERS,
+KLINE_CACHE_DIR, ARCHIVE_SOURCE) plus FRED_SINCE / FRED_API_KEY /
+FRED_CACHE_DIR from a02. Pass --startup-profile to log import times.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import startup  # noqa: E402
+
+startup.install_from_argv("pipeline_spot1d")
+
+from a_apps.a01_bsp_pullDaily_sheet_full.main import build_header  # noqa: E402
+from a_ingest.a01_ingest_klines import stage as ingest_klines  # noqa: E402
+from a_ingest.a02_ingest_fred import stage as ingest_fred  # noqa: E402
+from a_publish.p01_export_spot1d import stage as publish_spot1d  # noqa: E402
+from a_transform.t02_features_spot1d import stage as transform_features  # noqa: E402
+from a_transform.t03_macro_spot1d import stage as join_macro  # noqa: E402
+from lib.py import binance, pipeline, sheets, telemetry  # noqa: E402
+
+STAGES = (ingest_klines.STAGE, ingest_fred.STAGE, transform_features.STAGE, join_macro.STAGE, publish_spot1d.STAGE)
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def env(name: str, default: str = "") -> str:
+    return os.getenv(name, default).strip()
+
+
+def log(lvl: str, msg: str, **fields: Any) -> None:
+    print(json.dumps({"ts": utc_now_iso(), "lvl": lvl, "job": "pipeline_spot1d", "msg": msg, **fields}, separators=(",", ":")), flush=True)
+
+
+def params() -> Dict[str, Any]:
+    """Run parameters; `as_of` / `fred_as_of` roll daily so sources are refetched once per closed day."""
+    return {
+        "provider": env("PROVIDER", "binance"),
+        "symbol": env("SYMBOL", "BTCUSDT"),
+        "since": env("SINCE", "2017-01-01"),
+        "as_of": binance.last_closed_ms("1d"),
+        "fred_series": ingest_fred.SERIES,
+        "fred_since": env("FRED_SINCE", "2010-01-01"),
+        "fred_as_of": datetime.now(timezone.utc).date().isoformat(),
+        "encoding_mode": "full" if env("PUBLISH_ENCODING", "compact").lower() == "full" else "compact",
+        "sheet_id": env("SHEET_ID"),
+        "sheet_tab": env("SHEET_TAB", "spot1d"),
+    }
+
+
+def run_dag(p: Dict[str, Any]) -> int:
+    """Run the stage graph; exit code 1 when any stage failed or was blocked."""
+    flow = pipeline.Pipeline(STAGES, pipeline.default_store())
+    force = [s for s in env("PIPELINE_FORCE").split(",") if s.strip()]
+
+    def done(run: pipeline.StageRun) -> None:
+        log("ERROR" if run.status in ("failed", "blocked") else "INFO", "stage", stage=run.name, status=run.status,
+            seconds=round(run.seconds, 3), key=run.key[:12], **({"err": run.error} if run.error else {}))
+
+    report = flow.run(p, workers=int(env("PIPELINE_WORKERS", "0") or 0) or None, force=force, on_done=done)
+    ok = all(r.status in ("ran", "cached") for r in report.values())
+    log("INFO" if ok else "ERROR", "pipeline", mode="dag", store=str(flow.store.root),
+        ran=[n for n, r in report.items() if r.status == "ran"], cached=[n for n, r in report.items() if r.status == "cached"])
+    return 0 if ok else 1
+
+
+def run_stream(p: Dict[str, Any]) -> int:
+    """Overlap fetch, compute and write with at most STREAM_DEPTH items queued between steps."""
+    depth = int(env("STREAM_DEPTH", "2") or 2)
+    t0 = time.perf_counter()
+    pages = pipeline.background(ingest_klines.pages(p["provider"], p["symbol"], p["since"]), depth)
+    chunks = pipeline.background(transform_features.stream(pages, p["encoding_mode"]), depth)
+    rows = publish_spot1d.stream(sheets.client(), p["sheet_id"], p["sheet_tab"], build_header(), chunks)
+    log("INFO", "pipeline", mode="stream", rows=rows, sheet_tab=p["sheet_tab"], seconds=round(time.perf_counter() - t0, 3))
+    return 0
+
+
+def main() -> int:
+    p = params()
+    if not p["sheet_id"]:
+        log("ERROR", "SHEET_ID missing")
+        return 2
+    telemetry.install("pipeline_spot1d")
+    startup.ready()
+    return run_stream(p) if env("PIPELINE_MODE", "dag").lower() == "stream" else run_dag(p)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
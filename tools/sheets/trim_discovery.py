@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Regenerate lib/py/discovery/sheets.v4.json from the installed googleapiclient's static Sheets document.
+
+The bundled copy keeps only the methods the jobs call (METHODS) and stubs
+their request/response schemas, so `build_from_document` parses ~18 KB
+instead of ~290 KB on every cold start and per writer thread. Run it after
+bumping google-api-python-client or when lib/py/sheets.py starts calling a
+new method; `tools/verify/test_startup.py` fails while a call is missing.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+OUT = ROOT / "lib" / "py" / "discovery" / "sheets.v4.json"
+
+# resource path -> methods kept
+METHODS: Dict[str, tuple] = {
+    "spreadsheets": ("get", "batchUpdate"),
+    "spreadsheets.values": ("get", "batchGet", "update", "append", "clear", "batchClear", "batchUpdate"),
+}
+
+
+def _strip(node: Any) -> Any:
+    # descriptions are documentation only
+    if isinstance(node, dict):
+        return {k: _strip(v) for k, v in node.items() if k != "description"}
+    if isinstance(node, list):
+        return [_strip(v) for v in node]
+    return node
+
+
+def trim(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Return `doc` reduced to METHODS with stub schemas for the bodies they reference."""
+    out = {k: v for k, v in doc.items() if k not in ("resources", "schemas", "description", "icons")}
+    out["resources"] = {}
+    refs = set()
+    for path, names in METHODS.items():
+        src, dst = doc, out
+        for part in path.split("."):
+            src = src["resources"][part]
+            dst = dst.setdefault("resources", {}).setdefault(part, {})
+        dst["methods"] = {name: _strip(src["methods"][name]) for name in names}
+        for method in dst["methods"].values():
+            refs.update(method[k]["$ref"] for k in ("request", "response") if k in method)
+    out["schemas"] = {ref: {"id": ref, "type": "object"} for ref in sorted(refs)}
+    return _strip(out)
+
+
+def main() -> int:
+    """Write the trimmed document and print its size."""
+    import googleapiclient
+
+    src = Path(googleapiclient.__file__).parent / "discovery_cache" / "documents" / "sheets.v4.json"
+    doc = json.loads(src.read_text(encoding="utf-8"))
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+    OUT.write_text(json.dumps(trim(doc), indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    print(f"[sheets] wrote {OUT.relative_to(ROOT)} ({OUT.stat().st_size} bytes, revision {doc.get('revision')})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
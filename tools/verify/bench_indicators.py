@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""Benchmark harness: wall time and peak memory per indicator family and for the a01 pipeline.
+
+Runs on synthetic daily OHLCV of 3k, 100k and 3M bars (`--sizes`), prints
+`[verify]` lines, and writes a JSON report (`--out`). `--compare BASELINE`
+fails when a case is slower or uses more peak memory than the baseline by
+more than `--threshold` (default 0.25 = 25 %). Every run also fingerprints
+each feature column and checks the 3k fingerprints against
+`tools/verify/golden/indicator_fingerprints.json`, so a speedup cannot
+silently change numbers; `--update-golden` rewrites that file after an
+intended change.
+
+Time is the best of `--repeat` runs without tracing; peak memory is one
+extra run under tracemalloc (NumPy reports its buffers there). The Sheets
+matrix (`compute_all`) is only built up to 200k bars: a tab holds at most
+10M cells, i.e. ~140k rows of 70 columns.
+
+Multi-window sweeps (windows 5..300) are timed on every installed kernel
+backend next to the same windows computed one call at a time; a sweep that
+is slower than its per-window calls fails the run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib.util
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import indicators as ind  # noqa: E402
+from lib.py import sweeps  # noqa: E402
+from lib.py.features import FEATURES, compute, feature_columns  # noqa: E402
+from lib.py.klineframe import FIELDS, KlineFrame  # noqa: E402
+
+APP = ROOT / "a_apps" / "a01_bsp_pullDaily_sheet_full" / "main.py"
+GOLDEN = HERE / "golden" / "indicator_fingerprints.json"
+GOLDEN_SIZE = 3000
+SIZES = (3_000, 100_000, 3_000_000)
+MATRIX_MAX = 200_000
+SWEEP_WINDOWS = tuple(range(5, 301))
+# A 296-window matrix is 2.4 KB per bar; the Python backend's per-window calls take minutes past 3k bars.
+SWEEP_MAX = {"numba": 100_000, "python": 3_000}
+REL_TOL = 1e-9
+NOISE_S = 0.005  # absolute slack so millisecond-scale cases do not flap on shared runners
+NOISE_MB = 0.5
+
+# Families are column groups from the spot1d schema; each runs its own DAG plan (shared inputs included).
+FAMILIES: Dict[str, Tuple[str, ...]] = {
+    "volume_flow": FEATURES[0:8],
+    "moving_averages": ("sma20", "sma50", "sma200", "ema12", "ema26", "ema50"),
+    "momentum": ("macd", "macd_sig", "macd_hist", "rsi14", "roc10"),
+    "money_flow": ("obv", "ad", "cmf20", "mfi14"),
+    "bands": ("atr14", "bb_mid", "bb_up", "bb_dn", "bb_w", "kc_mid", "kc_up", "kc_dn"),
+    "directional": ("di_plus", "di_minus", "adx14"),
+    "donchian": ("don20_hi", "don20_lo", "don55_hi", "don55_lo"),
+    "swings": ("swing_hh", "swing_hl", "swing_lh", "swing_ll"),
+    "divergences": ("bull_div_rsi", "bear_div_rsi", "bull_div_cvd", "bear_div_cvd"),
+    "fibonacci": FEATURES[46:58],
+}
+
+# Hot primitives timed on their own.
+PRIMITIVES: Dict[str, Callable[[KlineFrame], Any]] = {
+    "sma": lambda f: ind.sma(f.close, 200),
+    "ema": lambda f: ind.ema(f.close, 50),
+    "stddev": lambda f: ind.stddev(f.close, 20),
+    "rolling_max": lambda f: ind.rolling_max(f.high, 55),
+    "rsi": lambda f: ind.rsi(f.close, 14),
+    "price_pivots": lambda f: ind.price_pivots(f.high, f.low, lookback=3, min_sep=5),
+}
+
+
+# Sweeps timed against one single-window call per window.
+SWEEPS: Dict[str, Callable[[KlineFrame], Any]] = {
+    name: (lambda f, name=name: sweeps.sweep(name, f.close, SWEEP_WINDOWS)) for name in ("sma", "ema", "rma", "rsi", "rolling_max")
+}
+PER_WINDOW: Dict[str, Callable[[KlineFrame], Any]] = {
+    name: (lambda f, name=name: [getattr(ind, name)(f.close, w) for w in SWEEP_WINDOWS]) for name in SWEEPS
+}
+
+
+def synth_frame(n: int, seed: int = 7) -> KlineFrame:
+    """Return `n` synthetic daily bars (same shape as test_indicator_parity.synth_rows), generated vectorized."""
+    rng = np.random.default_rng(seed)
+    close = 4000.0 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    open_ = np.concatenate(([4000.0], close[:-1]))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    volume = np.abs(rng.normal(30000, 8000, n)) + 1
+    tbb = volume * rng.uniform(0.3, 0.7, n)
+    tp = (high + low + close) / 3
+    ot = 1502928000000 + np.arange(n, dtype=np.float64) * 86_400_000
+    cols = {
+        "open_time": ot, "open": open_, "high": high, "low": low, "close": close, "volume": volume,
+        "close_time": ot + 86_399_999, "qav": volume * tp, "ntr": np.floor(volume * rng.uniform(3, 9, n)),
+        "tbb": tbb, "tbq": tbb * tp, "ignore": np.zeros(n),
+    }
+    return KlineFrame.from_block(np.column_stack([cols[name] for name in FIELDS]))
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Tuple[float, float]:
+    """Return (best wall seconds over `repeat` runs, peak traced MiB of one more run)."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2**20
+
+
+def fingerprints(feats: Dict[str, np.ndarray]) -> Dict[str, List[float]]:
+    """Per column: [non-finite count, sum, position-weighted sum] over finite cells."""
+    out = {}
+    for name in FEATURES:
+        x = feats[name].astype(np.float64)
+        ok = np.isfinite(x)
+        w = np.arange(1, x.shape[0] + 1, dtype=np.float64) / max(x.shape[0], 1)
+        out[name] = [float((~ok).sum()), float(x[ok].sum()), float((x[ok] * w[ok]).sum())]
+    return out
+
+
+def fingerprint_diff(expected: Dict[str, List[float]], actual: Dict[str, List[float]]) -> List[str]:
+    """Return the columns whose fingerprints differ beyond REL_TOL."""
+    bad = []
+    for name, exp in expected.items():
+        act = actual.get(name)
+        if act is None or any(abs(a - e) > REL_TOL * max(1.0, abs(a), abs(e)) for a, e in zip(exp, act)):
+            bad.append(name)
+    return bad
+
+
+def load_app() -> Optional[ModuleType]:
+    """Import the a01 job (needs the Google client libraries); None when unavailable."""
+    try:
+        spec = importlib.util.spec_from_file_location("a01_main", APP)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    except ImportError as exc:
+        print(f"[verify] SKIP bench compute_all: {exc}")
+        return None
+
+
+def run(sizes: Sequence[int], repeat: int) -> Dict[str, Any]:
+    """Benchmark every case at every size and return the report."""
+    app = load_app()
+    results: List[Dict[str, Any]] = []
+    prints: Dict[str, Dict[str, List[float]]] = {}
+    ind.warmup()
+    for n in sizes:
+        frame = synth_frame(n)
+        cases: Dict[str, Callable[[], Any]] = {f"primitive:{k}": (lambda fn=fn: fn(frame)) for k, fn in PRIMITIVES.items()}
+        cases.update({f"family:{k}": (lambda cols=cols: compute(frame, cols)) for k, cols in FAMILIES.items()})
+        cases["pipeline:feature_columns"] = lambda: feature_columns(frame)
+        if app is not None:
+            cases["pipeline:build_header"] = app.build_header
+            if n <= MATRIX_MAX:
+                cases["pipeline:compute_all"] = lambda: app.compute_all(frame)
+        for case, fn in cases.items():
+            seconds, peak_mb = measure(fn, repeat)
+            results.append({"size": n, "case": case, "seconds": seconds, "peak_mb": peak_mb})
+            print(f"[verify] PASS bench n={n} {case} seconds={seconds:.6f} peak_mb={peak_mb:.1f}")
+        prints[str(n)] = fingerprints(feature_columns(frame))
+        active = ind.backend()
+        try:
+            for backend in ind.available_backends():
+                if n > SWEEP_MAX[backend]:
+                    continue
+                ind.set_backend(backend)
+                ind.warmup()
+                for name in SWEEPS:
+                    for kind, fn in (("sweep", SWEEPS[name]), ("per_window", PER_WINDOW[name])):
+                        case = f"{kind}:{name}@{backend}"
+                        seconds, peak_mb = measure(lambda fn=fn: fn(frame), repeat)
+                        results.append({"size": n, "case": case, "seconds": seconds, "peak_mb": peak_mb})
+                        print(f"[verify] PASS bench n={n} {case} seconds={seconds:.6f} peak_mb={peak_mb:.1f}")
+        finally:
+            ind.set_backend(active)
+    return {
+        "version": 1,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "backend": ind.backend(),
+        "repeat": repeat,
+        "results": results,
+        "fingerprints": prints,
+    }
+
+
+def compare(baseline: Dict[str, Any], report: Dict[str, Any], threshold: float) -> List[str]:
+    """Return regression and numeric-drift descriptions of `report` against `baseline`."""
+    problems = []
+    base = {(r["size"], r["case"]): r for r in baseline.get("results", [])}
+    for r in report["results"]:
+        b = base.get((r["size"], r["case"]))
+        if b is None:
+            continue
+        label = f"n={r['size']} {r['case']}"
+        if r["seconds"] > b["seconds"] * (1 + threshold) and r["seconds"] - b["seconds"] > NOISE_S:
+            problems.append(f"{label} seconds {b['seconds']:.6f} -> {r['seconds']:.6f}")
+        if r["peak_mb"] > b["peak_mb"] * (1 + threshold) and r["peak_mb"] - b["peak_mb"] > NOISE_MB:
+            problems.append(f"{label} peak_mb {b['peak_mb']:.1f} -> {r['peak_mb']:.1f}")
+    for size, exp in baseline.get("fingerprints", {}).items():
+        act = report["fingerprints"].get(size)
+        if act is not None:
+            problems += [f"n={size} {col} output changed" for col in fingerprint_diff(exp, act)]
+    return problems
+
+
+def slow_sweeps(report: Dict[str, Any], threshold: float) -> List[str]:
+    """Return the sweeps slower than calling the single-window function once per window on the same backend."""
+    timed = {(r["size"], r["case"]): r["seconds"] for r in report["results"]}
+    problems = []
+    for (n, case), seconds in timed.items():
+        if not case.startswith("sweep:"):
+            continue
+        single = timed.get((n, "per_window:" + case[len("sweep:"):]))
+        if single is not None and seconds > single * (1 + threshold) and seconds - single > NOISE_S:
+            problems.append(f"n={n} {case} {seconds:.6f}s vs per-window {single:.6f}s")
+    return problems
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the benchmarks, check golden fingerprints, and optionally compare against a baseline report."""
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default=",".join(str(n) for n in SIZES), help="comma-separated bar counts")
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is kept)")
+    ap.add_argument("--out", help="write the JSON report here")
+    ap.add_argument("--compare", metavar="BASELINE", help="fail on regressions against this JSON report")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown / memory growth")
+    ap.add_argument("--update-golden", action="store_true", help=f"rewrite {GOLDEN.name} from this run")
+    args = ap.parse_args(argv)
+
+    sizes = sorted({int(s) for s in args.sizes.split(",") if s.strip()} | {GOLDEN_SIZE})
+    report = run(sizes, max(1, args.repeat))
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=1) + "\n", encoding="utf-8")
+        print(f"[verify] PASS bench report written to {args.out}")
+
+    failed = 0
+    checks = 1
+    golden = report["fingerprints"][str(GOLDEN_SIZE)]
+    if args.update_golden:
+        GOLDEN.parent.mkdir(parents=True, exist_ok=True)
+        lines = ",\n".join(f"  {json.dumps(k)}: {json.dumps(v)}" for k, v in golden.items())  # one column per line
+        GOLDEN.write_text(f'{{"size": {GOLDEN_SIZE}, "fingerprints": {{\n{lines}\n}}}}\n', encoding="utf-8")
+        print(f"[verify] PASS golden fingerprints updated n={GOLDEN_SIZE}")
+    else:
+        bad = fingerprint_diff(json.loads(GOLDEN.read_text(encoding="utf-8"))["fingerprints"], golden)
+        if bad:
+            print(f"[verify] FAIL golden fingerprints n={GOLDEN_SIZE} changed={bad}")
+            failed += 1
+        else:
+            print(f"[verify] PASS golden fingerprints n={GOLDEN_SIZE}")
+    checks += 1
+    problems = slow_sweeps(report, args.threshold)
+    for p in problems:
+        print(f"[verify] FAIL sweep slower than per-window {p}")
+    if problems:
+        failed += 1
+    else:
+        print(f"[verify] PASS sweeps no slower than per-window calls on {', '.join(ind.available_backends())}")
+    if args.compare:
+        checks += 1
+        problems = compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), report, args.threshold)
+        for p in problems:
+            print(f"[verify] FAIL regression {p}")
+        if problems:
+            failed += 1
+        else:
+            print(f"[verify] PASS no regressions against {args.compare} (threshold {args.threshold:.0%})")
+
+    summary = f"[verify] PASS summary: {checks - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""In-memory Sheets v4 service for the write-path harnesses (no network, no google client).
+
+`FakeService` answers the calls lib/py/sheets.py makes
+(`spreadsheets().get/batchUpdate`, `spreadsheets().values().batchUpdate/
+append/clear`) on a per-tab grid, records every executed call with its
+body, and lets a harness inject failures per call. Plug it into a
+`SheetsClient` with `attach(client, service)`.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+A1 = re.compile(r"^(?P<tab>[^!]+)!(?P<c1>[A-Z]+)(?P<r1>\d+)(?::(?P<c2>[A-Z]+)(?P<r2>\d+)?)?$")
+Failure = Callable[[str, Dict[str, Any], int], Optional[BaseException]]
+
+
+class HttpError(Exception):
+    """googleapiclient-style error: the status sits on `resp.status`."""
+
+    def __init__(self, status: int) -> None:
+        super().__init__(f"HTTP {status}")
+        self.resp = type("Resp", (), {"status": status})()
+
+
+def _col(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+def _cell(data: Dict[str, Any]) -> Any:
+    v = data.get("userEnteredValue", {})
+    return next(iter(v.values())) if v else ""
+
+
+class FakeRequest:
+    """One built API call; `execute()` runs it against the service."""
+
+    def __init__(self, svc: "FakeService", method: str, kwargs: Dict[str, Any]) -> None:
+        self.svc, self.method, self.kwargs = svc, method, kwargs
+        self.methodId = f"sheets.{method}"
+        self.body = json.dumps(kwargs.get("body", {}), separators=(",", ":"))
+
+    def execute(self) -> Any:
+        return self.svc.run(self.method, self.kwargs)
+
+
+class _Resource:
+    def __init__(self, svc: "FakeService", path: str) -> None:
+        self._svc, self._path = svc, path
+
+    def values(self) -> "_Resource":
+        return _Resource(self._svc, self._path + ".values")
+
+    def __getattr__(self, name: str) -> Callable[..., FakeRequest]:
+        return lambda **kw: FakeRequest(self._svc, f"{self._path}.{name}", kw)
+
+
+class FakeService:
+    """Thread-safe fake spreadsheet: `tabs` {title: properties}, `grid` {title: {row index: values}}."""
+
+    def __init__(self, fail: Optional[Failure] = None) -> None:
+        self.fail = fail
+        self.tabs: Dict[str, Dict[str, Any]] = {}
+        self.grid: Dict[str, Dict[int, List[Any]]] = {}
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+        self.attempts = 0
+        self._lock = threading.Lock()
+
+    def spreadsheets(self) -> _Resource:
+        return _Resource(self, "spreadsheets")
+
+    def add_tab(self, title: str, sheet_id: int, rows: int = 1000, cols: int = 26) -> None:
+        """Seed an existing tab."""
+        self.tabs[title] = {"sheetId": sheet_id, "title": title, "gridProperties": {"rowCount": rows, "columnCount": cols}}
+        self.grid[title] = {}
+
+    def methods(self) -> List[str]:
+        """Executed method names in order."""
+        return [m for m, _ in self.calls]
+
+    def table(self, tab: str) -> List[List[Any]]:
+        """Data rows (sheet rows 2..) up to the last non-empty one, trailing empty cells trimmed."""
+        rows = self.grid.get(tab, {})
+        last = max((i for i, r in rows.items() if i >= 1 and any(v != "" for v in r)), default=0)
+        out = []
+        for i in range(1, last + 1):
+            r = list(rows.get(i, []))
+            while r and r[-1] == "":
+                r.pop()
+            out.append(r)
+        return out
+
+    def _title(self, sheet_id: int) -> str:
+        return next(t for t, p in self.tabs.items() if p["sheetId"] == sheet_id)
+
+    def _put(self, tab: str, row: int, col: int, values: List[Any]) -> None:
+        line = self.grid.setdefault(tab, {}).setdefault(row, [])
+        line.extend([""] * (col + len(values) - len(line)))
+        line[col:col + len(values)] = values
+
+    def _a1(self, a1: str, values: List[List[Any]]) -> None:
+        m = A1.match(a1)
+        for j, row in enumerate(values):
+            self._put(m["tab"], int(m["r1"]) - 1 + j, _col(m["c1"]), list(row))
+
+    def run(self, method: str, kwargs: Dict[str, Any]) -> Any:
+        with self._lock:
+            self.attempts += 1
+            exc = self.fail(method, kwargs, self.attempts) if self.fail else None
+            if exc is not None:
+                raise exc
+            self.calls.append((method, copy.deepcopy(kwargs)))
+            body = kwargs.get("body", {})
+            if method == "spreadsheets.get":
+                return {"sheets": [{"properties": copy.deepcopy(p)} for p in self.tabs.values()]}
+            if method == "spreadsheets.batchUpdate":
+                for req in body["requests"]:
+                    self._structural(req)
+                return {}
+            if method == "spreadsheets.values.batchUpdate":
+                for item in body["data"]:
+                    self._a1(item["range"], item["values"])
+                return {}
+            if method == "spreadsheets.values.clear":
+                m = A1.match(kwargs["range"])
+                for i in [i for i in self.grid.get(m["tab"], {}) if i >= int(m["r1"]) - 1]:
+                    del self.grid[m["tab"]][i]
+                return {}
+            if method == "spreadsheets.values.append":
+                tab = A1.match(kwargs["range"])["tab"]
+                start = max(self.grid.get(tab, {0: []}), default=0) + 1
+                for j, row in enumerate(body["values"]):
+                    self._put(tab, start + j, 0, list(row))
+                return {}
+            raise NotImplementedError(method)
+
+    def _structural(self, req: Dict[str, Any]) -> None:
+        (kind, spec), = req.items()
+        if kind == "addSheet":
+            props = copy.deepcopy(spec["properties"])
+            if any(p["sheetId"] == props["sheetId"] for p in self.tabs.values()):
+                raise HttpError(400)
+            self.tabs[props["title"]] = props
+            self.grid[props["title"]] = {}
+        elif kind == "appendDimension":
+            grid = self.tabs[self._title(spec["sheetId"])]["gridProperties"]
+            grid["rowCount" if spec["dimension"] == "ROWS" else "columnCount"] += spec["length"]
+        elif kind == "updateCells" and "start" in spec:
+            tab = self._title(spec["start"]["sheetId"])
+            for j, row in enumerate(spec["rows"]):
+                self._put(tab, spec["start"]["rowIndex"] + j, spec["start"]["columnIndex"], [_cell(c) for c in row["values"]])
+        elif kind == "updateCells":
+            rng = spec["range"]
+            tab = self._title(rng["sheetId"])
+            for i in range(rng["startRowIndex"], rng["endRowIndex"]):
+                self.grid[tab].pop(i, None)
+        else:
+            raise NotImplementedError(kind)
+
+
+def attach(client: Any, service: FakeService) -> Any:
+    """Route every thread of `client` to `service` (instead of building a googleapiclient service)."""
+    client.service = lambda: service
+    return client
@@ -0,0 +1,328 @@
+"""Reference pure-Python compute_all kept as the parity oracle for lib/py/indicators.py.
+
+This is the loop implementation the a01 job ran before it delegated to the
+vectorized engine (Apps Script port, `''` as the missing value). It is not
+imported by any job; tools/verify harnesses compare the production matrix
+against it.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timezone
+from typing import List
+
+# Notes:
+# - We work on arrays of floats; non-finite -> '' (empty) to mirror Sheets behavior.
+# - Functions return lists same length as inputs.
+
+def _sma(arr, period):
+    out=['']*len(arr); q=[]; s=0.0
+    for i,v in enumerate(arr):
+        if not _is_num(v): out[i]=''; continue
+        q.append(v); s+=v
+        if len(q)>period: s-=q.pop(0)
+        out[i]= (s/period) if len(q)==period else ''
+    return out
+
+def _ema(arr, period):
+    out=['']*len(arr); k=2.0/(period+1); seed=None; cnt=0; s=0.0
+    for i,v in enumerate(arr):
+        if not _is_num(v): out[i]=''; seed=None; cnt=0; s=0.0; continue
+        if seed is None:
+            s+=v; cnt+=1
+            out[i]= (s/period) if cnt==period else ''
+            if cnt==period: seed=out[i]
+        else:
+            seed = (v - seed)*k + seed
+            out[i]=seed
+    return out
+
+def _rma(arr, period):
+    out=['']*len(arr); seed=None; cnt=0; s=0.0
+    for i,v in enumerate(arr):
+        if not _is_num(v): out[i]=''; seed=None; cnt=0; s=0.0; continue
+        if seed is None:
+            s+=v; cnt+=1
+            out[i]= (s/period) if cnt==period else ''
+            if cnt==period: seed=out[i]
+        else:
+            seed = (seed*(period-1)+v)/period
+            out[i]=seed
+    return out
+
+def _stddev(arr, period):
+    out=['']*len(arr); q=[]; s=0.0; s2=0.0
+    for i,v in enumerate(arr):
+        if not _is_num(v): out[i]=''; continue
+        q.append(v); s+=v; s2+=v*v
+        if len(q)>period:
+            x=q.pop(0); s-=x; s2-=x*x
+        if len(q)==period:
+            mean=s/period; var=max((s2/period)-mean*mean,0.0); out[i]=var**0.5
+        else: out[i]=''
+    return out
+
+def _roll_max(arr, period):
+    out=['']*len(arr); dq=[]
+    for i,v in enumerate(arr):
+        if not _is_num(v): out[i]=''; continue
+        while dq and dq[-1][1] <= v: dq.pop()
+        dq.append((i,v))
+        start=i-period+1
+        while dq and dq[0][0] < start: dq.pop(0)
+        out[i]= dq[0][1] if start>=0 else ''
+    return out
+
+def _roll_min(arr, period):
+    out=['']*len(arr); dq=[]
+    for i,v in enumerate(arr):
+        if not _is_num(v): out[i]=''; continue
+        while dq and dq[-1][1] >= v: dq.pop()
+        dq.append((i,v))
+        start=i-period+1
+        while dq and dq[0][0] < start: dq.pop(0)
+        out[i]= dq[0][1] if start>=0 else ''
+    return out
+
+def _is_num(x):
+    return isinstance(x,(int,float)) and math.isfinite(x)
+
+
+def compute_all(rows: List[List]) -> List[List]:
+    """Return the data matrix (no header) for raw 12-field Binance arrays."""
+    # Map raw Binance arrays → base columns with ms→string for times
+    n = len(rows)
+    if n==0: return []
+
+    o_ms = [int(r[0]) for r in rows]
+    o  = [float(r[1]) for r in rows]
+    h  = [float(r[2]) for r in rows]
+    l  = [float(r[3]) for r in rows]
+    c  = [float(r[4]) for r in rows]
+    v  = [float(r[5]) for r in rows]
+    c_ms= [int(r[6]) for r in rows]
+    qav= [float(r[7]) for r in rows]
+    ntr= [float(r[8]) for r in rows]
+    tbb= [float(r[9]) for r in rows]
+    tbq= [float(r[10]) for r in rows]
+    ign= [r[11] for r in rows]
+
+    # Base time string conversion
+    def ms2str(ms): return datetime.fromtimestamp(ms/1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    openTime_str  = [ms2str(x) for x in o_ms]
+    closeTime_str = [ms2str(x) for x in c_ms]
+
+    # ---- Indicators (matching your JS) ----
+    # Volume & Flow
+    delta = [(2*tbb[i] - v[i]) if (math.isfinite(v[i]) and math.isfinite(tbb[i])) else '' for i in range(n)]
+    cvd=[]; s=0.0
+    for i in range(n):
+        x = delta[i]
+        if x=='' or not math.isfinite(x): cvd.append(''); continue
+        s += x; cvd.append(s)
+    tbr = [(tbb[i]/v[i]) if (math.isfinite(v[i]) and v[i]!=0 and math.isfinite(tbb[i])) else '' for i in range(n)]
+    smaV20 = _sma(v,20)
+    rvol20=[(v[i]/smaV20[i]) if (math.isfinite(v[i]) and _is_num(smaV20[i]) and smaV20[i]!=0) else '' for i in range(n)]
+    avg_trade=[(v[i]/ntr[i]) if (math.isfinite(v[i]) and math.isfinite(ntr[i]) and ntr[i]!=0) else '' for i in range(n)]
+
+    # VWAP-like
+    vwap_bar=[(qav[i]/v[i]) if (math.isfinite(qav[i]) and math.isfinite(v[i]) and v[i]!=0) else '' for i in range(n)]
+    vwap_sess=[]; sumQ=0.0; sumV=0.0
+    for i in range(n):
+        qi,vi=qav[i],v[i]
+        if math.isfinite(qi) and math.isfinite(vi) and vi!=0:
+            sumQ += qi; sumV += vi; vwap_sess.append((sumQ/sumV) if sumV!=0 else '')
+        else:
+            vwap_sess.append((sumQ/sumV) if sumV!=0 else '')
+    # VWMA20
+    vwma20=['']*n; qC=[]; qV=[]; sumCV=0.0; sumVv=0.0
+    for i in range(n):
+        ci,vi=c[i],v[i]
+        if math.isfinite(ci) and math.isfinite(vi):
+            qC.append(ci*vi); qV.append(vi); sumCV+=ci*vi; sumVv+=vi
+            if len(qC)>20:
+                sumCV-=qC.pop(0); sumVv-=qV.pop(0)
+            vwma20[i] = (sumCV/sumVv) if (len(qC)==20 and sumVv!=0) else ''
+        else:
+            vwma20[i] = ''
+
+    # Momentum / Trend
+    sma20=_sma(c,20); sma50=_sma(c,50); sma200=_sma(c,200)
+    ema12=_ema(c,12); ema26=_ema(c,26); ema50=_ema(c,50)
+    macd=[(ema12[i]-ema26[i]) if (_is_num(ema12[i]) and _is_num(ema26[i])) else '' for i in range(n)]
+    macd_sig=_ema(macd,9)
+    macd_hist=[(macd[i]-macd_sig[i]) if (_is_num(macd[i]) and _is_num(macd_sig[i])) else '' for i in range(n)]
+    # RSI14 (Wilder)
+    rsi14=['']*n
+    if n>=15:
+        gain=0.0; loss=0.0
+        ok=True
+        for i in range(1,15):
+            if not (math.isfinite(c[i]) and math.isfinite(c[i-1])): ok=False; break
+            d=c[i]-c[i-1]; gain+=max(d,0); loss+=max(-d,0)
+        if ok:
+            ag=gain/14; al=loss/14
+            rsi14[14] = 100 if al==0 else (100 - 100/(1+ag/al))
+            for i in range(15,n):
+                if not (math.isfinite(c[i]) and math.isfinite(c[i-1])): rsi14[i]=''; continue
+                d=c[i]-c[i-1]; g=max(d,0); ls=max(-d,0)
+                ag=(ag*13+g)/14; al=(al*13+ls)/14
+                rsi14[i] = 100 if al==0 else (100 - 100/(1+ag/al))
+    roc10=[(c[i]/c[i-10]-1) if (i>=10 and math.isfinite(c[i]) and math.isfinite(c[i-10]) and c[i-10]!=0) else '' for i in range(n)]
+    obv=['']*n; s=0.0
+    for i in range(n):
+        if i==0 or not (math.isfinite(c[i]) and math.isfinite(c[i-1]) and math.isfinite(v[i])): obv[i]=''; continue
+        sign = 1 if c[i]>c[i-1] else (-1 if c[i]<c[i-1] else 0)
+        s += sign*v[i]; obv[i]=s
+
+    # ATR14
+    prevC=[(c[i-1] if i>0 else math.nan) for i in range(n)]
+    trRaw=[max(h[i]-l[i], abs(h[i]-prevC[i]), abs(l[i]-prevC[i])) if (i>0 and math.isfinite(h[i]) and math.isfinite(l[i]) and math.isfinite(prevC[i])) else '' for i in range(n)]
+    atr14=_rma(trRaw,14)
+
+    # Money Flow
+    CLV=[(((c[i]-l[i])-(h[i]-c[i]))/(h[i]-l[i])) if (math.isfinite(h[i]) and math.isfinite(l[i]) and math.isfinite(c[i]) and (h[i]-l[i])>0) else 0 for i in range(n)]
+    ad=[]; s=0.0
+    for i in range(n):
+        v_ = (CLV[i]*v[i]) if (math.isfinite(CLV[i]) and math.isfinite(v[i])) else float('nan')
+        if not math.isfinite(v_): ad.append(''); continue
+        s+=v_; ad.append(s)
+    cmf20=['']*n; qNum=[]; qDen=[]; sNum=0.0; sDen=0.0
+    for i in range(n):
+        num = (CLV[i]*v[i]) if (math.isfinite(CLV[i]) and math.isfinite(v[i])) else float('nan')
+        den = v[i] if math.isfinite(v[i]) else float('nan')
+        if math.isfinite(num) and math.isfinite(den):
+            qNum.append(num); sNum+=num; qDen.append(den); sDen+=den
+            if len(qNum)>20: sNum-=qNum.pop(0); sDen-=qDen.pop(0)
+            cmf20[i]=(sNum/sDen) if (len(qNum)==20 and sDen!=0) else ''
+        else: cmf20[i]=''
+    tp=[((h[i]+l[i]+c[i])/3) if (math.isfinite(h[i]) and math.isfinite(l[i]) and math.isfinite(c[i])) else float('nan') for i in range(n)]
+    rmf=[(tp[i]*v[i]) if (math.isfinite(tp[i]) and math.isfinite(v[i])) else float('nan') for i in range(n)]
+    mfi14=['']*n; posQ=[]; negQ=[]; posS=0.0; negS=0.0
+    for i in range(n):
+        if i==0 or not (math.isfinite(tp[i]) and math.isfinite(tp[i-1]) and math.isfinite(rmf[i])): mfi14[i]=''; continue
+        isPos = tp[i]>tp[i-1]; isNeg = tp[i]<tp[i-1]
+        pos = rmf[i] if isPos else 0.0; neg = rmf[i] if isNeg else 0.0
+        posQ.append(pos); negQ.append(neg); posS+=pos; negS+=neg
+        if len(posQ)>14: posS-=posQ.pop(0); negS-=negQ.pop(0)
+        mfi14[i] = 100 if negS==0 else (100 - 100/(1+(posS/negS))) if len(posQ)==14 else ''
+
+    # Bands/Channels
+    stdev20=_stddev(c,20); bb_mid=sma20
+    bb_up=[(bb_mid[i]+2*stdev20[i]) if (_is_num(bb_mid[i]) and _is_num(stdev20[i])) else '' for i in range(n)]
+    bb_dn=[(bb_mid[i]-2*stdev20[i]) if (_is_num(bb_mid[i]) and _is_num(stdev20[i])) else '' for i in range(n)]
+    bb_w=[((bb_up[i]-bb_dn[i])/bb_mid[i]) if (_is_num(bb_mid[i]) and _is_num(bb_up[i]) and _is_num(bb_dn[i]) and bb_mid[i]!=0) else '' for i in range(n)]
+    kc_mid=_ema(c,20)
+    kc_up=[(kc_mid[i]+2*atr14[i]) if (_is_num(kc_mid[i]) and _is_num(atr14[i])) else '' for i in range(n)]
+    kc_dn=[(kc_mid[i]-2*atr14[i]) if (_is_num(kc_mid[i]) and _is_num(atr14[i])) else '' for i in range(n)]
+
+    # DI/ADX/Donchian
+    plusDM=[(max(h[i]-h[i-1],0) if (i>0 and math.isfinite(h[i]) and math.isfinite(h[i-1]) and math.isfinite(l[i]) and math.isfinite(l[i-1]) and (h[i]-h[i-1])>(l[i-1]-l[i])) else 0) if i>0 else '' for i in range(n)]
+    minusDM=[(max(l[i-1]-l[i],0) if (i>0 and math.isfinite(h[i]) and math.isfinite(h[i-1]) and math.isfinite(l[i]) and math.isfinite(l[i-1]) and (l[i-1]-l[i])>(h[i]-h[i-1])) else 0) if i>0 else '' for i in range(n)]
+    rPlus=_rma(plusDM,14); rMinus=_rma(minusDM,14); tr14=atr14
+    di_plus=[(100*rPlus[i]/tr14[i]) if (_is_num(rPlus[i]) and _is_num(tr14[i]) and tr14[i]!=0) else '' for i in range(n)]
+    di_minus=[(100*rMinus[i]/tr14[i]) if (_is_num(rMinus[i]) and _is_num(tr14[i]) and tr14[i]!=0) else '' for i in range(n)]
+    DX=[(100*abs(di_plus[i]-di_minus[i])/(di_plus[i]+di_minus[i])) if (_is_num(di_plus[i]) and _is_num(di_minus[i]) and (di_plus[i]+di_minus[i])!=0) else '' for i in range(n)]
+    adx14=_rma(DX,14)
+    don20_hi=_roll_max(h,20); don20_lo=_roll_min(l,20)
+    don55_hi=_roll_max(h,55); don55_lo=_roll_min(l,55)
+
+    # Pivots & Divergences (simplified parity to JS flags)
+    def pivots_price(k=3, ampK=0.5, minSep=5):
+        isHigh=[False]*n; isLow=[False]*n
+        for i in range(k,n-k):
+            hi=all(math.isfinite(h[i]) and math.isfinite(h[i-j]) and math.isfinite(h[i+j]) and h[i]>h[i-j] and h[i]>h[i+j] for j in range(1,k+1))
+            lo=all(math.isfinite(l[i]) and math.isfinite(l[i-j]) and math.isfinite(l[i+j]) and l[i]<l[i-j] and l[i]<l[i+j] for j in range(1,k+1))
+            isHigh[i]=hi; isLow[i]=lo
+        highs=[]; lows=[]; lastHi=-9999; lastLo=-9999
+        for i in range(n):
+            if isHigh[i] and (i-lastHi)>=minSep: highs.append((i,h[i])); lastHi=i
+            if isLow[i]  and (i-lastLo)>=minSep: lows.append((i,l[i]));  lastLo=i
+        swing_hh=[0]*n; swing_hl=[0]*n; swing_lh=[0]*n; swing_ll=[0]*n
+        for j in range(1,len(highs)):
+            prev,cur=highs[j-1],highs[j]
+            swing_hh[cur[0]] = 1 if cur[1]>prev[1] else 0
+            swing_lh[cur[0]] = 1 if cur[1]<prev[1] else 0
+        for j in range(1,len(lows)):
+            prev,cur=lows[j-1],lows[j]
+            swing_hl[cur[0]] = 1 if cur[1]>prev[1] else 0
+            swing_ll[cur[0]] = 1 if cur[1]<prev[1] else 0
+        return highs, lows, swing_hh, swing_hl, swing_lh, swing_ll
+    highs,lows,swing_hh,swing_hl,swing_lh,swing_ll = pivots_price()
+
+    def last_two(p): return p[-2:] if len(p)>=2 else []
+    # RSI/CVD divergences (use smoothed cvd via RMA(5) as in JS spirit)
+    cvd_smooth=_rma([x if _is_num(x) else '' for x in cvd],5)
+    def piv_scalar(x, k=3, minSep=5):
+        # pick extrema similarly
+        hi=[]; lo=[]; lastHi=-9999; lastLo=-9999
+        for i in range(k,n-k):
+            def ok(idx): return _is_num(x[idx])
+            if all(ok(i) and ok(i-j) and ok(i+j) and x[i]>x[i-j] and x[i]>x[i+j] for j in range(1,k+1)):
+                if (i-lastHi)>=minSep: hi.append((i,x[i])); lastHi=i
+            if all(ok(i) and ok(i-j) and ok(i+j) and x[i]<x[i-j] and x[i]<x[i+j] for j in range(1,k+1)):
+                if (i-lastLo)>=minSep: lo.append((i,x[i])); lastLo=i
+        return hi, lo
+    rsi_hi,rsi_lo = piv_scalar(rsi14)
+    cvd_hi,cvd_lo = piv_scalar(cvd_smooth)
+    bull_div_rsi=[0]*n; bear_div_rsi=[0]*n; bull_div_cvd=[0]*n; bear_div_cvd=[0]*n
+    if len(lows)>=2 and len(rsi_lo)>=2:
+        (i1,p1),(i2,p2)=lows[-2],lows[-1]; (j1,a1),(j2,a2)=rsi_lo[-2],rsi_lo[-1]
+        if p2<p1 and a2>a1: bull_div_rsi[i2]=1
+    if len(highs)>=2 and len(rsi_hi)>=2:
+        (i1,p1),(i2,p2)=highs[-2],highs[-1]; (j1,a1),(j2,a2)=rsi_hi[-2],rsi_hi[-1]
+        if p2>p1 and a2<a1: bear_div_rsi[i2]=1
+    if len(lows)>=2 and len(cvd_lo)>=2:
+        (i1,p1),(i2,p2)=lows[-2],lows[-1]; (j1,a1),(j2,a2)=cvd_lo[-2],cvd_lo[-1]
+        if p2<p1 and a2>a1: bull_div_cvd[i2]=1
+    if len(highs)>=2 and len(cvd_hi)>=2:
+        (i1,p1),(i2,p2)=highs[-2],highs[-1]; (j1,a1),(j2,a2)=cvd_hi[-2],cvd_hi[-1]
+        if p2>p1 and a2<a1: bear_div_cvd[i2]=1
+
+    # Fibonacci sets
+    lo20=_roll_min(l,20); hi20=_roll_max(h,20)
+    lo55=_roll_min(l,55); hi55=_roll_max(h,55)
+    def fib(lo,hi,ratio):
+        return [(lo[i]+ratio*(hi[i]-lo[i])) if (_is_num(lo[i]) and _is_num(hi[i])) else '' for i in range(n)]
+    fib20_382=fib(lo20,hi20,0.382); fib20_500=fib(lo20,hi20,0.5); fib20_618=fib(lo20,hi20,0.618)
+    fib55_382=fib(lo55,hi55,0.382); fib55_500=fib(lo55,hi55,0.5); fib55_618=fib(lo55,hi55,0.618)
+
+    # Swing-anchored fibs (simplified lastLeg fill)
+    # Build arrays L/H that hold last confirmed swing low/high values forward
+    Larr=['']*n; Harr=['']*n; lastL=None; lastH=None
+    for i in range(n):
+        if any(x[0]==i for x in lows): lastL=l[i]
+        if any(x[0]==i for x in highs): lastH=h[i]
+        if lastL is not None and lastH is not None:
+            Larr[i]=lastL; Harr[i]=lastH
+    fib_sw_382=fib(Larr,Harr,0.382); fib_sw_500=fib(Larr,Harr,0.5); fib_sw_618=fib(Larr,Harr,0.618)
+
+    # Event-anchored (sma50 x sma200) index
+    anchorIdx=0
+    for i in range(1,n):
+        if not (_is_num(sma50[i]) and _is_num(sma200[i]) and _is_num(sma50[i-1]) and _is_num(sma200[i-1])): continue
+        prev=sma50[i-1]-sma200[i-1]; cur=sma50[i]-sma200[i]
+        if (prev<=0 and cur>0) or (prev>=0 and cur<0): anchorIdx=i
+    minSince=[ '' if i<anchorIdx else min([l[j] for j in range(anchorIdx,i+1) if math.isfinite(l[j])] or [float('inf')]) for i in range(n)]
+    maxSince=[ '' if i<anchorIdx else max([h[j] for j in range(anchorIdx,i+1) if math.isfinite(h[j])] or [float('-inf')]) for i in range(n)]
+    fibA_382=fib(minSince,maxSince,0.382); fibA_500=fib(minSince,maxSince,0.5); fibA_618=fib(minSince,maxSince,0.618)
+
+    # Assemble matrix (base + ind), preserving order
+    matrix=[]
+    for i in range(n):
+        base_row = [
+          openTime_str[i], o[i],h[i],l[i],c[i],v[i], closeTime_str[i], qav[i],ntr[i],tbb[i],tbq[i], ign[i]
+        ]
+        ind_row = [
+          delta[i],cvd[i],tbr[i],rvol20[i],avg_trade[i],
+          vwap_bar[i],vwap_sess[i],vwma20[i],
+          sma20[i],sma50[i],sma200[i],ema12[i],ema26[i],ema50[i],macd[i],macd_sig[i],macd_hist[i],rsi14[i],roc10[i],obv[i],
+          ad[i],cmf20[i],mfi14[i],
+          atr14[i],bb_mid[i],bb_up[i],bb_dn[i],bb_w[i],kc_mid[i],kc_up[i],kc_dn[i],
+          di_plus[i],di_minus[i],adx14[i],don20_hi[i],don20_lo[i],don55_hi[i],don55_lo[i],
+          swing_hh[i],swing_hl[i],swing_lh[i],swing_ll[i],bull_div_rsi[i],bear_div_rsi[i],bull_div_cvd[i],bear_div_cvd[i],
+          fib20_382[i],fib20_500[i],fib20_618[i],fib55_382[i],fib55_500[i],fib55_618[i],fib_sw_382[i],fib_sw_500[i],fib_sw_618[i],fibA_382[i],fibA_500[i],fibA_618[i]
+        ]
+        matrix.append(base_row+ind_row)
+    return matrix
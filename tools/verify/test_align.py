@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""As-of alignment harness: binary-search joins and calendar lookbacks against plain-Python references."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import align  # noqa: E402
+from lib.py.klineframe import KlineFrame  # noqa: E402
+from test_indicator_parity import synth_rows  # noqa: E402
+
+
+def ref_asof(days: List[int], values: List[float], at: int, max_age=None) -> float:
+    """Linear scan: last observation on or before `at`."""
+    best = None
+    for d, v in zip(days, values):
+        if d <= at:
+            best = (d, v)
+    if best is None or (max_age is not None and at - best[0] > max_age):
+        return float("nan")
+    return best[1]
+
+
+def ref_months_back(day: date, months: int) -> date:
+    """Same day `months` earlier, clamped to month end."""
+    y, m = divmod(day.year * 12 + day.month - 1 - months, 12)
+    m += 1
+    last = (date(y + (m == 12), m % 12 + 1, 1) - timedelta(days=1)).day
+    return date(y, m, min(day.day, last))
+
+
+def same(a: np.ndarray, b: List[float]) -> bool:
+    """Arrays equal with NaN == NaN."""
+    return np.array_equal(a, np.array(b, dtype=np.float64), equal_nan=True)
+
+
+def main() -> int:
+    """Check asof/max_age, month shifting, calendar-correct YoY, same-day alignment and the KlineFrame join."""
+    failed = 0
+    total = 0
+
+    def check(label: str, ok: bool, detail: str = "") -> None:
+        nonlocal failed, total
+        total += 1
+        if ok:
+            print(f"[verify] PASS align {label}")
+        else:
+            print(f"[verify] FAIL align {label} {detail}")
+            failed += 1
+
+    rng = np.random.default_rng(5)
+    days = np.sort(rng.choice(np.arange(18000, 19000), 300, replace=False))
+    s = align.Series(days, rng.normal(0, 1, days.size))
+    at = np.arange(17990, 19010)
+    for max_age in (None, 0, 3):
+        got = align.asof(s, at, max_age=max_age)
+        exp = [ref_asof(days.tolist(), s.values.tolist(), int(a), max_age) for a in at]
+        check(f"asof max_age={max_age}", same(got, exp))
+    check("asof empty series", bool(np.isnan(align.asof(align.series([]), at)).all()))
+
+    probe = [date(2024, 3, 31), date(2024, 2, 29), date(2023, 1, 31), date(2024, 12, 15)]
+    got = align.iso_days(align.shift_months(align.to_days(probe), 12))
+    exp = [ref_months_back(d, 12).isoformat() for d in probe]
+    got1 = align.iso_days(align.shift_months(align.to_days(probe), 1))
+    exp1 = [ref_months_back(d, 1).isoformat() for d in probe]
+    check("shift_months clamps to month end", got == exp and got1 == exp1, f"{got} {got1}")
+
+    monthly = [date(2015 + i // 12, i % 12 + 1, 1) for i in range(60) if i != 30]  # one missing print
+    cpi = align.series({"date": d.isoformat(), "value": 100 + i} for i, d in enumerate(monthly))
+    by_day = {d: 100 + i for i, d in enumerate(monthly)}
+    exp = [by_day[d] / by_day[ref_months_back(d, 12)] - 1 if ref_months_back(d, 12) in by_day else float("nan") for d in monthly]
+    check("yoy monthly (12 months, not 12 rows)", same(align.yoy(cpi).values, exp))
+
+    bdays = [date(2020, 1, 1) + timedelta(days=i) for i in range(900) if (date(2020, 1, 1) + timedelta(days=i)).weekday() < 5]
+    daily = align.series({"date": d.isoformat(), "value": float(i + 1)} for i, d in enumerate(bdays))
+    pos = {d: i + 1 for i, d in enumerate(bdays)}
+
+    def ref_yoy(d: date) -> float:
+        back = ref_months_back(d, 12)
+        hits = [b for b in bdays if back - timedelta(days=align.YOY_TOLERANCE) <= b <= back]
+        return pos[d] / pos[hits[-1]] - 1 if hits else float("nan")
+
+    check("yoy daily (weekend tolerance)", same(align.yoy(daily).values, [ref_yoy(d) for d in bdays]))
+
+    block = {"cpi": cpi, "daily": daily}
+    cal, cols = align.align(block, max_age=0)
+    exact = all(
+        np.isnan(cols["cpi"][i]) != (align.iso_days(cal[i:i + 1])[0] in {d.isoformat() for d in monthly}) for i in range(cal.size)
+    )
+    cal_ff, ff = align.align(block)
+    check("align same-day vs forward fill", exact and not np.isnan(ff["cpi"][-1]) and cal_ff.size == cal.size)
+
+    frame = KlineFrame.from_rows(synth_rows(40, seed=1))  # daily bars from 2017-08-17
+    bar_days = (frame.open_time // align.DAY_MS).astype(np.int64)
+    weekly = align.Series(bar_days[::7] + 2, np.arange(bar_days[::7].size, dtype=np.float64))
+    joined = align.join_frame(frame, {"w": weekly}, lags={"w": 1})
+    exp = [ref_asof(weekly.days.tolist(), weekly.values.tolist(), int(d) - 1) for d in bar_days]
+    check("join_frame honours publication lag", same(joined["w"], exp))
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
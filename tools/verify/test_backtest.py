@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Backtest harness: point-in-time columns, loop parity of the vectorized engine, no lookahead, screening throughput."""
+
+from __future__ import annotations
+
+import math
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import backtest, features, sweeps  # noqa: E402
+from lib.py.klineframe import FIELDS, KlineFrame  # noqa: E402
+from test_indicator_parity import synth_rows  # noqa: E402
+
+LOOKBACK = 3  # pivot confirmation lag of the spot1d fractals
+REVISED = features.FLAGS | {f"fib_sw_{r}" for r in ("382", "500", "618")} | {f"fibA_{r}" for r in ("382", "500", "618")}
+
+
+def same(a: np.ndarray, b: np.ndarray) -> bool:
+    """Bitwise equal float arrays (NaN == NaN)."""
+    return a.shape == b.shape and bool(np.all((a == b) | (np.isnan(a) & np.isnan(b))))
+
+
+def loop_backtest(o: List[float], c: List[float], entry: List[bool], exit_: List[bool], cost: float, side: float) -> Tuple[List[float], List[float]]:
+    """Bar-by-bar reference: signal at close t, fill at open t+1; returns (equity, per-trade returns)."""
+    eq, pos, want = 1.0, 0.0, 0.0
+    curve: List[float] = []
+    trades: List[float] = []
+    entry_eq = 0.0
+    for t in range(len(c)):
+        if t and pos and math.isfinite(o[t]) and math.isfinite(c[t - 1]):
+            eq *= 1 + pos * (o[t] / c[t - 1] - 1)
+        if want != pos:
+            eq *= 1 - abs(want - pos) * cost
+            if want:
+                entry_eq = eq / (1 - cost)
+            else:
+                trades.append(eq / entry_eq - 1)
+            pos = want
+        if pos and math.isfinite(o[t]) and math.isfinite(c[t]):
+            eq *= 1 + pos * (c[t] / o[t] - 1)
+        curve.append(eq)
+        if exit_[t]:
+            want = 0.0
+        elif entry[t]:
+            want = side
+    if pos:
+        trades.append(eq / entry_eq - 1)
+    return curve, trades
+
+
+def shifted(frame: KlineFrame, k: int, factor: float) -> KlineFrame:
+    """Same bars up to `k`; later prices scaled by `factor` (a different future)."""
+    cols = {name: getattr(frame, name).copy() for name in FIELDS}
+    for name in ("open", "high", "low", "close"):
+        cols[name][k + 1:] *= factor
+    return KlineFrame(**cols)
+
+
+def main() -> int:
+    """Run the backtest checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL backtest {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS backtest {label}")
+
+    frame = KlineFrame.from_rows(synth_rows(3000, seed=5, gaps=4))
+    cols = backtest.point_in_time(frame)
+    batch = features.feature_columns(frame)
+    check("point-in-time equals batch for causal columns", [k for k in features.FEATURES if k not in REVISED and not same(cols[k], np.asarray(batch[k], dtype=np.float64))])
+
+    lagged = []
+    for k in sorted(features.FLAGS):
+        want = np.zeros(len(frame))
+        want[LOOKBACK:] = np.asarray(batch[k], dtype=np.float64)[:-LOOKBACK]
+        if not same(cols[k], want):
+            lagged.append(k)
+    check(f"flags fire {LOOKBACK} bars after their pivot", lagged)
+
+    problems = []
+    for t in np.random.default_rng(1).integers(60, len(frame) - 1, 25).tolist():
+        head = features.feature_columns(frame.take(slice(0, t + 1)))
+        problems += [f"{k}@{t}" for k in REVISED - features.FLAGS if not same(cols[k][t:t + 1], np.asarray(head[k][-1:], dtype=np.float64))]
+    check("revised columns equal a batch run cut at that bar", problems[:5])
+
+    o, c = cols["open"], cols["close"]
+    fast, slow = sweeps.sma_sweep(c, [10, 20]), sweeps.sma_sweep(c, [50, 100])
+    entries = np.vstack([backtest.cross_above(fast[0], slow[0]), backtest.cross_above(fast[1], slow[1]), cols["bull_div_rsi"] > 0])
+    exits = np.vstack([backtest.cross_below(fast[0], slow[0]), backtest.cross_below(fast[1], slow[1]), cols["rsi14"] > 70])
+    problems = []
+    for short in (False, True):
+        sim = backtest.simulate(o, c, entries, exits, short=short)
+        stats = backtest.evaluate(o, c, entries, exits, short=short, batch=2)
+        for v in range(entries.shape[0]):
+            curve, trades = loop_backtest(o.tolist(), c.tolist(), entries[v].tolist(), exits[v].tolist(), backtest.FEE + backtest.SLIPPAGE, -1.0 if short else 1.0)
+            curve_a = np.array(curve)
+            peak = np.maximum(np.maximum.accumulate(curve_a), 1.0)
+            wins = sum(1 for r in trades if r > 0) / len(trades) if trades else float("nan")
+            if not np.allclose(sim.equity[v], curve_a, rtol=1e-10, atol=0):
+                problems.append(f"equity v{v} short={short}")
+            if not np.allclose(sim.drawdown[v], curve_a / peak - 1, rtol=0, atol=1e-10):
+                problems.append(f"drawdown v{v} short={short}")
+            got = (stats["total_return"][v], stats["max_drawdown"][v], stats["trades"][v], stats["win_rate"][v])
+            want = (curve[-1] - 1, (curve_a / peak - 1).min(), len(trades), wins)
+            if not (np.allclose(got[:2], want[:2], rtol=1e-9) and got[2] == want[2] and (got[3] == want[3] or math.isnan(want[3]) and math.isnan(got[3]))):
+                problems.append(f"metrics v{v} short={short} {got} != {want}")
+    check("vectorized curves and metrics equal the bar loop (long and short)", problems)
+
+    k = 2000
+    sig = lambda cc: (backtest.cross_above(cc["sma20"], cc["sma50"]) | (cc["swing_hl"] > 0), backtest.cross_below(cc["sma20"], cc["sma50"]) | (cc["bear_div_rsi"] > 0))  # noqa: E731
+    base = backtest.simulate(o, c, *sig(cols))
+    alt_cols = backtest.point_in_time(shifted(frame, k, 1.7))
+    alt = backtest.simulate(alt_cols["open"], alt_cols["close"], *sig(alt_cols))
+    problems = [] if np.array_equal(base.position[:, :k + 2], alt.position[:, :k + 2]) else ["positions"]
+    problems += [] if np.array_equal(base.equity[:, :k + 1], alt.equity[:, :k + 1]) else ["equity"]
+    problems += [] if not np.array_equal(base.equity[:, k + 1:], alt.equity[:, k + 1:]) else ["future change had no effect"]
+    check(f"changing bars after {k} leaves positions to {k + 1} and equity to {k} unchanged", problems)
+
+    hold = backtest.simulate(o, c, np.arange(len(c)) == 0, np.zeros(len(c), dtype=bool), fee=0.001, slippage=0.0)
+    want = (1 - 0.001) * np.nanprod(np.nan_to_num(c[1:] / o[1:], nan=1.0) * np.nan_to_num(np.r_[1.0, o[2:] / c[1:-1]], nan=1.0))
+    check("buy and hold pays one fee", [] if math.isclose(hold.equity[0, -1], want, rel_tol=1e-10) else [f"{hold.equity[0, -1]} != {want}"])
+
+    fast_w, slow_w = list(range(5, 65)), list(range(70, 275, 5))
+    f_sma, s_sma = sweeps.sma_sweep(c, fast_w), sweeps.sma_sweep(c, slow_w)
+    grid_f, grid_s = f_sma[:, None, :], s_sma[None, :, :]
+    t0 = time.perf_counter()
+    ent = backtest.cross_above(grid_f, grid_s).reshape(-1, len(c))
+    ex = backtest.cross_below(grid_f, grid_s).reshape(-1, len(c))
+    stats = backtest.evaluate(o, c, ent, ex)
+    dt = time.perf_counter() - t0
+    rate = ent.shape[0] / dt
+    top = backtest.best(stats, top=3, min_trades=5)
+    problems = [] if rate >= 1000 else [f"{rate:.0f} variants/s"]
+    problems += [] if len(top) == 3 and all(stats["trades"][i] >= 5 for i in top) else [f"best {top}"]
+    check(f"{ent.shape[0]} SMA-cross variants over {len(c)} bars in {dt:.2f}s ({rate:.0f}/s)", problems)
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Archive backfill harness: no gaps around an unpublished month, bounded lookahead, checksum rejection."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import sys
+import tempfile
+import zipfile
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import binance_archive  # noqa: E402
+
+DAY = 86_400_000
+SYMBOL = "BTCUSDT"
+
+
+def ms(d: date) -> int:
+    return int(datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def csv_rows(first: date, last: date) -> str:
+    out = []
+    d = first
+    while d <= last:
+        t = ms(d)
+        out.append(f"{t},1.0,2.0,0.5,1.5,10.0,{t + DAY - 1},15.0,7,5.0,7.5,0")
+        d += timedelta(days=1)
+    return "\n".join(out) + "\n"
+
+
+def put(root: Path, period: str, stamp: str, body: str, *, bad_checksum: bool = False) -> None:
+    """Write one zipped CSV plus its `.CHECKSUM` in the data.binance.vision layout."""
+    rel = binance_archive.archive_relpath(SYMBOL, "1d", period, stamp)
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr(Path(rel).with_suffix(".csv").name, body)
+    data = buf.getvalue()
+    path.write_bytes(data)
+    digest = hashlib.sha256(data + (b"x" if bad_checksum else b"")).hexdigest()
+    Path(str(path) + ".CHECKSUM").write_text(f"{digest}  {path.name}\n", encoding="utf-8")
+
+
+def put_month(root: Path, y: int, m: int) -> None:
+    last = (date(y + 1, 1, 1) if m == 12 else date(y, m + 1, 1)) - timedelta(days=1)
+    put(root, "monthly", f"{y:04d}-{m:02d}", csv_rows(date(y, m, 1), last))
+
+
+def put_days(root: Path, first: date, last: date) -> None:
+    d = first
+    while d <= last:
+        put(root, "daily", d.isoformat(), csv_rows(d, d))
+        d += timedelta(days=1)
+
+
+class Counting(binance_archive.ArchiveSource):
+    """Local source that records every archive requested."""
+
+    def __init__(self, root: str) -> None:
+        super().__init__(root)
+        self.zips: List[str] = []
+
+    def read(self, relpath: str) -> Optional[bytes]:
+        if relpath.endswith(".zip"):
+            self.zips.append(relpath)
+        return super().read(relpath)
+
+
+def days_of(chunks: List[List[List[object]]]) -> List[date]:
+    return [datetime.fromtimestamp(int(r[0]) / 1000, tz=timezone.utc).date() for chunk in chunks for r in chunk]
+
+
+def main() -> int:
+    """Run the archive checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL binance_archive {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS binance_archive {label}")
+
+    until = ms(date(2026, 10, 3)) - 1  # Oct 2 is the last closed day
+
+    def run(root: Path, start: date, source: Optional[binance_archive.ArchiveSource] = None) -> List[date]:
+        src = source or binance_archive.ArchiveSource(str(root))
+        return days_of(list(binance_archive.archive_rows(SYMBOL, ms(start), source=src, until_ms=until)))
+
+    def contiguous(got: List[date], first: date, last: date) -> List[str]:
+        want = [first + timedelta(days=k) for k in range((last - first).days + 1)]
+        if got == want:
+            return []
+        gaps = [f"{a}->{b}" for a, b in zip(got, got[1:]) if (b - a).days != 1]
+        return [f"{len(got)} days {got[:1]}..{got[-1:]} gaps {gaps[:3]}"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Aug monthly published, Sep monthly not yet (its daily files are), Oct 1-2 daily.
+        root = Path(tmp) / "a"
+        put_month(root, 2026, 8)
+        put_days(root, date(2026, 9, 1), date(2026, 10, 2))
+        check("unpublished month read from its daily files", contiguous(run(root, date(2026, 7, 1)), date(2026, 8, 1), date(2026, 10, 2)))
+
+        # Same, but the Sep daily files are gone too: stop after Aug, never jump to Oct.
+        root = Path(tmp) / "b"
+        put_month(root, 2026, 8)
+        put_days(root, date(2026, 10, 1), date(2026, 10, 2))
+        check("missing month without daily files stops the walk", contiguous(run(root, date(2026, 8, 1)), date(2026, 8, 1), date(2026, 8, 31)))
+
+        # Months before listing are skipped; a mid-history gap stops within LOOKAHEAD extra fetches.
+        root = Path(tmp) / "c"
+        for m in (3, 4):
+            put_month(root, 2025, m)
+        for m in range(6, 13):
+            put_month(root, 2025, m)
+        src = Counting(str(root))
+        got = run(root, date(2025, 1, 1), src)
+        monthly = [z for z in src.zips if "/monthly/" in z]
+        problems = contiguous(got, date(2025, 3, 1), date(2025, 4, 30))
+        # Jan..May monthly, then the LOOKAHEAD periods queued behind May, then the first May daily file
+        problems += [] if len(monthly) <= 5 + binance_archive.LOOKAHEAD else [f"{len(monthly)} monthly fetches"]
+        check(f"pre-listing months skipped, gap stops after {len(src.zips)} fetches", problems)
+
+        root = Path(tmp) / "d"
+        put_month(root, 2026, 8)
+        put(root, "monthly", "2026-09", csv_rows(date(2026, 9, 1), date(2026, 9, 30)), bad_checksum=True)
+        problems = []
+        try:
+            run(root, date(2026, 8, 1))
+            problems.append("no error")
+        except binance_archive.ArchiveError:
+            pass
+        unchecked = days_of(list(binance_archive.archive_rows(SYMBOL, ms(date(2026, 8, 1)), source=binance_archive.ArchiveSource(str(root)), verify=False, until_ms=until)))
+        problems += [] if len(unchecked) == 61 else [f"verify=False read {len(unchecked)} days"]
+        check("checksum mismatch raises ArchiveError", problems)
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Binance pacing harness: WeightLimiter header sync, 80% budget, 418/429 Retry-After; klines_batch error isolation."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import requests
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import binance  # noqa: E402
+
+
+def response(status: int = 200, **headers: str) -> requests.Response:
+    """Synthetic response carrying only a status and headers (names use '-' for '_')."""
+    r = requests.Response()
+    r.status_code = status
+    r.headers.update({k.replace("_", "-"): v for k, v in headers.items()})
+    return r
+
+
+def timed(fn, *args: object) -> float:
+    t0 = time.monotonic()
+    fn(*args)
+    return time.monotonic() - t0
+
+
+def main() -> int:
+    """Run the limiter checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL binance_limiter {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS binance_limiter {label}")
+
+    # limit 100 at 80% headroom = 80 weight per 0.5 s window (160/s refill)
+    lim = binance.WeightLimiter(100, window_s=0.5)
+    t0 = time.monotonic()
+    for _ in range(40):
+        lim.acquire(2)
+    burst = time.monotonic() - t0
+    for _ in range(40):
+        lim.acquire(2)
+    total_s = time.monotonic() - t0
+    problems = [] if lim.capacity == 80 and burst < 0.05 else [f"burst of 40 took {burst:.3f}s"]
+    problems += [] if 0.45 <= total_s < 0.9 else [f"80 requests took {total_s:.3f}s, want ~0.5s"]
+    check(f"80% budget: 40 requests at once, the next 40 paced ({total_s:.2f}s)", problems)
+
+    lim = binance.WeightLimiter(6000)  # 4800 per minute = 80/s
+    lim.observe(response(200, X_MBX_USED_WEIGHT_1M="4790", X_MBX_USED_WEIGHT="9999"))
+    problems = [] if abs(lim.tokens - 10) < 0.5 else [f"tokens {lim.tokens:.1f} after used=4790"]
+    lim.observe(response(200, **{"x-mbx-used-weight-1m": "100"}))
+    problems += [] if lim.tokens < 11 else ["a lower used weight refilled the bucket"]
+    lim.observe(response(200, X_MBX_USED_WEIGHT_1M="junk"))
+    waited = timed(lim.acquire, 20)
+    problems += [] if 0.08 <= waited < 0.4 else [f"acquire(20) with ~10 left waited {waited:.3f}s"]
+    check("X-MBX-USED-WEIGHT-1M header syncs the bucket down, never up", problems)
+
+    problems = []
+    for status in (429, 418):
+        lim = binance.WeightLimiter(6000)
+        lim.observe(response(status, Retry_After="0.3"))
+        waited = timed(lim.acquire, 2)
+        if not 0.28 <= waited < 0.6:
+            problems.append(f"{status}: waited {waited:.3f}s")
+    lim = binance.WeightLimiter(6000)
+    lim.observe(response(418, Retry_After="soon"))
+    left = lim.blocked_until - time.monotonic()
+    problems += [] if 59 < left <= 60 else [f"unparseable Retry-After blocked {left:.1f}s"]
+    check("418/429 block every caller until Retry-After", problems)
+
+    lim = binance.WeightLimiter(6000)
+    lim.observe(response(429, Retry_After="0.25"))
+    done: List[float] = []
+    t0 = time.monotonic()
+    threads = [threading.Thread(target=lambda: (lim.acquire(2), done.append(time.monotonic() - t0))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    check("a ban holds concurrent callers too", [] if len(done) == 4 and min(done) >= 0.23 else [str(done)])
+
+    real = binance.klines_cached
+    bars = {"AAA": [[1, "1"]], "CCC": [[2, "2"]]}
+
+    def fake(symbol: str, start_ms: int, **kwargs: object) -> List[List[object]]:
+        if symbol not in bars:
+            raise binance.transport.TransportError(f"400 Invalid symbol {symbol}")
+        return bars[symbol]
+
+    binance.klines_cached = fake  # type: ignore[assignment]
+    try:
+        errors: Dict[str, str] = {}
+        got = binance.klines_batch(["AAA", "BAD", "CCC"], 0, workers=3, on_error=lambda s, e: errors.__setitem__(s, str(e)))
+        problems = [] if got == {"AAA": bars["AAA"], "BAD": [], "CCC": bars["CCC"]} and list(errors) == ["BAD"] else [f"{got} {errors}"]
+        try:
+            binance.klines_batch(["AAA", "BAD"], 0, workers=2)
+            problems.append("no error without on_error")
+        except binance.transport.TransportError:
+            pass
+    finally:
+        binance.klines_cached = real  # type: ignore[assignment]
+    check("klines_batch keeps the other symbols when one fails (on_error)", problems)
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""BigQuery loader harness: staged Parquet loads + partition-scoped MERGE against the DuckDB stand-in."""
+
+from __future__ import annotations
+
+import importlib.util
+import re
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import bq  # noqa: E402
+from lib.py.features import FEATURES_1D, compute  # noqa: E402
+from lib.py.klineframe import KlineFrame  # noqa: E402
+from test_indicator_parity import synth_rows  # noqa: E402
+
+BOOTSTRAP = ROOT / "tools" / "bq" / "bootstrap.sql"
+OHLCV = "trading.ohlcv_1d"
+FEATS = "trading.features_1d"
+
+
+class RecordingWarehouse(bq.DuckDBWarehouse):
+    """DuckDB warehouse that keeps every statement it runs."""
+
+    def __init__(self) -> None:
+        super().__init__(":memory:")
+        self.statements: List[str] = []
+
+    def execute(self, sql: str) -> int:
+        self.statements.append(sql)
+        return super().execute(sql)
+
+
+def bootstrap_schemas() -> Dict[str, Dict[str, str]]:
+    """Parse `CREATE TABLE` column lists out of tools/bq/bootstrap.sql."""
+    out = {}
+    for name, body in re.findall(r"CREATE TABLE IF NOT EXISTS `([\w.]+)` \((.*?)\n\)", BOOTSTRAP.read_text(encoding="utf-8"), re.S):
+        cols = [re.match(r"\s*(\w+)\s+(\w+)", line) for line in body.splitlines()]
+        out[name] = {m.group(1): m.group(2) for m in cols if m}
+    return out
+
+
+def snapshot(wh: bq.DuckDBWarehouse, table_id: str) -> Dict[Tuple[Any, str], Tuple[Any, ...]]:
+    """Return {(date, symbol): row} for the whole table."""
+    return {(r[0], r[1]): r for r in wh.con.execute(f"SELECT * FROM {table_id}").fetchall()}
+
+
+def merged_dates(sql: str) -> List[str]:
+    """Dates named in a MERGE's partition filter."""
+    return re.findall(r"DATE '([\d-]+)'", sql)
+
+
+def main() -> int:
+    """Check schema parity, first load, idempotent reload, revision scoping, key dedupe and NULL handling."""
+    missing = [m for m in ("duckdb", "pyarrow") if importlib.util.find_spec(m) is None]
+    if missing:
+        print(f"[verify] SKIP bq merge: {', '.join(missing)} not installed")
+        return 0
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL bq {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS bq {label}")
+
+    check("schemas match bootstrap.sql", [] if bootstrap_schemas() == bq.SCHEMAS else [f"{bootstrap_schemas()} != {bq.SCHEMAS}"])
+
+    wh = RecordingWarehouse()
+    wh.bootstrap()
+    frame = KlineFrame.from_rows(synth_rows(120, seed=3))
+    cols = bq.ohlcv_columns(frame, "BTCUSDT")
+
+    res = bq.merge_upsert(OHLCV, {k: v[:100] for k, v in cols.items()}, client=wh)
+    first = snapshot(wh, OHLCV)
+    check("first load", [] if (res.staged, res.affected, len(res.partitions), len(first)) == (100, 100, 100, 100) else [str(res)])
+
+    res = bq.merge_upsert(OHLCV, {k: v[:100] for k, v in cols.items()}, client=wh)
+    check("idempotent reload", [] if res.affected == 0 and snapshot(wh, OHLCV) == first else [f"affected={res.affected}"])
+
+    # Late revision of two bars inside the last 10 days, plus 20 new days.
+    tail = {k: list(v[90:120]) for k, v in cols.items()}
+    tail["close"][2] = float(tail["close"][2]) + 1.25
+    tail["ntr"][5] = float(tail["ntr"][5]) + 1
+    res = bq.merge_upsert(OHLCV, tail, client=wh)
+    after = snapshot(wh, OHLCV)
+    problems = []
+    if res.affected != 22 or len(after) != 120:
+        problems.append(f"affected={res.affected} rows={len(after)}")
+    if merged_dates(wh.statements[-2]) != list(res.partitions) or len(res.partitions) != 30:
+        problems.append("MERGE partition filter does not match the batch dates")
+    changed = sorted(str(k[0]) for k in first if after[k] != first[k])
+    if changed != [str(cols["date"][92]), str(cols["date"][95])]:
+        problems.append(f"changed rows {changed}")
+    check("revision touches only its partitions", problems)
+
+    dup = {k: list(v[0:2]) + list(v[0:1]) for k, v in cols.items()}
+    dup["close"][2] = 1.5
+    res = bq.merge_upsert(OHLCV, dup, client=wh)
+    row = snapshot(wh, OHLCV)[(cols["date"][0].item(), "BTCUSDT")]
+    check("duplicate keys keep the last row", [] if res.staged == 2 and float(row[5]) == 1.5 else [f"{res} close={row[5]}"])
+
+    feats = compute(frame, FEATURES_1D.values())
+    fcols = bq.features_columns(frame, feats, "BTCUSDT")
+    res = bq.merge_upsert(FEATS, fcols, client=wh)
+    again = bq.merge_upsert(FEATS, fcols, client=wh)
+    nulls = wh.con.execute(f"SELECT count(*) FROM {FEATS} WHERE rsi_14 IS NULL").fetchone()[0]
+    check("features NULL warmup is idempotent", [] if res.affected == 120 and again.affected == 0 and nulls == 14 else [f"{res} {again} nulls={nulls}"])
+
+    leftover = wh.con.execute("SELECT count(*) FROM information_schema.tables WHERE table_name LIKE '_stage_%'").fetchone()[0]
+    check("staging tables dropped", [] if leftover == 0 else [f"{leftover} left"])
+
+    wh.insert_json(OHLCV, [{"date": "2030-01-01", "symbol": "ETHUSDT", "close": "2500.5", "ntr": 7}])
+    row = snapshot(wh, OHLCV).get((date(2030, 1, 1), "ETHUSDT"))
+    check("insert_json rows coerced to schema", [] if row and float(row[5]) == 2500.5 and row[8] == 7 else [str(row)])
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""BigQuery read harness: Arrow reads and the partition cache against the DuckDB stand-in."""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import bq  # noqa: E402
+from lib.py.klineframe import KlineFrame  # noqa: E402
+from test_indicator_parity import synth_rows  # noqa: E402
+
+OHLCV = "trading.ohlcv_1d"
+
+
+class CountingWarehouse(bq.DuckDBWarehouse):
+    """DuckDB warehouse that counts row fetches (what a cache hit must avoid)."""
+
+    def __init__(self) -> None:
+        super().__init__(":memory:")
+        self.fetches: List[str] = []
+
+    def read_arrow(self, table_id: str, where: str = "", columns: Optional[Sequence[str]] = None) -> Any:
+        self.fetches.append(where)
+        return super().read_arrow(table_id, where, columns)
+
+
+def main() -> int:
+    """Check cold/warm cached reads, snapshot invalidation, range/symbol filters and the KlineFrame round trip."""
+    missing = [m for m in ("duckdb", "pyarrow") if importlib.util.find_spec(m) is None]
+    if missing:
+        print(f"[verify] SKIP bq read: {', '.join(missing)} not installed")
+        return 0
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL bq read {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS bq read {label}")
+
+    wh = CountingWarehouse()
+    wh.bootstrap()
+    frames = {sym: KlineFrame.from_rows(synth_rows(120, seed=seed)) for sym, seed in (("BTCUSDT", 3), ("ETHUSDT", 4))}
+    for sym, frame in frames.items():
+        bq.merge_upsert(OHLCV, bq.ohlcv_columns(frame, sym), client=wh)
+    direct = wh.read_arrow(OHLCV)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wh.cache = bq.PartitionCache(tmp)
+        cold = wh.read(OHLCV)
+        check("cold read equals direct read", [] if cold.equals(direct) and wh.cache.misses == 120 else [f"misses={wh.cache.misses}"])
+
+        wh.fetches.clear()
+        warm = wh.read(OHLCV)
+        check("warm read fetches nothing", [] if warm.equals(direct) and not wh.fetches and wh.cache.hits == 120 else [f"fetches={len(wh.fetches)}"])
+
+        cols = bq.ohlcv_columns(frames["BTCUSDT"], "BTCUSDT")
+        revised = {k: v[50:51] for k, v in cols.items()}
+        revised["close"] = np.array([123.456])
+        bq.merge_upsert(OHLCV, revised, client=wh)
+        wh.fetches.clear()
+        after = wh.read(OHLCV)
+        day = str(cols["date"][50])
+        problems = []
+        if len(wh.fetches) != 1 or f"DATE '{day}'" not in wh.fetches[0] or wh.fetches[0].count("DATE") != 1:
+            problems.append(f"fetches={wh.fetches}")
+        if not after.equals(wh.read_arrow(OHLCV)):
+            problems.append("content differs from warehouse")
+        check("revised partition alone is refetched", problems)
+
+        start, end = cols["date"][10], cols["date"][29]
+        sub = wh.read(OHLCV, start=start, end=end, symbols=["ETHUSDT"], columns=["date", "symbol", "close"])
+        ref = wh.read_arrow(OHLCV, bq.where_sql(start=start, end=end, symbols=["ETHUSDT"]), ["date", "symbol", "close"])
+        check("range/symbol/column filters", [] if sub.equals(ref) and sub.num_rows == 20 else [f"rows={sub.num_rows}"])
+
+        empty = wh.read(OHLCV, start="2031-01-01")
+        check("empty range keeps the schema", [] if empty.num_rows == 0 and empty.schema == direct.schema else [str(empty.schema)])
+
+        eth = frames["ETHUSDT"]
+        back = bq.read_klines("ETHUSDT", client=wh)
+        problems = [
+            name for name in ("open_time", "open", "close", "volume", "ntr", "tbq")
+            if not np.allclose(getattr(back, name), getattr(eth, name), rtol=0, atol=1e-9, equal_nan=True)
+        ]
+        check("read_klines round trip", problems)
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
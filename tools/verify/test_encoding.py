@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Compact encoding harness: quantization stays within its error bound and shrinks the publish payload."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, List, Optional
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fake_sheets import FakeService, attach  # noqa: E402
+from lib.py import encoding, sheets, telemetry  # noqa: E402
+from lib.py.features import FLAGS, feature_columns, load_checkpoint  # noqa: E402
+from lib.py.klineframe import KlineFrame  # noqa: E402
+from test_indicator_parity import APP, load, synth_rows  # noqa: E402
+
+
+def exchange_rows(n: int, seed: int, gaps: int = 0, price_dp: int = 2) -> List[List[object]]:
+    """synth_rows re-quoted like BTCUSDT: prices on a 0.01 tick, base quantities on a 1e-5 step."""
+    rows = synth_rows(n, seed=seed, gaps=gaps)
+    for r in rows:
+        for j, dp in ((1, price_dp), (2, price_dp), (3, price_dp), (4, price_dp), (5, 5), (7, 8), (9, 5), (10, 8)):
+            if r[j] != "nan":
+                r[j] = f"{float(r[j]):.{dp}f}"
+    return rows
+
+
+def append_runs(rows: List[List[object]], first: int) -> Optional[List[Any]]:
+    """Run the a01 job in WRITE_MODE=append over rows[:first], then over all rows; return (checkpoint, appended rows)."""
+    try:
+        app = load(APP, "a01_main")
+    except ImportError as exc:
+        print(f"[verify] SKIP encoding a01 append: {exc}")
+        return None
+    svc = FakeService()
+    saved_env = {k: os.environ.get(k) for k in ("SHEET_ID", "WRITE_MODE", "FEATURE_CHECKPOINT", "PUBLISH_ENCODING")}
+    saved_client = sheets._CLIENT
+    with tempfile.TemporaryDirectory() as tmp:
+        ckpt = str(Path(tmp) / "ckpt.json")
+        os.environ.update(SHEET_ID="S", WRITE_MODE="append", FEATURE_CHECKPOINT=ckpt, PUBLISH_ENCODING="compact")
+        sheets._CLIENT = attach(sheets.SheetsClient(limiter=None), svc)
+        telemetry.configure("off")  # the job installs an exit report; keep its aggregates out of this harness
+        try:
+            appended = []
+            for upto in (first, len(rows)):
+                # like the exchange: bars from the requested day on (the checkpoint's last bar is fetched again)
+                def fetch(provider: str, symbol: str, since: str, upto: int = upto) -> KlineFrame:
+                    return KlineFrame.from_rows([r for r in rows[:upto] if app._ms_to_date(int(r[0])) >= since])
+                app.get_kline_frame = fetch
+                mark = len(svc.calls)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    app.main()
+                appended = [row for m, kw in svc.calls[mark:] if m == "spreadsheets.values.batchUpdate"
+                            for item in kw["body"]["data"] if re.search(r"!A\d", item["range"]) for row in item["values"]]
+            return [load_checkpoint(ckpt), appended, app.build_header()]
+        finally:
+            sheets._CLIENT = saved_client
+            for k, v in saved_env.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+
+
+def payload(frame: KlineFrame, feats: dict, spec) -> int:
+    """JSON bytes of the feature cells as sent to Sheets."""
+    if spec:
+        enc, _ = encoding.encode_block(feats, spec)
+        feats = {**feats, **enc}
+    return len(json.dumps([encoding.cells(v) for v in feats.values()], separators=(",", ":")))
+
+
+def main() -> int:
+    """Check bounds, missing-cell preservation, int flags, derived tick decimals and the payload saving."""
+    failed = 0
+    total = 0
+    for label, rows in (("n=3000", exchange_rows(3000, 7)), ("gaps n=800", exchange_rows(800, 2, gaps=9)), ("n=1", exchange_rows(1, 4))):
+        frame = KlineFrame.from_rows(rows)
+        feats = feature_columns(frame)
+        spec = encoding.encoding_spec(frame)
+        raw = {**{k: getattr(frame, k) for k in ("open", "high", "low", "close", "volume", "qav", "tbb", "tbq")}, **feats}
+        enc, decimals = encoding.encode_block(raw, spec)
+        problems = []
+        bad = encoding.check_error_bounds(raw, enc, decimals)
+        if bad:
+            problems.append(f"bound exceeded {bad}")
+        if set(spec) & FLAGS:
+            problems.append("flags carry decimals")
+        if len(frame) > 1 and (spec["close"], spec["volume"]) != (2, 5):
+            problems.append(f"tick decimals price={spec['close']} qty={spec['volume']}")
+        for name in ("open", "close", "volume"):
+            if not np.array_equal(enc[name], raw[name], equal_nan=True):
+                problems.append(f"raw {name} changed by encoding")
+        full, compact = payload(frame, feats, None), payload(frame, feats, spec)
+        if len(frame) > 100 and compact > 0.7 * full:
+            problems.append(f"payload {full} -> {compact} bytes")
+        total += 1
+        if problems:
+            print(f"[verify] FAIL encoding {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS encoding {label} payload {full} -> {compact} bytes")
+
+    problems = []
+    wide = encoding.widen_spec({"close": 4, "volume": 5}, {"close": 2, "volume": 6, "qav": 8})
+    problems += [] if wide == {"close": 4, "volume": 6, "qav": 8} else [f"widen {wide}"]
+    problems += [] if encoding.widen_spec(None, {"close": 2}) == {"close": 2} else ["widen from nothing"]
+    # History on a 1e-4 tick; the last checkpointed bar and the new ones happen to print on whole cents.
+    rows = exchange_rows(300, 6, price_dp=4)
+    rows[249:] = exchange_rows(300, 6, price_dp=2)[249:]
+    out = append_runs(rows, 250)
+    if out is not None:
+        stream, appended, header = out
+        col = header.index(next(h for h in header if h.startswith("sma20 ")))
+        problems += [] if stream.spec and stream.spec["close"] == 4 and stream.spec["sma20"] == 4 else [f"checkpoint spec {stream.spec and stream.spec['close']}"]
+        problems += [] if len(appended) == 50 else [f"appended {len(appended)} rows"]
+        problems += [] if any(round(r[col], 2) != r[col] for r in appended) else ["appended rows rounded to the new bars' 2 decimals"]
+    total += 1
+    if problems:
+        print(f"[verify] FAIL encoding append keeps decimals {'; '.join(problems)}")
+        failed += 1
+    else:
+        print("[verify] PASS encoding append keeps decimals (spec widened against the checkpoint)")
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
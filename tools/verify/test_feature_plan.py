@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Feature DAG harness: compute(frame, subset) equals the full compute; plan() dedups shared nodes."""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import features  # noqa: E402
+from lib.py.klineframe import KlineFrame  # noqa: E402
+from test_indicator_parity import synth_rows  # noqa: E402
+
+
+def counted(fn: Any, op: str, calls: Dict[str, int]) -> Any:
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        calls[op] = calls.get(op, 0) + 1
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def main() -> int:
+    """Run the feature plan checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL feature_plan {label} {'; '.join(problems[:5])}")
+            failed += 1
+        else:
+            print(f"[verify] PASS feature_plan {label}")
+
+    frame = KlineFrame.from_rows(synth_rows(500, seed=5, gaps=4))
+    full = features.compute(frame)
+
+    def mismatches(cols: List[str]) -> List[str]:
+        part = features.compute(frame, cols)
+        bad = [] if list(part) == cols else [f"keys {list(part)}"]
+        return bad + [c for c in cols if not np.array_equal(part[c], full[c], equal_nan=True)]
+
+    problems = [f"{c}: {bad}" for c in features.FEATURES if (bad := mismatches([c]))]
+    check(f"each of {len(features.FEATURES)} columns alone equals the full compute", problems)
+
+    rnd = random.Random(1)
+    problems = []
+    for _ in range(20):
+        cols = rnd.sample(list(features.FEATURES), rnd.randint(2, 12))
+        problems += [f"{cols}: {bad}"] if (bad := mismatches(cols)) else []
+    problems += mismatches(list(features.FEATURES_1D.values()))
+    check("random subsets and FEATURES_1D equal the matching full columns", problems)
+
+    nodes = features.plan(features.FEATURES_1D.values())
+    ops = sorted(n.op for n in nodes)
+    want = sorted(["rsi", "atr", "ema", "ema", "sub", "macd_signal", "rolling_max", "rolling_min"])
+    problems = [] if len(nodes) == 8 and ops == want else [f"{len(nodes)} nodes {ops}"]
+    calls: Dict[str, int] = {}
+    saved = dict(features.OPS)
+    features.OPS.update({op: counted(fn, op, calls) for op, fn in saved.items()})
+    try:
+        features.compute(frame, features.FEATURES_1D.values())
+    finally:
+        features.OPS.update(saved)
+    problems += [] if sum(calls.values()) == 8 and calls.get("ema") == 2 else [f"ran {calls}"]
+    check("plan(FEATURES_1D) dedups to 8 nodes and compute runs each once", problems)
+
+    problems = []
+    for cols, n in (
+        (["sma20", "bb_mid"], 1),
+        (["di_plus", "di_minus", "adx14"], 1),
+        (["don20_lo", "don20_hi", "fib20_382", "fib20_500", "fib20_618"], 3),
+        (["atr14", "kc_up", "kc_dn", "kc_mid"], 4),
+        (["swing_hh", "swing_ll", "bull_div_rsi", "fib_sw_500"], 5),
+    ):
+        got = len(features.plan(cols))
+        if got != n:
+            problems.append(f"{cols}: {got} nodes, want {n}")
+    nodes = features.plan(features.FEATURES)
+    pos = {n: i for i, n in enumerate(nodes)}
+    for n in nodes:
+        for x in n.inputs:
+            if isinstance(x, features.Node) and pos[x._replace(out=None)] > pos[n]:
+                problems.append(f"{n.op} planned before its input {x.op}")
+    problems += [] if len(nodes) == len(set(nodes)) < len(features.FEATURES) else [f"full plan {len(nodes)} nodes"]
+    check(f"shared computations collapse; full plan is {len(nodes)} nodes for {len(features.FEATURES)} columns, inputs first", problems)
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""FRED cache harness: incremental merge, 3-observation re-verify window, short re-requests, per-series error isolation (fake fetch)."""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import fred  # noqa: E402
+
+
+def monthly(n: int, first: date = date(2020, 1, 1)) -> List[Dict[str, object]]:
+    out = []
+    y, m = first.year, first.month
+    for k in range(n):
+        out.append({"date": date(y, m, 1).isoformat(), "value": 100.0 + k})
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+
+class FakeFred:
+    """Serves `series` from a start date; unknown ids or ids in `down` raise. Records (id, start, count)."""
+
+    def __init__(self, series: Dict[str, List[Dict[str, object]]]) -> None:
+        self.series = series
+        self.down: Set[str] = set()
+        self.calls: List[Tuple[str, str, int]] = []
+        self._lock = threading.Lock()
+
+    def fetch(self, series_id: str, start: str) -> List[Dict[str, object]]:
+        if series_id not in self.series or series_id in self.down:
+            raise fred.transport.TransportError(f"HTTP 400 series {series_id}")
+        out = [dict(o) for o in self.series[series_id] if str(o["date"]) >= start]
+        with self._lock:
+            self.calls.append((series_id, start, len(out)))
+        return out
+
+
+def main() -> int:
+    """Run the FRED cache checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL fred_cache {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS fred_cache {label}")
+
+    saved = os.environ.get("FRED_CACHE_DIR")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["FRED_CACHE_DIR"] = ""
+        problems = [] if fred.default_cache() is None else ["cache without FRED_CACHE_DIR"]
+        os.environ["FRED_CACHE_DIR"] = tmp
+        cache = fred.default_cache()
+        problems += [] if cache is not None and Path(cache.root) == Path(tmp) else ["FRED_CACHE_DIR ignored"]
+        check("default_cache follows FRED_CACHE_DIR", problems)
+
+        src = FakeFred({"CPIAUCSL": monthly(60), "DGS10": monthly(24), "UNRATE": monthly(36)})
+        first = fred.cached_series(cache, "CPIAUCSL", "2020-01-01", src.fetch)
+        problems = [] if first == src.series["CPIAUCSL"] and src.calls == [("CPIAUCSL", "2020-01-01", 60)] else [str(src.calls)]
+        src.series["CPIAUCSL"] += monthly(62)[60:]
+        src.calls.clear()
+        out = fred.cached_series(cache, "CPIAUCSL", "2020-01-01", src.fetch)
+        problems += [] if out == src.series["CPIAUCSL"] else ["merged rows differ"]
+        problems += [] if src.calls == [("CPIAUCSL", src.series["CPIAUCSL"][57]["date"], 5)] else [f"requested {src.calls}"]
+        problems += [] if cache.load("fred", "CPIAUCSL", "obs")[1][-1][1:] == ["2025-02-01", 161.0] else ["cache tail"]
+        check("second pull requests only the last 3 cached + new observations", problems)
+
+        obs = src.series["CPIAUCSL"]
+        obs[-2]["value"] = 999.0  # revised inside the re-verify window
+        obs[-5]["value"] = -1.0  # revised before it: not seen until a full refetch
+        out = fred.cached_series(cache, "CPIAUCSL", "2020-01-01", src.fetch)
+        problems = [] if out[-2]["value"] == 999.0 and cache.load("fred", "CPIAUCSL", "obs")[1][-2][2] == 999.0 else ["revision in window lost"]
+        problems += [] if out[-5]["value"] == 100.0 + 57 else [f"revision outside window picked up: {out[-5]}"]
+        src.calls.clear()
+        out = fred.cached_series(cache, "CPIAUCSL", "2019-06-01", src.fetch)
+        problems += [] if src.calls == [("CPIAUCSL", "2019-06-01", 62)] and out[-5]["value"] == -1.0 else [f"earlier start: {src.calls}"]
+        later = fred.cached_series(cache, "CPIAUCSL", "2024-01-01", src.fetch)
+        problems += [] if later == [o for o in obs if str(o["date"]) >= "2024-01-01"] else ["later start not filtered"]
+        check("re-verify window picks up revisions of the last 3 observations", problems)
+
+        kept = cache.load("fred", "CPIAUCSL", "obs")[1]
+        out = fred.cached_series(cache, "CPIAUCSL", "2019-06-01", lambda sid, start: [])
+        problems = [] if len(out) == 62 and cache.load("fred", "CPIAUCSL", "obs")[1] == kept else [f"empty re-request left {len(out)} observations"]
+        last = [dict(obs[-1])]
+        out = fred.cached_series(cache, "CPIAUCSL", "2019-06-01", lambda sid, start: last)
+        problems += [] if len(out) == 62 and cache.load("fred", "CPIAUCSL", "obs")[1] == kept else [f"one-observation re-request left {len(out)}"]
+        check("an empty or short re-request keeps the cached observations", problems)
+
+        errors: Dict[str, str] = {}
+        got = fred.observations_batch(["DGS10", "NOPE", "UNRATE"], "2020-01-01", src.fetch, cache=cache, on_error=lambda s, e: errors.__setitem__(s, str(e)))
+        problems = [] if got["DGS10"] == src.series["DGS10"] and got["UNRATE"] == src.series["UNRATE"] and got["NOPE"] == [] else ["results"]
+        problems += [] if list(errors) == ["NOPE"] and not cache.path("fred", "NOPE", "obs").exists() else [f"errors {errors}"]
+        before = cache.path("fred", "UNRATE", "obs").read_bytes()
+        src.down.add("UNRATE")
+        src.series["UNRATE"] += monthly(40)[36:]
+        errors.clear()
+        got = fred.observations_batch(["DGS10", "UNRATE"], "2020-01-01", src.fetch, cache=cache, on_error=lambda s, e: errors.__setitem__(s, str(e)))
+        problems += [] if got == {"DGS10": src.series["DGS10"], "UNRATE": []} and list(errors) == ["UNRATE"] else ["second batch"]
+        problems += [] if cache.path("fred", "UNRATE", "obs").read_bytes() == before else ["failed series' segment touched"]
+        try:
+            fred.observations_batch(["DGS10", "UNRATE"], "2020-01-01", src.fetch, cache=cache)
+            problems.append("no error without on_error")
+        except fred.transport.TransportError:
+            pass
+        src.down.clear()
+        got = fred.observations_batch(["UNRATE"], "2020-01-01", src.fetch, cache=cache)
+        problems += [] if got["UNRATE"] == src.series["UNRATE"] else ["recovery after outage"]
+        check("a failing series maps to [] and leaves the others and its cache intact", problems)
+
+    if saved is None:
+        os.environ.pop("FRED_CACHE_DIR", None)
+    else:
+        os.environ["FRED_CACHE_DIR"] = saved
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Parity harness: recursive indicator kernels give identical output on every available backend."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import indicators as ind  # noqa: E402
+
+
+def cases() -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Return (high, low, close) series: short, clean, and gapped (incl. a gap inside the RSI warm-up)."""
+    rng = np.random.default_rng(11)
+    out = {}
+    for label, n, gaps in (("n=0", 0, ()), ("n=10", 10, ()), ("n=5000", 5000, ()), ("gaps", 3000, (5, 400, 401, 2999))):
+        c = np.cumsum(rng.normal(0, 1, n)) + 500
+        h = c + rng.uniform(0, 2, n)
+        l = c - rng.uniform(0, 2, n)
+        for g in gaps:
+            h[g], l[g], c[g] = np.nan, np.nan, np.nan
+        out[label] = (h, l, c)
+    return out
+
+
+CHECKS: List[Tuple[str, Callable[[np.ndarray, np.ndarray, np.ndarray], Tuple[np.ndarray, ...]]]] = [
+    ("ema", lambda h, l, c: (ind.ema(c, 12), ind.ema(c, 200))),
+    ("rma", lambda h, l, c: (ind.rma(c, 14),)),
+    ("rsi", lambda h, l, c: (ind.rsi(c, 14), ind.rsi(c, 2))),
+    ("atr", lambda h, l, c: (ind.atr(h, l, c, 14),)),
+    ("directional_index", lambda h, l, c: ind.directional_index(h, l, c, 14)),
+    ("pivot_indices", lambda h, l, c: ind.price_pivots(h, l, lookback=3, min_sep=5)),
+]
+
+
+def main() -> int:
+    """Run every check on each backend and compare against the pure-Python reference."""
+    backends = ind.available_backends()
+    print(f"[verify] INFO indicator backends available={','.join(backends)}")
+    results: Dict[str, Dict[Tuple[str, str], Tuple[np.ndarray, ...]]] = {}
+    for name in backends:
+        ind.set_backend(name)
+        results[name] = {(check, label): fn(*series) for check, fn in CHECKS for label, series in cases().items()}
+    ind.set_backend("auto")
+
+    failed = 0
+    total = 0
+    for name in backends[1:]:
+        for key, expected in results["python"].items():
+            total += 1
+            got = results[name][key]
+            ok = all(np.array_equal(a, b, equal_nan=True) for a, b in zip(expected, got))
+            if ok:
+                print(f"[verify] PASS backend={name} {key[0]} {key[1]}")
+            else:
+                print(f"[verify] FAIL backend={name} {key[0]} {key[1]} differs from python")
+                failed += 1
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
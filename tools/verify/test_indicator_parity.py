@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Parity harness: a01 compute_all (lib/py/indicators.py) against the pure-Python reference.
+
+Divergence flags intentionally differ: the job flags every confirmed
+divergence, the reference only the last pivot pair. Those four columns are
+checked against `divergence_flags(..., last_only=True)` instead.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import math
+import random
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import List, Tuple
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+APP = ROOT / "a_apps" / "a01_bsp_pullDaily_sheet_full" / "main.py"
+REL_TOL = 1e-9
+DIVERGENCE_COLS = {54: ("rsi", 0), 55: ("rsi", 1), 56: ("cvd", 0), 57: ("cvd", 1)}
+
+
+def load(path: Path, name: str) -> ModuleType:
+    """Import a module from a file path."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synth_rows(n: int, seed: int = 7, gaps: int = 0) -> List[List[object]]:
+    """Return `n` synthetic daily klines in the REST 12-field shape, with `gaps` random 'nan' fields."""
+    rnd = random.Random(seed)
+    px = 4000.0
+    rows: List[List[object]] = []
+    for i in range(n):
+        o = px
+        c = max(1.0, o * (1 + rnd.gauss(0, 0.03)))
+        h = max(o, c) * (1 + abs(rnd.gauss(0, 0.01)))
+        l = min(o, c) * (1 - abs(rnd.gauss(0, 0.01)))
+        v = abs(rnd.gauss(30000, 8000)) + 1
+        tbb = v * rnd.uniform(0.3, 0.7)
+        tp = (h + l + c) / 3
+        ot = 1502928000000 + i * 86_400_000
+        rows.append([ot, f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.8f}", ot + 86_399_999,
+                     f"{v * tp:.8f}", int(v * rnd.uniform(3, 9)), f"{tbb:.8f}", f"{tbb * tp:.8f}", "0"])
+        px = c
+    for _ in range(gaps if n else 0):
+        rows[rnd.randrange(n)][rnd.choice((2, 3, 4, 5, 9))] = "nan"
+    return rows
+
+
+def _same(x: object, y: object) -> bool:
+    if x == "" or y == "":
+        return x == y
+    if isinstance(x, str) or isinstance(y, str):
+        return x == y
+    fx, fy = float(x), float(y)
+    if math.isnan(fx) or math.isnan(fy):
+        return math.isnan(fx) and math.isnan(fy)
+    return abs(fx - fy) <= REL_TOL * max(1.0, abs(fx), abs(fy))
+
+
+def last_pair_divergences(rows: List[List[object]]) -> List[List[object]]:
+    """Return reference-shaped rows whose divergence columns use the Apps Script last-pair rule."""
+    from lib.py import indicators as ind
+    from lib.py.klineframe import KlineFrame
+
+    frame = KlineFrame.from_rows(rows)
+    osc = {"rsi": ind.rsi(frame.close, 14), "cvd": ind.rma(ind.cumulative_delta(ind.delta(frame.tbb, frame.volume)), 5)}
+    flags = {k: ind.divergence_flags(frame.high, frame.low, x, last_only=True) for k, x in osc.items()}
+    return [[int(flags[name][side][i]) for name, side in DIVERGENCE_COLS.values()] for i in range(len(rows))]
+
+
+def compare(expected: List[List[object]], actual: List[List[object]]) -> Tuple[int, str]:
+    """Return (mismatch_count, first_mismatch_description)."""
+    if len(expected) != len(actual):
+        return 1, f"rows expected={len(expected)} actual={len(actual)}"
+    bad = 0
+    first = ""
+    for i, (er, ar) in enumerate(zip(expected, actual)):
+        if len(er) != len(ar):
+            bad += 1
+            first = first or f"row={i} cols expected={len(er)} actual={len(ar)}"
+            continue
+        for j, (x, y) in enumerate(zip(er, ar)):
+            if not _same(x, y):
+                bad += 1
+                first = first or f"row={i} col={j} expected={x!r} actual={y!r}"
+    return bad, first
+
+
+def main() -> int:
+    """Compare both implementations across lengths around the warm-up edges and with gapped input."""
+    try:
+        reference = load(HERE / "reference_compute_all.py", "reference_compute_all")
+        app = load(APP, "a01_main")
+    except Exception as exc:  # pragma: no cover - harness logging only
+        print(f"[verify] FAIL indicator parity import error: {exc}")
+        return 1
+
+    cases = [(n, 7, 0) for n in (0, 1, 14, 15, 27, 60, 201, 1500)] + [(400, seed, 6) for seed in range(3)]
+    failed = 0
+    for n, seed, gaps in cases:
+        rows = synth_rows(n, seed=seed, gaps=gaps)
+        header, matrix = app.compute_all(rows)
+        expected = reference.compute_all(rows)
+        cols = sorted(DIVERGENCE_COLS)
+        bad, first = compare(
+            [[x for j, x in enumerate(r) if j not in DIVERGENCE_COLS] for r in expected],
+            [[x for j, x in enumerate(r) if j not in DIVERGENCE_COLS] for r in matrix],
+        )
+        div_bad, div_first = compare([[r[j] for j in cols] for r in expected], last_pair_divergences(rows))
+        bad, first = bad + div_bad, first or div_first
+        if len(header) != 70:
+            bad, first = bad + 1, first or f"header cols={len(header)}"
+        label = f"n={n} seed={seed} gaps={gaps}"
+        if bad:
+            print(f"[verify] FAIL indicator parity {label} mismatches={bad} first={first}")
+            failed += 1
+        else:
+            print(f"[verify] PASS indicator parity {label}")
+
+    summary = f"[verify] PASS summary: {len(cases) - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
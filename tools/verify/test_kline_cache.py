@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Kline cache harness: incremental append, revised-tail and earlier-since rewrites, torn lines, gap healing, short re-requests."""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py.kline_cache import KlineCache, cached_klines  # noqa: E402
+
+STEP = 86_400_000
+T0 = 1_700_006_400_000
+
+
+def bar(i: int, close: str = "") -> List[object]:
+    t = T0 + i * STEP
+    return [t, "1.0", "2.0", "0.5", close or f"{1 + i / 100:.2f}", "10.0", t + STEP - 1, "15.0", 7, "5.0", "7.5", "0"]
+
+
+class Provider:
+    """Fake exchange: serves closed bars from `from_ms`, counting the bars it sends."""
+
+    def __init__(self, n: int) -> None:
+        self.bars = [bar(i) for i in range(n)]
+        self.sent = 0
+        self.calls: List[int] = []
+
+    def fetch(self, from_ms: int) -> List[List[object]]:
+        out = [list(b) for b in self.bars if b[0] >= from_ms]
+        self.sent += len(out)
+        self.calls.append(from_ms)
+        return out
+
+
+def main() -> int:
+    """Run the cache checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL kline_cache {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS kline_cache {label}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = KlineCache(tmp)
+        key = ("binance", "BTCUSDT", "1d")
+        src = Provider(100)
+
+        def run(start_index: int = 0) -> List[List[object]]:
+            return cached_klines(cache, *key, T0 + start_index * STEP, src.fetch, verify_bars=3, step_ms=STEP)
+
+        first = run()
+        check("first run fetches and stores everything", [] if first == src.bars and cache.load(*key)[1] == src.bars else ["mismatch"])
+
+        src.bars += [bar(i) for i in range(100, 105)]
+        src.sent = 0
+        size = cache.path(*key).stat().st_size
+        out = run()
+        problems = [] if out == src.bars and cache.load(*key)[1] == src.bars else ["rows"]
+        problems += [] if src.sent == 3 + 5 else [f"sent {src.sent} bars"]
+        problems += [] if cache.path(*key).stat().st_size > size else ["segment not appended"]
+        check("new bars appended after re-verifying the last 3", problems)
+
+        src.bars[103] = bar(103, close="9.99")
+        out = run()
+        check("revised cached bar rewrites the tail", [] if out == src.bars and cache.load(*key)[1][103][4] == "9.99" else ["revision lost"])
+
+        src.sent = 0
+        out = run(start_index=-10)
+        problems = [] if cache.load(*key)[0] == T0 - 10 * STEP else [f"start {cache.load(*key)[0]}"]
+        problems += [] if src.sent == len(src.bars) and out == src.bars else [f"sent {src.sent}"]
+        check("earlier since rewrites from scratch", problems)
+
+        path = cache.path(*key)
+        good = path.read_bytes()
+        path.write_bytes(good + b'[1700000000000,"1.0","2.')  # killed mid-append
+        start, rows = cache.load(*key)
+        problems = [] if rows == src.bars and path.read_bytes() == good else ["torn line not dropped"]
+        path.write_bytes(good[:-1])  # killed before the final newline
+        start, rows = cache.load(*key)
+        problems += [] if rows == src.bars and path.read_bytes() == good else ["missing newline not repaired"]
+        src.bars.append(bar(105))
+        problems += [] if run() == src.bars else ["append after repair"]
+        check("torn last line dropped and segment repaired", problems)
+
+        lines = path.read_bytes().split(b"\n")
+        path.write_bytes(b"\n".join(lines[:5] + [b"{oops"] + lines[6:]))
+        check("corrupt middle line discards the segment", [] if cache.load(*key) == (None, []) else ["loaded"])
+        run()
+
+        # A segment with a hole (bars 40..49 missing), e.g. left by an older archive backfill.
+        cache.rewrite(*key, T0, src.bars[:40] + src.bars[50:])
+        src.calls.clear()
+        out = run()
+        problems = [] if out == src.bars and cache.load(*key)[1] == src.bars else ["gap kept"]
+        problems += [] if src.calls == [T0 + 39 * STEP] else [f"refetched from {src.calls}"]
+        check("cached gap refetched from the bar before it", problems)
+
+        src.bars += [bar(i) for i in range(108, 110)]  # provider skipped 106-107 this time
+        out = run()
+        problems = [] if cache.load(*key)[1] == out == src.bars else ["segment differs from provider"]
+        check("new bars that skip an interval are stored as served", problems)
+
+        short = ("binance", "ETHUSDT", "1d")
+        ten = [bar(i) for i in range(10)]
+        cached_klines(cache, *short, T0, lambda f: [b for b in ten if b[0] >= f], verify_bars=3, step_ms=STEP)
+        out = cached_klines(cache, *short, T0, lambda f: [], verify_bars=3, step_ms=STEP)
+        problems = [] if out == ten and cache.load(*short)[1] == ten else [f"empty refetch left {len(out)} rows, {len(cache.load(*short)[1])} on disk"]
+        out = cached_klines(cache, *short, T0, lambda f: [ten[7]], verify_bars=3, step_ms=STEP)
+        problems += [] if out == ten and cache.load(*short)[1] == ten else [f"short refetch left {len(out)} rows"]
+        revised = bar(7, close="7.77")
+        out = cached_klines(cache, *short, T0, lambda f: [revised], verify_bars=3, step_ms=STEP)
+        problems += [] if out == ten[:7] + [revised] + ten[8:] == cache.load(*short)[1] else ["short revision not merged into the tail"]
+        check("short or empty re-request keeps the cached tail, merging any revision", problems)
+
+        obs = KlineCache(Path(tmp) / "fred")
+        months = [[T0 + k * 31 * STEP, f"m{k}", float(k)] for k in range(6)]
+        got = cached_klines(obs, "fred", "CPI", "obs", T0, lambda f: [m for m in months if m[0] >= f], verify_bars=3)
+        months.append([T0 + 6 * 31 * STEP, "m6", 6.0])
+        got = cached_klines(obs, "fred", "CPI", "obs", T0, lambda f: [m for m in months if m[0] >= f], verify_bars=3)
+        check("irregular series (no step) append as before", [] if got == months == obs.load("fred", "CPI", "obs")[1] else ["mismatch"])
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
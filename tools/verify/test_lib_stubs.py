@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""Lightweight harness to ensure stub helpers expose docstrings."""
+"""Lightweight harness to ensure shared helpers expose docstrings and are exported through `__all__`."""
 
 from __future__ import annotations
 
@@ -30,18 +30,56 @@ def check_docstrings(module_name: str, attribute_names: Iterable[str]) -> Tuple[
     return passed, failed
 
 
+def check_exports(module_name: str, attribute_names: Iterable[str]) -> Tuple[int, int]:
+    """Return (pass_count, fail_count) for the module exporting every listed helper in `__all__`."""
+    module = import_module(module_name)
+    exported = set(getattr(module, "__all__", ()))
+    missing = [attr for attr in attribute_names if attr not in exported]
+    if missing:
+        print(f"[verify] FAIL {module_name}.__all__ missing {missing}")
+        return 0, 1
+    print(f"[verify] PASS {module_name}.__all__ exports every helper")
+    return 1, 0
+
+
 def main() -> int:
-    """Run docstring checks across stub modules."""
+    """Run docstring and export checks across the shared modules."""
     checks: List[Tuple[str, Iterable[str]]] = [
-        ("lib.py.bq", ("get_client", "load_dataframe", "insert_json")),
-        ("lib.py.sheets", ("ensure_header", "replace_rows")),
-        ("lib.py.binance", ("get_klines_daily_binance",)),
+        ("lib.py.bq", ("get_client", "set_client", "load_dataframe", "insert_json", "merge_upsert", "merge_sql", "to_arrow", "parquet_bytes", "ohlcv_columns", "features_columns", "Warehouse", "BigQueryWarehouse", "DuckDBWarehouse", "MergeResult", "where_sql", "PartitionCache", "read", "read_klines")),
+        ("lib.py.encoding", ("tick_decimals", "encoding_spec", "widen_spec", "encode_block", "cells", "check_error_bounds")),
+        ("lib.py.startup", ("install", "install_from_argv", "enabled", "ready", "summary", "report")),
+        ("lib.py.sheets", ("SheetsClient", "discovery_document", "client", "dumps", "ensure_header", "replace_rows", "RateLimiter", "call_with_retry", "plan_chunks", "col_letters", "write_rows", "append_rows", "row_hashes", "PublishPlan", "row_runs", "plan_publish", "load_publish_state", "save_publish_state")),
+        ("lib.py.binance", ("get_klines_daily_binance", "klines", "klines_cached", "klines_batch", "klines_frame", "klines_pages", "WeightLimiter")),
+        ("lib.py.kline_cache", ("KlineCache", "cached_klines", "default_cache")),
+        ("lib.py.klineframe", ("KlineFrame",)),
+        ("lib.py.transport", ("Transport", "MirrorStats", "shared")),
+        ("lib.py.fred", ("series_observations", "cached_series", "observations_batch", "default_cache")),
+        ("lib.py.binance_archive", ("ArchiveSource", "iter_archive_rows", "archive_rows", "backfill")),
+        ("lib.py.features", ("Node", "node", "resolve", "plan", "compute", "feature_columns", "FeatureStream", "load_checkpoint", "save_checkpoint")),
+        ("lib.py.panel", ("Panel", "panel_features")),
+        ("lib.py.align", ("Series", "to_days", "iso_days", "series", "asof", "shift_months", "lookback", "yoy", "calendar", "align", "join_frame")),
+        ("lib.py.pipeline", ("Stage", "StageRun", "ArtifactStore", "Pipeline", "digest", "code_digest", "stage_key", "default_store", "background")),
+        ("lib.py.backtest", ("Backtest", "point_in_time", "cross_above", "cross_below", "positions", "simulate", "evaluate", "best")),
+        ("lib.py.telemetry", ("format_line", "log", "enabled", "configure", "record", "span", "snapshot", "reset", "peak_rss_mb", "Sampler", "report", "install")),
+        ("lib.py.sweeps", ("sma_sweep", "ema_sweep", "rma_sweep", "rsi_sweep", "rolling_max_sweep", "rolling_min_sweep", "sweep")),
+        (
+            "lib.py.indicator_stream",
+            ("WindowSums", "SMA", "EMA", "RMA", "RSI", "RollingExtreme", "StdDev", "Lag", "Cumulative", "PivotStream"),
+        ),
         (
             "lib.py.indicators",
             (
+                "available_backends",
+                "set_backend",
+                "backend",
+                "warmup",
                 "sma",
                 "ema",
                 "rma",
+                "stddev",
+                "rolling_max",
+                "rolling_min",
+                "true_range",
                 "atr",
                 "rsi",
                 "macd",
@@ -49,6 +87,7 @@ def main() -> int:
                 "macd_histogram",
                 "roc",
                 "vwap",
+                "session_vwap",
                 "vwma",
                 "delta",
                 "cumulative_delta",
@@ -56,6 +95,7 @@ def main() -> int:
                 "relative_volume",
                 "average_trade_size",
                 "on_balance_volume",
+                "close_location_value",
                 "accumulation_distribution",
                 "chaikin_money_flow",
                 "money_flow_index",
@@ -63,9 +103,14 @@ def main() -> int:
                 "keltner_channels",
                 "directional_index",
                 "donchian_channels",
+                "pivot_indices",
                 "swing_points",
                 "divergence_flags",
+                "fibonacci_from_range",
                 "fibonacci_levels",
+                "swing_fibonacci_levels",
+                "last_cross_index",
+                "anchored_fibonacci_levels",
             ),
         ),
     ]
@@ -75,12 +120,13 @@ def main() -> int:
     for module_name, attrs in checks:
         try:
             passed, failed = check_docstrings(module_name, attrs)
+            exported, unexported = check_exports(module_name, attrs)
         except Exception as exc:  # pragma: no cover - harness logging only
             print(f"[verify] FAIL {module_name} import/docstring error: {exc}")
             total_fail += 1
             continue
-        total_pass += passed
-        total_fail += failed
+        total_pass += passed + exported
+        total_fail += failed + unexported
 
     summary = f"[verify] PASS summary: {total_pass} passed, {total_fail} failed"
     if total_fail:
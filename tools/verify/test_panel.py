@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Panel harness: panel_features equals per-symbol features.compute (misaligned listings, gaps), pool fallback."""
+
+from __future__ import annotations
+
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import features, panel  # noqa: E402
+from lib.py.klineframe import KlineFrame  # noqa: E402
+from test_indicator_parity import synth_rows  # noqa: E402
+
+DAY = 86_400_000
+
+
+class BrokenPool:
+    """ProcessPoolExecutor stand-in whose workers die, as under the OOM killer."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def __enter__(self) -> "BrokenPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+    def map(self, *args: Any, **kwargs: Any) -> Any:
+        raise BrokenProcessPool("A process in the process pool was terminated abruptly")
+
+
+def diff(got: Dict[str, np.ndarray], want: Dict[str, np.ndarray]) -> List[str]:
+    if list(got) != list(want):
+        return ["column order"]
+    return [name for name in want if not np.array_equal(np.asarray(got[name], float), np.asarray(want[name], float), equal_nan=True)]
+
+
+def main() -> int:
+    """Run the panel checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL panel {label} {'; '.join(problems[:5])}")
+            failed += 1
+        else:
+            print(f"[verify] PASS panel {label}")
+
+    full = synth_rows(600, seed=11)
+    late = synth_rows(420, seed=12)
+    for r in late:  # listed 180 days after the others
+        r[0] += 180 * DAY
+        r[6] += 180 * DAY
+    gappy = synth_rows(600, seed=13)
+    gappy = gappy[:200] + gappy[230:]  # 30-day exchange outage
+    delisted = synth_rows(350, seed=14, gaps=5)
+    rows = {"AAA": full, "BBB": late, "CCC": gappy, "DDD": delisted}
+    frames = {sym: KlineFrame.from_rows(r) for sym, r in rows.items()}
+    p = panel.Panel.from_frames(frames)
+    want = {sym: features.compute(KlineFrame.from_rows(r)) for sym, r in rows.items()}
+
+    problems = [] if p.present.sum(axis=0).tolist() == [600, 420, 570, 350] else [str(p.present.sum(axis=0))]
+    for sym, fr in frames.items():
+        if not np.array_equal(p.frame(sym).close, fr.close, equal_nan=True) or not np.array_equal(p.frame(sym).open_time, fr.open_time):
+            problems.append(f"{sym} frame round trip")
+    check(f"panel aligns {len(frames)} symbols on {p.times.shape[0]} bars", problems)
+
+    for workers in (1, 2):
+        got = panel.panel_features(p, workers=workers)
+        problems = [f"{sym}: {bad}" for sym in rows if (bad := diff(got[sym], want[sym]))]
+        problems += [] if list(got) == list(rows) else ["symbol order"]
+        check(f"panel_features equals per-symbol compute (workers={workers})", problems)
+
+    cols = ("rsi14", "macd", "bull_div_cvd")
+    got = panel.panel_features(p, cols, workers=2)
+    problems = [f"{sym}: {bad}" for sym in rows if (bad := diff(got[sym], {c: want[sym][c] for c in cols}))]
+    grid = p.to_grid({sym: got[sym][cols[0]] for sym in rows})
+    problems += [] if np.isnan(grid[~p.present]).all() and np.array_equal(grid[p.present[:, 1], 1], got["BBB"][cols[0]], equal_nan=True) else ["to_grid"]
+    check(f"column subset {cols} and to_grid scatter", problems)
+
+    real = panel.ProcessPoolExecutor
+    panel.ProcessPoolExecutor = BrokenPool  # type: ignore[misc,assignment]
+    try:
+        got = panel.panel_features(p, workers=4)
+        problems = [f"{sym}: {bad}" for sym in rows if (bad := diff(got[sym], want[sym]))]
+    except BrokenProcessPool as exc:
+        problems = [f"raised {exc}"]
+    finally:
+        panel.ProcessPoolExecutor = real  # type: ignore[misc]
+    check("broken process pool falls back to in-process compute", problems)
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
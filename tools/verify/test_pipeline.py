@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""Pipeline harness: stage DAG (concurrency, content-hash skips, publish retry) and the streaming spot1d path."""
+
+from __future__ import annotations
+
+import re
+import sys
+import tempfile
+import threading
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from a_apps.a01_bsp_pullDaily_sheet_full import main as a01  # noqa: E402
+from a_publish.p01_export_spot1d import stage as publish  # noqa: E402
+from a_transform.t02_features_spot1d import stage as transform  # noqa: E402
+from a_transform.t03_macro_spot1d import stage as macro  # noqa: E402
+from lib.py import align, encoding, pipeline  # noqa: E402
+from lib.py.klineframe import FIELDS, KlineFrame  # noqa: E402
+from test_indicator_parity import synth_rows  # noqa: E402
+
+RANGE = re.compile(r"^(?P<tab>[^!]+)!(?P<col>[A-Z]+)(?P<lo>\d+):[A-Z]+(?P<hi>\d+)$")
+
+
+class FakeSheets:
+    """In-memory tab implementing the SheetsClient calls the stream publisher makes (or discarding rows)."""
+
+    def __init__(self, keep: bool = True) -> None:
+        self.keep = keep
+        self.grid: Dict[int, List[Any]] = {}
+        self.header: List[str] = []
+        self.rows = 0
+        self.calls = 0
+
+    def ensure_header(self, sheet_id: str, tab: str, header: List[str]) -> None:
+        self.header = list(header)
+
+    def properties(self, sheet_id: str, tab: str, *, rows: int) -> None:
+        self.rows = max(self.rows, rows)
+
+    def tabs(self, sheet_id: str) -> Dict[str, Any]:
+        return {"t": {"gridProperties": {"rowCount": self.rows}}}
+
+    def clear_rows(self, sheet_id: str, tab: str, first: int = 0) -> None:
+        self.grid = {i: r for i, r in self.grid.items() if i < first}
+
+    def write_rows(self, sheet_id: str, tab: str, rows: List[List[Any]], *, first_row: int, width: int, workers: int) -> None:
+        self.calls += 1
+        if self.keep:
+            for j, row in enumerate(rows):
+                self.grid[first_row - 2 + j] = list(row)
+
+    def update_values(self, sheet_id: str, data: List[Dict[str, Any]]) -> None:
+        self.calls += 1
+        for item in data if self.keep else ():
+            m = RANGE.match(item["range"])
+            col = sum((ord(c) - 64) * 26 ** k for k, c in enumerate(reversed(m["col"]))) - 1
+            for j, (value,) in enumerate(item["values"]):
+                self.grid[int(m["lo"]) - 2 + j][col] = value
+
+    def table(self) -> List[List[Any]]:
+        return [self.grid[i] for i in range(len(self.grid))]
+
+
+def same_cell(a: Any, b: Any, rel: float) -> bool:
+    """Equal cells (NaN == NaN); floats may differ by `rel` relative."""
+    if isinstance(a, float) and isinstance(b, float):
+        return repr(a) == repr(b) or abs(a - b) <= rel * max(abs(a), abs(b))
+    return repr(a) == repr(b)
+
+
+def pages_of(frame: KlineFrame, size: int) -> Iterator[KlineFrame]:
+    """Slice a frame the way the REST walk pages it."""
+    for lo in range(0, len(frame), size):
+        yield frame.take(slice(lo, lo + size))
+
+
+def main() -> int:
+    """Check the DAG runner, `background` and stream/batch parity plus bounded memory."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL pipeline {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS pipeline {label}")
+
+    calls: Dict[str, int] = {}
+    barrier = threading.Barrier(2, timeout=10)
+    fail_publish = [True]
+
+    def count(name: str) -> None:
+        calls[name] = calls.get(name, 0) + 1
+
+    def pull_a(a_param: int) -> Dict[str, Any]:
+        count("pull_a")
+        barrier.wait()  # only returns once pull_b is running too
+        return {"a": list(range(a_param))}
+
+    def pull_b(b_param: str) -> Dict[str, Any]:
+        count("pull_b")
+        barrier.wait()
+        return {"b": b_param * 2}
+
+    def join(a: List[int], b: str) -> Dict[str, Any]:
+        count("join")
+        return {"joined": (sum(a), b)}
+
+    def emit(joined: Any) -> Dict[str, Any]:
+        count("emit")
+        if fail_publish[0]:
+            raise RuntimeError("sheets 503")
+        return {"sent": joined}
+
+    def stages(version: str = "v1") -> List[pipeline.Stage]:
+        return [
+            pipeline.Stage("emit", emit, ("joined",), ("sent",)),
+            pipeline.Stage("pull_a", pull_a, ("a_param",), ("a",)),
+            pipeline.Stage("pull_b", pull_b, ("b_param",), ("b",)),
+            pipeline.Stage("join", join, ("a", "b"), ("joined",), code=(version,)),
+        ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = pipeline.ArtifactStore(tmp)
+        params = {"a_param": 5, "b_param": "x"}
+        first = pipeline.Pipeline(stages(), store).run(params)
+        status = {n: r.status for n, r in first.items()}
+        check("independent stages run concurrently", [] if status["pull_a"] == status["pull_b"] == "ran" else [str(first)])
+        check("failed publish keeps upstream artifacts", [] if status == {"pull_a": "ran", "pull_b": "ran", "join": "ran", "emit": "failed"} else [str(status)])
+
+        fail_publish[0] = False
+        before = dict(calls)
+        retry = pipeline.Pipeline(stages(), store).run(params)
+        status = {n: r.status for n, r in retry.items()}
+        sent = store.get(store.record("emit")["outputs"]["sent"])
+        problems = [] if status == {"pull_a": "cached", "pull_b": "cached", "join": "cached", "emit": "ran"} else [str(status)]
+        problems += [] if sent == (10, "xx") else [f"sent {sent}"]
+        problems += [] if calls["pull_a"] == before["pull_a"] and calls["join"] == before["join"] else [f"calls {calls}"]
+        check("retry reruns only the failed stage", problems)
+
+        again = pipeline.Pipeline(stages(), store).run(params)
+        check("unchanged inputs skip every stage", [] if all(r.status == "cached" for r in again.values()) else [str(again)])
+
+        barrier = threading.Barrier(1)
+        changed = pipeline.Pipeline(stages(), store).run({"a_param": 6, "b_param": "x"})
+        status = {n: r.status for n, r in changed.items()}
+        check("changed input reruns its dependents only", [] if status == {"pull_a": "ran", "pull_b": "cached", "join": "ran", "emit": "ran"} else [str(status)])
+
+        recoded = pipeline.Pipeline(stages("v2"), store).run({"a_param": 6, "b_param": "x"})
+        status = {n: r.status for n, r in recoded.items()}
+        check("changed code reruns the stage", [] if status["join"] == "ran" and status["pull_a"] == "cached" else [str(status)])
+
+        def broken(b: str) -> Dict[str, Any]:
+            raise ValueError("boom")
+
+        graph = [pipeline.Stage("pull_b", pull_b, ("b_param",), ("b",)), pipeline.Stage("bad", broken, ("b",), ("c",)),
+                 pipeline.Stage("after", lambda c: {"d": c}, ("c",), ("d",)), pipeline.Stage("pull_a", pull_a, ("a_param",), ("a",))]
+        out = pipeline.Pipeline(graph, pipeline.ArtifactStore(Path(tmp) / "b")).run(params)
+        status = {n: r.status for n, r in out.items()}
+        check("failure blocks dependents only", [] if status == {"pull_b": "ran", "pull_a": "ran", "bad": "failed", "after": "blocked"} else [str(status)])
+
+        bars = KlineFrame.from_rows(synth_rows(120, seed=9))
+        fred_up = [False]
+
+        def ingest_fred(fred_series: List[str]) -> Dict[str, Any]:
+            if not fred_up[0]:
+                raise RuntimeError("FRED 503")
+            return {"fred": {sid: align.series([{"date": "2000-01-01", "value": 1.0}]) for sid in fred_series}}
+
+        def spot1d() -> List[pipeline.Stage]:
+            return [
+                pipeline.Stage("ingest_klines", lambda symbol: {"klines": bars}, ("symbol",), ("klines",)),
+                pipeline.Stage("ingest_fred", ingest_fred, ("fred_series",), ("fred",)),
+                transform.STAGE,
+                macro.STAGE,
+                pipeline.Stage("publish_spot1d", lambda header, matrix, sheet_id, sheet_tab: {"published": len(matrix)}, publish.STAGE.inputs, publish.STAGE.outputs),
+            ]
+
+        params = {"symbol": "BTCUSDT", "fred_series": ["DGS10"], "encoding_mode": "compact", "sheet_id": "S", "sheet_tab": "spot1d"}
+        store = pipeline.ArtifactStore(Path(tmp) / "spot1d")
+        status = {n: r.status for n, r in pipeline.Pipeline(spot1d(), store).run(params).items()}
+        problems = [] if status == {"ingest_klines": "ran", "ingest_fred": "failed", "transform_features": "ran", "join_macro": "blocked", "publish_spot1d": "ran"} else [str(status)]
+        fred_up[0] = True
+        status = {n: r.status for n, r in pipeline.Pipeline(spot1d(), store).run(params).items()}
+        joined = store.get(store.record("join_macro")["outputs"]["macro"])
+        problems += [] if status["join_macro"] == "ran" and status["publish_spot1d"] == "cached" else [str(status)]
+        problems += [] if list(joined) == ["DGS10"] and len(joined["DGS10"]) == len(bars) else [f"macro {list(joined)}"]
+        check("a FRED failure blocks only join_macro, never the spot1d publish", problems)
+
+    problems = []
+    try:
+        pipeline.Pipeline([pipeline.Stage("x", join, ("b",), ("a",)), pipeline.Stage("y", join, ("a",), ("b",))], pipeline.ArtifactStore(tempfile.gettempdir()))
+        problems.append("no error")
+    except ValueError:
+        pass
+    check("cycle rejected", problems)
+
+    ahead = [0]
+    produced = [0]
+
+    def source() -> Iterator[int]:
+        for i in range(200):
+            produced[0] += 1
+            yield i
+
+    got = []
+    for item in pipeline.background(source(), depth=3):
+        ahead[0] = max(ahead[0], produced[0] - len(got))
+        got.append(item)
+
+    def exploding() -> Iterator[int]:
+        yield 1
+        raise KeyError("page 2")
+
+    try:
+        list(pipeline.background(exploding()))
+        raised = False
+    except KeyError:
+        raised = True
+    check("background keeps order, bounds lookahead, re-raises", [] if got == list(range(200)) and ahead[0] <= 5 and raised else [f"ahead={ahead[0]} raised={raised}"])
+
+    frame = KlineFrame.from_rows(synth_rows(2600, seed=11, gaps=4))
+    for mode in ("compact", "full"):
+        spec = encoding.encoding_spec(frame) if mode == "compact" else None
+        header, matrix = a01.compute_all(frame, spec)
+        sheet = FakeSheets()
+        chunks = pipeline.background(transform.stream(pipeline.background(pages_of(frame, 1000)), mode))
+        n = publish.stream(sheet, "S", "spot1d", header, chunks)
+        table = sheet.table()
+        # compact: encode_block caps decimals by the block's peak (|x| * 10**d < 2**53); a page's peak
+        # can sit below the history's, so streamed cells may keep a digit the batch rounded away
+        rel = 1e-12 if mode == "compact" else 0.0
+        bad = sum(1 for x, y in zip(table, matrix) if not all(same_cell(a, b, rel) for a, b in zip(x, y))) + abs(len(table) - len(matrix))
+        check(f"stream equals batch ({mode}, {len(frame)} bars in 1000-bar pages)", [] if bad == 0 and n == len(matrix) and sheet.header == header else [f"{bad} rows differ"])
+
+    big = KlineFrame.concat([frame] + [
+        KlineFrame(**{name: getattr(frame, name) + (k * len(frame) * 86_400_000 if name in ("open_time", "close_time") else 0) for name in FIELDS})
+        for k in range(1, 4)
+    ])
+    tracemalloc.start()
+    a01.compute_all(big, encoding.encoding_spec(big))
+    batch_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    sink = FakeSheets(keep=False)
+    publish.stream(sink, "S", "spot1d", a01.build_header(), pipeline.background(transform.stream(pipeline.background(pages_of(big, 1000)), "compact")))
+    stream_peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    ratio = stream_peak / batch_peak
+    check(f"stream peak memory {stream_peak / 1e6:.1f} MB vs batch {batch_peak / 1e6:.1f} MB ({len(big)} bars)", [] if ratio < 0.5 else [f"ratio {ratio:.2f}"])
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Diff-publish harness: row hashes, plan_publish (schema change, changed runs, shrink), state round trip, a01 publish_diff."""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, List
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fake_sheets import FakeService, attach  # noqa: E402
+from lib.py import sheets  # noqa: E402
+from test_indicator_parity import APP, load  # noqa: E402
+
+HEADER = ["time", "close", "ema"]
+
+
+def matrix_of(n: int) -> List[List[Any]]:
+    return [[f"2026-01-{i % 28 + 1:02d}", 100.0 + i, round(99.5 + i * 0.9, 4)] for i in range(n)]
+
+
+def main() -> int:
+    """Run the diff-publish checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL publish_diff {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS publish_diff {label}")
+
+    rows = matrix_of(20)
+    hashes = sheets.row_hashes(rows)
+    problems = [] if hashes == sheets.row_hashes([list(r) for r in rows]) else ["not deterministic"]
+    problems += [] if len(set(hashes)) == len(rows) and all(len(h) == 16 for h in hashes) else ["collisions or width"]
+    problems += [] if sheets.row_hashes([rows[0][:2] + [rows[0][2] + 1e-9]])[0] != hashes[0] else ["small change not seen"]
+    check("row_hashes are stable per content and sensitive to any cell", problems)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "state" / "spot1d.json")
+        problems = [] if sheets.load_publish_state(path) is None else ["state before first save"]
+        sheets.save_publish_state(path, "S", "t", HEADER, hashes)
+        state = sheets.load_publish_state(path)
+        problems += [] if sheets.plan_publish(state, "S", "t", HEADER, hashes) == sheets.PublishPlan(False, [], None) else ["unchanged rows planned"]
+        problems += [] if [p.name for p in Path(path).parent.iterdir()] == ["spot1d.json"] else ["temp file left"]
+        check("state round trip: unchanged content plans nothing", problems)
+
+    problems = []
+    for label, st in (
+        ("no state", None),
+        ("header", {**state, "header": "0" * 16}),
+        ("tab", {**state, "tab": "other"}),
+        ("sheet", {**state, "sheet_id": "other"}),
+        ("version", {**state, "version": sheets.PUBLISH_STATE_VERSION + 1}),
+    ):
+        plan = sheets.plan_publish(st, "S", "t", HEADER, hashes)
+        if plan != sheets.PublishPlan(True, [(0, 20)], 20):
+            problems.append(f"{label}: {plan}")
+    plan = sheets.plan_publish(state, "S", "t", HEADER + ["rsi"], hashes)
+    problems += [] if plan.full else ["added column not a full rewrite"]
+    check("schema/target change or missing state forces a full rewrite", problems)
+
+    changed = [list(r) for r in rows] + matrix_of(23)[20:]
+    for i in (3, 4, 9):
+        changed[i][1] += 0.5
+    plan = sheets.plan_publish(state, "S", "t", HEADER, sheets.row_hashes(changed))
+    check("changed rows collapse into runs, new rows appended as a run",
+          [] if plan == sheets.PublishPlan(False, [(3, 5), (9, 10), (20, 23)], None) else [str(plan)])
+
+    shrunk = [list(r) for r in rows[:15]]
+    shrunk[14][2] = 0.0
+    plan = sheets.plan_publish(state, "S", "t", HEADER, sheets.row_hashes(shrunk))
+    problems = [] if plan == sheets.PublishPlan(False, [(14, 15)], 15) else [str(plan)]
+    plan = sheets.plan_publish(state, "S", "t", HEADER, [])
+    problems += [] if plan == sheets.PublishPlan(False, [], 0) else [f"emptied: {plan}"]
+    check("shrinking content clears from the new length", problems)
+
+    try:
+        app = load(APP, "a01_main")
+    except ImportError as exc:
+        print(f"[verify] SKIP publish_diff a01 publish_diff: {exc}")
+        app = None
+    if app is not None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "publish.json")
+            svc = FakeService()
+            client = attach(sheets.SheetsClient(limiter=None), svc)
+            written, full = app.publish_diff(client, "S", "t", HEADER, rows, path)
+            problems = [] if (written, full) == (20, True) and svc.table("t") == rows else [f"first: {(written, full)}"]
+            problems += [] if sheets.load_publish_state(path)["rows"] == hashes else ["state not saved"]
+
+            mark = len(svc.calls)
+            edited = [list(r) for r in rows[:17]]
+            edited[5][1] = -1.0
+            written, full = app.publish_diff(client, "S", "t", HEADER, edited, path)
+            calls = svc.calls[mark:]
+            problems += [] if (written, full) == (1, False) and svc.table("t") == edited else [f"diff: {(written, full)}"]
+            problems += [] if [m for m, _ in calls] == ["spreadsheets.values.batchUpdate", "spreadsheets.values.clear"] else [str([m for m, _ in calls])]
+            problems += [] if calls and [d["range"] for d in calls[0][1]["body"]["data"]] == ["t!A7:C7"] else ["changed row range"]
+            problems += [] if len(calls) > 1 and calls[1][1]["range"] == "t!A19:ZZZ" else ["tail clear range"]
+
+            mark = len(svc.calls)
+            written, full = app.publish_diff(client, "S", "t", HEADER, edited, path)
+            problems += [] if (written, full) == (0, False) and len(svc.calls) == mark else ["republish of same rows wrote"]
+
+            header = HEADER[:2] + ["ema (20)"]
+            written, full = app.publish_diff(client, "S", "t", header, edited, path)
+            problems += [] if (written, full) == (17, True) and svc.grid["t"][0] == header else [f"schema change: {(written, full)}"]
+            check("a01 publish_diff writes changed rows, clears the tail, rewrites on schema change", problems)
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
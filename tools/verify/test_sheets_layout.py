@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""SheetsClient layout harness: exact batchUpdate bodies and round trips for new tab, grow, shrink, FOLD_CELLS cutover."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fake_sheets import FakeService, HttpError, attach  # noqa: E402
+from lib.py import sheets  # noqa: E402
+
+SHEET = "S"
+
+
+def header_cells(sheet: int, header: List[str]) -> Dict[str, Any]:
+    return {
+        "updateCells": {
+            "start": {"sheetId": sheet, "rowIndex": 0, "columnIndex": 0},
+            "rows": [{"values": [{"userEnteredValue": {"stringValue": h}} for h in header]}],
+            "fields": "userEnteredValue",
+        }
+    }
+
+
+def requests_of(svc: FakeService, since: int = 0) -> List[List[Dict[str, Any]]]:
+    """Request lists of the executed spreadsheets.batchUpdate calls from call `since` on."""
+    return [kw["body"]["requests"] for m, kw in svc.calls[since:] if m == "spreadsheets.batchUpdate"]
+
+
+def main() -> int:
+    """Run the layout checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL sheets_layout {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS sheets_layout {label}")
+
+    svc = FakeService()
+    svc.add_tab("a", 0)
+    svc.add_tab("b", 7)
+    client = attach(sheets.SheetsClient(limiter=None), svc)
+
+    calls = client.replace_rows(SHEET, "t", [[1, "x"], [2.5, None]], header=["time", "v"])
+    want = [
+        {"addSheet": {"properties": {"sheetId": 8, "title": "t", "gridProperties": {"rowCount": 1000, "columnCount": 26}}}},
+        header_cells(8, ["time", "v"]),
+        {
+            "updateCells": {
+                "start": {"sheetId": 8, "rowIndex": 1, "columnIndex": 0},
+                "rows": [
+                    {"values": [{"userEnteredValue": {"numberValue": 1}}, {"userEnteredValue": {"stringValue": "x"}}]},
+                    {"values": [{"userEnteredValue": {"numberValue": 2.5}}, {}]},
+                ],
+                "fields": "userEnteredValue",
+            }
+        },
+    ]
+    problems = [] if svc.methods() == ["spreadsheets.get", "spreadsheets.batchUpdate"] and calls == 1 else [f"{svc.methods()} returned {calls}"]
+    problems += [] if svc.calls[0][1].get("fields") == sheets.PROPERTY_FIELDS else ["metadata read not field-masked"]
+    problems += [] if requests_of(svc) == [want] else [f"body {requests_of(svc)}"]
+    problems += [] if svc.table("t") == [[1, "x"], [2.5]] else [str(svc.table("t"))]
+    check("new tab: one get + one batchUpdate with client-chosen sheetId, header and data", problems)
+
+    mark = len(svc.calls)
+    header = [f"c{j}" for j in range(28)]
+    grown = [[i, i + 0.5] for i in range(1500)]
+    calls = client.replace_rows(SHEET, "t", grown, header=header)
+    reqs = requests_of(svc, mark)
+    problems = [] if svc.methods()[mark:] == ["spreadsheets.batchUpdate"] and calls == 1 else [f"{svc.methods()[mark:]} returned {calls}"]
+    problems += [] if reqs and reqs[0][:3] == [
+        {"appendDimension": {"sheetId": 8, "dimension": "ROWS", "length": 501}},
+        {"appendDimension": {"sheetId": 8, "dimension": "COLUMNS", "length": 2}},
+        header_cells(8, header),
+    ] else [f"structural requests {reqs[0][:3] if reqs else None}"]
+    problems += [] if reqs and len(reqs[0]) == 4 and reqs[0][3]["updateCells"]["start"]["rowIndex"] == 1 else ["data not folded in"]
+    problems += [] if svc.tabs["t"]["gridProperties"] == {"rowCount": 1501, "columnCount": 28} else [str(svc.tabs["t"])]
+    problems += [] if client.tabs(SHEET)["t"]["gridProperties"] == svc.tabs["t"]["gridProperties"] else ["cached grid stale"]
+    problems += [] if svc.table("t") == grown else ["rows"]
+    check("grow: appendDimension rows/columns in the same batchUpdate, no metadata re-read", problems)
+
+    mark = len(svc.calls)
+    small = [[i, -i] for i in range(10)]
+    calls = client.replace_rows(SHEET, "t", small, header=header)
+    reqs = requests_of(svc, mark)
+    clear = {"updateCells": {"range": {"sheetId": 8, "startRowIndex": 11, "endRowIndex": 1501}, "fields": "userEnteredValue"}}
+    problems = [] if svc.methods()[mark:] == ["spreadsheets.batchUpdate"] and calls == 1 else [f"{svc.methods()[mark:]} returned {calls}"]
+    problems += [] if reqs and len(reqs[0]) == 3 and reqs[0][0] == header_cells(8, header) and reqs[0][2] == clear else [f"requests {reqs}"]
+    problems += [] if svc.table("t") == small else [f"{len(svc.table('t'))} rows left"]
+    check("shrink: stale tail cleared by a ranged updateCells in the same batchUpdate", problems)
+
+    mark = len(svc.calls)
+    big = [[i, i * 2] for i in range(sheets.FOLD_CELLS // 2 + 1000)]
+    calls = client.replace_rows(SHEET, "t", big, header=header)
+    reqs = requests_of(svc, mark)
+    values = [kw["body"]["data"] for m, kw in svc.calls[mark:] if m == "spreadsheets.values.batchUpdate"]
+    problems = [] if svc.methods()[mark:] == ["spreadsheets.batchUpdate", "spreadsheets.values.batchUpdate"] and calls == 2 else [f"{svc.methods()[mark:]} returned {calls}"]
+    problems += [] if reqs == [[{"appendDimension": {"sheetId": 8, "dimension": "ROWS", "length": len(big) + 1 - 1501}}, header_cells(8, header)]] else [f"requests {reqs}"]
+    problems += [] if values and [d["range"] for d in values[0]] == [f"t!A2:AB{len(big) + 1}"] else ["data range"]
+    problems += [] if svc.table("t") == big else ["rows"]
+    check(f"over FOLD_CELLS ({len(big) * 2} cells): structural batchUpdate + chunked values writes", problems)
+
+    svc.fail = lambda m, kw, n: HttpError(400) if m == "spreadsheets.batchUpdate" else None
+    problems = []
+    try:
+        client.replace_rows(SHEET, "t", small, header=header)
+        problems.append("no error")
+    except HttpError:
+        pass
+    problems += [] if SHEET not in client._meta else ["metadata kept after a failed batchUpdate"]
+    svc.fail = None
+    svc.tabs["t"]["gridProperties"]["rowCount"] = 9000  # changed by someone else meanwhile
+    mark = len(svc.calls)
+    client.replace_rows(SHEET, "t", small, header=header)
+    reqs = requests_of(svc, mark)
+    problems += [] if svc.methods()[mark:] == ["spreadsheets.get", "spreadsheets.batchUpdate"] else [str(svc.methods()[mark:])]
+    problems += [] if reqs and reqs[0][-1]["updateCells"]["range"]["endRowIndex"] == 9000 else ["tail clear from stale grid"]
+    problems += [] if svc.table("t") == small else ["rows"]
+    check("failed batchUpdate invalidates cached metadata; next call re-reads it", problems)
+
+    mark = len(svc.calls)
+    client.tabs(SHEET)
+    client.tabs(SHEET, refresh=True)
+    check("tabs() served from cache unless refresh", [] if svc.methods()[mark:] == ["spreadsheets.get"] else [str(svc.methods()[mark:])])
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Sheets write-path harness: chunk limits, resume from the progress file, retry policy incl. appends (fake service)."""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fake_sheets import FakeService, HttpError  # noqa: E402
+from lib.py import sheets  # noqa: E402
+
+
+def matrix_of(n: int, width: int = 10) -> List[List[Any]]:
+    return [[i * 1000 + j + 0.5 for j in range(width)] for i in range(n)]
+
+
+def written_rows(svc: FakeService) -> List[int]:
+    """0-based data rows carried by the executed values.batchUpdate calls."""
+    out: List[int] = []
+    for method, kw in svc.calls:
+        if method == "spreadsheets.values.batchUpdate":
+            for item in kw["body"]["data"]:
+                m = data_rows(item["range"])
+                out.extend(range(m[0], m[1] + 1))
+    return out
+
+
+def data_rows(a1: str) -> List[int]:
+    """[first, last] 0-based data rows of an `tab!A2:J11` range."""
+    lo, hi = a1.split("!")[1].split(":")
+    return [int(lo.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ")) - 2, int(hi.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ")) - 2]
+
+
+def main() -> int:
+    """Run the write-path checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL sheets_write {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS sheets_write {label}")
+
+    matrix = matrix_of(300) + [["x" * 5000] * 10]  # the last row alone exceeds the byte limit below
+    runs = [(0, 40), (55, 56), (60, 301)]
+    chunks = sheets.plan_chunks(matrix, runs, max_cells=200, max_bytes=20_000)
+    problems = []
+    covered = [i for chunk in chunks for a, b in chunk for i in range(a, b)]
+    problems += [] if covered == [i for a, b in runs for i in range(a, b)] else ["rows lost, repeated or reordered"]
+    for k, chunk in enumerate(chunks):
+        cells = sum(len(matrix[i]) for a, b in chunk for i in range(a, b))
+        size = sum(len(sheets.dumps(matrix[i])) for a, b in chunk for i in range(a, b))
+        rows = sum(b - a for a, b in chunk)
+        if rows > 1 and (cells > 200 or size > 20_000):
+            problems.append(f"chunk {k} {cells} cells {size} bytes")
+        if any(b1 == a2 for (_, b1), (a2, _) in zip(chunk, chunk[1:])):
+            problems.append(f"chunk {k} has adjacent runs not merged")
+    problems += [] if chunks[-1] == [(300, 301)] else [f"oversized row not alone: {chunks[-1]}"]
+    problems += [] if chunks[0] == [(0, 20)] and chunks[1] == [(20, 40)] else [f"first chunks {chunks[:2]}"]
+    check(f"plan_chunks packs {len(covered)} rows into {len(chunks)} chunks under both limits", problems)
+
+    data = matrix_of(100)
+    svc = FakeService()
+    sent = sheets.write_rows(lambda: svc, "S", "t", data, max_cells=100, workers=4, limiter=None)
+    problems = [] if svc.table("t") == data and sent == 10 else [f"sent {sent}"]
+    problems += [] if sorted(written_rows(svc)) == list(range(100)) else ["ranges overlap or miss rows"]
+    check("concurrent chunks write disjoint ranges covering every row", problems)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        progress = str(Path(tmp) / "progress.json")
+        for workers in (1, 4):
+            def fail(method: str, kw: Dict[str, Any], attempt: int) -> Optional[BaseException]:
+                # chunk 5 (rows 50-59) is rejected; the others go through
+                return HttpError(400) if data_rows(kw["body"]["data"][0]["range"])[0] == 50 else None
+
+            svc1 = FakeService(fail)
+            try:
+                sheets.write_rows(lambda: svc1, "S", "t", data, max_cells=100, workers=workers, progress_path=progress, limiter=None)
+                problems = ["first attempt did not fail"]
+            except HttpError:
+                problems = []
+            done = set(json.loads(Path(progress).read_text())["done"])
+            svc2 = FakeService()
+            for i, row in svc1.grid.get("t", {}).items():
+                svc2.grid.setdefault("t", {})[i] = list(row)
+            sent = sheets.write_rows(lambda: svc2, "S", "t", data, max_cells=100, workers=workers, progress_path=progress, limiter=None)
+            again = {r // 10 for r in written_rows(svc2)}
+            problems += [] if again == set(range(10)) - done and sent == 10 - len(done) else [f"rewrote {sorted(again)} after {sorted(done)}"]
+            problems += [] if 5 in again and svc2.table("t") == data else ["failed chunk not rewritten"]
+            problems += [] if not Path(progress).exists() else ["progress file left behind"]
+            check(f"rerun after a mid-run failure writes only uncommitted chunks (workers={workers})", problems)
+
+        svc1 = FakeService(lambda m, kw, n: HttpError(400) if n == 3 else None)
+        try:
+            sheets.write_rows(lambda: svc1, "S", "t", data, max_cells=100, workers=1, progress_path=progress, limiter=None)
+        except HttpError:
+            pass
+        changed = [list(r) for r in data]
+        changed[0][0] = -1.0
+        svc2 = FakeService()
+        sent = sheets.write_rows(lambda: svc2, "S", "t", changed, max_cells=100, workers=1, progress_path=progress, limiter=None)
+        check("progress from different content is ignored", [] if sent == 10 and svc2.table("t") == changed else [f"sent {sent}"])
+
+    def flaky(statuses: List[Any]) -> FakeService:
+        return FakeService(lambda m, kw, n: (HttpError(statuses[n - 1]) if isinstance(statuses[n - 1], int) else statuses[n - 1]) if n <= len(statuses) else None)
+
+    def attempt(svc: FakeService, retries: int = 5) -> str:
+        try:
+            sheets.call_with_retry(lambda: svc.spreadsheets().values().batchUpdate(spreadsheetId="S", body={"data": []}),
+                                   retries=retries, base_s=0.001, cap_s=0.002, limiter=None)
+            return "ok"
+        except Exception as exc:
+            return type(exc).__name__
+
+    problems = []
+    for statuses in ([429], [500, 502, 503, 504], [ConnectionError("reset"), TimeoutError("slow")]):
+        svc = flaky(list(statuses))
+        outcome = attempt(svc)
+        if outcome != "ok" or svc.attempts != len(statuses) + 1:
+            problems.append(f"{statuses}: {outcome} after {svc.attempts}")
+    check("429, 5xx and connection errors are retried", problems)
+
+    problems = []
+    for status in (400, 403, 404):
+        svc = flaky([status])
+        outcome = attempt(svc)
+        if outcome != "HttpError" or svc.attempts != 1:
+            problems.append(f"{status}: {outcome} after {svc.attempts}")
+    svc = flaky([503] * 10)
+    outcome = attempt(svc, retries=3)
+    problems += [] if outcome == "HttpError" and svc.attempts == 4 else [f"exhausted: {outcome} after {svc.attempts}"]
+    check("4xx raise at once; retries stop after the limit", problems)
+
+    problems = []
+    for statuses, want, attempts in (
+        ([503], "HttpError", 1),
+        ([TimeoutError("slow")], "TimeoutError", 1),
+        ([ConnectionError("reset")], "ConnectionError", 1),
+        ([429, 429], "ok", 3),
+    ):
+        svc = flaky(list(statuses))
+        try:
+            sheets.append_rows(svc, "S", "t", data[:5], limiter=None)
+            outcome = "ok"
+        except Exception as exc:
+            outcome = type(exc).__name__
+        if outcome != want or svc.attempts != attempts:
+            problems.append(f"{statuses}: {outcome} after {svc.attempts}")
+    check("append is retried only when refused (429), never after an ambiguous failure", problems)
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Cold-start harness: deferred heavy imports, bundled Sheets discovery coverage, --startup-profile output."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import sheets  # noqa: E402
+
+APPS = {
+    "a01": ROOT / "a_apps" / "a01_bsp_pullDaily_sheet_full" / "main.py",
+    "a02": ROOT / "a_apps" / "a02_obb_macro_sheet" / "main.py",
+    "pipeline": ROOT / "tools" / "pipeline" / "run_spot1d.py",
+}
+HEAVY = ("openbb", "pandas", "googleapiclient", "google.auth", "google.cloud", "pyarrow", "duckdb", "numba")
+CALL = re.compile(r"spreadsheets\(\)((?:\.\w+\(\))*)\.(\w+)\(")
+
+
+def sheets_calls() -> List[str]:
+    """Dotted Sheets methods called anywhere in lib/py and the apps, e.g. `spreadsheets.values.append`."""
+    found = set()
+    for path in [*sorted((ROOT / "lib" / "py").glob("*.py")), *APPS.values()]:
+        for chain, method in CALL.findall(path.read_text(encoding="utf-8")):
+            found.add(".".join(["spreadsheets", *re.findall(r"\.(\w+)\(\)", chain), method]))
+    return sorted(found)
+
+
+def covered(doc: dict, dotted: str) -> bool:
+    """True when the discovery document defines the dotted method."""
+    *resources, method = dotted.split(".")
+    node = doc
+    for name in resources:
+        node = node.get("resources", {}).get(name, {})
+    return method in node.get("methods", {})
+
+
+def loaded_after_import(app: Path) -> List[str]:
+    """Heavy packages present in sys.modules after importing the job module in a fresh interpreter."""
+    code = (
+        "import importlib.util, json, sys\n"
+        f"spec = importlib.util.spec_from_file_location('job', {str(app)!r})\n"
+        "spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+        f"print(json.dumps(sorted({{m for m in sys.modules for h in {HEAVY!r} if m == h or m.startswith(h + '.')}})))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=str(ROOT), timeout=120)
+    if out.returncode:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else f"exit {out.returncode}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    """Run the cold-start checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL startup {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS startup {label}")
+
+    doc = sheets.discovery_document()
+    calls = sheets_calls()
+    check("bundled discovery present", [] if doc else [f"{sheets.DISCOVERY_PATH} missing"])
+    if doc:
+        check(f"bundled discovery covers {len(calls)} Sheets methods", [c for c in calls if not covered(doc, c)])
+
+    for name, app in APPS.items():
+        try:
+            heavy = loaded_after_import(app)
+        except Exception as exc:
+            print(f"[verify] SKIP startup {name} import: {exc}")
+            continue
+        check(f"{name} import defers heavy packages", [f"loaded {heavy}"] if heavy else [])
+
+    env = {k: v for k, v in os.environ.items() if k != "SHEET_ID"}
+    run = subprocess.run([sys.executable, str(APPS["a01"]), "--startup-profile"], capture_output=True, text=True, env=env, timeout=120)
+    lines = [json.loads(line) for line in run.stdout.splitlines() if line.startswith("{")]
+    prof = [line for line in lines if line.get("msg") == "startup_profile"]
+    problems = []
+    if not prof:
+        problems.append(f"no profile line (exit {run.returncode})")
+    elif not any(item["module"] == "numpy" for item in prof[0]["slowest"]) or prof[0]["import_ms"] <= 0:
+        problems.append(f"profile {prof[0]}")
+    check("--startup-profile reports import times", problems)
+
+    if importlib.util.find_spec("googleapiclient") is not None and importlib.util.find_spec("google.auth") is not None:
+        from google.auth.credentials import AnonymousCredentials
+
+        svc = sheets.SheetsClient(AnonymousCredentials()).service()
+        req = svc.spreadsheets().values().batchUpdate(spreadsheetId="S", body={"data": []})
+        ok = req.method == "POST" and req.uri.startswith("https://sheets.googleapis.com/v4/spreadsheets/S/values:batchUpdate")
+        check("service built from bundled discovery", [] if ok else [f"{req.method} {req.uri}"])
+    else:
+        print("[verify] SKIP startup service build: google-api-python-client not installed")
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
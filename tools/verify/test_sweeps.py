@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Parity harness: every sweep row equals the single-window indicator (bit-exact, NaN-aware)."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import indicators as ind  # noqa: E402
+from lib.py.sweeps import SWEEPS  # noqa: E402
+
+WINDOWS = [1, 2, 3, 5, 14, 20, 37, 64, 200, 250, 600]
+
+
+def main() -> int:
+    """Compare each sweep against per-window calls on clean, short and gapped series, on every installed backend."""
+    rng = np.random.default_rng(3)
+    series = {}
+    for n, gaps in ((0, 0), (3, 0), (500, 0), (2000, 10)):
+        x = np.cumsum(rng.normal(0, 1, n)) + 100
+        if gaps:
+            x[rng.integers(0, n, gaps)] = np.nan
+        series[f"n={n} gaps={gaps}"] = x
+
+    failed = 0
+    total = 0
+    active = ind.backend()
+    for backend in ind.available_backends():
+        ind.set_backend(backend)
+        for name, fn in SWEEPS.items():
+            single = getattr(ind, name)
+            for label, x in series.items():
+                total += 1
+                matrix = fn(x, WINDOWS)
+                bad = [w for k, w in enumerate(WINDOWS) if not np.array_equal(matrix[k], single(x, w), equal_nan=True)]
+                if bad:
+                    print(f"[verify] FAIL sweep {name} {label} backend={backend} windows={bad}")
+                    failed += 1
+                else:
+                    print(f"[verify] PASS sweep {name} {label} backend={backend}")
+    ind.set_backend(active)
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Telemetry harness: k=v line format, span/record aggregation, library hooks, off-mode cost and PROFILE runs."""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import features, sheets, telemetry, transport  # noqa: E402
+from lib.py.klineframe import KlineFrame  # noqa: E402
+from test_indicator_parity import synth_rows  # noqa: E402
+
+LINE = re.compile(r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z \[[A-Z]+\] \[[\w.]+\] [^|]+( \| (\w+=(\"[^\"]*\"|\S+) ?)+)?$")
+
+# Busy loop on the main thread plus a worker thread, so both profilers have something to find.
+PROFILED = """
+import sys, threading
+sys.path.insert(0, {root!r})
+from lib.py import telemetry
+telemetry.install("profiled")
+
+def spin_worker(n):
+    return sum(i * i for i in range(n))
+
+def spin_main(n):
+    return sum(i * i for i in range(n))
+
+t = threading.Thread(target=spin_worker, args=(3_000_000,))
+t.start()
+spin_main(3_000_000)
+t.join()
+"""
+
+
+class FakeRequest:
+    """googleapiclient HttpRequest stand-in: methodId, serialized body, scripted outcome."""
+
+    def __init__(self, outcome: Any) -> None:
+        self.methodId = "sheets.spreadsheets.values.batchUpdate"
+        self.body = '{"data": []}'
+        self.outcome = outcome
+
+    def execute(self) -> Any:
+        if isinstance(self.outcome, BaseException):
+            raise self.outcome
+        return self.outcome
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        body = b"x" * 1000
+        self.send_response(404 if self.path.startswith("/missing") else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+def find(items: List[Dict[str, Any]], **want: Any) -> List[Dict[str, Any]]:
+    return [it for it in items if all(it.get(k) == v for k, v in want.items())]
+
+
+def main() -> int:
+    """Run the telemetry checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL telemetry {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS telemetry {label}")
+
+    line = telemetry.format_line("info", "sheets", "request", method="values.batchUpdate", ms=12.3456, note="two words", skip=None)
+    problems = [] if LINE.match(line) else [line]
+    problems += [] if line.endswith('method=values.batchUpdate ms=12.346 note="two words"') else [line]
+    check("format_line matches the structured log format", problems)
+
+    telemetry.configure("summary")
+    telemetry.reset()
+    for i in range(4):
+        telemetry.record("http", 0.01 * (i + 1), mod="transport", host="a", status=200, bytes=100, rows=2)
+    telemetry.record("http", 0.5, mod="transport", host="a", status=503, bytes=10)
+    try:
+        with telemetry.span("publish", mod="sheets", tab="t") as sp:
+            sp.fields["rows"] = 7
+            raise KeyError("x")
+    except KeyError:
+        pass
+    snap = telemetry.snapshot()
+    ok = find(snap, name="http", status=200)
+    problems = [] if ok and ok[0]["n"] == 4 and ok[0]["bytes"] == 400 and ok[0]["rows"] == 8 and abs(ok[0]["max_ms"] - 40) < 1e-6 else [str(ok)]
+    problems += [] if snap[0]["status"] == 503 else ["slowest tag set of a name not listed first"]
+    problems += [] if find(snap, name="publish", error="KeyError", rows=7) else [str(find(snap, name="publish"))]
+    check("record/span aggregate by tags and sum bytes/rows", problems)
+
+    telemetry.configure("off")
+    telemetry.reset()
+    telemetry.record("x", 1.0)
+    with telemetry.span("y"):
+        pass
+    check("off mode records nothing", [] if not telemetry.snapshot() and not telemetry.enabled() else [str(telemetry.snapshot())])
+
+    n = 200_000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        telemetry.record("x", 0.0, mod="m", tag=1)
+    off_ns = (time.perf_counter() - t0) / n * 1e9
+    telemetry.configure("summary")
+    t0 = time.perf_counter()
+    for _ in range(n):
+        telemetry.record("x", 0.0, mod="m", tag=1, rows=1)
+    on_ns = (time.perf_counter() - t0) / n * 1e9
+    telemetry.reset()
+    check(f"record cost off {off_ns:.0f} ns, on {on_ns:.0f} ns", [] if off_ns < 1_000 and on_ns < 20_000 else ["too slow"])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"127.0.0.1:{server.server_address[1]}"
+    client = transport.Transport([f"http://{host}"], hedge=False)
+    for _ in range(3):
+        client.get("/ok")
+    try:
+        client.get("/missing")
+    except transport.TransportError:
+        pass
+    server.shutdown()
+    snap = telemetry.snapshot()
+    ok = find(snap, mod="transport", name="http", host=host, status=200)
+    problems = [] if ok and ok[0]["n"] == 3 and ok[0]["bytes"] == 3000 else [str(snap)]
+    problems += [] if find(snap, mod="transport", host=host, status=404) else ["404 not recorded"]
+    check("transport records latency, status and bytes per host", problems)
+
+    telemetry.reset()
+    features.compute(KlineFrame.from_rows(synth_rows(400, seed=3)))
+    families = {it["family"] for it in telemetry.snapshot() if it["mod"] == "features"}
+    check(f"features.compute records {len(families)} families", [] if {"ema", "rsi", "sma"} <= families else [str(sorted(families))])
+
+    telemetry.reset()
+    unavailable = RuntimeError("503")
+    unavailable.status_code = 503  # type: ignore[attr-defined]
+    script = [unavailable, {"ok": True}]
+    sheets.call_with_retry(lambda: FakeRequest(script.pop(0)), base_s=0.0, cap_s=0.0, limiter=None, rows=25)
+    snap = find(telemetry.snapshot(), mod="sheets", name="request", method="spreadsheets.values.batchUpdate")
+    statuses = {it["status"]: it for it in snap}
+    problems = [] if set(statuses) == {200, 503} else [str(snap)]
+    problems += [] if statuses.get(200, {}).get("rows") == 25 and statuses[200].get("bytes") == 12 else [str(statuses.get(200))]
+    check("sheets records every attempt with method, status, bytes and rows", problems)
+
+    rss = telemetry.peak_rss_mb()
+    check(f"peak RSS {rss} MB", [] if rss is None or 1 < rss < 100_000 else [str(rss)])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script_path = Path(tmp) / "profiled.py"
+        script_path.write_text(PROFILED.format(root=str(ROOT)), encoding="utf-8")
+        for kind, suffix, want in (("cprofile", ".prof", ("spin_main",)), ("sample", ".folded", ("spin_main", "spin_worker"))):
+            out = Path(tmp) / f"out{suffix}"
+            env = {**os.environ, "PROFILE": kind, "PROFILE_OUT": str(out), "TELEMETRY": "summary"}
+            run = subprocess.run([sys.executable, str(script_path)], capture_output=True, text=True, env=env, timeout=120)
+            lines = run.stdout.splitlines()
+            top = [ln for ln in lines if "[profile] top" in ln]
+            problems = [] if run.returncode == 0 and out.exists() and out.stat().st_size else [f"exit {run.returncode} {run.stderr[-300:]}"]
+            problems += [f"{fn} missing from top" for fn in want if not any(fn in ln for ln in top)]
+            problems += [] if any("[telemetry] run | job=profiled" in ln for ln in lines) else ["no run line"]
+            problems += [ln for ln in lines if not LINE.match(ln)]
+            check(f"PROFILE={kind} writes {suffix} and logs top functions", problems)
+
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Transport harness: hedge delay, per-attempt pacing hook and queued hedges, EWMA scoring, circuit breaker, stop_status (local mirrors)."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.py import transport  # noqa: E402
+
+
+class Mirror:
+    """Local HTTP mirror: `routes` maps a path prefix to (status, delay_s); counts hits per path."""
+
+    def __init__(self, routes: Dict[str, Tuple[int, float]]) -> None:
+        self.routes = routes
+        self.hits: List[str] = []
+        mirror = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                mirror.hits.append(self.path)
+                status, delay = next((v for k, v in mirror.routes.items() if self.path.startswith(k)), (404, 0.0))
+                time.sleep(delay)
+                body = f"{status}".encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def count(self, prefix: str) -> int:
+        return sum(p.startswith(prefix) for p in self.hits)
+
+
+def main() -> int:
+    """Run the transport checks."""
+    failed = 0
+    total = 0
+
+    def check(label: str, problems: List[str]) -> None:
+        nonlocal failed, total
+        total += 1
+        if problems:
+            print(f"[verify] FAIL transport {label} {'; '.join(problems)}")
+            failed += 1
+        else:
+            print(f"[verify] PASS transport {label}")
+
+    st = transport.MirrorStats()
+    for _ in range(10):
+        st.record(0.1, True, alpha=0.2, threshold=3, cooldown_s=60)
+    st.record(1.0, False, alpha=0.2, threshold=3, cooldown_s=60)
+    st.record(1.0, False, alpha=0.2, threshold=3, cooldown_s=60)
+    problems = [] if abs(st.error_rate - 0.36) < 1e-12 and abs(st.score() - 0.1 * (1 + 4 * 0.36)) < 1e-12 else [f"ewma {st.error_rate} score {st.score()}"]
+    st.record(0.1, True, alpha=0.2, threshold=3, cooldown_s=60)
+    problems += [] if abs(st.error_rate - 0.288) < 1e-12 and st.consecutive_failures == 0 else [f"decay {st.error_rate}"]
+    problems += [] if transport.MirrorStats().score() == float("inf") else ["unsampled mirror not ranked last"]
+    check("error EWMA inflates the median-latency score", problems)
+
+    a = Mirror({"/ok": (200, 0.0), "/slow": (200, 0.4), "/err": (500, 0.0), "/ban": (429, 0.0)})
+    b = Mirror({"/ok": (200, 0.0), "/slow": (200, 0.0), "/err": (200, 0.0), "/ban": (200, 0.0)})
+    paced: List[float] = []
+
+    def pace() -> None:
+        paced.append(time.monotonic())
+
+    api = transport.Transport([a.base, b.base], hedge_min_samples=5, breaker_threshold=3, cooldown_s=0.5)
+    problems = [] if api._hedge_delay(a.base) is None else ["hedging before min samples"]
+    for _ in range(5):
+        api.get("/ok", before_send=pace)
+    problems += [] if a.count("/ok") == 5 and len(paced) == 5 else [f"warm-up hits a={a.count('/ok')} paced={len(paced)}"]
+    p95 = api._hedge_delay(a.base)
+    problems += [] if p95 is not None and p95 < 0.1 else [f"p95 {p95}"]
+    problems += [] if transport.Transport([a.base], hedge=False)._hedge_delay(a.base) is None else ["hedge=False still hedges"]
+    check("hedge delay is the primary's p95 once it has enough samples", problems)
+
+    paced.clear()
+    t0 = time.monotonic()
+    r = api.get("/slow", before_send=pace)
+    took = time.monotonic() - t0
+    problems = [] if r.status_code == 200 and took < 0.3 else [f"took {took:.3f}s"]
+    problems += [] if a.count("/slow") == 1 and b.count("/slow") == 1 else [f"hits a={a.count('/slow')} b={b.count('/slow')}"]
+    problems += [] if len(paced) == 2 and paced[1] - paced[0] >= p95 * 0.9 else [f"before_send ran {len(paced)}x"]
+    check(f"slow primary hedged to the next mirror after p95 ({took:.3f}s), both attempts paced", problems)
+
+    time.sleep(0.5)  # let the abandoned /slow finish so it does not skew the next checks
+    paced.clear()
+    hedgeless = transport.Transport([a.base, b.base], hedge=False, breaker_threshold=3, cooldown_s=0.5)
+    r = hedgeless.get("/err", before_send=pace)
+    problems = [] if r.status_code == 200 and len(paced) == 2 else [f"status {r.status_code} paced {len(paced)}x"]
+    check("failover attempt runs before_send too", problems)
+
+    # c stays ranked first (fast /ok sample, d only ever answers slowly) until its breaker opens
+    c = Mirror({"/ok": (200, 0.0), "/flaky": (500, 0.0)})
+    d = Mirror({"/flaky": (200, 0.05)})
+    api = transport.Transport([c.base, d.base], hedge=False, breaker_threshold=3, cooldown_s=0.5)
+    api.get("/ok")
+    for _ in range(3):
+        api.get("/flaky")
+    opened = api.stats(c.base).open_until > time.monotonic()
+    problems = [] if opened and api.ranked() == [d.base, c.base] else [f"breaker open={opened} ranked={api.ranked()}"]
+    api.get("/flaky")
+    problems += [] if c.count("/flaky") == 3 and d.count("/flaky") == 4 else [f"open mirror tried: c={c.count('/flaky')}"]
+    time.sleep(0.55)
+    c.routes["/flaky"] = (200, 0.0)
+    api.get("/flaky")
+    st = api.stats(c.base)
+    problems += [] if c.count("/flaky") == 4 and st.open_until == 0.0 and st.consecutive_failures == 0 else ["not retried after cooldown"]
+    check("breaker skips a mirror after 3 failures and reopens after cooldown", problems)
+
+    # e is warm (fast p95), f unsampled and ranked last: any hit on f is a hedge
+    e = Mirror({"/ok": (200, 0.0), "/queued": (200, 0.3)})
+    f = Mirror({"/ok": (200, 0.0), "/queued": (200, 0.0)})
+    api = transport.Transport([e.base, f.base], hedge_min_samples=5)
+    for _ in range(5):
+        api.get("/ok")
+    r = api.get("/ok", before_send=lambda: time.sleep(0.3))
+    time.sleep(0.4)  # a hedge fired during the wait would land on f after the primary returned
+    problems = [] if r.status_code == 200 and e.count("/ok") == 6 and f.count("/ok") == 0 else [f"hedged while throttled: f={f.count('/ok')}"]
+    check("time spent in before_send does not count towards the hedge delay", problems)
+
+    waits = [0.0, 0.6]
+    t0 = time.monotonic()
+    r = api.get("/queued", before_send=lambda: time.sleep(waits.pop(0)))
+    took = time.monotonic() - t0
+    time.sleep(0.5)  # the queued hedge wakes from before_send after the primary answered
+    problems = [] if r.status_code == 200 and took < 0.5 and not waits else [f"status {r.status_code} took {took:.3f}s waits {waits}"]
+    problems += [] if e.count("/queued") == 1 and f.count("/queued") == 0 else [f"queued hedge sent: f={f.count('/queued')}"]
+    check("a hedge still queued in before_send is dropped once the primary answers", problems)
+
+    seen: List[int] = []
+    banned = transport.Transport([a.base, b.base], hedge=False, on_response=lambda r: seen.append(r.status_code), stop_status=(429,))
+    try:
+        banned.get("/ban")
+        problems = ["no error"]
+    except transport.TransportError as exc:
+        problems = [] if exc.response is not None and exc.response.status_code == 429 else [str(exc)]
+    problems += [] if b.count("/ban") == 0 and seen == [429] else [f"fell through to b ({b.count('/ban')}), seen {seen}"]
+    check("stop_status aborts instead of falling through", problems)
+
+    for m in (a, b, c, d, e, f):
+        m.server.shutdown()
+    summary = f"[verify] PASS summary: {total - failed} passed, {failed} failed"
+    if failed:
+        print(summary.replace("PASS", "FAIL"))
+        return 1
+    print(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())